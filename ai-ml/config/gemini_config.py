@@ -7,7 +7,8 @@ Handles Gemini API setup, authentication, and rate limiting.
 import os
 import time
 import yaml
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 from dotenv import load_dotenv
@@ -46,6 +47,9 @@ class GeminiAPIManager:
         self.last_request_time = 0
         self.request_count = 0
         self.request_times = []
+        # Scrapers call the manager from worker threads concurrently
+        self._rate_lock = threading.Lock()
+        self._client_lock = threading.Lock()
         
     def _load_config(self) -> GeminiConfig:
         """Load configuration from environment variables and config files."""
@@ -117,21 +121,30 @@ class GeminiAPIManager:
             return False
     
     def _check_rate_limit(self) -> None:
-        """Check and enforce rate limiting."""
-        current_time = time.time()
+        """
+        Check and enforce rate limiting.
         
-        # Remove requests older than 1 minute
-        self.request_times = [t for t in self.request_times if current_time - t < 60]
-        
-        # Check if we're hitting rate limits
-        if len(self.request_times) >= self.config.rate_limit_requests_per_minute:
-            sleep_time = 60 - (current_time - self.request_times[0])
-            if sleep_time > 0:
-                print(f"⏳ Rate limit reached. Waiting {sleep_time:.1f} seconds...")
-                time.sleep(sleep_time)
-        
-        # Add current request time
-        self.request_times.append(current_time)
+        The check and the append happen under one lock, so concurrent
+        callers cannot all pass a nearly full window; a caller that has to
+        wait holds the lock, and the others queue behind it for later slots.
+        """
+        with self._rate_lock:
+            current_time = time.time()
+            
+            # Remove requests older than 1 minute
+            self.request_times = [t for t in self.request_times if current_time - t < 60]
+            
+            # Check if we're hitting rate limits
+            if len(self.request_times) >= self.config.rate_limit_requests_per_minute:
+                sleep_time = 60 - (current_time - self.request_times[0])
+                if sleep_time > 0:
+                    print(f"⏳ Rate limit reached. Waiting {sleep_time:.1f} seconds...")
+                    time.sleep(sleep_time)
+                current_time = time.time()
+                self.request_times = [t for t in self.request_times if current_time - t < 60]
+            
+            # Add current request time
+            self.request_times.append(current_time)
     
     def generate_content(
         self, 
@@ -141,14 +154,31 @@ class GeminiAPIManager:
         max_tokens: Optional[int] = None
     ) -> Optional[str]:
         """Generate content using Gemini API with error handling and retries."""
+        return self.generate_content_with_model(prompt, model, temperature, max_tokens)[0]
+    
+    def generate_content_with_model(
+        self, 
+        prompt: str, 
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Tuple[Optional[str], str]:
+        """
+        Generate content like generate_content, also returning the model that answered.
         
-        # Initialize client if needed
-        if not hasattr(self, 'client'):
-            if not self._initialize_client():
-                return None
+        Failed attempts switch to the fallback model, so callers caching or
+        labelling responses by model must use the returned name.
+        """
         
         # Use provided parameters or defaults
         model_name = model or self.config.model_name
+        
+        # Initialize client if needed
+        if not hasattr(self, 'client'):
+            with self._client_lock:
+                if not hasattr(self, 'client') and not self._initialize_client():
+                    return None, model_name
+        
         temp = temperature if temperature is not None else self.config.temperature
         max_tok = max_tokens or self.config.max_tokens
         
@@ -163,7 +193,7 @@ class GeminiAPIManager:
                     contents=prompt
                 )
                 
-                return response.text
+                return response.text, model_name
                 
             except Exception as e:
                 print(f"❌ Attempt {attempt + 1} failed: {e}")
@@ -179,7 +209,7 @@ class GeminiAPIManager:
                 else:
                     print(f"❌ All attempts failed for prompt: {prompt[:50]}...")
         
-        return None
+        return None, model_name
     
     def test_connection(self) -> bool:
         """Test the API connection with a simple request."""
@@ -1,16 +1,19 @@
 """Regulatory Intelligence API Router"""
 
+import json
+import asyncio
 import logging
-from typing import Any, Dict
+import threading
+from typing import Any, AsyncIterator, Dict, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from services.api.auth.jwt_handler import get_current_user
 from services.api.routers.regulatory_intelligence.models import SearchResult
 from services.api.routers.regulatory_intelligence.models import (
     DocumentAnalysisRequest, DocumentAnalysisResponse,
     SummarizationRequest, SummarizationResponse,
-    QARequest, QAResponse,
+    QARequest, QAResponse, QAStreamRequest,
     SearchRequest, SearchResponse
 )
 
@@ -25,6 +28,38 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Lazily constructed so the router imports without the RAG stack loaded;
+# construction loads models and indexes, so async handlers call these off
+# the event loop
+_rag_system = None
+_response_generator = None
+_init_lock = threading.Lock()
+
+
+def _get_rag_system():
+    """Get the shared RAG system."""
+    global _rag_system
+    with _init_lock:
+        if _rag_system is None:
+            from services.regulatory_intelligence.rag import DocumentEmbeddingService, RAGSystem
+            _rag_system = RAGSystem(DocumentEmbeddingService())
+    return _rag_system
+
+
+def _get_response_generator():
+    """Get the shared response generator for caller-supplied context."""
+    global _response_generator
+    with _init_lock:
+        if _response_generator is None:
+            from services.regulatory_intelligence.rag.retrieval_system import ResponseGenerator
+            _response_generator = ResponseGenerator()
+    return _response_generator
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
 @router.post(
     "/documents/analyze",
@@ -133,6 +168,53 @@ async def answer_question(request: QARequest) -> QAResponse:
         )
 
 
+@router.post(
+    "/qa/stream",
+    summary="Stream Answers to Regulatory Questions",
+    description="Ask a question and stream the answer as Server-Sent Events; citations are sent once generation completes."
+)
+async def stream_answer(request: QAStreamRequest):
+    """Stream an answer to a regulatory question."""
+    try:
+        logger.info(f"Streaming answer for question: {request.question}")
+        
+        if request.context:
+            generator = await asyncio.to_thread(_get_response_generator)
+            events = generator.agenerate_response_stream(
+                request.question,
+                [{"title": "Provided context", "source": "request", "content": request.context}]
+            )
+        else:
+            rag_system = await asyncio.to_thread(_get_rag_system)
+            events = rag_system.aquery_stream(request.question, request.filters)
+        
+        async def generate() -> AsyncIterator[str]:
+            # Errors raised mid-stream become a single error event; the
+            # response has already started, so HTTPException cannot be used
+            failed = False
+            try:
+                async for event in events:
+                    failed = failed or event["event"] == "error"
+                    yield _sse(event["event"], event["data"])
+            except Exception as e:
+                logger.error(f"Error streaming answer: {str(e)}")
+                if not failed:
+                    yield _sse("error", {"message": "Failed to stream answer"})
+                failed = True
+            
+            # Send completion event
+            if not failed:
+                yield _sse("completion", {"status": "completed"})
+        
+        return StreamingResponse(generate(), media_type="text/event-stream")
+    except Exception as e:
+        logger.error(f"Error streaming answer: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to stream answer"
+        )
+
+
 @router.post(
     "/search",
     response_model=SearchResponse,
@@ -42,6 +42,13 @@ class QARequest(BaseModel):
     model_preference: str = Field(default="gemini", description="Preferred LLM model")
 
 
+class QAStreamRequest(BaseModel):
+    """Request model for the streaming Q&A endpoint"""
+    question: str = Field(..., description="Question to answer")
+    context: Optional[str] = Field(default=None, description="Context for answering; retrieved from the RAG index when omitted")
+    filters: Optional[Dict[str, Any]] = Field(default=None, description="Retrieval filters")
+
+
 class QAResponse(BaseModel):
     """Response model for Q&A endpoint"""
     answer: str = Field(..., description="Answer to the question")
@@ -49,6 +49,16 @@ from .metrics import (
     IndividualFairnessAnalyzer,
     IndividualFairnessResult,
     IndividualFairnessThreshold,
+    GroupStatistics,
+    compute_group_statistics,
+    merge_group_statistics,
+    StreamingFairnessAuditor,
+    StreamingAuditConfig,
+    StreamingAuditState,
+    StreamingAuditResult,
+    IntersectionalAnalyzer,
+    IntersectionalResult,
+    IntersectionalThreshold,
 )
 
 # ── Explainability ─────────────────────────────────────────────────────── #
@@ -97,6 +107,9 @@ from .scoring import (
     RiskClassifier,
     BiasAlertManager,
     BiasRiskReportGenerator,
+    OnlineFairnessMonitor,
+    MonitorConfig,
+    MonitorSnapshot,
 )
 
 # ── Visualization ──────────────────────────────────────────────────────── #
@@ -123,6 +136,9 @@ __all__ = [
     "EqualizedOddsAnalyzer", "EqualizedOddsResult", "EqualizedOddsThreshold",
     "CalibrationAnalyzer", "CalibrationResult", "CalibrationThreshold",
     "IndividualFairnessAnalyzer", "IndividualFairnessResult", "IndividualFairnessThreshold",
+    "GroupStatistics", "compute_group_statistics", "merge_group_statistics",
+    "StreamingFairnessAuditor", "StreamingAuditConfig", "StreamingAuditState", "StreamingAuditResult",
+    "IntersectionalAnalyzer", "IntersectionalResult", "IntersectionalThreshold",
     # Explainability
     "SHAPExplainer", "SHAPExplanation", "SHAPConfig",
     "LIMEExplainer", "LIMEExplanation", "LIMEConfig",
@@ -137,6 +153,7 @@ __all__ = [
     "BiasScoreAlgorithm", "WeightProfileManager", "BiasScoreCalculator",
     "ScoreInterpreter", "RiskLevel", "RISK_THRESHOLDS", "RISK_METADATA",
     "RiskClassifier", "BiasAlertManager", "BiasRiskReportGenerator",
+    "OnlineFairnessMonitor", "MonitorConfig", "MonitorSnapshot",
     # Visualization
     "BiasVisualizer",
     # Persistence
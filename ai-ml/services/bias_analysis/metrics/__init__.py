@@ -8,6 +8,9 @@ Metrics:
     - Equalized Odds: TPR and FPR equality across groups
     - Calibration: Predicted probability vs actual outcome alignment
     - Individual Fairness: Similar individuals receive similar predictions
+    - Group Statistics: Single-pass per-group kernel shared by the analyzers
+    - Intersectional: Subgroups over combinations of protected attributes
+    - Streaming Audit: Out-of-core audits from mergeable group statistics
 
 Author: REGIQ AI/ML Team
 Version: 1.0.0
@@ -28,6 +31,22 @@ from .calibration_analysis import (
     CalibrationResult,
     CalibrationThreshold,
 )
+from .group_statistics import (
+    GroupStatistics,
+    compute_group_statistics,
+    merge_group_statistics,
+)
+from .streaming_audit import (
+    StreamingFairnessAuditor,
+    StreamingAuditConfig,
+    StreamingAuditState,
+    StreamingAuditResult,
+)
+from .intersectional_analysis import (
+    IntersectionalAnalyzer,
+    IntersectionalResult,
+    IntersectionalThreshold,
+)
 from .individual_fairness import (
     IndividualFairnessAnalyzer,
     IndividualFairnessResult,
@@ -54,4 +73,17 @@ __all__ = [
     "IndividualFairnessAnalyzer",
     "IndividualFairnessResult",
     "IndividualFairnessThreshold",
+    # Group Statistics
+    "GroupStatistics",
+    "compute_group_statistics",
+    "merge_group_statistics",
+    # Streaming Audit
+    "StreamingFairnessAuditor",
+    "StreamingAuditConfig",
+    "StreamingAuditState",
+    "StreamingAuditResult",
+    # Intersectional
+    "IntersectionalAnalyzer",
+    "IntersectionalResult",
+    "IntersectionalThreshold",
 ]
\ No newline at end of file
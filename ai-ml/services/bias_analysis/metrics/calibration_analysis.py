@@ -40,6 +40,7 @@ except ImportError:
     SKLEARN_AVAILABLE = False
 
 from config.env_config import get_env_config
+from services.bias_analysis.metrics.group_statistics import GroupStatistics, compute_group_statistics
 
 
 @dataclass
@@ -90,19 +91,27 @@ class CalibrationAnalyzer:
     
     def calculate_calibration_metrics(self, y_true: np.ndarray, y_prob: np.ndarray, 
                                     protected_attribute: np.ndarray, 
-                                    protected_groups: Optional[List[str]] = None) -> CalibrationResult:
-        """Calculate calibration metrics."""
+                                    protected_groups: Optional[List[str]] = None,
+                                    group_stats: Optional[GroupStatistics] = None) -> CalibrationResult:
+        """
+        Calculate calibration metrics.
+        
+        Args:
+            group_stats: Precomputed statistics of the same data (from
+                compute_group_statistics with y_prob), shared between analyzers
+        """
         try:
             # Convert to numpy arrays if needed
             y_true = np.array(y_true)
             y_prob = np.array(y_prob)
             protected_attribute = np.array(protected_attribute)
             
-            # Get unique groups
-            if protected_groups is None:
-                groups = np.unique(protected_attribute)
-            else:
-                groups = np.array(protected_groups)
+            # Per-group loss sums and calibration bins in one pass
+            if group_stats is None:
+                group_stats = compute_group_statistics(
+                    protected_attribute, y_true=y_true, y_prob=y_prob,
+                    protected_groups=protected_groups, n_bins=self.threshold.n_bins
+                )
             
             # Calculate metrics for each group
             brier_scores = {}
@@ -111,36 +120,22 @@ class CalibrationAnalyzer:
             mce_scores = {}
             reliability_diagrams = {}
             group_sizes = {}
+            brier, log_losses = group_stats.brier_scores, group_stats.log_losses
+            ece, mce = group_stats.ece, group_stats.mce
             
-            for group in groups:
-                group_mask = protected_attribute == group
-                group_size = np.sum(group_mask)
+            for i, group in enumerate(group_stats.groups):
+                group_size = int(group_stats.sizes[i])
                 
                 if group_size < self.threshold.min_group_size:
                     self.logger.warning(f"Group {group} has only {group_size} samples (min: {self.threshold.min_group_size})")
                     continue
                 
-                group_y_true = y_true[group_mask]
-                group_y_prob = y_prob[group_mask]
-                
-                # Calculate Brier score
-                brier_score = self._calculate_brier_score(group_y_true, group_y_prob)
-                brier_scores[str(group)] = float(brier_score)
-                
-                # Calculate log loss
-                log_loss_score = self._calculate_log_loss(group_y_true, group_y_prob)
-                log_loss_scores[str(group)] = float(log_loss_score)
-                
-                # Calculate ECE and MCE
-                ece, mce = self._calculate_calibration_errors(group_y_true, group_y_prob)
-                ece_scores[str(group)] = float(ece)
-                mce_scores[str(group)] = float(mce)
-                
-                # Calculate reliability diagram
-                reliability_diagram = self._calculate_reliability_diagram(group_y_true, group_y_prob)
-                reliability_diagrams[str(group)] = reliability_diagram
-                
-                group_sizes[str(group)] = int(group_size)
+                brier_scores[group] = float(brier[i])
+                log_loss_scores[group] = float(log_losses[i])
+                ece_scores[group] = float(ece[i])
+                mce_scores[group] = float(mce[i])
+                reliability_diagrams[group] = group_stats.reliability_diagram(i)
+                group_sizes[group] = group_size
             
             # Determine calibration quality
             calibration_quality = self._assess_calibration_quality(brier_scores, ece_scores, mce_scores)
@@ -177,102 +172,6 @@ class CalibrationAnalyzer:
             self.logger.error(f"Calibration analysis failed: {e}")
             raise
     
-    def _calculate_brier_score(self, y_true: np.ndarray, y_prob: np.ndarray) -> float:
-        """Calculate Brier score."""
-        try:
-            if not SKLEARN_AVAILABLE:
-                # Manual calculation
-                return np.mean((y_prob - y_true) ** 2)
-            else:
-                return brier_score_loss(y_true, y_prob)
-        except Exception as e:
-            self.logger.warning(f"Brier score calculation failed: {e}")
-            return float('inf')
-    
-    def _calculate_log_loss(self, y_true: np.ndarray, y_prob: np.ndarray) -> float:
-        """Calculate log loss."""
-        try:
-            if not SKLEARN_AVAILABLE:
-                # Manual calculation with epsilon for numerical stability
-                epsilon = 1e-15
-                y_prob = np.clip(y_prob, epsilon, 1 - epsilon)
-                return -np.mean(y_true * np.log(y_prob) + (1 - y_true) * np.log(1 - y_prob))
-            else:
-                return log_loss(y_true, y_prob)
-        except Exception as e:
-            self.logger.warning(f"Log loss calculation failed: {e}")
-            return float('inf')
-    
-    def _calculate_calibration_errors(self, y_true: np.ndarray, y_prob: np.ndarray) -> Tuple[float, float]:
-        """Calculate Expected Calibration Error (ECE) and Maximum Calibration Error (MCE)."""
-        try:
-            n_bins = self.threshold.n_bins
-            bin_boundaries = np.linspace(0, 1, n_bins + 1)
-            bin_lowers = bin_boundaries[:-1]
-            bin_uppers = bin_boundaries[1:]
-            
-            ece = 0
-            mce = 0
-            total_samples = len(y_true)
-            
-            for bin_lower, bin_upper in zip(bin_lowers, bin_uppers):
-                in_bin = (y_prob > bin_lower) & (y_prob <= bin_upper)
-                prop_in_bin = in_bin.mean()
-                
-                if prop_in_bin > 0:
-                    accuracy_in_bin = y_true[in_bin].mean()
-                    avg_confidence_in_bin = y_prob[in_bin].mean()
-                    calibration_error = abs(avg_confidence_in_bin - accuracy_in_bin)
-                    
-                    ece += prop_in_bin * calibration_error
-                    mce = max(mce, calibration_error)
-            
-            return float(ece), float(mce)
-            
-        except Exception as e:
-            self.logger.warning(f"Calibration error calculation failed: {e}")
-            return float('inf'), float('inf')
-    
-    def _calculate_reliability_diagram(self, y_true: np.ndarray, y_prob: np.ndarray) -> Dict[str, List[float]]:
-        """Calculate reliability diagram data."""
-        try:
-            n_bins = self.threshold.n_bins
-            
-            if SKLEARN_AVAILABLE:
-                fraction_of_positives, mean_predicted_value = calibration_curve(
-                    y_true, y_prob, n_bins=n_bins
-                )
-            else:
-                # Manual calculation
-                bin_boundaries = np.linspace(0, 1, n_bins + 1)
-                bin_lowers = bin_boundaries[:-1]
-                bin_uppers = bin_boundaries[1:]
-                
-                fraction_of_positives = []
-                mean_predicted_value = []
-                
-                for bin_lower, bin_upper in zip(bin_lowers, bin_uppers):
-                    in_bin = (y_prob > bin_lower) & (y_prob <= bin_upper)
-                    prop_in_bin = in_bin.mean()
-                    
-                    if prop_in_bin > 0:
-                        accuracy_in_bin = y_true[in_bin].mean()
-                        avg_confidence_in_bin = y_prob[in_bin].mean()
-                        fraction_of_positives.append(accuracy_in_bin)
-                        mean_predicted_value.append(avg_confidence_in_bin)
-                    else:
-                        fraction_of_positives.append(0)
-                        mean_predicted_value.append(0)
-            
-            return {
-                "fraction_of_positives": fraction_of_positives.tolist() if hasattr(fraction_of_positives, 'tolist') else list(fraction_of_positives),
-                "mean_predicted_value": mean_predicted_value.tolist() if hasattr(mean_predicted_value, 'tolist') else list(mean_predicted_value)
-            }
-            
-        except Exception as e:
-            self.logger.warning(f"Reliability diagram calculation failed: {e}")
-            return {"fraction_of_positives": [], "mean_predicted_value": []}
-    
     def _assess_calibration_quality(self, brier_scores: Dict[str, float], 
                                    ece_scores: Dict[str, float], 
                                    mce_scores: Dict[str, float]) -> str:
@@ -40,6 +40,7 @@ except ImportError:
     SKLEARN_AVAILABLE = False
 
 from config.env_config import get_env_config
+from services.bias_analysis.metrics.group_statistics import GroupStatistics, compute_group_statistics
 
 
 @dataclass
@@ -86,36 +87,41 @@ class DemographicParityAnalyzer:
     
     def calculate_demographic_parity(self, y_true: np.ndarray, y_pred: np.ndarray, 
                                    protected_attribute: np.ndarray, 
-                                   protected_groups: Optional[List[str]] = None) -> DemographicParityResult:
-        """Calculate demographic parity metrics."""
+                                   protected_groups: Optional[List[str]] = None,
+                                   group_stats: Optional[GroupStatistics] = None) -> DemographicParityResult:
+        """
+        Calculate demographic parity metrics.
+        
+        Args:
+            group_stats: Precomputed statistics of the same data (from
+                compute_group_statistics), shared between analyzers
+        """
         try:
             # Convert to numpy arrays if needed
             y_true = np.array(y_true)
             y_pred = np.array(y_pred)
             protected_attribute = np.array(protected_attribute)
             
-            # Get unique groups
-            if protected_groups is None:
-                groups = np.unique(protected_attribute)
-            else:
-                groups = np.array(protected_groups)
+            # Per-group sums in one pass
+            if group_stats is None:
+                group_stats = compute_group_statistics(
+                    protected_attribute, y_pred=y_pred, protected_groups=protected_groups
+                )
             
             # Calculate positive rates for each group
             positive_rates = {}
             group_sizes = {}
+            rates_by_group = group_stats.positive_rates
             
-            for group in groups:
-                group_mask = protected_attribute == group
-                group_size = np.sum(group_mask)
+            for i, group in enumerate(group_stats.groups):
+                group_size = int(group_stats.sizes[i])
                 
                 if group_size < self.threshold.min_group_size:
                     self.logger.warning(f"Group {group} has only {group_size} samples (min: {self.threshold.min_group_size})")
                     continue
                 
-                group_predictions = y_pred[group_mask]
-                positive_rate = np.mean(group_predictions)
-                positive_rates[str(group)] = float(positive_rate)
-                group_sizes[str(group)] = int(group_size)
+                positive_rates[group] = float(rates_by_group[i])
+                group_sizes[group] = group_size
             
             # Calculate parity metrics
             if len(positive_rates) < 2:
@@ -129,9 +135,7 @@ class DemographicParityAnalyzer:
             threshold_violation = max_difference > self.threshold.threshold_value
             
             # Statistical significance test
-            statistical_significance = self._calculate_statistical_significance(
-                y_pred, protected_attribute, groups
-            )
+            statistical_significance = self._calculate_statistical_significance(group_stats)
             
             # Generate recommendations
             recommendations = self._generate_recommendations(
@@ -160,33 +164,21 @@ class DemographicParityAnalyzer:
             self.logger.error(f"Demographic parity calculation failed: {e}")
             raise
     
-    def _calculate_statistical_significance(self, y_pred: np.ndarray, 
-                                          protected_attribute: np.ndarray, 
-                                          groups: List[str]) -> Optional[float]:
+    def _calculate_statistical_significance(self, group_stats: GroupStatistics) -> Optional[float]:
         """Calculate statistical significance of group differences."""
         try:
             if not SCIPY_AVAILABLE:
                 return None
             
             # Prepare data for chi-square test
-            group_predictions = []
-            for group in groups:
-                group_mask = protected_attribute == group
-                group_pred = y_pred[group_mask]
-                if len(group_pred) >= self.threshold.min_group_size:
-                    group_predictions.append(group_pred)
-            
-            if len(group_predictions) < 2:
+            large_enough = group_stats.sizes >= self.threshold.min_group_size
+            if np.count_nonzero(large_enough) < 2:
                 return None
             
             # Perform chi-square test
-            contingency_table = []
-            for group_pred in group_predictions:
-                positive_count = np.sum(group_pred)
-                negative_count = len(group_pred) - positive_count
-                contingency_table.append([positive_count, negative_count])
-            
-            contingency_table = np.array(contingency_table)
+            positive_counts = group_stats.positive_sums[large_enough]
+            negative_counts = group_stats.sizes[large_enough] - positive_counts
+            contingency_table = np.column_stack([positive_counts, negative_counts])
             chi2, p_value = stats.chi2_contingency(contingency_table)[:2]
             
             return float(p_value)
@@ -40,6 +40,7 @@ except ImportError:
     SKLEARN_AVAILABLE = False
 
 from config.env_config import get_env_config
+from services.bias_analysis.metrics.group_statistics import GroupStatistics, compute_group_statistics
 
 
 @dataclass
@@ -91,19 +92,26 @@ class EqualizedOddsAnalyzer:
     
     def calculate_equalized_odds(self, y_true: np.ndarray, y_pred: np.ndarray, 
                                protected_attribute: np.ndarray, 
-                               protected_groups: Optional[List[str]] = None) -> EqualizedOddsResult:
-        """Calculate equalized odds metrics."""
+                               protected_groups: Optional[List[str]] = None,
+                               group_stats: Optional[GroupStatistics] = None) -> EqualizedOddsResult:
+        """
+        Calculate equalized odds metrics.
+        
+        Args:
+            group_stats: Precomputed statistics of the same data (from
+                compute_group_statistics), shared between analyzers
+        """
         try:
             # Convert to numpy arrays if needed
             y_true = np.array(y_true)
             y_pred = np.array(y_pred)
             protected_attribute = np.array(protected_attribute)
             
-            # Get unique groups
-            if protected_groups is None:
-                groups = np.unique(protected_attribute)
-            else:
-                groups = np.array(protected_groups)
+            # Per-group confusion matrices in one pass
+            if group_stats is None:
+                group_stats = compute_group_statistics(
+                    protected_attribute, y_true=y_true, y_pred=y_pred, protected_groups=protected_groups
+                )
             
             # Calculate metrics for each group
             tpr_by_group = {}
@@ -112,33 +120,21 @@ class EqualizedOddsAnalyzer:
             fnr_by_group = {}
             group_sizes = {}
             confusion_matrices = {}
+            tpr, fpr, tnr, fnr = group_stats.tpr, group_stats.fpr, group_stats.tnr, group_stats.fnr
             
-            for group in groups:
-                group_mask = protected_attribute == group
-                group_size = np.sum(group_mask)
+            for i, group in enumerate(group_stats.groups):
+                group_size = int(group_stats.sizes[i])
                 
                 if group_size < self.threshold.min_group_size:
                     self.logger.warning(f"Group {group} has only {group_size} samples (min: {self.threshold.min_group_size})")
                     continue
                 
-                group_y_true = y_true[group_mask]
-                group_y_pred = y_pred[group_mask]
-                
-                # Calculate confusion matrix
-                tn, fp, fn, tp = confusion_matrix(group_y_true, group_y_pred, labels=[0, 1]).ravel()
-                confusion_matrices[str(group)] = {"tn": int(tn), "fp": int(fp), "fn": int(fn), "tp": int(tp)}
-                
-                # Calculate rates
-                tpr = tp / (tp + fn) if (tp + fn) > 0 else 0.0
-                fpr = fp / (fp + tn) if (fp + tn) > 0 else 0.0
-                tnr = tn / (tn + fp) if (tn + fp) > 0 else 0.0
-                fnr = fn / (fn + tp) if (fn + tp) > 0 else 0.0
-                
-                tpr_by_group[str(group)] = float(tpr)
-                fpr_by_group[str(group)] = float(fpr)
-                tnr_by_group[str(group)] = float(tnr)
-                fnr_by_group[str(group)] = float(fnr)
-                group_sizes[str(group)] = int(group_size)
+                confusion_matrices[group] = group_stats.confusion_matrix(i)
+                tpr_by_group[group] = float(tpr[i])
+                fpr_by_group[group] = float(fpr[i])
+                tnr_by_group[group] = float(tnr[i])
+                fnr_by_group[group] = float(fnr[i])
+                group_sizes[group] = group_size
             
             # Calculate differences
             if len(tpr_by_group) < 2:
@@ -159,9 +155,7 @@ class EqualizedOddsAnalyzer:
             threshold_violation = tpr_violation or fpr_violation
             
             # Statistical tests
-            statistical_tests = self._perform_statistical_tests(
-                y_true, y_pred, protected_attribute, groups
-            )
+            statistical_tests = self._perform_statistical_tests(y_pred, group_stats)
             
             # Generate recommendations
             recommendations = self._generate_recommendations(
@@ -196,8 +190,7 @@ class EqualizedOddsAnalyzer:
             self.logger.error(f"Equalized odds calculation failed: {e}")
             raise
     
-    def _perform_statistical_tests(self, y_true: np.ndarray, y_pred: np.ndarray, 
-                                 protected_attribute: np.ndarray, groups: List[str]) -> Dict[str, float]:
+    def _perform_statistical_tests(self, y_pred: np.ndarray, group_stats: GroupStatistics) -> Dict[str, float]:
         """Perform statistical tests for equalized odds."""
         try:
             tests = {}
@@ -205,51 +198,21 @@ class EqualizedOddsAnalyzer:
             if not SCIPY_AVAILABLE:
                 return tests
             
-            # Chi-square test for independence
-            contingency_table = []
-            for group in groups:
-                group_mask = protected_attribute == group
-                if np.sum(group_mask) < self.threshold.min_group_size:
-                    continue
-                
-                group_y_true = y_true[group_mask]
-                group_y_pred = y_pred[group_mask]
-                
-                # Create 2x2 contingency table
-                tn, fp, fn, tp = confusion_matrix(group_y_true, group_y_pred, labels=[0, 1]).ravel()
-                contingency_table.append([tn, fp, fn, tp])
+            large_enough = np.flatnonzero(group_stats.sizes >= self.threshold.min_group_size)
             
-            if len(contingency_table) >= 2:
-                contingency_table = np.array(contingency_table)
+            # Chi-square test for independence over [tn, fp, fn, tp] per group
+            if len(large_enough) >= 2:
+                contingency_table = group_stats.confusion[large_enough].reshape(len(large_enough), 4)
                 chi2, p_value = stats.chi2_contingency(contingency_table)[:2]
                 tests["chi_square_p_value"] = float(p_value)
                 tests["chi_square_statistic"] = float(chi2)
             
-            # Mann-Whitney U test for TPR differences
-            tpr_values = []
-            group_labels = []
-            for group in groups:
-                group_mask = protected_attribute == group
-                if np.sum(group_mask) < self.threshold.min_group_size:
-                    continue
-                
-                group_y_true = y_true[group_mask]
-                group_y_pred = y_pred[group_mask]
-                
-                # Calculate TPR for this group
-                tn, fp, fn, tp = confusion_matrix(group_y_true, group_y_pred, labels=[0, 1]).ravel()
-                tpr = tp / (tp + fn) if (tp + fn) > 0 else 0.0
-                
-                tpr_values.append(tpr)
-                group_labels.append(group)
-            
-            if len(tpr_values) >= 2:
-                # Compare first two groups
-                group1_mask = protected_attribute == group_labels[0]
-                group2_mask = protected_attribute == group_labels[1]
-                
-                group1_scores = y_pred[group1_mask]
-                group2_scores = y_pred[group2_mask]
+            # Mann-Whitney U test on the predictions of the first two groups
+            # (needs rows; merged streaming statistics only keep sums)
+            if len(large_enough) >= 2 and group_stats.codes is not None:
+                indices = group_stats.group_indices()
+                group1_scores = y_pred[indices[large_enough[0]]]
+                group2_scores = y_pred[indices[large_enough[1]]]
                 
                 if len(group1_scores) > 0 and len(group2_scores) > 0:
                     statistic, p_value = stats.mannwhitneyu(group1_scores, group2_scores, alternative='two-sided')
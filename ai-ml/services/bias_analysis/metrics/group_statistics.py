@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Group Statistics Kernel
+Single-pass per-group statistics shared by the fairness metric analyzers.
+
+Groups are encoded once with np.unique(return_inverse=True); prediction
+sums, confusion matrices, calibration bins, Brier and log-loss sums are
+then accumulated for every group at once with np.bincount, instead of one
+boolean mask (and one pass over the data) per group and per bin.
+
+All statistics are sums, so the statistics of coarser groups (unions of
+groups) are obtained with GroupStatistics.rollup without rescanning rows,
+and statistics of disjoint parts of a dataset (chunks, files, processes)
+are combined with merge_group_statistics.
+"""
+
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+
+@dataclass
+class GroupStatistics:
+    """
+    Per-group sufficient statistics for the group fairness metrics.
+
+    Arrays are indexed like ``groups``. Confusion, calibration and loss
+    statistics are None when the inputs they need were not given.
+    """
+    groups: List[str]
+    codes: Optional[np.ndarray]  # Group index of every row (-1 outside ``groups``, None once rolled up)
+    sizes: np.ndarray
+    positive_sums: Optional[np.ndarray] = None  # Sum of y_pred per group
+    confusion: Optional[np.ndarray] = None  # groups x 2 (y_true) x 2 (y_pred)
+    n_bins: int = 10
+    bin_counts: Optional[np.ndarray] = None  # groups x n_bins
+    bin_true_sums: Optional[np.ndarray] = None
+    bin_prob_sums: Optional[np.ndarray] = None
+    brier_sums: Optional[np.ndarray] = None
+    log_loss_sums: Optional[np.ndarray] = None
+    _indices: Optional[List[np.ndarray]] = field(default=None, repr=False)
+
+    @staticmethod
+    def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        numerator = np.asarray(numerator, dtype=float)
+        return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+    def group_indices(self) -> List[np.ndarray]:
+        """Row indices of each group, from one stable sort of the codes."""
+        if self.codes is None:
+            raise ValueError("Rolled-up statistics have no row indices")
+        if self._indices is None:
+            order = np.argsort(self.codes, kind="stable")
+            bounds = np.searchsorted(self.codes[order], np.arange(len(self.groups) + 1))
+            self._indices = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.groups))]
+        return self._indices
+
+    @property
+    def positive_rates(self) -> np.ndarray:
+        return self._ratio(self.positive_sums, self.sizes)
+
+    @property
+    def tp(self) -> np.ndarray:
+        return self.confusion[:, 1, 1]
+
+    @property
+    def fp(self) -> np.ndarray:
+        return self.confusion[:, 0, 1]
+
+    @property
+    def fn(self) -> np.ndarray:
+        return self.confusion[:, 1, 0]
+
+    @property
+    def tn(self) -> np.ndarray:
+        return self.confusion[:, 0, 0]
+
+    @property
+    def tpr(self) -> np.ndarray:
+        return self._ratio(self.tp, self.tp + self.fn)
+
+    @property
+    def fpr(self) -> np.ndarray:
+        return self._ratio(self.fp, self.fp + self.tn)
+
+    @property
+    def tnr(self) -> np.ndarray:
+        return self._ratio(self.tn, self.tn + self.fp)
+
+    @property
+    def fnr(self) -> np.ndarray:
+        return self._ratio(self.fn, self.fn + self.tp)
+
+    @property
+    def brier_scores(self) -> np.ndarray:
+        return self._ratio(self.brier_sums, self.sizes)
+
+    @property
+    def log_losses(self) -> np.ndarray:
+        return self._ratio(self.log_loss_sums, self.sizes)
+
+    @property
+    def calibration_gaps(self) -> np.ndarray:
+        """|mean predicted probability - fraction of positives| per group and bin."""
+        return np.abs(self._ratio(self.bin_prob_sums, self.bin_counts)
+                      - self._ratio(self.bin_true_sums, self.bin_counts))
+
+    @property
+    def ece(self) -> np.ndarray:
+        """Expected calibration error per group (bin weights relative to group size)."""
+        return np.sum(self._ratio(self.bin_counts, self.sizes[:, None]) * self.calibration_gaps, axis=1)
+
+    @property
+    def mce(self) -> np.ndarray:
+        """Maximum calibration error per group over non-empty bins."""
+        gaps = np.where(self.bin_counts > 0, self.calibration_gaps, 0.0)
+        return gaps.max(axis=1) if gaps.size else np.zeros(len(self.groups))
+
+    def rollup(self, assignment: np.ndarray, groups: List[str]) -> "GroupStatistics":
+        """
+        Statistics of coarser groups, without rescanning rows.
+
+        Args:
+            assignment: Index into ``groups`` of each of this object's groups
+            groups: Labels of the coarser groups
+        """
+        n_groups = len(groups)
+
+        def total(values):
+            if values is None:
+                return None
+            summed = np.zeros((n_groups,) + values.shape[1:], dtype=values.dtype)
+            np.add.at(summed, assignment, values)
+            return summed
+
+        return GroupStatistics(
+            groups=groups, codes=None, sizes=total(self.sizes),
+            positive_sums=total(self.positive_sums), confusion=total(self.confusion),
+            n_bins=self.n_bins, bin_counts=total(self.bin_counts),
+            bin_true_sums=total(self.bin_true_sums), bin_prob_sums=total(self.bin_prob_sums),
+            brier_sums=total(self.brier_sums), log_loss_sums=total(self.log_loss_sums),
+        )
+
+    def confusion_matrix(self, i: int) -> Dict[str, int]:
+        return {"tn": int(self.tn[i]), "fp": int(self.fp[i]), "fn": int(self.fn[i]), "tp": int(self.tp[i])}
+
+    def reliability_diagram(self, i: int) -> Dict[str, List[float]]:
+        """Fraction of positives and mean predicted value of group i's non-empty bins."""
+        filled = self.bin_counts[i] > 0
+        counts = self.bin_counts[i][filled]
+        return {
+            "fraction_of_positives": (self.bin_true_sums[i][filled] / counts).tolist(),
+            "mean_predicted_value": (self.bin_prob_sums[i][filled] / counts).tolist(),
+        }
+
+
+def encode_groups(protected_attribute: Any,
+                  protected_groups: Optional[Sequence[Any]] = None):
+    """
+    Encode group membership once.
+
+    Returns:
+        (labels, codes): group labels in result order and each row's index
+        into them (-1 for rows in none of ``protected_groups``)
+    """
+    protected_attribute = np.asarray(protected_attribute)
+    labels, codes = np.unique(protected_attribute, return_inverse=True)
+    codes = codes.reshape(-1)
+    if protected_groups is None:
+        return list(labels), codes
+
+    # Requested order; requested groups absent from the data get no rows
+    position = {label.item() if hasattr(label, "item") else label: i for i, label in enumerate(labels)}
+    remap = np.full(len(labels), -1, dtype=np.int64)
+    for i, group in enumerate(protected_groups):
+        key = group.item() if hasattr(group, "item") else group
+        if key in position:
+            remap[position[key]] = i
+    return list(protected_groups), remap[codes]
+
+
+def compute_group_statistics(protected_attribute: Any,
+                             y_true: Optional[Any] = None,
+                             y_pred: Optional[Any] = None,
+                             y_prob: Optional[Any] = None,
+                             protected_groups: Optional[Sequence[Any]] = None,
+                             n_bins: int = 10) -> GroupStatistics:
+    """
+    Compute every group statistic the metric analyzers need in one pass.
+
+    Args:
+        protected_attribute: Group of every row
+        y_true: Binary labels (enables confusion matrices and calibration)
+        y_pred: Predictions (enables positive rates and, with y_true, confusion)
+        y_prob: Predicted probabilities of the positive class (enables
+            calibration bins, Brier and log-loss sums, with y_true)
+        protected_groups: Groups to report, in this order (default: all, sorted)
+        n_bins: Equal-width calibration bins over (0, 1]
+
+    Returns:
+        GroupStatistics
+    """
+    n_rows = len(np.asarray(protected_attribute))
+    for name, values in (("y_true", y_true), ("y_pred", y_pred), ("y_prob", y_prob)):
+        if values is not None and len(np.asarray(values)) != n_rows:
+            raise ValueError(f"{name} has {len(np.asarray(values))} rows, protected_attribute has {n_rows}")
+
+    labels, codes = encode_groups(protected_attribute, protected_groups)
+    return accumulate_group_statistics([str(label) for label in labels], codes,
+                                       y_true=y_true, y_pred=y_pred, y_prob=y_prob, n_bins=n_bins)
+
+
+def accumulate_group_statistics(groups: List[str],
+                                codes: np.ndarray,
+                                y_true: Optional[Any] = None,
+                                y_pred: Optional[Any] = None,
+                                y_prob: Optional[Any] = None,
+                                n_bins: int = 10) -> GroupStatistics:
+    """
+    Accumulate group statistics for already encoded rows (see compute_group_statistics).
+
+    Args:
+        groups: Group labels
+        codes: Index into ``groups`` of every row (-1 to skip a row)
+    """
+    n_groups = len(groups)
+    member = codes >= 0
+    member_codes = codes[member]
+
+    def per_group(weights=None):
+        return np.bincount(member_codes, weights=weights, minlength=n_groups)
+
+    stats = GroupStatistics(groups=list(groups), codes=codes, sizes=per_group(), n_bins=n_bins)
+
+    if y_pred is not None:
+        y_pred = np.asarray(y_pred)[member]
+        stats.positive_sums = per_group(y_pred.astype(float))
+
+    if y_true is not None:
+        y_true = np.asarray(y_true)[member]
+
+    if y_true is not None and y_pred is not None:
+        # Rows with labels outside {0, 1} are ignored, like confusion_matrix(labels=[0, 1])
+        binary = np.isin(y_true, (0, 1)) & np.isin(y_pred, (0, 1))
+        cells = member_codes[binary] * 4 + 2 * y_true[binary].astype(np.int64) + y_pred[binary].astype(np.int64)
+        stats.confusion = np.bincount(cells, minlength=4 * n_groups).reshape(n_groups, 2, 2)
+
+    if y_true is not None and y_prob is not None:
+        y_prob = np.asarray(y_prob, dtype=float)[member]
+        if y_prob.size and (np.nanmin(y_prob) < 0 or np.nanmax(y_prob) > 1):
+            raise ValueError("y_prob values must lie in [0, 1]")
+        y_true = y_true.astype(float)
+
+        # Bin k holds probabilities in (k / n_bins, (k + 1) / n_bins]
+        boundaries = np.linspace(0, 1, n_bins + 1)
+        bins = np.searchsorted(boundaries, y_prob, side="left") - 1
+        in_range = (bins >= 0) & (bins < n_bins)
+        cells = member_codes[in_range] * n_bins + bins[in_range]
+
+        def per_bin(weights=None):
+            return np.bincount(cells, weights=weights, minlength=n_groups * n_bins).reshape(n_groups, n_bins)
+
+        stats.bin_counts = per_bin()
+        stats.bin_true_sums = per_bin(y_true[in_range])
+        stats.bin_prob_sums = per_bin(y_prob[in_range])
+        stats.brier_sums = per_group((y_prob - y_true) ** 2)
+
+        epsilon = np.finfo(float).eps
+        clipped = np.clip(y_prob, epsilon, 1 - epsilon)
+        stats.log_loss_sums = per_group(-(y_true * np.log(clipped) + (1 - y_true) * np.log(1 - clipped)))
+
+    return stats
+
+
+_ADDITIVE_FIELDS = ("positive_sums", "confusion", "bin_counts", "bin_true_sums",
+                    "bin_prob_sums", "brier_sums", "log_loss_sums")
+
+
+def merge_group_statistics(parts: Sequence[GroupStatistics]) -> GroupStatistics:
+    """
+    Statistics of the union of disjoint row sets.
+
+    Groups are matched by label; the result holds every group seen in any
+    part, in sorted order, so it does not depend on the order of the parts.
+
+    Raises:
+        ValueError: If the parts were computed from different inputs or bins
+    """
+    if not parts:
+        raise ValueError("Need at least one GroupStatistics to merge")
+    first = parts[0]
+    for part in parts[1:]:
+        if part.n_bins != first.n_bins:
+            raise ValueError(f"Cannot merge statistics with {part.n_bins} and {first.n_bins} bins")
+        for name in _ADDITIVE_FIELDS:
+            if (getattr(part, name) is None) != (getattr(first, name) is None):
+                raise ValueError(f"Cannot merge statistics with and without {name}")
+
+    groups = sorted({group for part in parts for group in part.groups})
+    position = {group: i for i, group in enumerate(groups)}
+    assignment = np.array([position[group] for part in parts for group in part.groups], dtype=np.int64)
+
+    def stacked(name):
+        values = [getattr(part, name) for part in parts]
+        return None if values[0] is None else np.concatenate(values)
+
+    combined = GroupStatistics(
+        groups=[group for part in parts for group in part.groups], codes=None,
+        sizes=stacked("sizes"), n_bins=first.n_bins,
+        **{name: stacked(name) for name in _ADDITIVE_FIELDS}
+    )
+    return combined.rollup(assignment, groups)
@@ -2,6 +2,12 @@
 """
 REGIQ AI/ML - Individual Fairness Metrics
 Implements individual fairness analysis, similarity metrics, and consistency scoring.
+
+Features are standardized once per group, and one batched k-nearest-neighbor
+query (KD-tree or blockwise brute force, HNSW for large groups when hnswlib
+is installed) feeds consistency, the fairness map and the individual report.
+Mean pairwise similarity is computed exactly in O(n * d) without forming
+n x n matrices.
 """
 
 import os
@@ -39,7 +45,14 @@ try:
 except ImportError:
     SKLEARN_AVAILABLE = False
 
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
 from config.env_config import get_env_config
+from services.bias_analysis.metrics.group_statistics import compute_group_statistics
 
 
 @dataclass
@@ -67,6 +80,9 @@ class IndividualFairnessThreshold:
     min_group_size: int = 30
     n_neighbors: int = 5
     alert_enabled: bool = True
+    ann_min_group_size: int = 20000  # Groups this large use HNSW when hnswlib is installed
+    kd_tree_max_features: int = 8  # Wider data uses blockwise brute-force search
+    max_reported_pairs: int = 1000  # Cap on violations / individuals listed per group
 
 
 class IndividualFairnessAnalyzer:
@@ -96,11 +112,9 @@ class IndividualFairnessAnalyzer:
             y_pred = np.array(y_pred)
             protected_attribute = np.array(protected_attribute)
             
-            # Get unique groups
-            if protected_groups is None:
-                groups = np.unique(protected_attribute)
-            else:
-                groups = np.array(protected_groups)
+            # Encode groups once
+            group_stats = compute_group_statistics(protected_attribute, protected_groups=protected_groups)
+            group_indices = group_stats.group_indices()
             
             # Calculate metrics for each group
             consistency_scores = {}
@@ -108,33 +122,42 @@ class IndividualFairnessAnalyzer:
             fairness_maps = {}
             individual_reports = {}
             group_sizes = {}
+            neighbor_search = {}
             
-            for group in groups:
-                group_mask = protected_attribute == group
-                group_size = np.sum(group_mask)
+            for i, group in enumerate(group_stats.groups):
+                group_size = group_stats.sizes[i]
                 
                 if group_size < self.threshold.min_group_size:
                     self.logger.warning(f"Group {group} has only {group_size} samples (min: {self.threshold.min_group_size})")
                     continue
                 
-                group_X = X[group_mask]
-                group_y_pred = y_pred[group_mask]
+                group_X = X[group_indices[i]]
+                group_y_pred = y_pred[group_indices[i]]
+                
+                # Standardize once and share one neighbor query across sub-metrics
+                X_scaled = self._standardize(group_X)
+                neighbor_distances, neighbor_indices, method = self._find_neighbors(X_scaled)
+                neighbor_consistency = self._neighbor_consistency(group_y_pred, neighbor_indices)
+                neighbor_search[str(group)] = method
                 
                 # Calculate consistency score
-                consistency_score = self._calculate_consistency_score(group_X, group_y_pred)
+                consistency_score = self._calculate_consistency_score(neighbor_consistency)
                 consistency_scores[str(group)] = float(consistency_score)
                 
                 # Calculate similarity score
-                similarity_score = self._calculate_similarity_score(group_X, group_y_pred)
+                similarity_score = self._calculate_similarity_score(X_scaled, group_y_pred)
                 similarity_scores[str(group)] = float(similarity_score)
                 
                 # Generate fairness map
-                fairness_map = self._generate_fairness_map(group_X, group_y_pred, str(group))
+                fairness_map = self._generate_fairness_map(
+                    X_scaled, group_y_pred, str(group), neighbor_distances, neighbor_indices
+                )
                 fairness_maps[str(group)] = fairness_map
                 
                 # Generate individual report
                 individual_report = self._generate_individual_report(
-                    group_X, group_y_pred, str(group), consistency_score, similarity_score
+                    group_y_pred, str(group), consistency_score, similarity_score,
+                    neighbor_indices, neighbor_consistency
                 )
                 individual_reports[str(group)] = individual_report
                 
@@ -165,6 +188,7 @@ class IndividualFairnessAnalyzer:
                 recommendations=recommendations,
                 metadata={
                     "group_sizes": group_sizes,
+                    "neighbor_search": neighbor_search,
                     "total_samples": len(y_pred),
                     "analysis_date": time.strftime("%Y-%m-%d %H:%M:%S")
                 }
@@ -174,91 +198,107 @@ class IndividualFairnessAnalyzer:
             self.logger.error(f"Individual fairness calculation failed: {e}")
             raise
     
-    def _calculate_consistency_score(self, X: np.ndarray, y_pred: np.ndarray) -> float:
-        """Calculate consistency score for a group."""
-        try:
-            if not SKLEARN_AVAILABLE or len(X) < 2:
-                return 0.0
-            
-            # Standardize features
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
-            
-            # Find k-nearest neighbors
-            n_neighbors = min(self.threshold.n_neighbors, len(X) - 1)
-            if n_neighbors < 1:
-                return 0.0
-            
-            nbrs = NearestNeighbors(n_neighbors=n_neighbors + 1, algorithm='ball_tree')
+    def _standardize(self, X: np.ndarray) -> np.ndarray:
+        """Standardize a group's features (shared by all sub-metrics)."""
+        X = np.asarray(X, dtype=float)
+        if not SKLEARN_AVAILABLE or len(X) < 2:
+            return X
+        return StandardScaler().fit_transform(X)
+    
+    def _find_neighbors(self, X_scaled: np.ndarray) -> Tuple[np.ndarray, np.ndarray, str]:
+        """
+        k nearest neighbors of every individual in one batched query.
+        
+        Returns:
+            (distances, indices, method): n x k arrays excluding each
+            individual itself, and "exact" or "hnsw"
+        """
+        n = len(X_scaled)
+        n_neighbors = min(self.threshold.n_neighbors, n - 1)
+        if not SKLEARN_AVAILABLE or n_neighbors < 1:
+            return np.zeros((n, 0)), np.zeros((n, 0), dtype=int), "none"
+        
+        if HNSWLIB_AVAILABLE and n >= self.threshold.ann_min_group_size:
+            index = hnswlib.Index(space='l2', dim=X_scaled.shape[1])
+            index.init_index(max_elements=n, ef_construction=200, M=16)
+            index.add_items(X_scaled, np.arange(n))
+            index.set_ef(max(50, 2 * (n_neighbors + 1)))
+            indices, squared = index.knn_query(X_scaled, k=n_neighbors + 1)
+            distances, method = np.sqrt(np.maximum(squared, 0)), "hnsw"
+        else:
+            # KD-trees degrade past a few dimensions; brute force is computed
+            # in memory-bounded blocks (sklearn working_memory)
+            algorithm = 'kd_tree' if X_scaled.shape[1] <= self.threshold.kd_tree_max_features else 'brute'
+            nbrs = NearestNeighbors(n_neighbors=n_neighbors + 1, algorithm=algorithm, n_jobs=-1)
             nbrs.fit(X_scaled)
-            
-            # Calculate consistency
-            consistency_scores = []
-            
-            for i in range(len(X)):
-                # Find neighbors
-                distances, indices = nbrs.kneighbors([X_scaled[i]])
-                neighbor_indices = indices[0][1:]  # Exclude self
-                
-                if len(neighbor_indices) == 0:
-                    continue
-                
-                # Calculate prediction consistency
-                current_pred = y_pred[i]
-                neighbor_preds = y_pred[neighbor_indices]
-                
-                # Consistency is the proportion of neighbors with same prediction
-                consistency = np.mean(neighbor_preds == current_pred)
-                consistency_scores.append(consistency)
-            
-            return np.mean(consistency_scores) if consistency_scores else 0.0
-            
-        except Exception as e:
-            self.logger.warning(f"Consistency score calculation failed: {e}")
-            return 0.0
+            distances, indices = nbrs.kneighbors(X_scaled)
+            method = "exact"
+        
+        # Drop each individual from its own neighbor list; rows where
+        # duplicates crowded it out drop their farthest neighbor instead
+        is_self = indices == np.arange(n)[:, None]
+        is_self[~is_self.any(axis=1), -1] = True
+        keep = ~is_self
+        return (distances[keep].reshape(n, n_neighbors),
+                indices[keep].reshape(n, n_neighbors).astype(int),
+                method)
+    
+    def _neighbor_consistency(self, y_pred: np.ndarray, neighbor_indices: np.ndarray) -> np.ndarray:
+        """Per-individual share of nearest neighbors with the same prediction."""
+        if neighbor_indices.shape[1] == 0:
+            return np.zeros(0)
+        return np.mean(y_pred[neighbor_indices] == y_pred[:, None], axis=1)
+    
+    def _calculate_consistency_score(self, neighbor_consistency: np.ndarray) -> float:
+        """Calculate consistency score for a group."""
+        return float(np.mean(neighbor_consistency)) if len(neighbor_consistency) else 0.0
     
-    def _calculate_similarity_score(self, X: np.ndarray, y_pred: np.ndarray) -> float:
-        """Calculate similarity score for a group."""
+    def _calculate_similarity_score(self, X_scaled: np.ndarray, y_pred: np.ndarray) -> float:
+        """
+        Calculate similarity score for a group.
+        
+        Mean over all pairs i != j of (cosine(x_i, x_j) + 1 - |y_i - y_j|) / 2,
+        computed exactly without pairwise matrices: the cosine sum is
+        ||sum of unit rows||^2 minus the self pairs, and the prediction
+        gap sum comes from the sorted predictions.
+        """
         try:
-            if not SKLEARN_AVAILABLE or len(X) < 2:
+            n = len(X_scaled)
+            if not SKLEARN_AVAILABLE or n < 2:
                 return 0.0
             
-            # Standardize features
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
-            
-            # Calculate pairwise similarities
-            cosine_sim = cosine_similarity(X_scaled)
-            
-            # Calculate prediction similarities
-            pred_sim = np.abs(np.subtract.outer(y_pred, y_pred))
-            pred_sim = 1 - pred_sim  # Convert to similarity
+            norms = np.linalg.norm(X_scaled, axis=1)
+            unit = np.divide(X_scaled, norms[:, None], out=np.zeros_like(X_scaled, dtype=float),
+                             where=norms[:, None] > 0)
+            total = unit.sum(axis=0)
+            cosine_sum = float(total @ total) - float(np.count_nonzero(norms > 0))
             
-            # Combine feature and prediction similarities
-            combined_sim = (cosine_sim + pred_sim) / 2
+            y_sorted = np.sort(np.asarray(y_pred, dtype=float))
+            gap_sum = 2.0 * float(np.sum(y_sorted * (2 * np.arange(n) - n + 1)))
             
-            # Calculate average similarity (excluding diagonal)
-            mask = np.ones_like(combined_sim, dtype=bool)
-            np.fill_diagonal(mask, False)
-            
-            return np.mean(combined_sim[mask]) if np.any(mask) else 0.0
+            n_pairs = n * (n - 1)
+            return ((cosine_sum / n_pairs) + (1.0 - gap_sum / n_pairs)) / 2
             
         except Exception as e:
             self.logger.warning(f"Similarity score calculation failed: {e}")
             return 0.0
     
-    def _generate_fairness_map(self, X: np.ndarray, y_pred: np.ndarray, group: str) -> Dict[str, Any]:
-        """Generate fairness map for a group."""
+    def _generate_fairness_map(self, X_scaled: np.ndarray, y_pred: np.ndarray, group: str,
+                               neighbor_distances: np.ndarray,
+                               neighbor_indices: np.ndarray) -> Dict[str, Any]:
+        """
+        Generate fairness map for a group.
+        
+        Similar individuals are nearest-neighbor pairs; a violation is such
+        a pair with different predictions. Counts cover every pair, the
+        listed violations are the closest ``max_reported_pairs``.
+        """
         try:
-            if not SKLEARN_AVAILABLE or len(X) < 2:
+            if not SKLEARN_AVAILABLE or len(X_scaled) < 2:
                 return {"error": "Insufficient data for fairness map"}
             
-            # Standardize features
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
-            
             # Perform clustering to identify similar individuals
-            n_clusters = min(5, len(X) // 2)  # Adaptive number of clusters
+            n_clusters = min(5, len(X_scaled) // 2)  # Adaptive number of clusters
             if n_clusters < 2:
                 return {"error": "Insufficient data for clustering"}
             
@@ -278,83 +318,86 @@ class IndividualFairnessAnalyzer:
                         "consistency": float(np.mean(cluster_preds == cluster_preds[0]) if len(cluster_preds) > 1 else 1.0)
                     }
             
-            # Calculate pairwise distances
-            distances = euclidean_distances(X_scaled)
+            # Unique nearest-neighbor pairs (i < j)
+            n = len(X_scaled)
+            sources = np.repeat(np.arange(n), neighbor_indices.shape[1])
+            targets = neighbor_indices.ravel()
+            first, second = np.minimum(sources, targets), np.maximum(sources, targets)
+            pair_keys, unique_at = np.unique(first * n + second, return_index=True)
+            first, second = first[unique_at], second[unique_at]
+            pair_distances = neighbor_distances.ravel()[unique_at]
             
             # Find fairness violations (similar individuals with different predictions)
-            violations = []
-            for i in range(len(X)):
-                for j in range(i + 1, len(X)):
-                    if distances[i, j] < np.percentile(distances[distances > 0], 10):  # Top 10% most similar
-                        if y_pred[i] != y_pred[j]:
-                            violations.append({
-                                "individual_1": int(i),
-                                "individual_2": int(j),
-                                "distance": float(distances[i, j]),
-                                "prediction_1": float(y_pred[i]),
-                                "prediction_2": float(y_pred[j])
-                            })
+            violating = np.flatnonzero(y_pred[first] != y_pred[second])
+            closest = violating[np.argsort(pair_distances[violating], kind="stable")]
+            violations = [
+                {
+                    "individual_1": int(first[k]),
+                    "individual_2": int(second[k]),
+                    "distance": float(pair_distances[k]),
+                    "prediction_1": float(y_pred[first[k]]),
+                    "prediction_2": float(y_pred[second[k]])
+                }
+                for k in closest[:self.threshold.max_reported_pairs]
+            ]
             
             return {
                 "group": group,
-                "total_individuals": len(X),
+                "total_individuals": n,
                 "n_clusters": n_clusters,
                 "cluster_metrics": cluster_metrics,
                 "fairness_violations": violations,
-                "violation_rate": len(violations) / (len(X) * (len(X) - 1) / 2) if len(X) > 1 else 0.0
+                "n_violations": int(len(violating)),
+                "pairs_evaluated": int(len(pair_keys)),
+                "violation_rate": len(violating) / len(pair_keys) if len(pair_keys) else 0.0
             }
             
         except Exception as e:
             self.logger.warning(f"Fairness map generation failed: {e}")
             return {"error": str(e)}
     
-    def _generate_individual_report(self, X: np.ndarray, y_pred: np.ndarray, 
-                                  group: str, consistency_score: float, 
-                                  similarity_score: float) -> Dict[str, Any]:
-        """Generate individual report for a group."""
+    def _generate_individual_report(self, y_pred: np.ndarray, group: str,
+                                  consistency_score: float, similarity_score: float,
+                                  neighbor_indices: np.ndarray,
+                                  neighbor_consistency: np.ndarray) -> Dict[str, Any]:
+        """
+        Generate individual report for a group.
+        
+        An individual's similar individuals are its nearest neighbors.
+        Outlier counts cover the whole group; the listed individuals are
+        the ``max_reported_pairs`` least consistent ones.
+        """
         try:
-            # Calculate individual-level metrics
-            individual_metrics = []
-            
-            for i in range(len(X)):
-                # Find similar individuals
-                distances = np.linalg.norm(X - X[i], axis=1)
-                similar_indices = np.where(distances < np.percentile(distances[distances > 0], 20))[0]
-                similar_indices = similar_indices[similar_indices != i]  # Exclude self
-                
-                if len(similar_indices) > 0:
-                    similar_preds = y_pred[similar_indices]
-                    consistency = np.mean(similar_preds == y_pred[i])
-                    
-                    individual_metrics.append({
-                        "individual_id": int(i),
-                        "prediction": float(y_pred[i]),
-                        "n_similar": len(similar_indices),
-                        "consistency": float(consistency),
-                        "similar_predictions": similar_preds.tolist()
-                    })
-            
             # Calculate group-level statistics
             positive_rate = np.mean(y_pred)
             prediction_std = np.std(y_pred)
             
             # Identify outliers (individuals with very different predictions from similar ones)
-            outliers = []
-            for metric in individual_metrics:
-                if metric["consistency"] < 0.5 and metric["n_similar"] > 0:
-                    outliers.append(metric)
+            order = np.argsort(neighbor_consistency, kind="stable")[:self.threshold.max_reported_pairs]
+            individual_metrics = [
+                {
+                    "individual_id": int(i),
+                    "prediction": float(y_pred[i]),
+                    "n_similar": int(neighbor_indices.shape[1]),
+                    "consistency": float(neighbor_consistency[i]),
+                    "similar_predictions": y_pred[neighbor_indices[i]].tolist()
+                }
+                for i in order
+            ]
+            outliers = [metric for metric in individual_metrics if metric["consistency"] < 0.5]
+            n_outliers = int(np.count_nonzero(neighbor_consistency < 0.5))
             
             return {
                 "group": group,
-                "group_size": len(X),
+                "group_size": len(y_pred),
                 "positive_rate": float(positive_rate),
                 "prediction_std": float(prediction_std),
                 "consistency_score": consistency_score,
                 "similarity_score": similarity_score,
                 "individual_metrics": individual_metrics,
                 "outliers": outliers,
-                "n_outliers": len(outliers),
-                "outlier_rate": len(outliers) / len(X) if len(X) > 0 else 0.0
+                "n_outliers": n_outliers,
+                "outlier_rate": n_outliers / len(y_pred) if len(y_pred) > 0 else 0.0
             }
             
         except Exception as e:
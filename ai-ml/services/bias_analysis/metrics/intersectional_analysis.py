@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Intersectional Fairness Analysis
+Fairness statistics over every combination of protected attributes.
+
+The rows are scanned once: each row's combination of attribute values
+(its cell) is encoded to a single id and the group statistics kernel
+accumulates all non-empty cells in one pass. The cube is sparse, so only
+combinations that occur in the data are stored. Every coarser subgroup
+(e.g. sex x race out of sex x race x age, down to the marginals) is rolled
+up from its smallest already computed parent cuboid by summing
+statistics, without touching the rows again.
+"""
+
+import sys
+import logging
+import itertools
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from dataclasses import dataclass
+import time
+
+# Add project root
+sys.path.append(str(Path(__file__).parent.parent.parent.parent))
+
+from config.env_config import get_env_config
+from services.bias_analysis.metrics.group_statistics import (
+    GroupStatistics,
+    accumulate_group_statistics,
+    encode_groups,
+)
+
+
+# Direction in which each ranking metric is worse
+_WORST_FIRST = {"disparity": True, "fpr": True, "ece": True, "positive_rate": False, "tpr": False}
+
+
+@dataclass
+class IntersectionalResult:
+    """Results of intersectional fairness analysis."""
+    metric_name: str
+    attributes: List[str]
+    subgroups: Dict[str, Dict[str, Any]]  # Subgroups of at least min_group_size, by label
+    worst_subgroups: List[Dict[str, Any]]
+    disparities: Dict[str, Dict[str, Any]]  # Per attribute combination
+    max_disparity: float
+    threshold_violation: bool
+    threshold_value: float
+    recommendations: List[str]
+    metadata: Dict[str, Any]
+
+
+@dataclass
+class IntersectionalThreshold:
+    """Threshold configuration for intersectional analysis."""
+    threshold_value: float = 0.1  # Max gap between a subgroup and the overall population
+    min_group_size: int = 30  # Smaller subgroups are pruned from the report
+    max_order: int = 3  # Largest number of attributes combined
+    n_bins: int = 10
+    top_k: int = 10
+    rank_by: str = "disparity"  # disparity, positive_rate, tpr, fpr or ece
+
+
+@dataclass
+class _Cuboid:
+    """Statistics of all subgroups over one combination of attributes."""
+    attributes: Tuple[str, ...]
+    coordinates: List[np.ndarray]  # Value index of each attribute, per subgroup
+    stats: GroupStatistics
+
+
+def _cube_index(coordinates: Sequence[np.ndarray], dims: Sequence[int]):
+    """
+    Dense index of each distinct combination of coordinates.
+
+    Returns:
+        (index of every input position, coordinates of each distinct combination)
+    """
+    if float(np.prod(dims, dtype=float)) < 2 ** 62:
+        flat = np.ravel_multi_index(tuple(coordinates), tuple(dims))
+        keys, inverse = np.unique(flat, return_inverse=True)
+        return inverse.reshape(-1), list(np.unravel_index(keys, tuple(dims)))
+
+    # Too many potential combinations for one integer id
+    keys, inverse = np.unique(np.stack(coordinates, axis=1), axis=0, return_inverse=True)
+    return inverse.reshape(-1), [keys[:, j] for j in range(keys.shape[1])]
+
+
+class IntersectionalAnalyzer:
+    """Analyzes fairness across intersections of protected attributes."""
+
+    def __init__(self, threshold_config: Optional[IntersectionalThreshold] = None):
+        self.threshold = threshold_config or IntersectionalThreshold()
+        self.logger = self._setup_logger()
+        self.env_config = get_env_config()
+
+    def _setup_logger(self) -> logging.Logger:
+        logger = logging.getLogger("intersectional_analysis")
+        logger.setLevel(logging.INFO)
+        if not logger.handlers:
+            h = logging.StreamHandler()
+            h.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+            logger.addHandler(h)
+        return logger
+
+    def calculate_intersectional_fairness(self, y_true: Optional[np.ndarray], y_pred: np.ndarray,
+                                          protected_attributes: Mapping[str, Any],
+                                          y_prob: Optional[np.ndarray] = None) -> IntersectionalResult:
+        """
+        Calculate fairness metrics for every subgroup up to max_order attributes.
+
+        Args:
+            y_true: Binary labels (enables TPR and FPR), or None
+            y_pred: Binary predictions
+            protected_attributes: Attribute name -> value of every row
+                (a dict of arrays or a DataFrame)
+            y_prob: Predicted probabilities (enables ECE, with y_true)
+        """
+        try:
+            if self.threshold.rank_by not in _WORST_FIRST:
+                raise ValueError(f"Unknown rank_by: {self.threshold.rank_by}")
+
+            attributes = [str(name) for name in protected_attributes]
+            if not attributes:
+                raise ValueError("Need at least one protected attribute")
+
+            y_pred = np.asarray(y_pred)
+            n_rows = len(y_pred)
+
+            # Encode each attribute once
+            labels, codes = {}, []
+            for name in protected_attributes:
+                values = np.asarray(protected_attributes[name])
+                if len(values) != n_rows:
+                    raise ValueError(f"Attribute {name} has {len(values)} rows, y_pred has {n_rows}")
+                attribute_labels, attribute_codes = encode_groups(values)
+                labels[str(name)] = [str(label) for label in attribute_labels]
+                codes.append(attribute_codes)
+            dims = [len(labels[name]) for name in attributes]
+
+            # One scan: statistics of every non-empty cell of the full cube
+            cell_codes, cell_coordinates = _cube_index(codes, dims)
+            cell_labels = self._labels(attributes, cell_coordinates, labels)
+            cells = _Cuboid(
+                attributes=tuple(attributes),
+                coordinates=cell_coordinates,
+                stats=accumulate_group_statistics(
+                    cell_labels, cell_codes, y_true=y_true, y_pred=y_pred, y_prob=y_prob,
+                    n_bins=self.threshold.n_bins
+                )
+            )
+
+            cuboids = self._build_cuboids(cells, labels, dims)
+            overall = cells.stats.rollup(np.zeros(len(cell_labels), dtype=np.int64), ["overall"])
+            overall_metrics = {name: float(values[0]) for name, (values, valid) in self._metrics(overall).items()
+                               if valid[0]}
+
+            # Per-subgroup metrics and pruning
+            subgroups = {}
+            disparities = {}
+            pruned_total = 0
+            for cuboid in cuboids:
+                reported, pruned, summary = self._evaluate(cuboid, overall_metrics, labels)
+                subgroups.update(reported)
+                pruned_total += pruned
+                disparities[" x ".join(cuboid.attributes)] = summary
+
+            max_disparity = max((group["disparity"] for group in subgroups.values()), default=0.0)
+            threshold_violation = max_disparity > self.threshold.threshold_value
+            worst_subgroups = self._rank(subgroups)
+
+            recommendations = self._generate_recommendations(
+                worst_subgroups, max_disparity, threshold_violation, pruned_total
+            )
+
+            return IntersectionalResult(
+                metric_name="Intersectional Fairness",
+                attributes=attributes,
+                subgroups=subgroups,
+                worst_subgroups=worst_subgroups,
+                disparities=disparities,
+                max_disparity=max_disparity,
+                threshold_violation=threshold_violation,
+                threshold_value=self.threshold.threshold_value,
+                recommendations=recommendations,
+                metadata={
+                    "overall": overall_metrics,
+                    "total_samples": n_rows,
+                    "non_empty_cells": len(cell_labels),
+                    "cuboids": len(cuboids),
+                    "pruned_subgroups": pruned_total,
+                    "min_group_size": self.threshold.min_group_size,
+                    "rank_by": self.threshold.rank_by,
+                    "analysis_date": time.strftime("%Y-%m-%d %H:%M:%S")
+                }
+            )
+
+        except Exception as e:
+            self.logger.error(f"Intersectional fairness calculation failed: {e}")
+            raise
+
+    @staticmethod
+    def _labels(attributes: Sequence[str], coordinates: List[np.ndarray],
+                labels: Dict[str, List[str]]) -> List[str]:
+        columns = [[f"{name}={labels[name][i]}" for i in coordinate.tolist()]
+                   for name, coordinate in zip(attributes, coordinates)]
+        return [", ".join(parts) for parts in zip(*columns)]
+
+    def _build_cuboids(self, cells: _Cuboid, labels: Dict[str, List[str]],
+                       dims: List[int]) -> List[_Cuboid]:
+        """Roll up every attribute combination up to max_order, finest first."""
+        attributes = list(cells.attributes)
+        position = {name: i for i, name in enumerate(attributes)}
+        computed: Dict[Tuple[str, ...], _Cuboid] = {cells.attributes: cells}
+
+        max_order = min(self.threshold.max_order, len(attributes))
+        for order in range(len(attributes) - 1, 0, -1):
+            for subset in itertools.combinations(attributes, order):
+                # Smallest computed parent (fewest subgroups to sum)
+                parents = [cuboid for key, cuboid in computed.items()
+                           if len(key) == order + 1 and set(subset) <= set(key)]
+                parent = min(parents, key=lambda cuboid: len(cuboid.stats.groups))
+
+                parent_coordinates = [parent.coordinates[parent.attributes.index(name)] for name in subset]
+                assignment, coordinates = _cube_index(parent_coordinates, [dims[position[name]] for name in subset])
+                computed[subset] = _Cuboid(
+                    attributes=subset,
+                    coordinates=coordinates,
+                    stats=parent.stats.rollup(assignment, self._labels(subset, coordinates, labels))
+                )
+
+            # Levels above max_order are only needed as parents of the next one
+            for key in [key for key in computed if len(key) == order + 2 and len(key) > max_order]:
+                del computed[key]
+
+        return [cuboid for key, cuboid in computed.items() if len(key) <= max_order]
+
+    @staticmethod
+    def _metrics(stats: GroupStatistics) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Available metrics per subgroup, with a mask of subgroups where each is defined."""
+        metrics = {}
+        if stats.positive_sums is not None:
+            metrics["positive_rate"] = (stats.positive_rates, stats.sizes > 0)
+        if stats.confusion is not None:
+            metrics["tpr"] = (stats.tpr, (stats.tp + stats.fn) > 0)
+            metrics["fpr"] = (stats.fpr, (stats.fp + stats.tn) > 0)
+        if stats.bin_counts is not None:
+            metrics["ece"] = (stats.ece, stats.sizes > 0)
+        return metrics
+
+    def _evaluate(self, cuboid: _Cuboid, overall: Dict[str, float], labels: Dict[str, List[str]]):
+        """Report the subgroups of one cuboid that are large enough."""
+        stats = cuboid.stats
+        keep = stats.sizes >= self.threshold.min_group_size
+        metrics = self._metrics(stats)
+
+        # Largest gap to the overall population over the defined metrics
+        disparity = np.zeros(len(stats.groups))
+        for name, (values, valid) in metrics.items():
+            if name in overall:
+                gaps = np.where(valid, np.abs(values - overall[name]), 0.0)
+                disparity = np.maximum(disparity, gaps)
+
+        reported = {}
+        for i in np.flatnonzero(keep).tolist():
+            label = stats.groups[i]
+            subgroup = {
+                "subgroup": label,
+                "attributes": {name: labels[name][int(coordinate[i])]
+                               for name, coordinate in zip(cuboid.attributes, cuboid.coordinates)},
+                "order": len(cuboid.attributes),
+                "size": int(stats.sizes[i]),
+            }
+            for name, (values, valid) in metrics.items():
+                subgroup[name] = float(values[i]) if valid[i] else None
+            subgroup["disparity"] = float(disparity[i])
+            reported[label] = subgroup
+
+        summary = {"n_subgroups": int(np.count_nonzero(keep)), "pruned": int(np.count_nonzero(~keep))}
+        for name, (values, valid) in metrics.items():
+            defined = values[keep & valid]
+            summary[f"{name}_difference"] = float(defined.max() - defined.min()) if defined.size > 1 else 0.0
+        if "tpr_difference" in summary:
+            summary["equalized_odds_difference"] = max(summary["tpr_difference"], summary["fpr_difference"])
+
+        return reported, int(np.count_nonzero(~keep)), summary
+
+    def _rank(self, subgroups: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Worst-off subgroups by the configured metric."""
+        rank_by = self.threshold.rank_by
+        candidates = [group for group in subgroups.values() if group.get(rank_by) is not None]
+        candidates.sort(key=lambda group: (group[rank_by], group["size"]), reverse=_WORST_FIRST[rank_by])
+        return candidates[:self.threshold.top_k]
+
+    def _generate_recommendations(self, worst_subgroups: List[Dict[str, Any]], max_disparity: float,
+                                  threshold_violation: bool, pruned: int) -> List[str]:
+        """Generate recommendations based on analysis results."""
+        recommendations = []
+
+        if threshold_violation:
+            recommendations.append(f"⚠️ Intersectional disparity detected: {max_disparity:.3f} > {self.threshold.threshold_value}")
+
+            for group in worst_subgroups[:3]:
+                recommendations.append(
+                    f"📊 {group['subgroup']} (n={group['size']}): disparity {group['disparity']:.3f}"
+                )
+
+            recommendations.append("🔧 Recommendations:")
+            recommendations.append("  • Evaluate mitigation on the worst-off subgroups, not only on marginal groups")
+            recommendations.append("  • Collect more data for small intersectional subgroups")
+            recommendations.append("  • Consider subgroup-aware fairness constraints in model training")
+        else:
+            recommendations.append("✅ Intersectional fairness maintained within threshold")
+            recommendations.append(f"📊 Maximum disparity: {max_disparity:.3f} ≤ {self.threshold.threshold_value}")
+
+        if pruned:
+            recommendations.append(
+                f"📊 {pruned} subgroups below {self.threshold.min_group_size} samples were not evaluated"
+            )
+
+        return recommendations
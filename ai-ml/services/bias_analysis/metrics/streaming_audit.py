@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Streaming Fairness Audit
+Out-of-core fairness audits over chunked or memory-mapped datasets.
+
+Decision logs are read chunk by chunk (CSV, Parquet, or NumPy arrays
+such as np.load(..., mmap_mode="r")) and only the mergeable per-group
+sufficient statistics of the group statistics kernel are kept: positive
+counts, confusion counts, calibration bin sums, Brier and log-loss sums.
+Memory is bounded by the chunk size, whatever the dataset size. The
+statistics of separate files merge exactly, so files are audited in
+parallel processes and combined at the end; the final metrics come from
+the regular analyzers fed with the merged statistics.
+"""
+
+import os
+import sys
+import logging
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+from dataclasses import dataclass, field
+import time
+
+# Add project root
+sys.path.append(str(Path(__file__).parent.parent.parent.parent))
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from config.env_config import get_env_config
+from services.bias_analysis.metrics.group_statistics import (
+    GroupStatistics,
+    compute_group_statistics,
+    merge_group_statistics,
+)
+from services.bias_analysis.metrics.demographic_parity import DemographicParityAnalyzer, DemographicParityResult
+from services.bias_analysis.metrics.equalized_odds import EqualizedOddsAnalyzer, EqualizedOddsResult
+from services.bias_analysis.metrics.calibration_analysis import CalibrationAnalyzer, CalibrationResult
+
+
+@dataclass
+class StreamingAuditConfig:
+    """Configuration for streaming fairness audits."""
+    chunk_size: int = 100_000  # Rows read at a time
+    n_bins: int = 10  # Calibration bins
+    max_workers: Optional[int] = None  # Processes for audit_files (CPU count if None)
+
+
+@dataclass
+class StreamingAuditState:
+    """Mergeable sufficient statistics of the rows audited so far."""
+    group_stats: Dict[str, GroupStatistics] = field(default_factory=dict)  # Per protected attribute
+    rows: int = 0
+    chunks: int = 0
+    sources: List[str] = field(default_factory=list)
+
+    def merge(self, other: "StreamingAuditState") -> "StreamingAuditState":
+        """State of the union of two disjoint sets of rows."""
+        group_stats = dict(self.group_stats)
+        for attribute, stats in other.group_stats.items():
+            # Merging also drops per-row codes, so only sums are kept
+            parts = [group_stats[attribute], stats] if attribute in group_stats else [stats]
+            group_stats[attribute] = merge_group_statistics(parts)
+        return StreamingAuditState(
+            group_stats=group_stats,
+            rows=self.rows + other.rows,
+            chunks=self.chunks + other.chunks,
+            sources=self.sources + other.sources,
+        )
+
+
+@dataclass
+class StreamingAuditResult:
+    """Fairness metrics computed from streamed statistics."""
+    protected_attributes: List[str]
+    demographic_parity: Dict[str, Optional[DemographicParityResult]]
+    equalized_odds: Dict[str, Optional[EqualizedOddsResult]]
+    calibration: Dict[str, Optional[CalibrationResult]]
+    state: StreamingAuditState
+    metadata: Dict[str, Any]
+
+
+def _audit_file_worker(config: StreamingAuditConfig, path: str, protected_attributes: List[str],
+                       prediction_column: str, label_column: Optional[str],
+                       probability_column: Optional[str]) -> StreamingAuditState:
+    """Audit one file in a worker process."""
+    auditor = StreamingFairnessAuditor(config)
+    return auditor.audit_file(path, protected_attributes, prediction_column, label_column, probability_column)
+
+
+class StreamingFairnessAuditor:
+    """Audits fairness over datasets too large to load into memory."""
+
+    def __init__(self, config: Optional[StreamingAuditConfig] = None):
+        self.config = config or StreamingAuditConfig()
+        self.logger = self._setup_logger()
+        self.env_config = get_env_config()
+
+    def _setup_logger(self) -> logging.Logger:
+        logger = logging.getLogger("streaming_audit")
+        logger.setLevel(logging.INFO)
+        if not logger.handlers:
+            h = logging.StreamHandler()
+            h.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+            logger.addHandler(h)
+        return logger
+
+    def iter_file_chunks(self, path: str, columns: Sequence[str],
+                         text_columns: Sequence[str] = ()) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Read the given columns of a CSV or Parquet file in chunks.
+
+        Args:
+            text_columns: Columns read as strings, so every chunk labels
+                groups the same way whatever values it happens to contain
+        """
+        file_ext = Path(path).suffix.lower()
+        columns = list(dict.fromkeys(columns))
+
+        if file_ext == '.csv':
+            if not PANDAS_AVAILABLE:
+                raise ImportError("pandas is required to stream CSV files")
+            reader = pd.read_csv(path, usecols=columns, chunksize=self.config.chunk_size,
+                                 dtype={column: str for column in text_columns})
+            for chunk in reader:
+                yield {column: chunk[column].to_numpy() for column in columns}
+        elif file_ext == '.parquet':
+            if not PYARROW_AVAILABLE:
+                raise ImportError("pyarrow is required to stream Parquet files. Run: pip install pyarrow")
+            parquet_file = pq.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=self.config.chunk_size, columns=columns):
+                yield {column: batch.column(column).to_numpy(zero_copy_only=False) for column in columns}
+        else:
+            raise ValueError(f"Unsupported file format for streaming: {file_ext}")
+
+    def iter_array_chunks(self, arrays: Mapping[str, np.ndarray]) -> Iterator[Dict[str, np.ndarray]]:
+        """Slice equally long arrays (e.g. memory-mapped .npy files) into chunks."""
+        lengths = {len(values) for values in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Arrays have different lengths: {sorted(lengths)}")
+        n_rows = lengths.pop() if lengths else 0
+        for start in range(0, n_rows, self.config.chunk_size):
+            yield {column: values[start:start + self.config.chunk_size] for column, values in arrays.items()}
+
+    def accumulate(self, chunks: Iterable[Mapping[str, np.ndarray]], protected_attributes: Sequence[str],
+                   prediction_column: str, label_column: Optional[str] = None,
+                   probability_column: Optional[str] = None,
+                   state: Optional[StreamingAuditState] = None) -> StreamingAuditState:
+        """
+        Add the statistics of each chunk to a state.
+
+        Args:
+            chunks: Column name -> values, one mapping per chunk
+            protected_attributes: Columns whose groups are audited
+            prediction_column: Binary predictions
+            label_column: Binary labels (enables equalized odds)
+            probability_column: Predicted probabilities (enables calibration, with labels)
+            state: State to continue from (a new one if None)
+        """
+        state = state or StreamingAuditState()
+        for chunk in chunks:
+            y_pred = np.asarray(chunk[prediction_column])
+            y_true = np.asarray(chunk[label_column]) if label_column else None
+            y_prob = np.asarray(chunk[probability_column], dtype=float) if probability_column else None
+
+            chunk_state = StreamingAuditState(rows=len(y_pred), chunks=1)
+            for attribute in protected_attributes:
+                # Labels as strings so groups match across chunks and files
+                groups = np.asarray(chunk[attribute]).astype(str)
+                chunk_state.group_stats[attribute] = compute_group_statistics(
+                    groups, y_true=y_true, y_pred=y_pred, y_prob=y_prob, n_bins=self.config.n_bins
+                )
+            state = state.merge(chunk_state)
+        return state
+
+    def audit_file(self, path: str, protected_attributes: Sequence[str], prediction_column: str,
+                   label_column: Optional[str] = None,
+                   probability_column: Optional[str] = None) -> StreamingAuditState:
+        """Stream one CSV or Parquet file into a state."""
+        columns = [*protected_attributes, prediction_column,
+                   *(column for column in (label_column, probability_column) if column)]
+        state = self.accumulate(
+            self.iter_file_chunks(path, columns, text_columns=protected_attributes),
+            protected_attributes, prediction_column, label_column, probability_column
+        )
+        state.sources.append(str(path))
+        self.logger.info(f"Audited {path}: {state.rows} rows in {state.chunks} chunks")
+        return state
+
+    def audit_files(self, paths: Sequence[str], protected_attributes: Sequence[str], prediction_column: str,
+                    label_column: Optional[str] = None,
+                    probability_column: Optional[str] = None) -> StreamingAuditState:
+        """Stream several files, one worker process per file, and merge their states."""
+        args = (list(protected_attributes), prediction_column, label_column, probability_column)
+        max_workers = min(self.config.max_workers or os.cpu_count() or 1, len(paths))
+
+        if max_workers <= 1:
+            states = [self.audit_file(path, *args) for path in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_audit_file_worker, self.config, path, *args) for path in paths]
+                states = [future.result() for future in futures]
+
+        merged = StreamingAuditState()
+        for state in states:
+            merged = merged.merge(state)
+        return merged
+
+    def evaluate(self, state: StreamingAuditState,
+                 dp_analyzer: Optional[DemographicParityAnalyzer] = None,
+                 eo_analyzer: Optional[EqualizedOddsAnalyzer] = None,
+                 calibration_analyzer: Optional[CalibrationAnalyzer] = None) -> StreamingAuditResult:
+        """
+        Compute the fairness metrics of every audited attribute from a state.
+
+        Metrics whose inputs were not streamed (labels, probabilities) or
+        that cannot be computed (fewer than two large enough groups) are None.
+        """
+        start = time.time()
+        dp_analyzer = dp_analyzer or DemographicParityAnalyzer()
+        eo_analyzer = eo_analyzer or EqualizedOddsAnalyzer()
+        calibration_analyzer = calibration_analyzer or CalibrationAnalyzer()
+        empty = np.empty(0)
+
+        demographic_parity, equalized_odds, calibration = {}, {}, {}
+        for attribute, stats in state.group_stats.items():
+            demographic_parity[attribute] = self._run_analyzer(
+                attribute, state, stats.positive_sums is not None,
+                lambda: dp_analyzer.calculate_demographic_parity(empty, empty, empty, group_stats=stats)
+            )
+            equalized_odds[attribute] = self._run_analyzer(
+                attribute, state, stats.confusion is not None,
+                lambda: eo_analyzer.calculate_equalized_odds(empty, empty, empty, group_stats=stats)
+            )
+            calibration[attribute] = self._run_analyzer(
+                attribute, state, stats.bin_counts is not None,
+                lambda: calibration_analyzer.calculate_calibration_metrics(empty, empty, empty, group_stats=stats)
+            )
+
+        return StreamingAuditResult(
+            protected_attributes=list(state.group_stats),
+            demographic_parity=demographic_parity,
+            equalized_odds=equalized_odds,
+            calibration=calibration,
+            state=state,
+            metadata={
+                "total_samples": state.rows,
+                "chunks": state.chunks,
+                "sources": state.sources,
+                "evaluation_time": time.time() - start,
+                "analysis_date": time.strftime("%Y-%m-%d %H:%M:%S")
+            }
+        )
+
+    def _run_analyzer(self, attribute: str, state: StreamingAuditState, available: bool, run) -> Optional[Any]:
+        """Run one analyzer on streamed statistics, labelling the result with the attribute."""
+        if not available:
+            return None
+        try:
+            result = run()
+        except Exception as e:
+            self.logger.warning(f"{attribute}: {e}")
+            return None
+        result.protected_attribute = attribute
+        result.metadata["total_samples"] = state.rows
+        return result
@@ -19,6 +19,7 @@ import logging
 from services.bias_analysis.metrics.demographic_parity import DemographicParityAnalyzer
 from services.bias_analysis.metrics.equalized_odds import EqualizedOddsAnalyzer
 from services.bias_analysis.metrics.calibration_analysis import CalibrationAnalyzer
+from services.bias_analysis.metrics.group_statistics import GroupStatistics, compute_group_statistics
 
 # Import Phase 3.4 bias scoring
 from services.bias_analysis.scoring.composite_calculator import BiasScoreCalculator
@@ -168,27 +169,21 @@ class MitigationValidator:
         
         # Calculate fairness metrics - BEFORE
         logger.info("Calculating pre-mitigation fairness metrics...")
-        dp_before = self._calculate_demographic_parity(
-            y_before, y_pred_before, protected_attr_before
+        stats_before = self._group_statistics(
+            y_before, y_pred_before, y_proba_before, protected_attr_before
         )
-        eo_before = self._calculate_equalized_odds(
-            y_before, y_pred_before, protected_attr_before
-        )
-        calib_before = self._calculate_calibration(
-            y_before, y_proba_before, protected_attr_before
-        ) if y_proba_before is not None else None
+        dp_before = self._calculate_demographic_parity(stats_before)
+        eo_before = self._calculate_equalized_odds(stats_before)
+        calib_before = self._calculate_calibration(stats_before)
         
         # Calculate fairness metrics - AFTER
         logger.info("Calculating post-mitigation fairness metrics...")
-        dp_after = self._calculate_demographic_parity(
-            y_after, y_pred_after, protected_attr_after
-        )
-        eo_after = self._calculate_equalized_odds(
-            y_after, y_pred_after, protected_attr_after
+        stats_after = self._group_statistics(
+            y_after, y_pred_after, y_proba_after, protected_attr_after
         )
-        calib_after = self._calculate_calibration(
-            y_after, y_proba_after, protected_attr_after
-        ) if y_proba_after is not None else None
+        dp_after = self._calculate_demographic_parity(stats_after)
+        eo_after = self._calculate_equalized_odds(stats_after)
+        calib_after = self._calculate_calibration(stats_after)
         
         # Calculate bias scores
         logger.info("Calculating bias scores...")
@@ -263,43 +258,55 @@ class MitigationValidator:
         
         return report
     
-    def _calculate_demographic_parity(self,
-                                     y_true: np.ndarray,
-                                     y_pred: np.ndarray,
-                                     protected_attr: np.ndarray) -> float:
+    def _group_statistics(self,
+                          y_true: np.ndarray,
+                          y_pred: np.ndarray,
+                          y_proba: Optional[np.ndarray],
+                          protected_attr: np.ndarray) -> GroupStatistics:
+        """Per-group statistics for all fairness metrics in one pass"""
+        if y_proba is not None and np.ndim(y_proba) == 2:
+            y_proba = y_proba[:, -1]  # Probability of the positive class
+        return compute_group_statistics(
+            protected_attr,
+            y_true=y_true,
+            y_pred=y_pred,
+            y_prob=y_proba,
+            n_bins=self.calib_analyzer.threshold.n_bins
+        )
+    
+    @staticmethod
+    def _spread(values: np.ndarray) -> float:
+        """Largest difference between groups"""
+        return float(np.max(values) - np.min(values)) if len(values) else 0.0
+    
+    def _calculate_demographic_parity(self, stats: GroupStatistics) -> float:
         """Calculate demographic parity difference"""
         try:
-            result = self.dp_analyzer.analyze(y_true, y_pred, protected_attr)
-            return abs(result.demographic_parity_difference)
+            present = stats.sizes > 0
+            return self._spread(stats.positive_rates[present])
         except Exception as e:
             logger.warning(f"DP calculation failed: {e}")
             return 0.0
     
-    def _calculate_equalized_odds(self,
-                                 y_true: np.ndarray,
-                                 y_pred: np.ndarray,
-                                 protected_attr: np.ndarray) -> float:
+    def _calculate_equalized_odds(self, stats: GroupStatistics) -> float:
         """Calculate equalized odds difference"""
         try:
-            result = self.eo_analyzer.analyze(y_true, y_pred, protected_attr)
+            present = stats.sizes > 0
             # Use average of TPR and FPR differences
-            return (abs(result.true_positive_rate_difference) + 
-                   abs(result.false_positive_rate_difference)) / 2.0
+            return (self._spread(stats.tpr[present]) +
+                   self._spread(stats.fpr[present])) / 2.0
         except Exception as e:
             logger.warning(f"EO calculation failed: {e}")
             return 0.0
     
-    def _calculate_calibration(self,
-                              y_true: np.ndarray,
-                              y_proba: Optional[np.ndarray],
-                              protected_attr: np.ndarray) -> Optional[float]:
-        """Calculate calibration difference"""
-        if y_proba is None:
+    def _calculate_calibration(self, stats: GroupStatistics) -> Optional[float]:
+        """Calculate calibration difference (spread of expected calibration error)"""
+        if stats.bin_counts is None:
             return None
         
         try:
-            result = self.calib_analyzer.analyze(y_true, y_proba, protected_attr)
-            return abs(result.calibration_difference)
+            present = stats.sizes > 0
+            return self._spread(stats.ece[present])
         except Exception as e:
             logger.warning(f"Calibration calculation failed: {e}")
             return None
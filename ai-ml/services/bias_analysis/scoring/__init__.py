@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 REGIQ AI/ML - Bias Scoring System
-Composite bias scoring, risk classification, and alert management.
+Composite bias scoring, risk classification, alert management, and
+online fairness monitoring.
 """
 
 from .scoring_algorithm import BiasScoreAlgorithm
@@ -12,6 +13,7 @@ from .risk_levels import RiskLevel, RISK_THRESHOLDS, RISK_METADATA
 from .classification_engine import RiskClassifier
 from .alert_system import BiasAlertManager
 from .report_generator import BiasRiskReportGenerator
+from .online_monitor import OnlineFairnessMonitor, MonitorConfig, MonitorSnapshot
 
 __all__ = [
     "BiasScoreAlgorithm",
@@ -24,6 +26,9 @@ __all__ = [
     "RiskClassifier",
     "BiasAlertManager",
     "BiasRiskReportGenerator",
+    "OnlineFairnessMonitor",
+    "MonitorConfig",
+    "MonitorSnapshot",
 ]
 
 __version__ = "1.0.0"
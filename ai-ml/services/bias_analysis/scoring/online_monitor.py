@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Online Fairness Monitor
+Continuous bias scoring over a stream of prediction events.
+
+Per-group sufficient statistics (counts, confusion counts, calibration
+bin sums) are kept over a tumbling window, a sliding window or with
+exponential decay. Each update adds the new events to running totals
+(subtracting expired sliding-window buckets, or scaling by the decay
+factor), so the composite bias score is recomputed in O(groups) without
+revisiting history. Alerts are raised when the score crosses the
+threshold and the disparity behind it passes a sequential test whose
+alpha is spent over the repeated looks of each excursion above the
+threshold, so checking on every event does not inflate the false-alarm
+rate.
+"""
+
+import math
+import time
+import logging
+import numpy as np
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+from dataclasses import dataclass
+
+from .scoring_algorithm import BiasScoreAlgorithm
+from .classification_engine import RiskClassifier
+from .alert_system import BiasAlert, BiasAlertManager
+from ..metrics.group_statistics import GroupStatistics, accumulate_group_statistics
+
+
+logger = logging.getLogger("online_fairness_monitor")
+
+# Column layout of the per-group statistics matrix
+_SIZE, _POSITIVE, _CONFUSION = 0, 1, slice(2, 6)  # Confusion as tn, fp, fn, tp
+_BASE_COLUMNS = 6
+
+
+@dataclass
+class MonitorConfig:
+    """Configuration for online fairness monitoring."""
+    window_type: str = "sliding"  # sliding, tumbling or decay
+    window_seconds: float = 3600.0
+    bucket_seconds: float = 60.0  # Sliding window granularity
+    half_life_seconds: float = 3600.0  # Exponential decay
+    n_bins: int = 10  # Calibration bins
+    min_group_size: int = 30  # Events (decayed weight) before a group is scored
+    alert_threshold: float = 0.25  # Composite bias score above the LOW risk range
+    # False-alarm rate of one excursion above the threshold. Alpha is spent
+    # over the looks of an excursion and re-armed when the score falls back
+    # under the threshold (or a tumbling window closes), so long-running
+    # sliding and decay monitors keep a usable per-look alpha.
+    significance_level: float = 0.05
+
+
+@dataclass
+class MonitorSnapshot:
+    """Bias score of the current window after an update."""
+    timestamp: float
+    window_start: Optional[float]
+    events: float
+    bias_score: float
+    raw_metrics: Dict[str, float]
+    score_data: Dict[str, Any]
+    group_sizes: Dict[str, float]
+    p_value: Optional[float]
+    significant: bool
+    alert: Optional[BiasAlert] = None
+
+
+def _two_proportion_p_value(x1: float, n1: float, x2: float, n2: float) -> Optional[float]:
+    """Two-sided p-value of a two-proportion z-test."""
+    if n1 <= 0 or n2 <= 0:
+        return None
+    pooled = (x1 + x2) / (n1 + n2)
+    se = math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    if se == 0:
+        return None
+    z = (x1 / n1 - x2 / n2) / se
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+class OnlineFairnessMonitor:
+    """
+    Incremental bias scoring and alerting for live predictions.
+
+    Example:
+        >>> monitor = OnlineFairnessMonitor("credit_model_v3")
+        >>> snapshot = monitor.update("female", y_pred=1, y_true=1, y_prob=0.82)
+        >>> snapshot.bias_score
+    """
+
+    def __init__(self,
+                 model_id: str,
+                 config: Optional[MonitorConfig] = None,
+                 algorithm: Optional[BiasScoreAlgorithm] = None,
+                 alert_manager: Optional[BiasAlertManager] = None,
+                 risk_classifier: Optional[RiskClassifier] = None):
+        """
+        Initialize online fairness monitor.
+
+        Args:
+            model_id: Model identifier used in alerts
+            config: Monitoring configuration (uses defaults if None)
+            algorithm: Composite score algorithm (default weights if None)
+            alert_manager: Manager that records and deduplicates alerts
+            risk_classifier: Classifier mapping scores to risk levels
+        """
+        self.model_id = model_id
+        self.config = config or MonitorConfig()
+        if self.config.window_type not in ("sliding", "tumbling", "decay"):
+            raise ValueError(f"Unknown window type: {self.config.window_type}")
+
+        self.algorithm = algorithm or BiasScoreAlgorithm()
+        self.alert_manager = alert_manager or BiasAlertManager()
+        self.risk_classifier = risk_classifier or RiskClassifier()
+        self.logger = logger
+
+        self.groups: List[str] = []
+        self._group_index: Dict[str, int] = {}
+        self._totals = np.zeros((0, _BASE_COLUMNS + 3 * self.config.n_bins))
+        self._buckets: deque = deque()  # [bucket start, statistics] for sliding windows
+        self._window_start: Optional[float] = None
+        self._last_time: Optional[float] = None
+        self._labels_seen = False
+        self._probabilities_seen = False
+        self._tests = 0  # Sequential looks in the current excursion
+        self._armed = True  # Re-armed once the score falls back under the threshold
+        self.alerts: List[BiasAlert] = []
+        self.last_window: Optional[MonitorSnapshot] = None  # Last closed tumbling window
+
+    def update(self, group: Any, y_pred: int, y_true: Optional[int] = None,
+               y_prob: Optional[float] = None, timestamp: Optional[float] = None) -> MonitorSnapshot:
+        """Consume one prediction event."""
+        return self.update_batch(
+            [group], [y_pred],
+            None if y_true is None else [y_true],
+            None if y_prob is None else [y_prob],
+            timestamp
+        )
+
+    def update_batch(self, groups: Sequence[Any], y_pred: Sequence[int],
+                     y_true: Optional[Sequence[int]] = None,
+                     y_prob: Optional[Sequence[float]] = None,
+                     timestamp: Optional[float] = None) -> MonitorSnapshot:
+        """
+        Consume a batch of prediction events sharing one timestamp.
+
+        Args:
+            groups: Protected group of each event
+            y_pred: Binary decisions
+            y_true: Observed outcomes (enables equalized odds)
+            y_prob: Predicted probabilities (enables calibration, with outcomes)
+            timestamp: Event time in seconds (now if None)
+        """
+        timestamp = time.time() if timestamp is None else float(timestamp)
+        self._advance(timestamp)
+
+        codes = self._encode(np.asarray(groups).astype(str))
+        stats = accumulate_group_statistics(self.groups, codes, y_true=y_true, y_pred=y_pred,
+                                            y_prob=y_prob, n_bins=self.config.n_bins)
+        contribution = self._pack(stats)
+        self._totals += contribution
+        if self.config.window_type == "sliding":
+            self._buckets[-1][1] += contribution
+
+        self._labels_seen |= y_true is not None
+        self._probabilities_seen |= y_true is not None and y_prob is not None
+        return self._evaluate(timestamp)
+
+    def _encode(self, groups: np.ndarray) -> np.ndarray:
+        """Row index of each event's group, registering new groups."""
+        labels, inverse = np.unique(groups, return_inverse=True)
+        new = [label for label in labels.tolist() if label not in self._group_index]
+        if new:
+            for label in new:
+                self._group_index[label] = len(self.groups)
+                self.groups.append(label)
+            self._totals = np.pad(self._totals, ((0, len(new)), (0, 0)))
+            for bucket in self._buckets:
+                bucket[1] = np.pad(bucket[1], ((0, len(new)), (0, 0)))
+        positions = np.array([self._group_index[label] for label in labels.tolist()], dtype=np.int64)
+        return positions[inverse.reshape(-1)]
+
+    def _advance(self, timestamp: float) -> None:
+        """Expire, decay or close the window up to timestamp."""
+        config = self.config
+        # Late events are counted as arriving at the latest time seen
+        now = timestamp if self._last_time is None else max(timestamp, self._last_time)
+
+        if config.window_type == "decay":
+            if self._last_time is not None and now > self._last_time:
+                self._totals *= 0.5 ** ((now - self._last_time) / config.half_life_seconds)
+
+        elif config.window_type == "tumbling":
+            start = math.floor(now / config.window_seconds) * config.window_seconds
+            if self._window_start is not None and start > self._window_start:
+                self.last_window = self._evaluate(self._window_start + config.window_seconds, look=False)
+                self._totals[:] = 0.0
+                self._tests = 0  # The new window is disjoint from the old one
+                self._armed = True
+            self._window_start = start
+
+        else:
+            start = math.floor(now / config.bucket_seconds) * config.bucket_seconds
+            if not self._buckets or self._buckets[-1][0] < start:
+                self._buckets.append([start, np.zeros_like(self._totals)])
+            while self._buckets[0][0] + config.bucket_seconds <= now - config.window_seconds:
+                self._totals -= self._buckets.popleft()[1]
+            np.maximum(self._totals, 0.0, out=self._totals)  # Float rounding
+            self._window_start = now - config.window_seconds
+
+        self._last_time = now
+
+    def _pack(self, stats: GroupStatistics) -> np.ndarray:
+        n_bins = self.config.n_bins
+        packed = np.zeros((len(stats.groups), _BASE_COLUMNS + 3 * n_bins))
+        packed[:, _SIZE] = stats.sizes
+        packed[:, _POSITIVE] = stats.positive_sums
+        if stats.confusion is not None:
+            packed[:, _CONFUSION] = stats.confusion.reshape(-1, 4)
+        if stats.bin_counts is not None:
+            packed[:, _BASE_COLUMNS:] = np.hstack([stats.bin_counts, stats.bin_true_sums, stats.bin_prob_sums])
+        return packed
+
+    def _unpack(self) -> GroupStatistics:
+        n_bins = self.config.n_bins
+        totals = self._totals
+        bins = totals[:, _BASE_COLUMNS:]
+        return GroupStatistics(
+            groups=self.groups, codes=None, sizes=totals[:, _SIZE],
+            positive_sums=totals[:, _POSITIVE],
+            confusion=totals[:, _CONFUSION].reshape(-1, 2, 2), n_bins=n_bins,
+            bin_counts=bins[:, :n_bins], bin_true_sums=bins[:, n_bins:2 * n_bins],
+            bin_prob_sums=bins[:, 2 * n_bins:],
+        )
+
+    def _raw_metrics(self, stats: GroupStatistics, eligible: np.ndarray) -> Dict[str, float]:
+        """Metric inputs of the composite score, as in BiasScoreCalculator."""
+        raw = {}
+        if np.count_nonzero(eligible) < 2:
+            return raw
+
+        rates = stats.positive_rates[eligible]
+        raw["demographic_parity"] = float(rates.max() - rates.min())
+
+        if self._labels_seen:
+            gaps = []
+            for values, denominator in ((stats.tpr, stats.tp + stats.fn), (stats.fpr, stats.fp + stats.tn)):
+                defined = values[eligible & (denominator > 0)]
+                gaps.append(float(defined.max() - defined.min()) if defined.size > 1 else 0.0)
+            raw["equalized_odds"] = max(gaps)
+
+        if self._probabilities_seen:
+            raw["calibration"] = float(np.mean(stats.ece[eligible]))
+
+        return raw
+
+    def _disparity_p_value(self, stats: GroupStatistics, eligible: np.ndarray) -> Optional[float]:
+        """
+        Smallest Bonferroni-adjusted p-value of the positive rate, TPR and
+        FPR gaps between the best and worst eligible groups.
+
+        With exponential decay the counts are effective (decayed) counts.
+        """
+        tests = [(stats.positive_sums, stats.sizes)]
+        if self._labels_seen:
+            tests.append((stats.tp, stats.tp + stats.fn))
+            tests.append((stats.fp, stats.fp + stats.tn))
+
+        p_values = []
+        for successes, totals in tests:
+            candidates = np.flatnonzero(eligible & (totals > 0))
+            if len(candidates) < 2:
+                continue
+            rates = successes[candidates] / totals[candidates]
+            high, low = candidates[np.argmax(rates)], candidates[np.argmin(rates)]
+            p_value = _two_proportion_p_value(successes[high], totals[high], successes[low], totals[low])
+            if p_value is not None:
+                p_values.append(p_value)
+
+        return min(1.0, min(p_values) * len(p_values)) if p_values else None
+
+    def _evaluate(self, timestamp: float, look: bool = True) -> MonitorSnapshot:
+        """Score the current window and run the sequential test when above threshold."""
+        stats = self._unpack()
+        eligible = stats.sizes >= self.config.min_group_size
+        raw_metrics = self._raw_metrics(stats, eligible)
+        score_data = self.algorithm.calculate_composite_score(raw_metrics)
+        bias_score = score_data["overall_bias_score"]
+
+        p_value, significant, alert = None, False, None
+        if look and bias_score > self.config.alert_threshold and self._armed:
+            p_value = self._disparity_p_value(stats, eligible)
+            if p_value is not None:
+                # Alpha spending: look k gets alpha * 6 / (pi^2 k^2), summing to alpha
+                self._tests += 1
+                alpha = self.config.significance_level * 6 / (math.pi ** 2 * self._tests ** 2)
+                significant = p_value < alpha
+            if significant:
+                alert = self._raise_alert(score_data, raw_metrics, p_value)
+                self._armed = False
+        elif look and bias_score <= self.config.alert_threshold:
+            # The excursion is over; the next one spends alpha afresh
+            self._tests = 0
+            self._armed = True
+
+        return MonitorSnapshot(
+            timestamp=timestamp,
+            window_start=self._window_start,
+            events=float(stats.sizes.sum()),
+            bias_score=bias_score,
+            raw_metrics=raw_metrics,
+            score_data=score_data,
+            group_sizes=dict(zip(self.groups, stats.sizes.tolist())),
+            p_value=p_value,
+            significant=significant,
+            alert=alert
+        )
+
+    def _raise_alert(self, score_data: Dict[str, Any], raw_metrics: Dict[str, float],
+                     p_value: float) -> BiasAlert:
+        """Create a BiasAlert for a significant threshold crossing."""
+        risk_classification = self.risk_classifier.classify_risk(
+            score_data["overall_bias_score"], score_data["normalized_metrics"]
+        )
+        dominant_metric, _ = self.algorithm.get_dominant_metric(score_data)
+        key_concerns = [
+            f"{metric.replace('_', ' ').title()} gap of {value:.3f} in live predictions"
+            for metric, value in sorted(raw_metrics.items(), key=lambda item: -item[1])
+        ]
+        alert = self.alert_manager.create_alert(
+            self.model_id,
+            risk_classification,
+            {**score_data, "dominant_metric": dominant_metric},
+            {"severity_level": risk_classification["risk_level"], "key_concerns": key_concerns}
+        )
+        alert.detailed_findings["online_monitoring"] = {
+            "window_type": self.config.window_type,
+            "p_value": p_value,
+            "sequential_look": self._tests,
+            "alert_threshold": self.config.alert_threshold,
+        }
+        if all(existing.alert_id != alert.alert_id for existing in self.alerts):
+            self.alerts.append(alert)
+        self.logger.warning(
+            f"Bias score {score_data['overall_bias_score']:.3f} for {self.model_id} "
+            f"crossed {self.config.alert_threshold} (p={p_value:.2e})"
+        )
+        return alert
@@ -8,6 +8,11 @@ Provides:
     - ComplianceMapper: Maps regulations to compliance requirements and pathways
     - GraphDatabaseManager: NetworkX + Neo4j graph storage and querying
     - GraphQueryEngine: Compliance path traversal and relationship queries
+    - RegulationSimilarityIndex: MinHash/LSH index for regulation linking
+    - PathQueryEngine: Bounded k-shortest compliance path search
+    - Neo4jBulkWriter: Batched UNWIND synchronization to Neo4j
+    - GraphSnapshot: Memory-mapped binary graph snapshots
+    - NeighborhoodIndex: Cached k-hop regulation neighborhoods
 
 Author: REGIQ AI/ML Team
 Version: 1.0.0
@@ -29,6 +34,11 @@ from .graph_database import (
     GraphDatabaseManager,
     GraphQueryEngine,
 )
+from .similarity_index import RegulationSimilarityIndex
+from .path_query import PathQueryEngine, RankedPath
+from .neo4j_sync import Neo4jBulkWriter
+from .graph_snapshot import GraphSnapshot
+from .neighborhood_index import NeighborhoodIndex
 
 __version__ = "1.0.0"
 __author__ = "REGIQ AI/ML Team"
@@ -47,4 +57,10 @@ __all__ = [
     # Graph Database
     "GraphDatabaseManager",
     "GraphQueryEngine",
+    "RegulationSimilarityIndex",
+    "PathQueryEngine",
+    "RankedPath",
+    "Neo4jBulkWriter",
+    "GraphSnapshot",
+    "NeighborhoodIndex",
 ]
@@ -281,7 +281,7 @@ class ComplianceMapper:
                 return []
             
             # Find similar regulations
-            similar_regulations = self._find_similar_regulations(regulation)
+            similar_regulations = self._find_similar_regulations({"entity_id": regulation_id, **regulation})
             
             relationships = []
             for similar_reg in similar_regulations:
@@ -310,23 +310,49 @@ class ComplianceMapper:
             self.logger.error(f"Error linking related regulations: {e}")
             return []
     
+    def link_all_related_regulations(self) -> List[EntityRelationship]:
+        """
+        Link every regulation in the graph to its related regulations.
+        
+        Each regulation is only compared with its LSH bucket neighbours,
+        so the pass grows with the number of similar pairs rather than
+        quadratically with the number of regulations.
+        """
+        relationships = []
+        for regulation_id in self.graph_manager.get_entity_ids_by_type("REGULATION"):
+            relationships.extend(self.link_related_regulations(regulation_id))
+        self.logger.info(f"Linked {len(relationships)} related regulation pairs across the graph")
+        return relationships
+    
     def _find_similar_regulations(self, regulation: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Find regulations similar to the given regulation."""
+        """
+        Find regulations similar to the given regulation.
+        
+        Candidates come from the graph's MinHash/LSH regulation index, so
+        only regulations sharing a bucket are scored; unindexed regulations
+        fall back to scoring every regulation in the graph.
+        """
         try:
-            # Get all regulations
-            all_regulations = self.graph_manager.get_entities_by_type("REGULATION")
-            
-            similar_regs = []
-            regulation_name = regulation.get("name", "").lower()
+            regulation_id = regulation["entity_id"]
             regulation_jurisdiction = regulation.get("jurisdiction", "")
             
-            for reg in all_regulations:
-                if reg["entity_id"] == regulation["entity_id"]:
-                    continue
-                
-                # Calculate similarity based on name and jurisdiction
-                similarity_score = self._calculate_similarity(regulation_name, reg.get("name", "").lower())
-                
+            index = self.graph_manager.regulation_index
+            if regulation_id in index:
+                scored = index.query(regulation_id)
+                candidates = [
+                    {"entity_id": reg_id, **(self.graph_manager.get_entity(reg_id) or {})}
+                    for reg_id, _ in scored
+                ]
+                scores = [score for _, score in scored]
+            else:
+                regulation_name = regulation.get("name", "").lower()
+                candidates = [reg for reg in self.graph_manager.get_entities_by_type("REGULATION")
+                              if reg["entity_id"] != regulation_id]
+                scores = [self._calculate_similarity(regulation_name, reg.get("name", "").lower())
+                          for reg in candidates]
+            
+            similar_regs = []
+            for reg, similarity_score in zip(candidates, scores):
                 # Boost similarity for same jurisdiction
                 if reg.get("jurisdiction") == regulation_jurisdiction:
                     similarity_score += 0.2
@@ -362,14 +388,20 @@ class ComplianceMapper:
         return len(intersection) / len(union) if union else 0.0
     
     def create_compliance_pathways(self, source_regulation_id: str, 
-                                 target_regulation_id: str) -> List[CompliancePathway]:
-        """Create compliance pathways between regulations."""
+                                 target_regulation_id: str,
+                                 max_pathways: Optional[int] = None,
+                                 relationship_types: Optional[List[str]] = None) -> List[CompliancePathway]:
+        """Create compliance pathways between regulations from the top-ranked paths."""
         try:
-            # Find paths between regulations
-            paths = self.graph_manager.find_path(source_regulation_id, target_regulation_id)
+            # Find the cheapest paths between regulations
+            paths = self.graph_manager.find_ranked_paths(
+                source_regulation_id, target_regulation_id,
+                limit=max_pathways, relationship_types=relationship_types
+            )
             
             pathways = []
-            for i, path in enumerate(paths):
+            for i, ranked in enumerate(paths):
+                path = ranked.nodes
                 pathway = CompliancePathway(
                     pathway_id=f"pathway_{source_regulation_id}_{target_regulation_id}_{i}",
                     source_regulation=source_regulation_id,
@@ -378,7 +410,12 @@ class ComplianceMapper:
                     steps=self._extract_pathway_steps(path),
                     estimated_effort=self._estimate_effort(path),
                     timeline=self._estimate_timeline(path),
-                    metadata={"path": path, "path_length": len(path)}
+                    metadata={
+                        "path": path,
+                        "path_length": len(path),
+                        "path_cost": ranked.cost,
+                        "relationship_types": ranked.relationship_types
+                    }
                 )
                 pathways.append(pathway)
             
@@ -431,8 +468,9 @@ class ComplianceMapper:
         try:
             # Get regulations for jurisdiction
             if jurisdiction:
+                in_jurisdiction = set(self.graph_manager.get_entity_ids_by_jurisdiction(jurisdiction))
                 regulations = [reg for reg in self.graph_manager.get_entities_by_type("REGULATION")
-                              if reg.get("jurisdiction") == jurisdiction]
+                              if reg["entity_id"] in in_jurisdiction]
             else:
                 regulations = self.graph_manager.get_entities_by_type("REGULATION")
             
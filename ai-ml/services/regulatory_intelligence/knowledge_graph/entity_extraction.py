@@ -29,6 +29,12 @@ try:
 except ImportError:
     NETWORKX_AVAILABLE = False
 
+try:
+    from services.regulatory_intelligence.nlp.document_analysis import DocumentAnalyzer, get_shared_analyzer
+    DOCUMENT_ANALYZER_AVAILABLE = True
+except ImportError:
+    DOCUMENT_ANALYZER_AVAILABLE = False
+
 from config.env_config import get_env_config
 
 
@@ -69,7 +75,24 @@ class KnowledgeGraphConfig:
     
     # Graph database settings
     graph_db_path: str = "data/knowledge_graph/regulatory_kg.json"
+    graph_snapshot_path: str = "data/knowledge_graph/regulatory_kg.snapshot"
     backup_path: str = "data/knowledge_graph/backup/"
+    neo4j_batch_size: int = 1000  # Rows per UNWIND write
+    neo4j_max_retries: int = 3  # Retries per failing batch before its rows are requeued
+    
+    # Path query settings
+    max_paths: int = 10
+    max_path_length: int = 5
+    path_time_budget: float = 2.0  # Seconds per path query
+    
+    # Graph analytics settings
+    exact_centrality_max_nodes: int = 1000  # Larger graphs use approximate centrality
+    betweenness_pivots: int = 256
+    closeness_hll_precision: int = 7  # 2^7 registers, ~9% relative error
+    
+    # Related-regulation neighborhood index
+    neighborhood_max_depth: int = 3  # Hops cached per entity
+    neighborhood_cache_size: int = 10000  # Cached neighborhoods (LRU)
     
     def __post_init__(self):
         if self.relationship_patterns is None:
@@ -90,10 +113,11 @@ class KnowledgeGraphConfig:
 class EntityExtractor:
     """Extracts regulatory entities from text using NLP techniques."""
     
-    def __init__(self, config: Optional[KnowledgeGraphConfig] = None):
+    def __init__(self, config: Optional[KnowledgeGraphConfig] = None, analyzer: Optional["DocumentAnalyzer"] = None):
         self.config = config or KnowledgeGraphConfig()
         self.logger = self._setup_logger()
-        self.nlp = self._load_spacy_model()
+        self.analyzer = None
+        self.nlp = self._load_spacy_model(analyzer)
         self.entity_counter = 0
         self.relationship_counter = 0
         
@@ -106,8 +130,16 @@ class EntityExtractor:
             logger.addHandler(h)
         return logger
     
-    def _load_spacy_model(self):
+    def _load_spacy_model(self, analyzer: Optional["DocumentAnalyzer"] = None):
         """Load spaCy model for NLP processing."""
+        if analyzer is None and DOCUMENT_ANALYZER_AVAILABLE:
+            analyzer = get_shared_analyzer()
+        if analyzer is not None:
+            # Share parsed documents with the NLP preprocessing and NER stages
+            self.analyzer = analyzer
+            self.analyzer.require('entities')
+            return self.analyzer.nlp
+        
         if not SPACY_AVAILABLE:
             self.logger.warning("spaCy not available")
             return None
@@ -130,7 +162,7 @@ class EntityExtractor:
             return self._basic_entity_extraction(text, document_id)
         
         try:
-            doc = self.nlp(text)
+            doc = self.analyzer.analyze(text) if self.analyzer is not None else self.nlp(text)
             
             # Extract named entities
             for ent in doc.ents:
@@ -12,6 +12,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Set
 from dataclasses import dataclass, asdict
 import time
+from contextlib import contextmanager
 
 # Add project root
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
@@ -32,17 +33,94 @@ except ImportError:
 from services.regulatory_intelligence.knowledge_graph.entity_extraction import (
     RegulatoryEntity, EntityRelationship, KnowledgeGraphConfig
 )
+from services.regulatory_intelligence.knowledge_graph.similarity_index import RegulationSimilarityIndex
+from services.regulatory_intelligence.knowledge_graph.path_query import PathQueryEngine, RankedPath
+from services.regulatory_intelligence.knowledge_graph.neo4j_sync import Neo4jBulkWriter, validate_relationship_type
+from services.regulatory_intelligence.knowledge_graph.graph_snapshot import GraphSnapshot, write_snapshot, is_snapshot
+from services.regulatory_intelligence.knowledge_graph.graph_analytics import (
+    ComponentTracker, DegreeTracker, CentralityCache, approximate_betweenness, hyperball_closeness
+)
+from services.regulatory_intelligence.knowledge_graph.neighborhood_index import NeighborhoodIndex
 
 
 class GraphDatabaseManager:
-    """Manages knowledge graph database operations."""
+    """
+    Manages knowledge graph database operations.
+
+    Secondary indexes (entity_type -> ids, jurisdiction -> ids,
+    relationship_type -> edges, and a similarity index of regulation
+    names) are maintained by add_entity, add_relationship and load_graph,
+    which also invalidate the affected cached regulation neighborhoods.
+    Code that mutates ``self.graph`` directly must call rebuild_indexes().
+
+    Neo4j writes go through a batched UNWIND writer. Each add is flushed
+    straight away unless made inside ``with manager.bulk():``, which
+    buffers them into batches of ``config.neo4j_batch_size`` rows. A
+    single add that cannot be written returns False and its row stays
+    buffered; such rows are retried by flush_neo4j() (and on leaving a
+    bulk block), not by every later add.
+
+    load_snapshot memory-maps a binary snapshot without building the
+    NetworkX graph: entity lookups are answered from the snapshot columns
+    and the graph is materialized on first access to ``self.graph``.
+    """
     
     def __init__(self, config: Optional[KnowledgeGraphConfig] = None):
         self.config = config or KnowledgeGraphConfig()
         self.logger = self._setup_logger()
-        self.graph = self._init_graph()
+        self._graph = self._init_graph()
+        self._snapshot: Optional[GraphSnapshot] = None  # Loaded but not yet materialized
         self.neo4j_graph = self._init_neo4j()
+        self.neo4j_writer = (
+            Neo4jBulkWriter(self.neo4j_graph, self.config.neo4j_batch_size, self.logger,
+                            max_retries=self.config.neo4j_max_retries)
+            if self.neo4j_graph is not None else None
+        )
+        self._bulk_depth = 0
+        
+        # Insertion-ordered id sets (dict keys) per attribute value
+        self._type_index: Dict[str, Dict[str, None]] = {}
+        self._jurisdiction_index: Dict[str, Dict[str, None]] = {}
+        self._relationship_index: Dict[str, Dict[Tuple[str, str], None]] = {}
+        self._regulation_index = RegulationSimilarityIndex()
+        self.components = ComponentTracker()
+        self.degrees = DegreeTracker()
+        self.version = 0  # Bumped on every change, stamps cached analytics
+        self.path_engine = PathQueryEngine(self, self.logger)
+        self.neighborhoods = NeighborhoodIndex(
+            self, self.config.neighborhood_max_depth, self.config.neighborhood_cache_size
+        )
         
+    @property
+    def graph(self):
+        """NetworkX graph, materialized from a pending snapshot on first access."""
+        if self._snapshot is not None:
+            self._materialize()
+        return self._graph
+    
+    @graph.setter
+    def graph(self, graph) -> None:
+        self._snapshot = None
+        self._graph = graph
+    
+    @property
+    def regulation_index(self) -> RegulationSimilarityIndex:
+        """Similarity index of regulation names (needs the materialized graph)."""
+        if self._snapshot is not None:
+            self._materialize()
+        return self._regulation_index
+    
+    def _materialize(self) -> None:
+        """Build the NetworkX graph and indexes from the pending snapshot."""
+        snapshot, self._snapshot = self._snapshot, None
+        if self._graph is None:
+            return
+        start = time.time()
+        snapshot.to_networkx(self._graph)
+        self.rebuild_indexes()
+        self.logger.info(f"Materialized {snapshot.num_nodes} nodes and {snapshot.num_edges} edges "
+                         f"from snapshot in {time.time() - start:.2f}s")
+    
     def _setup_logger(self) -> logging.Logger:
         logger = logging.getLogger("graph_database_manager")
         logger.setLevel(logging.INFO)
@@ -86,6 +164,8 @@ class GraphDatabaseManager:
         try:
             # Add to NetworkX graph
             if self.graph is not None:
+                was_regulation = entity.entity_id in self._type_index.get("REGULATION", ())
+                self._unindex_node(entity.entity_id)
                 self.graph.add_node(
                     entity.entity_id,
                     **{
@@ -97,20 +177,19 @@ class GraphDatabaseManager:
                         "metadata": entity.metadata
                     }
                 )
+                self._index_node(entity.entity_id, self.graph.nodes[entity.entity_id])
+                self.components.add_node(entity.entity_id)
+                self.degrees.add_node(entity.entity_id)
+                if was_regulation != (entity.entity_type == "REGULATION"):
+                    self.neighborhoods.regulation_changed(entity.entity_id)
+                self.version += 1
             
             # Add to Neo4j if available
-            if self.neo4j_graph is not None:
-                node = Node(
-                    "Entity",
-                    entity_id=entity.entity_id,
-                    name=entity.name,
-                    entity_type=entity.entity_type,
-                    jurisdiction=entity.jurisdiction,
-                    description=entity.description,
-                    confidence=entity.confidence,
-                    **entity.metadata
-                )
-                self.neo4j_graph.create(node)
+            if self.neo4j_writer is not None:
+                written = self.neo4j_writer.add_entity(entity)
+                if not self._flush_unless_bulk(written):
+                    self.logger.error(f"Failed to write entity {entity.entity_id} to Neo4j")
+                    return False
             
             self.logger.info(f"Added entity: {entity.entity_id}")
             return True
@@ -122,8 +201,15 @@ class GraphDatabaseManager:
     def add_relationship(self, relationship: EntityRelationship) -> bool:
         """Add a relationship to the graph database."""
         try:
+            # Reject types Neo4j cannot store before touching either graph
+            if self.neo4j_writer is not None:
+                validate_relationship_type(relationship.relationship_type)
+            
             # Add to NetworkX graph
             if self.graph is not None:
+                is_new_edge = not self.graph.has_edge(relationship.source_entity_id,
+                                                      relationship.target_entity_id)
+                self._unindex_edge(relationship.source_entity_id, relationship.target_entity_id)
                 self.graph.add_edge(
                     relationship.source_entity_id,
                     relationship.target_entity_id,
@@ -134,23 +220,21 @@ class GraphDatabaseManager:
                         "metadata": relationship.metadata
                     }
                 )
+                self._index_edge(relationship.source_entity_id, relationship.target_entity_id,
+                                 relationship.relationship_type)
+                self.components.add_edge(relationship.source_entity_id, relationship.target_entity_id)
+                if is_new_edge:
+                    self.degrees.add_edge(relationship.source_entity_id, relationship.target_entity_id)
+                    self.neighborhoods.edge_added(relationship.source_entity_id,
+                                                  relationship.target_entity_id)
+                self.version += 1
             
             # Add to Neo4j if available
-            if self.neo4j_graph is not None:
-                matcher = NodeMatcher(self.neo4j_graph)
-                source_node = matcher.match("Entity", entity_id=relationship.source_entity_id).first()
-                target_node = matcher.match("Entity", entity_id=relationship.target_entity_id).first()
-                
-                if source_node and target_node:
-                    rel = Relationship(
-                        source_node,
-                        relationship.relationship_type,
-                        target_node,
-                        confidence=relationship.confidence,
-                        context=relationship.context,
-                        **relationship.metadata
-                    )
-                    self.neo4j_graph.create(rel)
+            if self.neo4j_writer is not None:
+                written = self.neo4j_writer.add_relationship(relationship)
+                if not self._flush_unless_bulk(written):
+                    self.logger.error(f"Failed to write relationship {relationship.relationship_id} to Neo4j")
+                    return False
             
             self.logger.info(f"Added relationship: {relationship.relationship_id}")
             return True
@@ -159,9 +243,171 @@ class GraphDatabaseManager:
             self.logger.error(f"Failed to add relationship {relationship.relationship_id}: {e}")
             return False
     
+    def _flush_unless_bulk(self, written: bool) -> bool:
+        """
+        Write the row just buffered unless inside a bulk block.
+
+        Args:
+            written: Result of the automatic flush the add may have triggered
+
+        Returns:
+            False if the row could not be written (always True in bulk mode)
+        """
+        if self._bulk_depth:
+            return True
+        return written and self.neo4j_writer.flush(retry_requeued=False)
+    
+    @contextmanager
+    def bulk(self):
+        """Buffer Neo4j writes until the outermost ``with manager.bulk():`` block exits."""
+        self._bulk_depth += 1
+        try:
+            yield self
+        finally:
+            self._bulk_depth -= 1
+            if self._bulk_depth == 0:
+                self.flush_neo4j()
+    
+    def flush_neo4j(self) -> bool:
+        """Write buffered entities and relationships to Neo4j."""
+        if self.neo4j_writer is None:
+            return False
+        return self.neo4j_writer.flush()
+    
+    def add_entities(self, entities: List[RegulatoryEntity]) -> int:
+        """Add many entities with batched Neo4j writes; returns how many were added."""
+        with self.bulk():
+            return sum(1 for entity in entities if self.add_entity(entity))
+    
+    def add_relationships(self, relationships: List[EntityRelationship]) -> int:
+        """Add many relationships with batched Neo4j writes; returns how many were added."""
+        with self.bulk():
+            return sum(1 for relationship in relationships if self.add_relationship(relationship))
+    
+    def sync_to_neo4j(self) -> bool:
+        """Write the whole in-memory graph to Neo4j in batches (e.g. after load_graph)."""
+        if self.graph is None or self.neo4j_writer is None:
+            return False
+        
+        stats = self.neo4j_writer.stats
+        before = dict(stats)
+        with self.bulk():
+            for node_id, data in self.graph.nodes(data=True):
+                self.neo4j_writer.add_entity(RegulatoryEntity(
+                    entity_id=node_id,
+                    name=data.get("name", node_id),
+                    entity_type=data.get("entity_type", "UNKNOWN"),
+                    jurisdiction=data.get("jurisdiction", "UNKNOWN"),
+                    description=data.get("description", ""),
+                    confidence=data.get("confidence", 1.0),
+                    metadata=data.get("metadata") or {}
+                ))
+            for source, target, data in self.graph.edges(data=True):
+                try:
+                    self.neo4j_writer.add_relationship(EntityRelationship(
+                        relationship_id=data.get("relationship_id", f"rel_{source}_{target}"),
+                        source_entity_id=source,
+                        target_entity_id=target,
+                        relationship_type=data.get("relationship_type", "RELATED_TO"),
+                        confidence=data.get("confidence", 1.0),
+                        context=data.get("context", ""),
+                        metadata=data.get("metadata") or {}
+                    ))
+                except ValueError as e:
+                    self.logger.warning(f"Skipping edge {source} -> {target}: {e}")
+        
+        # Report this call only; the writer's stats are cumulative
+        failed_batches = stats["failed_batches"] - before["failed_batches"]
+        self.logger.info(f"Synced graph to Neo4j: {stats['entities_written'] - before['entities_written']} entities, "
+                         f"{stats['relationships_written'] - before['relationships_written']} relationships, "
+                         f"{failed_batches} failed batches")
+        return failed_batches == 0 and self.neo4j_writer.pending == 0
+    
+    def _index_node(self, node_id: str, data: Dict[str, Any]) -> None:
+        """Add a node to the secondary indexes."""
+        entity_type = data.get("entity_type")
+        if entity_type is not None:
+            self._type_index.setdefault(entity_type, {})[node_id] = None
+        jurisdiction = data.get("jurisdiction")
+        if jurisdiction is not None:
+            self._jurisdiction_index.setdefault(jurisdiction, {})[node_id] = None
+        if entity_type == "REGULATION":
+            self._regulation_index.add(node_id, data.get("name", ""))
+    
+    def _unindex_node(self, node_id: str) -> None:
+        """Remove a node's current attributes from the secondary indexes."""
+        if self.graph is None or node_id not in self.graph.nodes:
+            return
+        data = self.graph.nodes[node_id]
+        for index, value in ((self._type_index, data.get("entity_type")),
+                             (self._jurisdiction_index, data.get("jurisdiction"))):
+            ids = index.get(value)
+            if ids is not None:
+                ids.pop(node_id, None)
+                if not ids:
+                    del index[value]
+        self._regulation_index.remove(node_id)
+    
+    def _index_edge(self, source: str, target: str, relationship_type: Optional[str]) -> None:
+        """Add an edge to the relationship-type index."""
+        if relationship_type is not None:
+            self._relationship_index.setdefault(relationship_type, {})[(source, target)] = None
+    
+    def _unindex_edge(self, source: str, target: str) -> None:
+        """Remove an existing edge from the relationship-type index."""
+        if self.graph is None or not self.graph.has_edge(source, target):
+            return
+        relationship_type = self.graph[source][target].get("relationship_type")
+        edges = self._relationship_index.get(relationship_type)
+        if edges is not None:
+            edges.pop((source, target), None)
+            if not edges:
+                del self._relationship_index[relationship_type]
+    
+    def rebuild_indexes(self) -> None:
+        """Rebuild all secondary indexes and component tracking from the graph."""
+        self._type_index.clear()
+        self._jurisdiction_index.clear()
+        self._relationship_index.clear()
+        self._regulation_index.clear()
+        self.components.clear()
+        self.degrees.clear()
+        self.neighborhoods.clear()
+        self.version += 1
+        if self.graph is None:
+            return
+        for node_id, data in self.graph.nodes(data=True):
+            self._index_node(node_id, data)
+            self.components.add_node(node_id)
+            self.degrees.add_node(node_id)
+        for source, target, data in self.graph.edges(data=True):
+            self._index_edge(source, target, data.get("relationship_type"))
+            self.components.add_edge(source, target)
+            self.degrees.add_edge(source, target)
+    
+    def get_entity_ids_by_type(self, entity_type: str) -> List[str]:
+        """Ids of all entities of a type, from the type index."""
+        if self._snapshot is not None:
+            return self._snapshot.entity_ids_by_type(entity_type)
+        return list(self._type_index.get(entity_type, ()))
+    
+    def get_entity_ids_by_jurisdiction(self, jurisdiction: str) -> List[str]:
+        """Ids of all entities in a jurisdiction, from the jurisdiction index."""
+        if self._snapshot is not None:
+            return self._snapshot.entity_ids_by_jurisdiction(jurisdiction)
+        return list(self._jurisdiction_index.get(jurisdiction, ()))
+    
+    def get_edges_by_relationship_type(self, relationship_type: str) -> List[Tuple[str, str]]:
+        """(source, target) pairs of all edges of a relationship type."""
+        if self._snapshot is not None:
+            return self._snapshot.edges_by_relationship_type(relationship_type)
+        return list(self._relationship_index.get(relationship_type, ()))
+    
     def get_entity(self, entity_id: str) -> Optional[Dict[str, Any]]:
         """Get an entity by ID."""
         try:
+            if self._snapshot is not None:
+                return self._snapshot.node_attributes(entity_id)
             if self.graph is not None and entity_id in self.graph.nodes:
                 return dict(self.graph.nodes[entity_id])
             return None
@@ -172,14 +418,19 @@ class GraphDatabaseManager:
     def get_entities_by_type(self, entity_type: str) -> List[Dict[str, Any]]:
         """Get all entities of a specific type."""
         try:
-            entities = []
-            
-            if self.graph is not None:
-                for node_id, data in self.graph.nodes(data=True):
-                    if data.get("entity_type") == entity_type:
-                        entities.append({"entity_id": node_id, **data})
+            if self._snapshot is not None:
+                return [
+                    {"entity_id": node_id, **self._snapshot.node_attributes(node_id)}
+                    for node_id in self._snapshot.entity_ids_by_type(entity_type)
+                ]
+            if self.graph is None:
+                return []
             
-            return entities
+            nodes = self.graph.nodes
+            return [
+                {"entity_id": node_id, **nodes[node_id]}
+                for node_id in self._type_index.get(entity_type, ())
+            ]
         except Exception as e:
             self.logger.error(f"Failed to get entities by type {entity_type}: {e}")
             return []
@@ -215,25 +466,40 @@ class GraphDatabaseManager:
             self.logger.error(f"Failed to get relationships for {entity_id}: {e}")
             return []
     
-    def find_path(self, source_entity_id: str, target_entity_id: str, 
-                  max_length: int = 5) -> List[List[str]]:
-        """Find paths between two entities."""
+    def find_ranked_paths(self, source_entity_id: str, target_entity_id: str,
+                          max_length: Optional[int] = None, limit: Optional[int] = None,
+                          relationship_types: Optional[List[str]] = None,
+                          time_budget: Optional[float] = None) -> List[RankedPath]:
+        """
+        Find the cheapest paths between two entities.
+        
+        Bounded by ``limit`` paths of at most ``max_length`` edges and a
+        ``time_budget`` in seconds (defaults from the config), so densely
+        linked graphs cannot make the query hang.
+        """
         try:
             if self.graph is None:
                 return []
             
-            try:
-                paths = list(nx.all_simple_paths(
-                    self.graph, source_entity_id, target_entity_id, 
-                    cutoff=max_length
-                ))
-                return paths
-            except nx.NetworkXNoPath:
-                return []
+            return self.path_engine.find_paths(
+                source_entity_id, target_entity_id,
+                max_length=max_length or self.config.max_path_length,
+                limit=limit or self.config.max_paths,
+                relationship_types=relationship_types,
+                time_budget=time_budget if time_budget is not None else self.config.path_time_budget
+            )
         except Exception as e:
             self.logger.error(f"Failed to find path: {e}")
             return []
     
+    def find_path(self, source_entity_id: str, target_entity_id: str, 
+                  max_length: Optional[int] = None, limit: Optional[int] = None,
+                  relationship_types: Optional[List[str]] = None) -> List[List[str]]:
+        """Find the cheapest paths between two entities, as lists of entity ids."""
+        paths = self.find_ranked_paths(source_entity_id, target_entity_id, max_length, limit,
+                                       relationship_types)
+        return [path.nodes for path in paths]
+    
     def get_subgraph(self, entity_ids: List[str]) -> Optional[nx.DiGraph]:
         """Get subgraph containing specified entities."""
         try:
@@ -261,15 +527,16 @@ class GraphDatabaseManager:
                 stats["total_nodes"] = self.graph.number_of_nodes()
                 stats["total_edges"] = self.graph.number_of_edges()
                 
-                # Count entity types
-                for node_id, data in self.graph.nodes(data=True):
-                    entity_type = data.get("entity_type", "UNKNOWN")
-                    stats["entity_types"][entity_type] = stats["entity_types"].get(entity_type, 0) + 1
+                # Count entity and relationship types from the indexes
+                stats["entity_types"] = {t: len(ids) for t, ids in self._type_index.items()}
+                untyped = stats["total_nodes"] - sum(stats["entity_types"].values())
+                if untyped:
+                    stats["entity_types"]["UNKNOWN"] = untyped
                 
-                # Count relationship types
-                for source, target, data in self.graph.edges(data=True):
-                    rel_type = data.get("relationship_type", "UNKNOWN")
-                    stats["relationship_types"][rel_type] = stats["relationship_types"].get(rel_type, 0) + 1
+                stats["relationship_types"] = {t: len(edges) for t, edges in self._relationship_index.items()}
+                untyped = stats["total_edges"] - sum(stats["relationship_types"].values())
+                if untyped:
+                    stats["relationship_types"]["UNKNOWN"] = untyped
             
             return stats
         except Exception as e:
@@ -277,8 +544,14 @@ class GraphDatabaseManager:
             return {}
     
     def save_graph(self, filepath: str = None) -> bool:
-        """Save graph to file."""
+        """
+        Save graph to file.
+        
+        Writes JSON node/edge lists; when saving to the default location
+        a binary snapshot is written alongside for fast startup loads.
+        """
         try:
+            default_location = filepath is None
             filepath = filepath or self.config.graph_db_path
             
             # Create directory
@@ -301,6 +574,8 @@ class GraphDatabaseManager:
                     json.dump(graph_data, f, indent=2)
                 
                 self.logger.info(f"Graph saved to {filepath}")
+                if default_location:
+                    self.save_snapshot()
                 return True
             
             return False
@@ -308,10 +583,81 @@ class GraphDatabaseManager:
             self.logger.error(f"Failed to save graph: {e}")
             return False
     
+    def save_snapshot(self, path: str = None) -> bool:
+        """Save graph as a binary snapshot (CSR adjacency, interned strings, columnar properties)."""
+        try:
+            path = path or self.config.graph_snapshot_path
+            if self.graph is None:
+                return False
+            
+            manifest = write_snapshot(self.graph, path)
+            self.logger.info(f"Graph snapshot saved to {path} "
+                             f"({manifest['nodes']} nodes, {manifest['edges']} edges)")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to save graph snapshot: {e}")
+            return False
+    
+    def load_snapshot(self, path: str = None, lazy: bool = True) -> bool:
+        """
+        Load a binary snapshot by memory-mapping it.
+        
+        Args:
+            path: Snapshot directory (defaults to config.graph_snapshot_path)
+            lazy: Defer building the NetworkX graph until it is needed
+        """
+        try:
+            path = path or self.config.graph_snapshot_path
+            if not is_snapshot(path):
+                self.logger.warning(f"Graph snapshot not found: {path}")
+                return False
+            if self._graph is None:
+                return False
+            
+            snapshot = GraphSnapshot.open(path)
+            self._graph.clear()
+            self._snapshot = snapshot
+            self._type_index.clear()
+            self._jurisdiction_index.clear()
+            self._relationship_index.clear()
+            self._regulation_index.clear()
+            self.components.clear()
+            self.degrees.clear()
+            self.neighborhoods.clear()
+            self.version += 1
+            if not lazy:
+                self._materialize()
+            
+            self.logger.info(f"Graph snapshot loaded from {path} "
+                             f"({snapshot.num_nodes} nodes, {snapshot.num_edges} edges)")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to load graph snapshot: {e}")
+            return False
+    
+    def _snapshot_is_current(self, json_path: str) -> bool:
+        snapshot_path = self.config.graph_snapshot_path
+        if not is_snapshot(snapshot_path):
+            return False
+        if not os.path.exists(json_path):
+            return True
+        return os.path.getmtime(os.path.join(snapshot_path, "manifest.json")) >= os.path.getmtime(json_path)
+    
     def load_graph(self, filepath: str = None) -> bool:
-        """Load graph from file."""
+        """
+        Load graph from file.
+        
+        Accepts a JSON graph file or a snapshot directory. Without a path,
+        the default snapshot is preferred when it is at least as new as
+        the default JSON file.
+        """
         try:
+            if filepath is None and self._snapshot_is_current(self.config.graph_db_path):
+                return self.load_snapshot()
+            
             filepath = filepath or self.config.graph_db_path
+            if is_snapshot(filepath):
+                return self.load_snapshot(filepath)
             
             if not os.path.exists(filepath):
                 self.logger.warning(f"Graph file not found: {filepath}")
@@ -324,17 +670,16 @@ class GraphDatabaseManager:
                 # Clear existing graph
                 self.graph.clear()
                 
-                # Add nodes
-                for node_data in graph_data.get("nodes", []):
-                    node_id = node_data.pop("id")
-                    self.graph.add_node(node_id, **node_data)
-                
-                # Add edges
-                for edge_data in graph_data.get("edges", []):
-                    source = edge_data.pop("source")
-                    target = edge_data.pop("target")
-                    self.graph.add_edge(source, target, **edge_data)
+                # Add nodes and edges in bulk
+                self.graph.add_nodes_from(
+                    (node_data.pop("id"), node_data) for node_data in graph_data.get("nodes", [])
+                )
+                self.graph.add_edges_from(
+                    (edge_data.pop("source"), edge_data.pop("target"), edge_data)
+                    for edge_data in graph_data.get("edges", [])
+                )
                 
+                self.rebuild_indexes()
                 self.logger.info(f"Graph loaded from {filepath}")
                 return True
             
@@ -350,6 +695,7 @@ class GraphQueryEngine:
     def __init__(self, graph_manager: GraphDatabaseManager):
         self.graph_manager = graph_manager
         self.logger = self._setup_logger()
+        self.centrality_cache = CentralityCache(self.logger)
         
     def _setup_logger(self) -> logging.Logger:
         logger = logging.getLogger("graph_query_engine")
@@ -360,49 +706,47 @@ class GraphQueryEngine:
             logger.addHandler(h)
         return logger
     
-    def find_compliance_paths(self, regulation_id: str, requirement_id: str) -> List[List[str]]:
+    def find_compliance_paths(self, regulation_id: str, requirement_id: str,
+                              relationship_types: Optional[List[str]] = None) -> List[List[str]]:
         """Find compliance pathways between regulation and requirement."""
         try:
-            paths = self.graph_manager.find_path(regulation_id, requirement_id)
+            paths = self.graph_manager.find_path(regulation_id, requirement_id,
+                                                 relationship_types=relationship_types)
             self.logger.info(f"Found {len(paths)} compliance paths")
             return paths
         except Exception as e:
             self.logger.error(f"Failed to find compliance paths: {e}")
             return []
     
-    def find_related_regulations(self, entity_id: str, max_depth: int = 2) -> List[Dict[str, Any]]:
-        """Find regulations related to an entity within max_depth."""
+    def find_related_regulations(self, entity_id: str, max_depth: int = 2,
+                                 offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find regulations related to an entity within max_depth, nearest first.
+        
+        Reachable regulations come from the manager's neighborhood index, so
+        only the returned page of entities is read from the graph.
+        
+        Args:
+            entity_id: Entity to start from (included at depth 0 if it is a regulation)
+            max_depth: Maximum number of hops along outgoing relationships
+            offset: Number of results to skip
+            limit: Maximum number of results (None for all)
+        """
         try:
             if self.graph_manager.graph is None:
                 return []
             
-            # Get entities within max_depth
-            related_entities = []
-            visited = set()
-            queue = [(entity_id, 0)]
-            
-            while queue:
-                current_id, depth = queue.pop(0)
-                if current_id in visited or depth > max_depth:
-                    continue
-                
-                visited.add(current_id)
-                
-                # Get entity data
-                entity_data = self.graph_manager.get_entity(current_id)
-                if entity_data and entity_data.get("entity_type") == "REGULATION":
-                    related_entities.append({
-                        "entity_id": current_id,
-                        "depth": depth,
-                        **entity_data
-                    })
-                
-                # Add neighbors to queue
-                if depth < max_depth:
-                    for neighbor in self.graph_manager.graph.neighbors(current_id):
-                        if neighbor not in visited:
-                            queue.append((neighbor, depth + 1))
+            related = self.graph_manager.neighborhoods.related(entity_id, max_depth)
+            page = related[offset:offset + limit if limit is not None else None]
             
+            related_entities = []
+            for regulation_id, depth in page:
+                entity_data = self.graph_manager.get_entity(regulation_id) or {}
+                related_entities.append({
+                    "entity_id": regulation_id,
+                    "depth": depth,
+                    **entity_data
+                })
             return related_entities
         except Exception as e:
             self.logger.error(f"Failed to find related regulations: {e}")
@@ -415,10 +759,7 @@ class GraphQueryEngine:
                 return None
             
             # Find all entities in jurisdiction
-            jurisdiction_entities = []
-            for node_id, data in self.graph_manager.graph.nodes(data=True):
-                if data.get("jurisdiction") == jurisdiction:
-                    jurisdiction_entities.append(node_id)
+            jurisdiction_entities = self.graph_manager.get_entity_ids_by_jurisdiction(jurisdiction)
             
             # Get subgraph
             return self.graph_manager.get_subgraph(jurisdiction_entities)
@@ -426,40 +767,98 @@ class GraphQueryEngine:
             self.logger.error(f"Failed to get compliance network: {e}")
             return None
     
-    def analyze_graph_metrics(self) -> Dict[str, Any]:
-        """Analyze graph metrics and properties."""
+    def analyze_graph_metrics(self, wait: bool = False) -> Dict[str, Any]:
+        """
+        Analyze graph metrics and properties.
+        
+        Size, density, degree and component metrics are maintained
+        incrementally and always current; the degree centrality map is
+        only rebuilt (O(n)) after nodes were added. Betweenness and closeness are
+        exact for graphs up to ``config.exact_centrality_max_nodes`` nodes;
+        larger graphs get sampled-pivot betweenness and HyperBall closeness
+        with error bounds (see ``centrality_info``), computed on a
+        background thread. Results are cached per graph version; for large
+        graphs a call returns the latest available values without waiting
+        unless ``wait`` is set.
+        """
         try:
             if self.graph_manager.graph is None:
                 return {}
             
             graph = self.graph_manager.graph
+            nodes = graph.number_of_nodes()
+            edges = graph.number_of_edges()
+            components = self.graph_manager.components
             
             metrics = {
                 "basic_stats": {
-                    "nodes": graph.number_of_nodes(),
-                    "edges": graph.number_of_edges(),
-                    "density": nx.density(graph)
+                    "nodes": nodes,
+                    "edges": edges,
+                    "density": edges / (nodes * (nodes - 1)) if nodes > 1 else 0.0
                 },
                 "connectivity": {
-                    "is_weakly_connected": nx.is_weakly_connected(graph),
-                    "number_weakly_connected_components": nx.number_weakly_connected_components(graph)
+                    "is_weakly_connected": nodes > 0 and components.components == 1,
+                    "number_weakly_connected_components": components.components,
+                    "largest_component_size": components.largest_component_size()
                 },
                 "centrality": {}
             }
             
-            # Calculate centrality measures for small graphs
-            if graph.number_of_nodes() < 1000:
-                try:
-                    metrics["centrality"]["betweenness"] = nx.betweenness_centrality(graph)
-                    metrics["centrality"]["closeness"] = nx.closeness_centrality(graph)
-                    metrics["centrality"]["degree"] = nx.degree_centrality(graph)
-                except Exception as e:
-                    self.logger.warning(f"Failed to calculate centrality: {e}")
+            if nodes > 1:
+                metrics["centrality"]["degree"] = self.graph_manager.degrees.centrality()
+            
+            # Exact centrality of small graphs is cheap enough to wait for
+            wait = wait or nodes <= self.graph_manager.config.exact_centrality_max_nodes
+            result = self.centrality_cache.get(self.graph_manager.version,
+                                               lambda: self._centrality_job(graph), wait)
+            metrics["centrality"].update(result.get("values", {}))
+            metrics["centrality_info"] = {
+                "status": result["status"],
+                "graph_version": result["graph_version"],
+                "current_version": self.graph_manager.version,
+                **result.get("info", {})
+            }
             
             return metrics
         except Exception as e:
             self.logger.error(f"Failed to analyze graph metrics: {e}")
             return {}
+    
+    def _centrality_job(self, graph):
+        """
+        Centrality computation over a structural copy of the graph.
+        
+        The node and edge lists are captured in the caller's thread so
+        the background computation never iterates the live graph.
+        """
+        config = self.graph_manager.config
+        node_list = list(graph.nodes)
+        edge_list = list(graph.edges)
+        
+        def compute():
+            structure = nx.DiGraph()
+            structure.add_nodes_from(node_list)
+            structure.add_edges_from(edge_list)
+            
+            if len(node_list) <= config.exact_centrality_max_nodes:
+                values = {
+                    "betweenness": nx.betweenness_centrality(structure),
+                    "closeness": nx.closeness_centrality(structure)
+                }
+                return values, {"method": "exact"}
+            
+            betweenness, betweenness_error = approximate_betweenness(structure, config.betweenness_pivots)
+            closeness, closeness_error = hyperball_closeness(node_list, edge_list, config.closeness_hll_precision)
+            info = {
+                "method": "approximate",
+                "betweenness_pivots": min(config.betweenness_pivots, len(node_list)),
+                "betweenness_error_bound": betweenness_error,
+                "betweenness_confidence": 0.9,
+                "closeness_relative_error": closeness_error
+            }
+            return {"betweenness": betweenness, "closeness": closeness}, info
+        
+        return compute
 
 
 def main():
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Knowledge Graph Snapshots
+Compact binary snapshots of the regulatory knowledge graph.
+
+A snapshot is a directory of NumPy arrays plus a small manifest:
+
+    manifest.json            format version and counts
+    strings_offsets.npy      interned string table (offsets into the blob)
+    strings_blob.npy         UTF-8 bytes of all strings
+    node_<column>.npy        columnar node properties (string ids / floats)
+    indptr.npy, indices.npy  CSR adjacency (successors of each node)
+    edge_<column>.npy        columnar edge properties, in CSR order
+
+Ids, types, names and JSON-encoded metadata are interned once in the
+string table and referenced by int32 ids (-1 for missing). Arrays are
+memory-mapped on open, so loading is O(1) and lookups touch only the
+pages they need; NetworkX is built only when to_networkx() is called.
+"""
+
+import os
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+SNAPSHOT_VERSION = 1
+
+# Known attributes stored in their own columns; anything else goes to "extra"
+NODE_STRING_COLUMNS = ("entity_type", "jurisdiction", "name", "description")
+EDGE_STRING_COLUMNS = ("relationship_type", "context")
+JSON_COLUMNS = ("metadata", "extra")
+FLOAT_COLUMNS = ("confidence",)
+
+
+class _StringTable:
+    """Builder for the interned string table."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return string_id
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [value.encode("utf-8") for value in self.values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            offsets[1:] = np.cumsum([len(b) for b in encoded])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return offsets, blob
+
+
+def _json_or_none(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _columns_for(items: List[Dict[str, Any]], string_columns: Tuple[str, ...],
+                 strings: _StringTable) -> Dict[str, np.ndarray]:
+    """Columnar arrays of a list of attribute dicts."""
+    known = set(string_columns) | {"metadata"} | set(FLOAT_COLUMNS)
+    columns: Dict[str, np.ndarray] = {}
+    for column in string_columns:
+        columns[column] = np.fromiter((strings.intern(d.get(column)) for d in items),
+                                      dtype=np.int32, count=len(items))
+    for column in FLOAT_COLUMNS:
+        columns[column] = np.fromiter(
+            (np.nan if d.get(column) is None else float(d[column]) for d in items),
+            dtype=np.float64, count=len(items)
+        )
+    columns["metadata"] = np.fromiter((strings.intern(_json_or_none(d.get("metadata"))) for d in items),
+                                      dtype=np.int32, count=len(items))
+    columns["extra"] = np.fromiter(
+        (strings.intern(_json_or_none({k: v for k, v in d.items() if k not in known} or None)) for d in items),
+        dtype=np.int32, count=len(items)
+    )
+    return columns
+
+
+def write_snapshot(graph: Any, path: str) -> Dict[str, Any]:
+    """
+    Write a NetworkX DiGraph as a binary snapshot directory.
+
+    The snapshot is written next to the target and swapped in with a
+    rename, so readers that still memory-map the old one are unaffected.
+
+    Args:
+        graph: NetworkX DiGraph
+        path: Snapshot directory (created or overwritten)
+
+    Returns:
+        The snapshot manifest
+    """
+    target = Path(path)
+    directory = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+    strings = _StringTable()
+
+    node_ids = list(graph.nodes)
+    node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+    node_data = [graph.nodes[node_id] for node_id in node_ids]
+
+    # CSR adjacency: successors grouped by source node, edges in the same order
+    indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+    targets: List[int] = []
+    edge_data: List[Dict[str, Any]] = []
+    for i, node_id in enumerate(node_ids):
+        for successor, data in graph.adj[node_id].items():
+            targets.append(node_index[successor])
+            edge_data.append(data)
+        indptr[i + 1] = len(targets)
+
+    arrays = {
+        "node_id": np.fromiter((strings.intern(n) for n in node_ids), dtype=np.int32, count=len(node_ids)),
+        "indptr": indptr,
+        "indices": np.asarray(targets, dtype=np.int32),
+    }
+    for column, values in _columns_for(node_data, NODE_STRING_COLUMNS, strings).items():
+        arrays[f"node_{column}"] = values
+    for column, values in _columns_for(edge_data, EDGE_STRING_COLUMNS, strings).items():
+        arrays[f"edge_{column}"] = values
+    arrays["strings_offsets"], arrays["strings_blob"] = strings.arrays()
+
+    for name, values in arrays.items():
+        np.save(directory / f"{name}.npy", values, allow_pickle=False)
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "nodes": len(node_ids),
+        "edges": len(edge_data),
+        "strings": len(strings.values),
+        "arrays": sorted(arrays),
+    }
+    with open(directory / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    previous = target.with_name(f"{target.name}.old-{os.getpid()}")
+    if target.exists():
+        target.rename(previous)
+    directory.rename(target)
+    shutil.rmtree(previous, ignore_errors=True)
+    return manifest
+
+
+def is_snapshot(path: str) -> bool:
+    """True if path is a snapshot directory."""
+    return (Path(path) / "manifest.json").is_file()
+
+
+class GraphSnapshot:
+    """
+    Read-only, memory-mapped view of a graph snapshot.
+
+    Example:
+        >>> snapshot = GraphSnapshot.open("data/knowledge_graph/regulatory_kg.snapshot")
+        >>> snapshot.entity_ids_by_type("REGULATION")[:3]
+        >>> graph = snapshot.to_networkx()   # only when an algorithm needs it
+    """
+
+    def __init__(self, path: str, arrays: Dict[str, np.ndarray], manifest: Dict[str, Any]):
+        self.path = path
+        self.arrays = arrays
+        self.manifest = manifest
+        self._strings: Optional[List[str]] = None
+        self._node_index: Optional[Dict[str, int]] = None
+        self._string_ids: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True) -> "GraphSnapshot":
+        """Open a snapshot directory, memory-mapping its arrays."""
+        directory = Path(path)
+        with open(directory / "manifest.json") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {manifest.get('version')}")
+        arrays = {}
+        for name in manifest["arrays"]:
+            try:
+                arrays[name] = np.load(directory / f"{name}.npy", mmap_mode="r" if mmap else None,
+                                       allow_pickle=False)
+            except ValueError:
+                # Empty arrays cannot be memory-mapped
+                arrays[name] = np.load(directory / f"{name}.npy", allow_pickle=False)
+        return cls(str(directory), arrays, manifest)
+
+    @property
+    def num_nodes(self) -> int:
+        return self.manifest["nodes"]
+
+    @property
+    def num_edges(self) -> int:
+        return self.manifest["edges"]
+
+    def string(self, string_id: int) -> Optional[str]:
+        """Decode one interned string (None for -1)."""
+        if string_id < 0:
+            return None
+        offsets = self.arrays["strings_offsets"]
+        start, end = int(offsets[string_id]), int(offsets[string_id + 1])
+        return self.arrays["strings_blob"][start:end].tobytes().decode("utf-8")
+
+    def strings(self) -> List[str]:
+        """Decode the whole string table (once)."""
+        if self._strings is None:
+            offsets = self.arrays["strings_offsets"].tolist()
+            blob = self.arrays["strings_blob"].tobytes()
+            self._strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+        return self._strings
+
+    def string_id(self, value: str) -> int:
+        """Id of an interned string, or -1."""
+        if self._string_ids is None:
+            self._string_ids = {value: i for i, value in enumerate(self.strings())}
+        return self._string_ids.get(value, -1)
+
+    def node_index(self, entity_id: str) -> Optional[int]:
+        """Row of an entity in the node columns."""
+        if self._node_index is None:
+            table = self.strings()
+            self._node_index = {table[string_id]: i for i, string_id in enumerate(self.arrays["node_id"].tolist())}
+        return self._node_index.get(entity_id)
+
+    def _rows(self, prefix: str, string_columns: Tuple[str, ...],
+              rows: Optional[List[int]] = None) -> Iterator[Dict[str, Any]]:
+        """Decode attribute dicts of some (default all) rows of a column group."""
+        table = self.strings() if rows is None else None
+        lookup = table.__getitem__ if table is not None else self.string
+
+        def column(name: str) -> List[Any]:
+            values = self.arrays[f"{prefix}_{name}"]
+            return (values if rows is None else values[rows]).tolist()
+
+        strings = {name: column(name) for name in string_columns + JSON_COLUMNS}
+        floats = {name: column(name) for name in FLOAT_COLUMNS}
+        for i in range(len(strings["metadata"])):
+            data: Dict[str, Any] = {}
+            for name in string_columns:
+                if strings[name][i] >= 0:
+                    data[name] = lookup(strings[name][i])
+            for name in FLOAT_COLUMNS:
+                if floats[name][i] == floats[name][i]:  # not NaN
+                    data[name] = floats[name][i]
+            if strings["metadata"][i] >= 0:
+                data["metadata"] = json.loads(lookup(strings["metadata"][i]))
+            if strings["extra"][i] >= 0:
+                data.update(json.loads(lookup(strings["extra"][i])))
+            yield data
+
+    def node_attributes(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Attributes of one entity, decoded from the columns."""
+        row = self.node_index(entity_id)
+        if row is None:
+            return None
+        return next(self._rows("node", NODE_STRING_COLUMNS, [row]))
+
+    def successors(self, entity_id: str) -> List[str]:
+        """Targets of an entity's outgoing edges, read from the CSR arrays."""
+        row = self.node_index(entity_id)
+        if row is None:
+            return []
+        indptr = self.arrays["indptr"]
+        node_ids = self.arrays["node_id"]
+        return [self.string(int(node_ids[t])) for t in self.arrays["indices"][indptr[row]:indptr[row + 1]]]
+
+    def _ids_where(self, column: str, value: str) -> List[str]:
+        string_id = self.string_id(value)
+        if string_id < 0:
+            return []
+        table = self.strings()
+        node_ids = self.arrays["node_id"][np.nonzero(self.arrays[column] == string_id)[0]]
+        return [table[node_id] for node_id in node_ids.tolist()]
+
+    def entity_ids_by_type(self, entity_type: str) -> List[str]:
+        """Ids of all entities of a type (vectorized column scan)."""
+        return self._ids_where("node_entity_type", entity_type)
+
+    def entity_ids_by_jurisdiction(self, jurisdiction: str) -> List[str]:
+        """Ids of all entities in a jurisdiction (vectorized column scan)."""
+        return self._ids_where("node_jurisdiction", jurisdiction)
+
+    def edges_by_relationship_type(self, relationship_type: str) -> List[Tuple[str, str]]:
+        """(source, target) pairs of all edges of a relationship type (vectorized column scan)."""
+        string_id = self.string_id(relationship_type)
+        if string_id < 0:
+            return []
+        rows = np.nonzero(self.arrays["edge_relationship_type"] == string_id)[0]
+        # An edge row belongs to the node whose CSR range contains it
+        sources = np.searchsorted(self.arrays["indptr"], rows, side="right") - 1
+        node_ids = self.arrays["node_id"]
+        table = self.strings()
+        return [
+            (table[source_id], table[target_id])
+            for source_id, target_id in zip(node_ids[sources].tolist(),
+                                            node_ids[self.arrays["indices"][rows]].tolist())
+        ]
+
+    def iter_nodes(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(entity_id, attributes) of every node, in snapshot order."""
+        table = self.strings()
+        node_ids = [table[string_id] for string_id in self.arrays["node_id"].tolist()]
+        return zip(node_ids, self._rows("node", NODE_STRING_COLUMNS))
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """(source, target, attributes) of every edge, in CSR order."""
+        table = self.strings()
+        node_ids = [table[string_id] for string_id in self.arrays["node_id"].tolist()]
+        sources = np.repeat(np.arange(self.num_nodes), np.diff(self.arrays["indptr"])).tolist()
+        targets = self.arrays["indices"].tolist()
+        for (source, target), data in zip(zip(sources, targets), self._rows("edge", EDGE_STRING_COLUMNS)):
+            yield node_ids[source], node_ids[target], data
+
+    def to_networkx(self, graph: Any = None) -> Any:
+        """Materialize the snapshot into a (new or given, cleared) NetworkX DiGraph."""
+        import networkx as nx
+
+        graph = graph if graph is not None else nx.DiGraph()
+        graph.clear()
+        graph.add_nodes_from(self.iter_nodes())
+        graph.add_edges_from(self.iter_edges())
+        return graph
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Regulation Neighborhood Index
+Cached k-hop neighborhoods of REGULATION nodes for related-regulation queries.
+
+For each queried entity the index keeps the regulations reachable within
+``max_depth`` hops with their hop distance, so repeated queries (and any
+depth up to ``max_depth``) are answered from a dict instead of a BFS.
+Entries are invalidated incrementally: a new edge u -> v only affects
+entities that reach u within ``max_depth - 1`` hops, and a node entering
+or leaving the REGULATION type only affects entities that reach it.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+
+REGULATION_TYPE = "REGULATION"
+
+
+class NeighborhoodIndex:
+    """
+    LRU cache of regulation neighborhoods over a GraphDatabaseManager.
+
+    Example:
+        >>> index = NeighborhoodIndex(graph_manager, max_depth=3)
+        >>> index.related("gdpr", depth=2)
+        [('gdpr', 0), ('eu_ai_act', 1), ...]
+    """
+
+    def __init__(self, graph_manager: Any, max_depth: int = 3, max_entries: int = 10000):
+        """
+        Initialize neighborhood index.
+
+        Args:
+            graph_manager: Manager whose graph and type index are read
+            max_depth: Hops precomputed per entity (deeper queries bypass the index)
+            max_entries: Cached neighborhoods kept (least recently used evicted)
+        """
+        self.graph_manager = graph_manager
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Dict[Hashable, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidated": 0}
+
+    def _regulation_ids(self) -> Dict[Hashable, None]:
+        return self.graph_manager._type_index.get(REGULATION_TYPE, {})
+
+    def _compute(self, source: Hashable, depth: int) -> Dict[Hashable, int]:
+        """Regulations within ``depth`` hops of source, in BFS order, with their distance."""
+        graph = self.graph_manager.graph
+        regulations = self._regulation_ids()
+        found: Dict[Hashable, int] = {}
+        if graph is None or source not in graph:
+            return found
+
+        seen = {source}
+        frontier = deque([(source, 0)])
+        while frontier:
+            node, distance = frontier.popleft()
+            if node in regulations:
+                found[node] = distance
+            if distance == depth:
+                continue
+            for neighbor in graph.successors(node):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    frontier.append((neighbor, distance + 1))
+        return found
+
+    def related(self, source: Hashable, depth: int) -> List[Tuple[Hashable, int]]:
+        """
+        Regulations within ``depth`` hops of an entity, nearest first.
+
+        Returns:
+            (regulation id, hop distance) pairs; the entity itself is
+            included at distance 0 if it is a regulation
+        """
+        if depth > self.max_depth:
+            return list(self._compute(source, depth).items())
+
+        with self._lock:
+            entry = self._entries.get(source)
+            if entry is not None:
+                self._entries.move_to_end(source)
+                self.stats["hits"] += 1
+
+        if entry is None:
+            entry = self._compute(source, self.max_depth)
+            with self._lock:
+                self.stats["misses"] += 1
+                self._entries[source] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return [(node, distance) for node, distance in entry.items() if distance <= depth]
+
+    def warm(self, sources: Optional[List[Hashable]] = None) -> int:
+        """Precompute neighborhoods (default: of every regulation); returns how many were computed."""
+        sources = sources if sources is not None else list(self._regulation_ids())
+        computed = 0
+        for source in sources[:self.max_entries]:
+            if source not in self._entries:
+                self.related(source, self.max_depth)
+                computed += 1
+        return computed
+
+    def _reaching(self, node: Hashable, depth: int) -> Set[Hashable]:
+        """Entities that reach node within ``depth`` hops (including node)."""
+        graph = self.graph_manager.graph
+        reached = {node}
+        frontier = [node]
+        for _ in range(depth):
+            next_frontier = []
+            for current in frontier:
+                if current not in graph:
+                    continue
+                for predecessor in graph.predecessors(current):
+                    if predecessor not in reached:
+                        reached.add(predecessor)
+                        next_frontier.append(predecessor)
+            frontier = next_frontier
+        return reached
+
+    def _invalidate(self, affected: Set[Hashable]) -> None:
+        with self._lock:
+            for source in affected:
+                if self._entries.pop(source, None) is not None:
+                    self.stats["invalidated"] += 1
+
+    def edge_added(self, source: Hashable, target: Hashable) -> None:
+        """A new edge source -> target extends neighborhoods of entities reaching source."""
+        if self._entries:
+            self._invalidate(self._reaching(source, self.max_depth - 1))
+
+    def regulation_changed(self, node: Hashable) -> None:
+        """A node became or stopped being a regulation."""
+        if self._entries:
+            self._invalidate(self._reaching(node, self.max_depth))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
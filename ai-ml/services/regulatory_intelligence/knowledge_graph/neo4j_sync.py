@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Neo4j Bulk Synchronization
+Buffers knowledge graph entities and relationships and writes them to
+Neo4j in batched, parameterized ``UNWIND $rows MERGE ...`` statements.
+
+Each batch is one transaction and one round trip, instead of one create
+(and two node lookups) per entity or relationship. MERGE on a unique
+``entity_id`` makes re-syncing the same data idempotent, so failed
+batches are retried with backoff and, if they still fail, their rows are
+kept buffered for the next full flush.
+"""
+
+import re
+import json
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.regulatory_intelligence.knowledge_graph.entity_extraction import (
+    RegulatoryEntity, EntityRelationship
+)
+
+
+ENTITY_LABEL = "Entity"
+
+CONSTRAINT_CYPHER = (
+    f"CREATE CONSTRAINT entity_id_unique IF NOT EXISTS "
+    f"FOR (e:{ENTITY_LABEL}) REQUIRE e.entity_id IS UNIQUE"
+)
+
+ENTITY_CYPHER = (
+    f"UNWIND $rows AS row "
+    f"MERGE (e:{ENTITY_LABEL} {{entity_id: row.entity_id}}) "
+    f"SET e += row.properties"
+)
+
+# Relationship types cannot be parameterized, so they are validated and inlined
+RELATIONSHIP_CYPHER = (
+    f"UNWIND $rows AS row "
+    f"MATCH (s:{ENTITY_LABEL} {{entity_id: row.source}}) "
+    f"MATCH (t:{ENTITY_LABEL} {{entity_id: row.target}}) "
+    f"MERGE (s)-[r:`{{relationship_type}}`]->(t) "
+    f"SET r += row.properties"
+)
+
+_RELATIONSHIP_TYPE_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def validate_relationship_type(relationship_type: Optional[str]) -> None:
+    """Raise ValueError unless the type is safe to inline into Cypher."""
+    if not _RELATIONSHIP_TYPE_PATTERN.match(relationship_type or ""):
+        raise ValueError(f"Invalid relationship type: {relationship_type!r}")
+
+
+def neo4j_properties(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Neo4j-storable copy of a property map.
+
+    Neo4j properties must be primitives or lists of primitives; None
+    values are dropped and anything else is stored as a JSON string.
+    """
+    primitive = (str, int, float, bool)
+    cleaned = {}
+    for key, value in properties.items():
+        if value is None:
+            continue
+        if isinstance(value, primitive):
+            cleaned[key] = value
+        elif isinstance(value, (list, tuple)) and all(isinstance(v, primitive) for v in value):
+            cleaned[key] = list(value)
+        else:
+            cleaned[key] = json.dumps(value, default=str)
+    return cleaned
+
+
+class Neo4jBulkWriter:
+    """
+    Batched Neo4j writer for entities and relationships.
+
+    Works with a py2neo ``Graph`` or any object with the same transaction
+    interface (``begin()`` returning a transaction with ``run(cypher,
+    parameters)``, committed with ``graph.commit(tx)`` or ``tx.commit()``),
+    so it can be exercised against a recording driver without a server.
+    """
+
+    def __init__(self, graph: Any, batch_size: int = 1000, logger: Optional[logging.Logger] = None,
+                 max_retries: int = 3, retry_backoff_seconds: float = 0.5):
+        """
+        Initialize bulk writer.
+
+        Args:
+            graph: py2neo Graph (or compatible driver)
+            batch_size: Rows per UNWIND statement and transaction
+            logger: Logger to report to
+            max_retries: Extra attempts per failing batch before its rows are requeued
+            retry_backoff_seconds: Delay before the first retry, doubled for each further one
+        """
+        self.graph = graph
+        self.batch_size = max(1, batch_size)
+        self.logger = logger or logging.getLogger("neo4j_bulk_writer")
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._entities: Dict[str, Dict[str, Any]] = {}
+        self._relationships: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        # Keys of rows put back by failed flushes; only a full flush retries them
+        self._requeued_entities: set = set()
+        self._requeued_relationships: set = set()
+        self._constraints_ready = False
+        self.stats = {
+            "entities_written": 0,
+            "relationships_written": 0,
+            "transactions": 0,
+            "retries": 0,
+            "failed_batches": 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Buffered rows not yet written."""
+        return len(self._entities) + len(self._relationships)
+
+    @property
+    def requeued(self) -> int:
+        """Buffered rows put back by failed flushes."""
+        return len(self._requeued_entities) + len(self._requeued_relationships)
+
+    def add_entity(self, entity: RegulatoryEntity) -> bool:
+        """
+        Buffer an entity (a later buffer of the same id replaces it).
+
+        Returns:
+            False if the automatic flush this row triggered failed
+        """
+        self._requeued_entities.discard(entity.entity_id)
+        self._entities[entity.entity_id] = {
+            "entity_id": entity.entity_id,
+            "properties": neo4j_properties({
+                **entity.metadata,
+                "name": entity.name,
+                "entity_type": entity.entity_type,
+                "jurisdiction": entity.jurisdiction,
+                "description": entity.description,
+                "confidence": entity.confidence,
+            }),
+        }
+        return self._maybe_flush()
+
+    def add_relationship(self, relationship: EntityRelationship) -> bool:
+        """
+        Buffer a relationship between two entities.
+
+        Returns:
+            False if the automatic flush this row triggered failed
+        """
+        validate_relationship_type(relationship.relationship_type)
+
+        key = (relationship.source_entity_id, relationship.target_entity_id, relationship.relationship_type)
+        self._requeued_relationships.discard(key)
+        self._relationships[key] = {
+            "source": relationship.source_entity_id,
+            "target": relationship.target_entity_id,
+            "properties": neo4j_properties({
+                **relationship.metadata,
+                "relationship_id": relationship.relationship_id,
+                "confidence": relationship.confidence,
+                "context": relationship.context,
+            }),
+        }
+        return self._maybe_flush()
+
+    def _maybe_flush(self) -> bool:
+        if self.pending - self.requeued >= self.batch_size:
+            return self.flush(retry_requeued=False)
+        return True
+
+    def ensure_constraints(self) -> None:
+        """Create the entity_id uniqueness constraint MERGE relies on."""
+        if self._constraints_ready:
+            return
+        self._run_transaction([(CONSTRAINT_CYPHER, {})])
+        self._constraints_ready = True
+
+    def flush(self, retry_requeued: bool = True) -> bool:
+        """
+        Write buffered rows, entities before relationships.
+
+        Rows of batches that still fail after retries stay buffered and are
+        only retried by a full flush, so per-row flushes against a failing
+        server do not retry the whole backlog every time. Relationships
+        wait while any entity batch is failing or one of their endpoints is
+        still buffered, since their MATCH would silently skip it.
+
+        Args:
+            retry_requeued: Also retry rows put back by earlier failed flushes
+
+        Returns:
+            True if every row written by this flush was committed
+        """
+        if retry_requeued:
+            self._requeued_entities.clear()
+            self._requeued_relationships.clear()
+        if self.pending == self.requeued:
+            return True
+
+        entity_rows = [self._entities.pop(entity_id) for entity_id in list(self._entities)
+                       if entity_id not in self._requeued_entities]
+        relationship_groups: Dict[str, List[Dict[str, Any]]] = {}
+        for key in list(self._relationships):
+            if key not in self._requeued_relationships:
+                relationship_groups.setdefault(key[2], []).append(self._relationships.pop(key))
+
+        try:
+            self.ensure_constraints()
+        except Exception as e:
+            self.logger.warning(f"Could not create Neo4j constraints: {e}")
+
+        failed_entities = self._write_batches(ENTITY_CYPHER, entity_rows, "entities_written")
+        for row in failed_entities:
+            # A newer buffered version of the entity wins over the failed one
+            self._entities.setdefault(row["entity_id"], row)
+
+        failed_relationships = 0
+        for relationship_type, rows in relationship_groups.items():
+            if failed_entities:
+                failed = rows
+            else:
+                failed = [row for row in rows if row["source"] in self._entities or row["target"] in self._entities]
+                ready = [row for row in rows if row["source"] not in self._entities
+                         and row["target"] not in self._entities]
+                cypher = RELATIONSHIP_CYPHER.replace("{relationship_type}", relationship_type)
+                failed += self._write_batches(cypher, ready, "relationships_written")
+            for row in failed:
+                self._relationships.setdefault((row["source"], row["target"], relationship_type), row)
+            failed_relationships += len(failed)
+
+        self._requeued_entities = set(self._entities)
+        self._requeued_relationships = set(self._relationships)
+        if failed_entities or failed_relationships:
+            self.logger.warning(f"{len(failed_entities)} entities and {failed_relationships} "
+                                f"relationships kept buffered after failed Neo4j writes")
+        return not (failed_entities or failed_relationships)
+
+    def _write_batches(self, cypher: str, rows: List[Dict[str, Any]], counter: str) -> List[Dict[str, Any]]:
+        """Write rows in batches, retrying each with backoff; returns the rows that failed."""
+        failed = []
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self._run_transaction([(cypher, {"rows": batch})])
+                    self.stats[counter] += len(batch)
+                    break
+                except Exception as e:
+                    if attempt < self.max_retries:
+                        self.stats["retries"] += 1
+                        self.logger.warning(f"Retrying Neo4j batch of {len(batch)} rows "
+                                            f"(attempt {attempt + 1}): {e}")
+                        time.sleep(self.retry_backoff_seconds * (2 ** attempt))
+                    else:
+                        self.stats["failed_batches"] += 1
+                        self.logger.error(f"Neo4j batch of {len(batch)} rows failed: {e}")
+                        failed.extend(batch)
+        return failed
+
+    def _run_transaction(self, statements: List[Tuple[str, Dict[str, Any]]]) -> None:
+        tx = self.graph.begin()
+        try:
+            for cypher, parameters in statements:
+                tx.run(cypher, parameters)
+        except Exception:
+            # py2neo 2021+ finishes transactions through the graph, older versions on the transaction
+            if callable(getattr(self.graph, "rollback", None)):
+                self.graph.rollback(tx)
+            else:
+                tx.rollback()
+            raise
+        if callable(getattr(self.graph, "commit", None)):
+            self.graph.commit(tx)
+        else:
+            tx.commit()
+        self.stats["transactions"] += 1
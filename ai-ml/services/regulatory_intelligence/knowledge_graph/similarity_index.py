@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Regulation Similarity Index
+MinHash / LSH index over regulation names for sublinear similarity lookups.
+
+Each regulation's word set is reduced to a MinHash signature and the
+signature is split into bands; regulations sharing any band bucket are
+candidates, and only candidates are scored with exact Jaccard similarity.
+The index is updated on every add, so linking a regulation touches its
+bucket neighbours instead of every regulation in the graph.
+"""
+
+import zlib
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+
+# Mersenne prime for the universal hash family (fits int64 products of 31-bit values)
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+class RegulationSimilarityIndex:
+    """
+    Incremental MinHash LSH index of regulation texts.
+
+    Regulation linking accepts name similarity down to about 0.1 (0.3 less
+    the same-jurisdiction boost), so the default is 64 bands of one row:
+    a pair becomes a candidate with probability 1 - (1 - J)^64, which is
+    99.9% at J = 0.1 and above 99.99% from J = 1/7. Wider bands would cut
+    bucket sizes but lose most of those weak links (32 bands of 2 rows
+    find only about half of the pairs at J = 1/7). Candidates are
+    re-scored exactly, so results never contain false positives.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 64, seed: int = 1):
+        """
+        Initialize similarity index.
+
+        Args:
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm must be divisible by bands)
+            seed: Seed for the hash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm).astype(np.int64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm).astype(np.int64)
+
+        self._tokens: Dict[str, Set[str]] = {}
+        self._keys: Dict[str, List[Tuple[int, bytes]]] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def tokenize(text: str) -> Set[str]:
+        """Lower-cased word set of a text."""
+        return set((text or "").lower().split())
+
+    @staticmethod
+    def jaccard(tokens1: Set[str], tokens2: Set[str]) -> float:
+        """Exact Jaccard similarity of two word sets."""
+        if not tokens1 or not tokens2:
+            return 0.0
+        return len(tokens1 & tokens2) / len(tokens1 | tokens2)
+
+    def signature(self, tokens: Iterable[str]) -> np.ndarray:
+        """MinHash signature of a word set."""
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode("utf-8")) & _MERSENNE_PRIME for token in tokens),
+            dtype=np.int64
+        )
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.int64)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+    def _band_keys(self, tokens: Set[str]) -> List[Tuple[int, bytes]]:
+        signature = self.signature(tokens)
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def add(self, entity_id: str, text: str) -> None:
+        """Index (or re-index) a regulation."""
+        tokens = self.tokenize(text)
+        keys = self._band_keys(tokens) if tokens else []
+        with self._lock:
+            self._remove_locked(entity_id)
+            self._tokens[entity_id] = tokens
+            self._keys[entity_id] = keys
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(entity_id)
+
+    def remove(self, entity_id: str) -> None:
+        """Drop a regulation from the index."""
+        with self._lock:
+            self._remove_locked(entity_id)
+
+    def _remove_locked(self, entity_id: str) -> None:
+        for key in self._keys.pop(entity_id, []):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entity_id)
+                if not bucket:
+                    del self._buckets[key]
+        self._tokens.pop(entity_id, None)
+
+    def clear(self) -> None:
+        """Remove all regulations."""
+        with self._lock:
+            self._tokens.clear()
+            self._keys.clear()
+            self._buckets.clear()
+
+    def candidates(self, entity_id: str) -> Set[str]:
+        """Regulations sharing at least one LSH bucket with an indexed regulation."""
+        with self._lock:
+            found: Set[str] = set()
+            for key in self._keys.get(entity_id, []):
+                found.update(self._buckets.get(key, ()))
+            found.discard(entity_id)
+            return found
+
+    def query(self, entity_id: str, threshold: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Exact Jaccard scores of an indexed regulation's LSH candidates.
+
+        Args:
+            entity_id: Indexed regulation
+            threshold: Minimum similarity to return
+
+        Returns:
+            (entity_id, similarity) pairs, most similar first
+        """
+        candidates = self.candidates(entity_id)
+        with self._lock:
+            tokens = self._tokens.get(entity_id, set())
+            scored = [
+                (candidate, self.jaccard(tokens, self._tokens.get(candidate, set())))
+                for candidate in candidates
+            ]
+        scored = [(candidate, score) for candidate, score in scored if score >= threshold]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._tokens
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Index size and bucket statistics."""
+        with self._lock:
+            sizes = [len(bucket) for bucket in self._buckets.values()]
+        return {
+            "regulations": len(self._tokens),
+            "buckets": len(sizes),
+            "largest_bucket": max(sizes) if sizes else 0,
+        }
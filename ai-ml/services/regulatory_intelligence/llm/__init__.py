@@ -5,6 +5,9 @@ Gemini 2.5 Flash integration for regulatory document analysis.
 
 Provides:
     - GeminiClient: Core API wrapper with retry/backoff/rate-limiting
+    - RateLimiter: Priority-aware RPM/TPM and concurrency limiter
+    - LLMResponseCache: Persistent exact/semantic response cache
+    - PromptCoalescer: Packs small structured-JSON tasks into shared requests
     - SummarizationService: Document summarization and key points
     - QASystem: Context-aware question answering
 
@@ -12,7 +15,16 @@ Author: REGIQ AI/ML Team
 Version: 1.0.0
 """
 
-from .gemini_client import GeminiClient, GeminiClientConfig, GeminiHelpers, RateLimiter
+from .gemini_client import GeminiClient, GeminiClientConfig, GeminiHelpers, classify_error
+from .rate_limiter import (
+    RateLimiter,
+    get_shared_rate_limiter,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_DEFAULT,
+    PRIORITY_BATCH,
+)
+from .response_cache import LLMResponseCache, get_shared_response_cache
+from .prompt_coalescer import PromptCoalescer, PromptTask
 from .summarization import SummarizationService
 from .qa import QASystem
 
@@ -23,7 +35,16 @@ __all__ = [
     "GeminiClient",
     "GeminiClientConfig",
     "GeminiHelpers",
+    "classify_error",
     "RateLimiter",
+    "get_shared_rate_limiter",
+    "PRIORITY_INTERACTIVE",
+    "PRIORITY_DEFAULT",
+    "PRIORITY_BATCH",
+    "LLMResponseCache",
+    "get_shared_response_cache",
+    "PromptCoalescer",
+    "PromptTask",
     "SummarizationService",
     "QASystem",
 ]
@@ -2,21 +2,29 @@
 """
 REGIQ AI/ML - Gemini Client Wrapper
 Provides a robust wrapper around Google Gemini API (gemini-2.5-flash) with:
-- Exponential retry/backoff
-- Simple rate limiting
+- Retries with jittered exponential backoff on classified transient errors
+- Priority-aware RPM/TPM rate limiting and a concurrency cap (see rate_limiter)
 - Structured output helpers
+- Sync and async (non-blocking) generation and streaming
+- Persistent response caching (exact and optional semantic)
 - Error handling and logging
 
 Reference: https://ai.google.dev/gemini-api/docs
 """
 
 import os
+import re
 import sys
+import math
 import time
+import random
+import asyncio
 import json
+import hashlib
 import logging
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Callable
 from dataclasses import dataclass
 
 # Official SDK per docs
@@ -29,6 +37,18 @@ except Exception as _e:  # pragma: no cover
 # Add project root
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 from config.env_config import get_env_config
+from services.regulatory_intelligence.llm.response_cache import (
+	DEFAULT_TTL_SECONDS,
+	LLMResponseCache,
+	get_shared_response_cache,
+)
+from services.regulatory_intelligence.llm.rate_limiter import (
+	PRIORITY_BATCH,
+	PRIORITY_DEFAULT,
+	PRIORITY_INTERACTIVE,
+	RateLimiter,
+	get_shared_rate_limiter,
+)
 
 
 @dataclass
@@ -36,43 +56,74 @@ class GeminiClientConfig:
 	model: str = "gemini-2.5-flash"
 	max_retries: int = 3
 	initial_backoff_seconds: float = 1.5
+	max_backoff_seconds: float = 30.0
 	rate_limit_rpm: int = 60  # requests per minute
+	rate_limit_tpm: int = 1_000_000  # prompt tokens per minute
+	max_concurrency: int = 8  # calls in flight across clients sharing the limiter
+	# Share the RPM/TPM budget across processes (else GEMINI_RATE_LIMIT_REDIS_URL, else per process)
+	rate_limit_redis_url: Optional[str] = None
 	timeout_seconds: int = 60
 	# Optionally allow passing API key directly; otherwise use env
 	api_key_env_var: str = "GEMINI_API_KEY"  # as shown in docs curl uses x-goog-api-key
+	token_count_cache_size: int = 4096
+	# Persistent response cache shared across clients using the same path
+	# (None: LLM_CACHE_PATH, else the default; relative paths live under the
+	# service data directory, see response_cache)
+	cache_enabled: bool = True
+	cache_path: Optional[str] = None
+	cache_ttl_seconds: int = DEFAULT_TTL_SECONDS
 
 
-class RateLimiter:
-	"""Simple fixed-window RPM rate limiter."""
-	def __init__(self, requests_per_minute: int) -> None:
-		self.requests_per_minute = max(1, requests_per_minute)
-		self.window_start = time.time()
-		self.request_count = 0
-
-	def acquire(self) -> None:
-		window = 60.0
-		now = time.time()
-		elapsed = now - self.window_start
-		if elapsed >= window:
-			self.window_start = now
-			self.request_count = 0
-		self.request_count += 1
-		if self.request_count > self.requests_per_minute:
-			# sleep until next window
-			sleep_for = window - elapsed
-			time.sleep(max(0.0, sleep_for))
-			self.window_start = time.time()
-			self.request_count = 1
+# HTTP statuses and API status names worth retrying
+RETRIABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+_RETRIABLE_PATTERN = re.compile(
+	r"\b(408|429|500|502|503|504)\b|RESOURCE_EXHAUSTED|UNAVAILABLE|DEADLINE_EXCEEDED|INTERNAL"
+	r"|rate limit|timed out|timeout|temporarily|connection (reset|aborted|refused)",
+	re.IGNORECASE
+)
+
+
+def classify_error(error: Exception) -> Optional[str]:
+	"""Classify a Gemini call failure; returns None for errors that must not be retried."""
+	code = getattr(error, "code", None) or getattr(error, "status_code", None)
+	if isinstance(code, int):
+		if code == 429:
+			return "rate_limited"
+		if code in RETRIABLE_STATUS_CODES:
+			return "server"
+		return None
+	if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+		return "timeout"
+	if isinstance(error, ConnectionError):
+		return "connection"
+	match = _RETRIABLE_PATTERN.search(str(error))
+	if not match:
+		return None
+	text = match.group(0).lower()
+	if text in ("429", "resource_exhausted", "rate limit"):
+		return "rate_limited"
+	if "time" in text or "deadline" in text or text == "408":
+		return "timeout"
+	if text.startswith("connection"):
+		return "connection"
+	return "server"
 
 
 class GeminiClient:
 	"""High-level Gemini client focused on text operations."""
-	def __init__(self, config: Optional[GeminiClientConfig] = None) -> None:
+	def __init__(self, config: Optional[GeminiClientConfig] = None, cache: Optional[LLMResponseCache] = None) -> None:
 		self.config = config or GeminiClientConfig()
 		self.logger = self._setup_logger()
 		self.env_config = get_env_config()
-		self._rate_limiter = RateLimiter(self.config.rate_limit_rpm)
+		self._rate_limiter = get_shared_rate_limiter(
+			self.config.rate_limit_rpm,
+			self.config.rate_limit_tpm,
+			self.config.max_concurrency,
+			self.config.rate_limit_redis_url,
+		)
 		self._client = self._init_client()
+		self._token_count_cache: "OrderedDict[str, int]" = OrderedDict()
+		self.cache = cache or self._init_cache()
 
 	def _setup_logger(self) -> logging.Logger:
 		logger = logging.getLogger("gemini_client")
@@ -99,41 +150,223 @@ class GeminiClient:
 			self.logger.error(f"Failed to init Gemini client: {e}")
 			return None
 
-	def _retry_loop(self, func: Callable[[], Any]) -> Any:
+	def _init_cache(self) -> Optional[LLMResponseCache]:
+		if not self.config.cache_enabled:
+			return None
+		try:
+			return get_shared_response_cache(self.config.cache_path, self.config.cache_ttl_seconds)
+		except Exception as e:
+			self.logger.warning(f"LLM response cache unavailable, continuing without it: {e}")
+			return None
+
+	@staticmethod
+	def _is_retriable(error: Exception) -> bool:
+		return classify_error(error) is not None
+
+	@staticmethod
+	def _estimate_tokens(prompt: str) -> int:
+		# Local estimate for the TPM budget; avoids a count_tokens call per request
+		return max(1, math.ceil(len(prompt) / 4))
+
+	def _backoff(self, attempt: int) -> float:
+		"""Full-jitter exponential backoff delay before retry ``attempt``."""
+		ceiling = min(self.config.max_backoff_seconds, self.config.initial_backoff_seconds * (2 ** (attempt - 1)))
+		return random.uniform(0, ceiling)
+
+	def _should_retry(self, error: Exception, attempt: int, label: str) -> bool:
+		kind = classify_error(error)
+		if attempt >= self.config.max_retries or kind is None:
+			self.logger.error(f"{label} failed (attempt {attempt}): {error}")
+			return False
+		self.logger.warning(f"Retrying {label} (attempt {attempt}) after {kind} error: {error}")
+		return True
+
+	def _retry_loop(self, func: Callable[[], Any], tokens: int = 1, priority: str = PRIORITY_DEFAULT) -> Any:
 		attempt = 0
-		backoff = self.config.initial_backoff_seconds
 		while True:
 			try:
-				self._rate_limiter.acquire()
-				return func()
+				with self._rate_limiter.slot(tokens, priority):
+					return func()
 			except Exception as e:
 				attempt += 1
-				# Simple heuristic: retry on 429/5xx or transient errors in message
-				msg = str(e)
-				is_retriable = any(tok in msg for tok in ["429", "Rate limit", "timeout", "temporar", "unavailable", "5", "deadline"])
-				if attempt >= self.config.max_retries or not is_retriable:
-					self.logger.error(f"Gemini call failed (attempt {attempt}): {e}")
+				if not self._should_retry(e, attempt, "Gemini call"):
 					raise
-				self.logger.warning(f"Retrying Gemini call (attempt {attempt}) after error: {e}")
-				time.sleep(backoff)
-				backoff *= 2
+				time.sleep(self._backoff(attempt))
 
-	def generate_text(self, prompt: str, model: Optional[str] = None, safety_settings: Optional[Dict[str, Any]] = None) -> str:
+	async def _aretry_loop(self, func: Callable[[], Any], tokens: int = 1, priority: str = PRIORITY_DEFAULT) -> Any:
+		attempt = 0
+		while True:
+			try:
+				async with self._rate_limiter.aslot(tokens, priority):
+					return await func()
+			except Exception as e:
+				attempt += 1
+				if not self._should_retry(e, attempt, "Gemini call"):
+					raise
+				await asyncio.sleep(self._backoff(attempt))
+
+	def generate_text(self, prompt: str, model: Optional[str] = None, safety_settings: Optional[Dict[str, Any]] = None,
+					  priority: str = PRIORITY_DEFAULT) -> str:
 		"""Generate free-form text from a prompt using gemini-2.5-flash by default."""
+		use_model = model or self.config.model
+		if self.cache is not None:
+			cached = self.cache.get(prompt, use_model)
+			if cached is not None:
+				return cached
 		if self._client is None:
 			raise RuntimeError("Gemini client not initialized")
-		use_model = model or self.config.model
 		def _call():
 			resp = self._client.models.generate_content(
 				model=use_model,
 				contents=prompt,
 			)
-			return getattr(resp, "text", None) or getattr(resp, "output_text", None) or str(resp)
-		return self._retry_loop(_call)
+			return self._response_text(resp)
+		text = self._retry_loop(_call, self._estimate_tokens(prompt), priority)
+		if self.cache is not None:
+			self.cache.put(prompt, use_model, text)
+		return text
+
+	async def agenerate_text(self, prompt: str, model: Optional[str] = None, priority: str = PRIORITY_DEFAULT) -> str:
+		"""Async variant of ``generate_text``; waits for rate limits without blocking the event loop."""
+		use_model = model or self.config.model
+		if self.cache is not None:
+			cached = self.cache.get(prompt, use_model)
+			if cached is not None:
+				return cached
+		if self._client is None:
+			raise RuntimeError("Gemini client not initialized")
+		async def _call():
+			resp = await self._client.aio.models.generate_content(model=use_model, contents=prompt)
+			return self._response_text(resp)
+		text = await self._aretry_loop(_call, self._estimate_tokens(prompt), priority)
+		if self.cache is not None:
+			self.cache.put(prompt, use_model, text)
+		return text
+
+	@staticmethod
+	def _response_text(resp: Any) -> str:
+		return getattr(resp, "text", None) or getattr(resp, "output_text", None) or str(resp)
+
+	def generate_text_stream(self, prompt: str, model: Optional[str] = None,
+							 priority: str = PRIORITY_DEFAULT) -> Iterator[str]:
+		"""Stream generated text chunks as they arrive.
+
+		Retries only happen before the first chunk; once text has been
+		yielded, a failure is raised to the caller. Cached responses are
+		replayed as a single chunk and completed streams are cached.
+		"""
+		use_model = model or self.config.model
+		cached = self.cache.get(prompt, use_model) if self.cache is not None else None
+		if cached is not None:
+			yield cached
+			return
+		if self._client is None:
+			raise RuntimeError("Gemini client not initialized")
+		chunks: List[str] = []
+		tokens = self._estimate_tokens(prompt)
+		attempt = 0
+		while True:
+			started = False
+			try:
+				with self._rate_limiter.slot(tokens, priority):
+					for chunk in self._client.models.generate_content_stream(model=use_model, contents=prompt):
+						text = getattr(chunk, "text", None)
+						if text:
+							started = True
+							chunks.append(text)
+							yield text
+				if self.cache is not None:
+					self.cache.put(prompt, use_model, "".join(chunks))
+				return
+			except Exception as e:
+				attempt += 1
+				if started:
+					self.logger.error(f"Gemini stream failed after output started: {e}")
+					raise
+				if not self._should_retry(e, attempt, "Gemini stream"):
+					raise
+				time.sleep(self._backoff(attempt))
 
-	def generate_structured_json(self, prompt: str, schema_hint: Optional[Dict[str, Any]] = None, model: Optional[str] = None) -> Dict[str, Any]:
+	async def agenerate_text_stream(self, prompt: str, model: Optional[str] = None,
+									priority: str = PRIORITY_DEFAULT) -> AsyncIterator[str]:
+		"""Async variant of ``generate_text_stream`` using the SDK's aio client."""
+		use_model = model or self.config.model
+		cached = self.cache.get(prompt, use_model) if self.cache is not None else None
+		if cached is not None:
+			yield cached
+			return
+		if self._client is None:
+			raise RuntimeError("Gemini client not initialized")
+		chunks: List[str] = []
+		tokens = self._estimate_tokens(prompt)
+		attempt = 0
+		while True:
+			started = False
+			try:
+				async with self._rate_limiter.aslot(tokens, priority):
+					stream = await self._client.aio.models.generate_content_stream(model=use_model, contents=prompt)
+					async for chunk in stream:
+						text = getattr(chunk, "text", None)
+						if text:
+							started = True
+							chunks.append(text)
+							yield text
+				if self.cache is not None:
+					self.cache.put(prompt, use_model, "".join(chunks))
+				return
+			except Exception as e:
+				attempt += 1
+				if started:
+					self.logger.error(f"Gemini stream failed after output started: {e}")
+					raise
+				if not self._should_retry(e, attempt, "Gemini stream"):
+					raise
+				await asyncio.sleep(self._backoff(attempt))
+
+	def count_tokens(self, text: str, model: Optional[str] = None, priority: str = PRIORITY_DEFAULT) -> int:
+		"""Count prompt tokens for the model; cached, with a local estimate as fallback.
+
+		Uncached counts are API requests and take a rate limiter slot like
+		generation calls do.
+		"""
+		if not text:
+			return 0
+		use_model = model or self.config.model
+		key = hashlib.sha1(f"{use_model}\x00{text}".encode("utf-8")).hexdigest()
+		cached = self._token_count_cache.get(key)
+		if cached is not None:
+			self._token_count_cache.move_to_end(key)
+			return cached
+		count = None
+		if self._client is not None:
+			try:
+				with self._rate_limiter.slot(1, priority):
+					resp = self._client.models.count_tokens(model=use_model, contents=text)
+				count = getattr(resp, "total_tokens", None)
+			except Exception as e:
+				self.logger.debug(f"count_tokens failed, using estimate: {e}")
+		if count is None:
+			# Gemini averages roughly four characters per token for English text
+			count = max(1, math.ceil(len(text) / 4))
+		self._token_count_cache[key] = count
+		if len(self._token_count_cache) > self.config.token_count_cache_size:
+			self._token_count_cache.popitem(last=False)
+		return count
+
+	def generate_structured_json(self, prompt: str, schema_hint: Optional[Dict[str, Any]] = None, model: Optional[str] = None,
+								 priority: str = PRIORITY_DEFAULT) -> Dict[str, Any]:
 		"""Ask Gemini to return JSON; best-effort coercion with fallback parsing."""
-		text = self.generate_text(self._json_prompt(prompt, schema_hint), model=model)
+		text = self.generate_text(self._json_prompt(prompt, schema_hint), model=model, priority=priority)
+		return self._parse_json(text)
+
+	async def agenerate_structured_json(self, prompt: str, schema_hint: Optional[Dict[str, Any]] = None,
+										model: Optional[str] = None, priority: str = PRIORITY_DEFAULT) -> Dict[str, Any]:
+		"""Async variant of ``generate_structured_json``."""
+		text = await self.agenerate_text(self._json_prompt(prompt, schema_hint), model=model, priority=priority)
+		return self._parse_json(text)
+
+	@staticmethod
+	def _parse_json(text: str) -> Any:
 		# try parse json from text; tolerate fenced blocks
 		clean = text.strip()
 		if clean.startswith("```"):
@@ -163,8 +396,32 @@ class GeminiClient:
 class GeminiHelpers:
 	def __init__(self, client: GeminiClient) -> None:
 		self.client = client
+		self._coalescers: Dict[str, Any] = {}
+
+	def coalescer(self, priority: str = PRIORITY_BATCH):
+		"""Prompt coalescer sending through this client at a priority class."""
+		if priority not in self._coalescers:
+			from services.regulatory_intelligence.llm.prompt_coalescer import PromptCoalescer
+			self._coalescers[priority] = PromptCoalescer.for_client(self.client, priority)
+		return self._coalescers[priority]
+
+	def _run_tasks(self, tasks: List[Any], priority: str, offline: bool) -> List[Any]:
+		coalescer = self.coalescer(priority)
+		return coalescer.run_offline(tasks) if offline else coalescer.run(tasks)
 
 	def summarize(self, text: str, style: str = "executive", max_bullets: int = 6) -> Dict[str, Any]:
+		prompt, schema = self._summary_prompt(text, style, max_bullets)
+		return self.client.generate_structured_json(prompt, schema, priority=PRIORITY_BATCH)
+
+	def summarize_many(self, texts: List[str], style: str = "executive", max_bullets: int = 6,
+					   offline: bool = False) -> List[Dict[str, Any]]:
+		"""Summarize several documents with coalesced requests (Batch API if ``offline``)."""
+		from services.regulatory_intelligence.llm.prompt_coalescer import PromptTask
+		tasks = [PromptTask(*self._summary_prompt(text, style, max_bullets), output_tokens=400) for text in texts]
+		return self._run_tasks(tasks, PRIORITY_BATCH, offline)
+
+	@staticmethod
+	def _summary_prompt(text: str, style: str, max_bullets: int):
 		prompt = (
 			"Summarize the following regulatory document.\n"
 			f"Style: {style} summary.\n"
@@ -179,19 +436,49 @@ class GeminiHelpers:
 			"deadlines": "string",
 			"actions": "string",
 		}
-		return self.client.generate_structured_json(prompt, schema)
+		return prompt, schema
 
 	def key_points(self, text: str, max_points: int = 8) -> List[str]:
-		prompt = (
+		data = self.client.generate_structured_json(self._key_points_prompt(text, max_points), {"items": "string"},
+													priority=PRIORITY_BATCH)
+		return self._as_key_points(data)
+
+	def key_points_many(self, texts: List[str], max_points: int = 8, offline: bool = False) -> List[List[str]]:
+		"""Extract key points of several documents with coalesced requests (Batch API if ``offline``)."""
+		from services.regulatory_intelligence.llm.prompt_coalescer import PromptTask
+		tasks = [PromptTask(self._key_points_prompt(text, max_points), {"items": "string"}, output_tokens=200)
+				 for text in texts]
+		return [self._as_key_points(data) for data in self._run_tasks(tasks, PRIORITY_BATCH, offline)]
+
+	@staticmethod
+	def _key_points_prompt(text: str, max_points: int) -> str:
+		return (
 			f"Extract up to {max_points} concise, actionable key points from the document.\n"
 			"Return JSON array of strings only.\n\nDOCUMENT:\n" + text
 		)
-		data = self.client.generate_structured_json(prompt, {"items": "string"})
+
+	@staticmethod
+	def _as_key_points(data: Any) -> List[str]:
 		if isinstance(data, list):
 			return data
 		return data.get("key_points") or data.get("items") or data.get("raw", [])
 
 	def answer(self, question: str, context: str) -> Dict[str, Any]:
+		prompt, schema = self._answer_prompt(question, context)
+		return self.client.generate_structured_json(prompt, schema, priority=PRIORITY_INTERACTIVE)
+
+	async def aanswer(self, question: str, context: str) -> Dict[str, Any]:
+		prompt, schema = self._answer_prompt(question, context)
+		return await self.client.agenerate_structured_json(prompt, schema, priority=PRIORITY_INTERACTIVE)
+
+	def answer_many(self, questions: List[str], contexts: List[str]) -> List[Dict[str, Any]]:
+		"""Answer several short questions with coalesced interactive requests."""
+		from services.regulatory_intelligence.llm.prompt_coalescer import PromptTask
+		tasks = [PromptTask(*self._answer_prompt(question, context)) for question, context in zip(questions, contexts)]
+		return self._run_tasks(tasks, PRIORITY_INTERACTIVE, offline=False)
+
+	@staticmethod
+	def _answer_prompt(question: str, context: str):
 		prompt = (
 			"You are a compliance and regulatory assistant.\n"
 			"Answer the QUESTION using only the CONTEXT. If uncertain, say 'insufficient context'.\n"
@@ -199,4 +486,4 @@ class GeminiHelpers:
 			"CONTEXT:\n" + context + "\n\nQUESTION: " + question
 		)
 		schema = {"answer": "string", "confidence": "number", "citations": ["string"]}
-		return self.client.generate_structured_json(prompt, schema)
+		return prompt, schema
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Prompt Coalescing
+Packs small, independent structured-JSON tasks (summaries, key points,
+short answers) into shared Gemini requests.
+
+Each task keeps its own schema and result: a coalesced request asks for
+one JSON object keyed by task id, items the model skips or fails are
+retried on their own, and results are cached per task. Offline jobs can
+go through the Gemini Batch API instead of live requests.
+"""
+
+import json
+import math
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+# Add project root
+sys.path.append(str(Path(__file__).parent.parent.parent.parent))
+from services.regulatory_intelligence.llm.gemini_client import GeminiClient
+from services.regulatory_intelligence.llm.rate_limiter import PRIORITY_BATCH
+from services.regulatory_intelligence.llm.response_cache import LLMResponseCache
+
+
+BATCH_DONE_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+
+@dataclass
+class PromptTask:
+	"""One independent structured-JSON task."""
+	prompt: str
+	schema: Optional[Any] = None
+	output_tokens: int = 256  # Expected response size, counted against the request budget
+
+
+class PromptCoalescer:
+	"""
+	Coalesces independent prompt tasks into few structured-JSON requests.
+
+	Example:
+		>>> coalescer = PromptCoalescer.for_client(client)
+		>>> results = coalescer.run([PromptTask("Summarize: ...", {"overview": "string"}), ...])
+	"""
+
+	def __init__(self,
+				 generate_fn: Callable[[str], Union[Optional[str], Tuple[Optional[str], str]]],
+				 model: str = "gemini-2.5-flash",
+				 cache: Optional[LLMResponseCache] = None,
+				 max_request_tokens: int = 8000,
+				 max_items: int = 12,
+				 max_parallel_requests: int = 4,
+				 batch_client: Any = None) -> None:
+		"""
+		Initialize the coalescer.
+
+		Args:
+			generate_fn: Sends one prompt and returns the response text, or the
+				text and the model that answered when it may fall back to another
+			model: Model name (cache namespace and Batch API model)
+			cache: Per-task result cache
+			max_request_tokens: Estimated prompt plus response tokens per coalesced request
+			max_items: Tasks per coalesced request
+			max_parallel_requests: Coalesced requests sent concurrently
+			batch_client: google-genai client for run_offline
+		"""
+		self.generate_fn = generate_fn
+		self.model = model
+		self.cache = cache
+		self.max_request_tokens = max_request_tokens
+		self.max_items = max(1, max_items)
+		self.max_parallel_requests = max(1, max_parallel_requests)
+		self.batch_client = batch_client
+		self.logger = logging.getLogger("gemini_client")
+		self.stats = {"tasks": 0, "requests": 0, "cache_hits": 0, "isolated_retries": 0}
+		self._lock = threading.Lock()
+
+	def _count(self, stat: str, amount: int = 1) -> None:
+		with self._lock:
+			self.stats[stat] += amount
+
+	@classmethod
+	def for_client(cls, client: GeminiClient, priority: str = PRIORITY_BATCH, **kwargs) -> "PromptCoalescer":
+		"""Coalescer sending requests through a GeminiClient (rate limits, retries) at a priority class."""
+		return cls(
+			lambda prompt: client.generate_text(prompt, priority=priority),
+			model=client.config.model,
+			cache=client.cache,
+			batch_client=client._client,
+			**kwargs
+		)
+
+	@staticmethod
+	def _estimate_tokens(text: str) -> int:
+		return max(1, math.ceil(len(text) / 4))
+
+	def _task_cost(self, task: PromptTask) -> int:
+		return self._estimate_tokens(task.prompt) + self._estimate_tokens(json.dumps(task.schema or {})) + task.output_tokens
+
+	def pack(self, tasks: List[PromptTask]) -> List[List[int]]:
+		"""Group task indices, in order, into requests within the token and item budgets."""
+		groups, current, used = [], [], 0
+		for index, task in enumerate(tasks):
+			cost = self._task_cost(task)
+			if current and (used + cost > self.max_request_tokens or len(current) >= self.max_items):
+				groups.append(current)
+				current, used = [], 0
+			current.append(index)
+			used += cost
+		if current:
+			groups.append(current)
+		return groups
+
+	@staticmethod
+	def single_prompt(task: PromptTask) -> str:
+		"""Prompt for a task sent on its own."""
+		parts = [
+			"You are to respond ONLY with valid JSON. Do not include explanations.",
+			"If you cannot produce the requested structure, return an empty JSON object {}.",
+		]
+		if task.schema:
+			parts.append("JSON schema hint: " + json.dumps(task.schema))
+		parts.append("Task: " + task.prompt)
+		return "\n\n".join(parts)
+
+	@staticmethod
+	def coalesced_prompt(tasks: Dict[str, PromptTask]) -> str:
+		"""Prompt asking for several tasks at once, answered as one JSON object keyed by task id."""
+		parts = [
+			f"Complete the following {len(tasks)} tasks. They are independent: never use the content "
+			"of one task when answering another.",
+			"Respond ONLY with a JSON object whose keys are the task ids and whose values follow each "
+			"task's JSON schema hint. If you cannot complete a task, set its value to {\"error\": \"<reason>\"}.",
+		]
+		for task_id, task in tasks.items():
+			section = f"### TASK {task_id}\n"
+			if task.schema:
+				section += "JSON schema hint: " + json.dumps(task.schema) + "\n"
+			parts.append(section + task.prompt)
+		return "\n\n".join(parts)
+
+	def _cache_get(self, task: PromptTask) -> Optional[Any]:
+		if self.cache is None:
+			return None
+		cached = self.cache.get(self.single_prompt(task), self.model, {"coalesced": True})
+		return json.loads(cached) if cached is not None else None
+
+	def _cache_put(self, task: PromptTask, result: Any, model: str) -> None:
+		# Results are cached under the model that produced them, never a fallback under self.model
+		if self.cache is not None:
+			self.cache.put(self.single_prompt(task), model, json.dumps(result), {"coalesced": True})
+
+	def _generate(self, prompt: str) -> Tuple[Optional[str], str]:
+		"""Send one prompt; returns the response text and the model that answered."""
+		output = self.generate_fn(prompt)
+		if isinstance(output, tuple):
+			return output
+		return output, self.model
+
+	@staticmethod
+	def _valid(value: Any) -> bool:
+		"""True for a usable result (not missing, empty, an error or unparsed text)."""
+		if value is None or value == {}:
+			return False
+		return not (isinstance(value, dict) and ("error" in value or set(value) == {"raw"}))
+
+	def _split_cached(self, tasks: List[PromptTask]):
+		"""Results list prefilled from the cache, and indices of tasks still to run."""
+		results: List[Tuple[Any, str]] = [(None, self.model)] * len(tasks)
+		pending = []
+		for index, task in enumerate(tasks):
+			cached = self._cache_get(task)
+			if cached is not None:
+				self._count("cache_hits")
+				results[index] = (cached, self.model)
+			else:
+				pending.append(index)
+		self._count("tasks", len(tasks))
+		return results, pending
+
+	def _run_single(self, task: PromptTask) -> Tuple[Any, str]:
+		try:
+			self._count("requests")
+			text, model = self._generate(self.single_prompt(task))
+			return GeminiClient._parse_json(text or ""), model
+		except Exception as e:
+			self.logger.error(f"Prompt task failed: {e}")
+			return {"error": str(e)}, self.model
+
+	def _run_group(self, tasks: List[PromptTask]) -> List[Tuple[Any, str]]:
+		"""Run one coalesced request; items it does not answer are retried on their own."""
+		if len(tasks) == 1:
+			return [self._run_single(tasks[0])]
+
+		keyed = {f"t{i + 1}": task for i, task in enumerate(tasks)}
+		model = self.model
+		try:
+			self._count("requests")
+			text, model = self._generate(self.coalesced_prompt(keyed))
+			data = GeminiClient._parse_json(text or "")
+		except Exception as e:
+			self.logger.warning(f"Coalesced request failed, running {len(tasks)} tasks individually: {e}")
+			data = {}
+		if not isinstance(data, dict):
+			data = {}
+
+		results = []
+		for task_id, task in keyed.items():
+			value = data.get(task_id)
+			if self._valid(value):
+				results.append((value, model))
+			else:
+				self._count("isolated_retries")
+				results.append(self._run_single(task))
+		return results
+
+	def run(self, tasks: List[PromptTask]) -> List[Any]:
+		"""
+		Run tasks with as few requests as the budgets allow.
+
+		Returns:
+			One parsed JSON result per task, in order; failed tasks
+			yield {"error": ...} without affecting the others
+		"""
+		return [value for value, _ in self.run_with_models(tasks)]
+
+	def run_with_models(self, tasks: List[PromptTask]) -> List[Tuple[Any, str]]:
+		"""Like ``run``, pairing each result with the model that produced it."""
+		results, pending = self._split_cached(tasks)
+		groups = [[pending[i] for i in group] for group in self.pack([tasks[i] for i in pending])]
+		with ThreadPoolExecutor(max_workers=self.max_parallel_requests) as executor:
+			outcomes = list(executor.map(lambda group: self._run_group([tasks[i] for i in group]), groups))
+
+		for group, values in zip(groups, outcomes):
+			for index, (value, model) in zip(group, values):
+				results[index] = (value, model)
+				if self._valid(value):
+					self._cache_put(tasks[index], value, model)
+		return results
+
+	def run_offline(self, tasks: List[PromptTask], poll_seconds: float = 30.0,
+					timeout_seconds: float = 24 * 3600) -> List[Any]:
+		"""
+		Run tasks as one Gemini Batch API job of coalesced requests.
+
+		For offline jobs: batch requests are cheaper and do not count
+		against the interactive rate limit, but may take hours. Items the
+		job does not answer are retried live.
+		"""
+		if self.batch_client is None:
+			raise RuntimeError("Gemini client not initialized; batch mode unavailable")
+
+		results, pending = self._split_cached(tasks)
+		if not pending:
+			return [value for value, _ in results]
+
+		groups = [[pending[i] for i in group] for group in self.pack([tasks[i] for i in pending])]
+		prompts = [
+			self.single_prompt(tasks[group[0]]) if len(group) == 1
+			else self.coalesced_prompt({f"t{i + 1}": tasks[index] for i, index in enumerate(group)})
+			for group in groups
+		]
+		job = self.batch_client.batches.create(
+			model=self.model,
+			src=[{"contents": [{"parts": [{"text": prompt}], "role": "user"}]} for prompt in prompts],
+			config={"display_name": f"regiq-coalesced-{int(time.time())}"},
+		)
+		self.logger.info(f"📦 Submitted Gemini batch job {job.name}: {len(pending)} tasks in {len(prompts)} requests")
+
+		deadline = time.monotonic() + timeout_seconds
+		while getattr(job.state, "name", str(job.state)) not in BATCH_DONE_STATES:
+			if time.monotonic() > deadline:
+				raise TimeoutError(f"Gemini batch job {job.name} did not finish in {timeout_seconds}s")
+			time.sleep(poll_seconds)
+			job = self.batch_client.batches.get(name=job.name)
+
+		responses = list(getattr(getattr(job, "dest", None), "inlined_responses", None) or [])
+		self._count("requests", len(prompts))
+
+		for position, group in enumerate(groups):
+			response = responses[position] if position < len(responses) else None
+			text = getattr(getattr(response, "response", None), "text", None) or ""
+			data = GeminiClient._parse_json(text) if text else {}
+			for i, index in enumerate(group):
+				value = data if len(group) == 1 else (data.get(f"t{i + 1}") if isinstance(data, dict) else None)
+				model = self.model
+				if not self._valid(value):
+					self._count("isolated_retries")
+					value, model = self._run_single(tasks[index])
+				results[index] = (value, model)
+				if self._valid(value):
+					self._cache_put(tasks[index], value, model)
+		return [value for value, _ in results]
+
+	def get_stats(self) -> Dict[str, Any]:
+		"""Tasks, requests sent and retries."""
+		with self._lock:
+			stats = dict(self.stats)
+		stats["tasks_per_request"] = round(stats["tasks"] / stats["requests"], 2) if stats["requests"] else 0.0
+		return stats
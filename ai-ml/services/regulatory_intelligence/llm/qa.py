@@ -22,6 +22,10 @@ class QASystem:
 	def answer(self, question: str, context: str) -> Dict[str, Any]:
 		return self.helpers.answer(question, context)
 
+	async def aanswer(self, question: str, context: str) -> Dict[str, Any]:
+		"""Answer from async code; admitted ahead of batch Gemini work."""
+		return await self.helpers.aanswer(question, context)
+
 	def answer_with_retrieval(self, question: str, retrieve_context_fn) -> Dict[str, Any]:
 		"""Perform retrieval (provided function) then answer.
 		retrieve_context_fn: Callable[[str], str] that returns textual context
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Gemini Rate Limiter
+Admission control for Gemini API calls:
+- Token buckets for requests per minute and tokens per minute
+- A cap on calls in flight
+- Priority classes, so interactive Q&A is admitted ahead of batch work
+- An optional budget shared across processes through Redis
+
+Waiting never sleeps the caller's event loop: async callers await a
+future, sync callers block only their own thread. The budget is taken
+outside the queue lock, and a shared (Redis) budget is only ever
+consulted from a dispatcher thread, never from the event loop.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+try:
+	import redis
+	REDIS_AVAILABLE = True
+except ImportError:  # pragma: no cover
+	redis = None
+	REDIS_AVAILABLE = False
+
+
+# Priority classes, most urgent first
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_DEFAULT = "default"
+PRIORITY_BATCH = "batch"
+PRIORITIES = {PRIORITY_INTERACTIVE: 0, PRIORITY_DEFAULT: 1, PRIORITY_BATCH: 2}
+
+
+class LocalBudget:
+	"""In-process RPM and TPM token buckets."""
+
+	def __init__(self, requests_per_minute: int, tokens_per_minute: int) -> None:
+		self.rates = (requests_per_minute / 60.0, tokens_per_minute / 60.0)
+		self.capacities = (float(requests_per_minute), float(tokens_per_minute))
+		self.levels = list(self.capacities)
+		self.updated = time.monotonic()
+
+	def try_take(self, tokens: int) -> float:
+		"""Take one request and ``tokens`` tokens; return 0, or seconds to wait if the budget is short."""
+		now = time.monotonic()
+		elapsed = now - self.updated
+		self.updated = now
+		for i in range(2):
+			self.levels[i] = min(self.capacities[i], self.levels[i] + elapsed * self.rates[i])
+		needs = (1.0, float(min(tokens, self.capacities[1])))
+		wait = max((needs[i] - self.levels[i]) / self.rates[i] for i in range(2))
+		if wait > 0:
+			return wait
+		for i in range(2):
+			self.levels[i] -= needs[i]
+		return 0.0
+
+
+_REDIS_TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local need = {1, tonumber(ARGV[6])}
+local rates = {tonumber(ARGV[2]), tonumber(ARGV[4])}
+local caps = {tonumber(ARGV[3]), tonumber(ARGV[5])}
+local levels = {}
+local wait = 0
+for i = 1, 2 do
+	local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+	local level = tonumber(state[1]) or caps[i]
+	local ts = tonumber(state[2]) or now
+	levels[i] = math.min(caps[i], level + math.max(0, now - ts) * rates[i])
+	if levels[i] < need[i] then
+		wait = math.max(wait, (need[i] - levels[i]) / rates[i])
+	end
+end
+for i = 1, 2 do
+	if wait == 0 then levels[i] = levels[i] - need[i] end
+	redis.call('HSET', KEYS[i], 'level', tostring(levels[i]), 'ts', tostring(now))
+	redis.call('EXPIRE', KEYS[i], 120)
+end
+return tostring(wait)
+"""
+
+
+class RedisBudget:
+	"""RPM and TPM token buckets in Redis, shared by every process using the same key prefix."""
+
+	def __init__(self, requests_per_minute: int, tokens_per_minute: int, redis_url: str,
+				 prefix: str = "regiq:gemini:budget") -> None:
+		if not REDIS_AVAILABLE:
+			raise ImportError("redis package not installed; install redis to share the Gemini rate limit")
+		self.client = redis.from_url(redis_url)
+		self.rates = (requests_per_minute / 60.0, tokens_per_minute / 60.0)
+		self.capacities = (float(requests_per_minute), float(tokens_per_minute))
+		self.keys = (f"{prefix}:requests", f"{prefix}:tokens")
+		self._take = self.client.register_script(_REDIS_TAKE_SCRIPT)
+
+	def try_take(self, tokens: int) -> float:
+		"""Atomically take one request and ``tokens`` tokens from the shared buckets."""
+		wait = self._take(keys=list(self.keys), args=[
+			time.time(), self.rates[0], self.capacities[0], self.rates[1], self.capacities[1],
+			min(tokens, self.capacities[1]),
+		])
+		return float(wait.decode("utf-8") if isinstance(wait, bytes) else wait)
+
+
+class _Waiter:
+	"""A caller waiting for admission."""
+	__slots__ = ("tokens", "event", "loop", "future", "granted", "cancelled")
+
+	def __init__(self, tokens: int, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+		self.tokens = tokens
+		self.loop = loop
+		self.event = None if loop else threading.Event()
+		self.future = loop.create_future() if loop else None
+		self.granted = False
+		self.cancelled = False
+
+	def grant(self) -> None:
+		self.granted = True
+		if self.loop is None:
+			self.event.set()
+		else:
+			self.loop.call_soon_threadsafe(self._resolve)
+
+	def _resolve(self) -> None:
+		if not self.future.done():
+			self.future.set_result(None)
+
+
+class RateLimiter:
+	"""
+	Priority-aware token-bucket rate limiter and concurrency controller.
+
+	Callers are admitted strictly by priority class, then in arrival
+	order, once both the request and token budgets allow it and fewer
+	than ``max_concurrency`` admitted calls are still running.
+
+	Example:
+		>>> limiter = RateLimiter(60, tokens_per_minute=250_000, max_concurrency=4)
+		>>> async with limiter.aslot(tokens=1200, priority=PRIORITY_INTERACTIVE):
+		...     response = await call_gemini()
+	"""
+
+	def __init__(self,
+				 requests_per_minute: int,
+				 tokens_per_minute: Optional[int] = None,
+				 max_concurrency: Optional[int] = None,
+				 redis_url: Optional[str] = None,
+				 redis_prefix: str = "regiq:gemini:budget") -> None:
+		"""
+		Initialize the rate limiter.
+
+		Args:
+			requests_per_minute: Request budget
+			tokens_per_minute: Token budget (unlimited if None)
+			max_concurrency: Calls in flight (unlimited if None)
+			redis_url: Share the request and token budget across processes through Redis
+			redis_prefix: Redis key prefix of the shared budget
+		"""
+		self.logger = logging.getLogger("gemini_client")
+		self.requests_per_minute = max(1, requests_per_minute)
+		self.tokens_per_minute = max(1, tokens_per_minute) if tokens_per_minute else 10 ** 12
+		self.max_concurrency = max(1, max_concurrency) if max_concurrency else None
+		self.budget = LocalBudget(self.requests_per_minute, self.tokens_per_minute)
+		if redis_url:
+			try:
+				self.budget = RedisBudget(self.requests_per_minute, self.tokens_per_minute, redis_url, redis_prefix)
+			except Exception as e:
+				self.logger.warning(f"Shared Gemini rate limit unavailable, limiting per process: {e}")
+
+		self._lock = threading.Lock()
+		self._queue: list = []
+		self._sequence = itertools.count()
+		self._in_flight = 0
+		self._timer: Optional[threading.Timer] = None
+		self._timer_due = 0.0
+		self._dispatching = False  # One dispatcher takes budget at a time
+		self._dispatcher: Optional[ThreadPoolExecutor] = None
+		self.stats: Dict[str, Any] = {
+			"admitted": {name: 0 for name in PRIORITIES},
+			"wait_seconds": {name: 0.0 for name in PRIORITIES},
+		}
+
+	def _enqueue(self, waiter: _Waiter, priority: str) -> None:
+		if priority not in PRIORITIES:
+			raise ValueError(f"Unknown priority class: {priority}")
+		with self._lock:
+			heapq.heappush(self._queue, (PRIORITIES[priority], next(self._sequence), waiter))
+
+	def _kick(self, inline: bool = False) -> None:
+		"""
+		Run a dispatch pass.
+
+		A local budget is checked in the calling thread. A shared budget is
+		a network round trip, so unless the caller may block (a sync
+		acquire), the pass runs on the dispatcher thread.
+		"""
+		if inline or isinstance(self.budget, LocalBudget):
+			self._dispatch()
+			return
+		with self._lock:
+			if self._dispatcher is None:
+				self._dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gemini-admission")
+			dispatcher = self._dispatcher
+		dispatcher.submit(self._dispatch)
+
+	def _take_budget(self, tokens: int) -> float:
+		try:
+			return self.budget.try_take(tokens)
+		except Exception as e:
+			# Shared budget unreachable: fall back to limiting this process
+			self.logger.warning(f"Shared Gemini rate limit failed, limiting per process: {e}")
+			self.budget = LocalBudget(self.requests_per_minute, self.tokens_per_minute)
+			return self.budget.try_take(tokens)
+
+	def _dispatch(self) -> None:
+		"""
+		Admit queued callers in priority order.
+
+		The head waiter and a concurrency slot are reserved under the lock;
+		the budget is taken with the lock released, so enqueueing and
+		releasing never wait on the budget (or on Redis).
+		"""
+		while True:
+			with self._lock:
+				if self._dispatching:
+					return  # The running pass re-checks the queue after its take
+				while self._queue and self._queue[0][2].cancelled:
+					heapq.heappop(self._queue)
+				if not self._queue:
+					return
+				if self.max_concurrency is not None and self._in_flight >= self.max_concurrency:
+					return  # release() dispatches again
+				entry = heapq.heappop(self._queue)
+				self._in_flight += 1
+				self._dispatching = True
+
+			waiter = entry[2]
+			try:
+				wait = self._take_budget(waiter.tokens)
+			except BaseException:
+				with self._lock:
+					self._dispatching = False
+					self._in_flight -= 1
+					heapq.heappush(self._queue, entry)
+				raise
+
+			with self._lock:
+				self._dispatching = False
+				if wait > 0:
+					self._in_flight -= 1
+					heapq.heappush(self._queue, entry)  # Keeps its place
+					self._schedule(wait)
+					return
+				if waiter.cancelled:
+					self._in_flight -= 1  # Cancelled while the budget was taken
+				else:
+					waiter.grant()
+
+	def _schedule(self, delay: float) -> None:
+		"""Dispatch again once the budget has refilled."""
+		due = time.monotonic() + delay
+		if self._timer is not None and self._timer_due <= due:
+			return
+		if self._timer is not None:
+			self._timer.cancel()
+		self._timer_due = due
+		self._timer = threading.Timer(delay, self._on_timer)
+		self._timer.daemon = True
+		self._timer.start()
+
+	def _on_timer(self) -> None:
+		with self._lock:
+			self._timer = None
+		self._dispatch()
+
+	def _record(self, priority: str, started: float) -> None:
+		with self._lock:
+			self.stats["admitted"][priority] += 1
+			self.stats["wait_seconds"][priority] += time.monotonic() - started
+
+	def acquire(self, tokens: int = 1, priority: str = PRIORITY_DEFAULT) -> None:
+		"""Block the calling thread until admitted; pair with release()."""
+		started = time.monotonic()
+		waiter = _Waiter(tokens)
+		self._enqueue(waiter, priority)
+		self._kick(inline=True)
+		waiter.event.wait()
+		self._record(priority, started)
+
+	async def aacquire(self, tokens: int = 1, priority: str = PRIORITY_DEFAULT) -> None:
+		"""Wait without blocking the event loop until admitted; pair with release()."""
+		started = time.monotonic()
+		waiter = _Waiter(tokens, asyncio.get_running_loop())
+		self._enqueue(waiter, priority)
+		self._kick()
+		try:
+			await waiter.future
+		except asyncio.CancelledError:
+			with self._lock:
+				waiter.cancelled = True
+				admitted = waiter.granted
+			if admitted:
+				self.release()  # Admitted just before cancellation
+			raise
+		self._record(priority, started)
+
+	def release(self) -> None:
+		"""Free a concurrency slot taken by acquire()/aacquire()."""
+		with self._lock:
+			self._in_flight = max(0, self._in_flight - 1)
+		self._kick()
+
+	@contextmanager
+	def slot(self, tokens: int = 1, priority: str = PRIORITY_DEFAULT):
+		"""Hold an admitted slot for the duration of a sync call."""
+		self.acquire(tokens, priority)
+		try:
+			yield
+		finally:
+			self.release()
+
+	@asynccontextmanager
+	async def aslot(self, tokens: int = 1, priority: str = PRIORITY_DEFAULT):
+		"""Hold an admitted slot for the duration of an async call."""
+		await self.aacquire(tokens, priority)
+		try:
+			yield
+		finally:
+			self.release()
+
+	def get_stats(self) -> Dict[str, Any]:
+		"""Admissions and cumulative wait time per priority class."""
+		with self._lock:
+			return {
+				"admitted": dict(self.stats["admitted"]),
+				"wait_seconds": {name: round(value, 3) for name, value in self.stats["wait_seconds"].items()},
+				"in_flight": self._in_flight,
+				"queued": len(self._queue),
+				"shared": isinstance(self.budget, RedisBudget),
+			}
+
+
+_shared_limiters: Dict[Tuple, RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(requests_per_minute: int,
+							tokens_per_minute: Optional[int] = None,
+							max_concurrency: Optional[int] = None,
+							redis_url: Optional[str] = None) -> RateLimiter:
+	"""
+	Process-wide limiter shared by every Gemini client with the same limits,
+	so priorities apply across services (Q&A, summarization, RAG).
+
+	Uses the Redis budget when ``redis_url`` or the GEMINI_RATE_LIMIT_REDIS_URL
+	environment variable is set.
+	"""
+	redis_url = redis_url or os.getenv("GEMINI_RATE_LIMIT_REDIS_URL")
+	key = (requests_per_minute, tokens_per_minute, max_concurrency, redis_url)
+	with _shared_lock:
+		if key not in _shared_limiters:
+			_shared_limiters[key] = RateLimiter(requests_per_minute, tokens_per_minute, max_concurrency, redis_url)
+		return _shared_limiters[key]
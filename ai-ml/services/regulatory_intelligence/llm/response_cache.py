@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - LLM Response Cache
+Persistent two-level cache for Gemini responses:
+- Exact cache keyed on a hash of the prompt and generation parameters
+- Optional semantic cache matching near-duplicate prompts by embedding similarity
+
+Entries live in SQLite (default) or Redis, expire after a TTL and are
+namespaced per model so a response from one model is never served for another.
+Relative SQLite paths are resolved against the service data directory
+(REGIQ_DATA_DIR, else ai-ml/data), so the cache does not depend on the CWD.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+	import redis
+	REDIS_AVAILABLE = True
+except ImportError:  # pragma: no cover
+	redis = None
+	REDIS_AVAILABLE = False
+
+
+DEFAULT_CACHE_PATH = "cache/llm_responses.db"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+def service_data_dir() -> Path:
+	"""Data directory of the AI/ML service."""
+	return Path(os.getenv("REGIQ_DATA_DIR") or Path(__file__).parent.parent.parent.parent / "data")
+
+
+def resolve_cache_path(db_path: str) -> Path:
+	"""Absolute cache database path; relative paths are taken from the service data directory."""
+	path = Path(db_path).expanduser()
+	return path if path.is_absolute() else service_data_dir() / path
+
+
+def prompt_key(prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+	"""Stable hash of a prompt and the generation parameters that affect its output."""
+	payload = prompt if not params else prompt + "\x00" + json.dumps(params, sort_keys=True, default=str)
+	return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteResponseStore:
+	"""SQLite storage for cached responses."""
+
+	def __init__(self, db_path: str = DEFAULT_CACHE_PATH) -> None:
+		self.db_path = resolve_cache_path(db_path)
+		self.db_path.parent.mkdir(parents=True, exist_ok=True)
+		self.lock = threading.Lock()
+		self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+		self.conn.execute("""
+			CREATE TABLE IF NOT EXISTS llm_responses (
+				namespace TEXT NOT NULL,
+				prompt_hash TEXT NOT NULL,
+				response TEXT NOT NULL,
+				embedding BLOB,
+				created_at REAL NOT NULL,
+				expires_at REAL NOT NULL,
+				PRIMARY KEY (namespace, prompt_hash)
+			)
+		""")
+		self.conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_expires ON llm_responses(expires_at)")
+		self.conn.commit()
+
+	def get(self, namespace: str, key: str) -> Optional[str]:
+		with self.lock:
+			row = self.conn.execute(
+				"SELECT response FROM llm_responses WHERE namespace = ? AND prompt_hash = ? AND expires_at > ?",
+				(namespace, key, time.time())
+			).fetchone()
+		return row[0] if row else None
+
+	def set(self, namespace: str, key: str, response: str, embedding: Optional[np.ndarray], ttl_seconds: int) -> None:
+		now = time.time()
+		blob = embedding.astype(np.float32).tobytes() if embedding is not None else None
+		with self.lock:
+			self.conn.execute(
+				"INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?, ?)",
+				(namespace, key, response, blob, now, now + ttl_seconds)
+			)
+			self.conn.commit()
+
+	def embeddings(self, namespace: str) -> List[Tuple[str, np.ndarray]]:
+		with self.lock:
+			rows = self.conn.execute(
+				"SELECT prompt_hash, embedding FROM llm_responses "
+				"WHERE namespace = ? AND embedding IS NOT NULL AND expires_at > ?",
+				(namespace, time.time())
+			).fetchall()
+		return [(key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows]
+
+	def purge_expired(self) -> int:
+		with self.lock:
+			cursor = self.conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (time.time(),))
+			self.conn.commit()
+		return cursor.rowcount
+
+	def clear(self, namespace: Optional[str] = None) -> None:
+		with self.lock:
+			if namespace is None:
+				self.conn.execute("DELETE FROM llm_responses")
+			else:
+				self.conn.execute("DELETE FROM llm_responses WHERE namespace = ?", (namespace,))
+			self.conn.commit()
+
+	def count(self) -> int:
+		with self.lock:
+			return self.conn.execute(
+				"SELECT COUNT(*) FROM llm_responses WHERE expires_at > ?", (time.time(),)
+			).fetchone()[0]
+
+	def close(self) -> None:
+		with self.lock:
+			self.conn.close()
+
+
+class RedisResponseStore:
+	"""Redis storage for cached responses; expiry is handled by Redis TTLs."""
+
+	def __init__(self, redis_url: str, prefix: str = "regiq:llm") -> None:
+		if not REDIS_AVAILABLE:
+			raise ImportError("redis package not installed; install redis to use a Redis LLM cache")
+		self.client = redis.from_url(redis_url)
+		self.prefix = prefix
+
+	def _key(self, namespace: str, key: str) -> str:
+		return f"{self.prefix}:{namespace}:{key}"
+
+	def _embedding_key(self, namespace: str) -> str:
+		return f"{self.prefix}:embeddings:{namespace}"
+
+	def get(self, namespace: str, key: str) -> Optional[str]:
+		value = self.client.get(self._key(namespace, key))
+		if value is None:
+			return None
+		return value.decode("utf-8") if isinstance(value, bytes) else value
+
+	def set(self, namespace: str, key: str, response: str, embedding: Optional[np.ndarray], ttl_seconds: int) -> None:
+		pipe = self.client.pipeline()
+		pipe.setex(self._key(namespace, key), ttl_seconds, response)
+		if embedding is not None:
+			pipe.hset(self._embedding_key(namespace), key, embedding.astype(np.float32).tobytes())
+		pipe.execute()
+
+	def embeddings(self, namespace: str) -> List[Tuple[str, np.ndarray]]:
+		entries = self.client.hgetall(self._embedding_key(namespace))
+		result = []
+		for key, blob in entries.items():
+			key = key.decode("utf-8") if isinstance(key, bytes) else key
+			result.append((key, np.frombuffer(blob, dtype=np.float32)))
+		return result
+
+	def purge_expired(self) -> int:
+		# Responses expire on their own; drop embeddings whose response is gone
+		removed = 0
+		for namespace_key in self.client.scan_iter(f"{self.prefix}:embeddings:*"):
+			namespace_key = namespace_key.decode("utf-8") if isinstance(namespace_key, bytes) else namespace_key
+			namespace = namespace_key[len(f"{self.prefix}:embeddings:"):]
+			for key, _ in self.embeddings(namespace):
+				if not self.client.exists(self._key(namespace, key)):
+					self.client.hdel(namespace_key, key)
+					removed += 1
+		return removed
+
+	def clear(self, namespace: Optional[str] = None) -> None:
+		if namespace is None:
+			patterns = [f"{self.prefix}:*"]
+		else:
+			patterns = [f"{self.prefix}:{namespace}:*", self._embedding_key(namespace)]
+		for pattern in patterns:
+			for key in self.client.scan_iter(pattern):
+				self.client.delete(key)
+
+	def count(self) -> int:
+		return sum(
+			1 for key in self.client.scan_iter(f"{self.prefix}:*")
+			if not (key.decode("utf-8") if isinstance(key, bytes) else key).startswith(f"{self.prefix}:embeddings:")
+		)
+
+	def close(self) -> None:
+		self.client.close()
+
+
+class LLMResponseCache:
+	"""
+	Two-level LLM response cache.
+
+	Lookups try the exact prompt hash first. When ``embed_fn`` and
+	``semantic_threshold`` are set, a miss falls back to the most similar
+	cached prompt in the same namespace whose cosine similarity reaches the
+	threshold.
+	"""
+
+	def __init__(self,
+				 db_path: str = DEFAULT_CACHE_PATH,
+				 ttl_seconds: int = DEFAULT_TTL_SECONDS,
+				 semantic_threshold: Optional[float] = None,
+				 embed_fn: Optional[Callable[[str], np.ndarray]] = None,
+				 redis_url: Optional[str] = None) -> None:
+		"""
+		Initialize the cache.
+
+		Args:
+			db_path: SQLite database path, relative to the service data
+				directory unless absolute (ignored when redis_url is given)
+			ttl_seconds: Time to live for new entries
+			semantic_threshold: Cosine similarity for near-duplicate hits (disabled if None)
+			embed_fn: Function returning an embedding vector for a prompt
+			redis_url: Store entries in Redis instead of SQLite
+		"""
+		self.ttl_seconds = ttl_seconds
+		self.semantic_threshold = semantic_threshold
+		self.embed_fn = embed_fn
+		self.logger = self._setup_logger()
+		self.store = RedisResponseStore(redis_url) if redis_url else SQLiteResponseStore(db_path)
+		self.lock = threading.Lock()
+		# Per-namespace (keys, unit-norm matrix) for semantic lookups, loaded lazily
+		self._semantic_index: Dict[str, Tuple[List[str], np.ndarray]] = {}
+		self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0}
+
+	def _setup_logger(self) -> logging.Logger:
+		logger = logging.getLogger("llm_response_cache")
+		logger.setLevel(logging.INFO)
+		if not logger.handlers:
+			h = logging.StreamHandler()
+			h.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+			logger.addHandler(h)
+		return logger
+
+	@property
+	def semantic_enabled(self) -> bool:
+		return self.embed_fn is not None and self.semantic_threshold is not None
+
+	def get(self, prompt: str, model: str, params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+		"""Return a cached response for the prompt, or None on a miss."""
+		key = prompt_key(prompt, params)
+		try:
+			response = self.store.get(model, key)
+			if response is not None:
+				self._count("exact_hits")
+				return response
+			if self.semantic_enabled:
+				response = self._semantic_lookup(prompt, model, key)
+				if response is not None:
+					self._count("semantic_hits")
+					return response
+		except Exception as e:
+			self.logger.error(f"LLM cache lookup failed: {e}")
+		self._count("misses")
+		return None
+
+	def put(self, prompt: str, model: str, response: str, params: Optional[Dict[str, Any]] = None) -> None:
+		"""Store a response for the prompt."""
+		if not response:
+			return
+		key = prompt_key(prompt, params)
+		try:
+			embedding = self._embed(prompt) if self.semantic_enabled else None
+			self.store.set(model, key, response, embedding, self.ttl_seconds)
+			if embedding is not None:
+				self._add_to_semantic_index(model, key, embedding)
+			self._count("stores")
+		except Exception as e:
+			self.logger.error(f"LLM cache store failed: {e}")
+
+	def get_or_generate(self, prompt: str, model: str, generate_fn: Callable[[], Optional[str]],
+						params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+		"""Return a cached response or call ``generate_fn`` and cache its result."""
+		cached = self.get(prompt, model, params)
+		if cached is not None:
+			return cached
+		response = generate_fn()
+		if response:
+			self.put(prompt, model, response, params)
+		return response
+
+	def get_or_generate_with_model(self, prompt: str, model: str,
+								   generate_fn: Callable[[], Tuple[Optional[str], str]],
+								   params: Optional[Dict[str, Any]] = None) -> Tuple[Optional[str], str]:
+		"""
+		Like ``get_or_generate`` for generators that may answer from another model.
+
+		``generate_fn`` returns ``(response, model_used)``; the response is
+		cached under the model that actually produced it, so a fallback
+		model's answer is never served for ``model``.
+
+		Returns:
+			The response and the model it came from
+		"""
+		cached = self.get(prompt, model, params)
+		if cached is not None:
+			return cached, model
+		response, model_used = generate_fn()
+		if response:
+			if model_used != model:
+				self.logger.info(f"Response for {model} came from fallback {model_used}")
+			self.put(prompt, model_used, response, params)
+		return response, model_used
+
+	def _embed(self, prompt: str) -> np.ndarray:
+		vector = np.asarray(self.embed_fn(prompt), dtype=np.float32).ravel()
+		norm = np.linalg.norm(vector)
+		return vector / norm if norm > 0 else vector
+
+	def _namespace_index(self, model: str) -> Tuple[List[str], np.ndarray]:
+		with self.lock:
+			if model not in self._semantic_index:
+				entries = self.store.embeddings(model)
+				keys = [key for key, _ in entries]
+				matrix = np.vstack([vec for _, vec in entries]) if entries else np.zeros((0, 0), dtype=np.float32)
+				self._semantic_index[model] = (keys, matrix)
+			return self._semantic_index[model]
+
+	def _add_to_semantic_index(self, model: str, key: str, embedding: np.ndarray) -> None:
+		keys, matrix = self._namespace_index(model)
+		with self.lock:
+			if key in keys:
+				return
+			if matrix.size and matrix.shape[1] != embedding.shape[0]:
+				self.logger.warning("Embedding dimension changed; resetting semantic index")
+				keys, matrix = [], np.zeros((0, 0), dtype=np.float32)
+			matrix = np.vstack([matrix, embedding]) if matrix.size else embedding[None, :]
+			self._semantic_index[model] = (keys + [key], matrix)
+
+	def _semantic_lookup(self, prompt: str, model: str, exact_key: str) -> Optional[str]:
+		keys, matrix = self._namespace_index(model)
+		if not keys:
+			return None
+		query = self._embed(prompt)
+		if matrix.shape[1] != query.shape[0]:
+			return None
+		similarities = matrix @ query
+		for idx in np.argsort(-similarities):
+			if similarities[idx] < self.semantic_threshold:
+				break
+			if keys[idx] == exact_key:
+				continue
+			# The entry may have expired since the index was loaded
+			response = self.store.get(model, keys[idx])
+			if response is not None:
+				return response
+		return None
+
+	def _count(self, stat: str) -> None:
+		with self.lock:
+			self.stats[stat] += 1
+
+	def purge_expired(self) -> int:
+		"""Delete expired entries and reset the semantic index."""
+		removed = self.store.purge_expired()
+		with self.lock:
+			self._semantic_index.clear()
+		return removed
+
+	def clear(self, model: Optional[str] = None) -> None:
+		"""Remove all entries, or only those of one model."""
+		self.store.clear(model)
+		with self.lock:
+			if model is None:
+				self._semantic_index.clear()
+			else:
+				self._semantic_index.pop(model, None)
+
+	def get_stats(self) -> Dict[str, Any]:
+		"""Get cache hit statistics."""
+		with self.lock:
+			stats = dict(self.stats)
+		lookups = stats["exact_hits"] + stats["semantic_hits"] + stats["misses"]
+		stats["hit_rate"] = round((stats["exact_hits"] + stats["semantic_hits"]) / lookups, 4) if lookups else 0.0
+		stats["semantic_enabled"] = self.semantic_enabled
+		try:
+			stats["entries"] = self.store.count()
+		except Exception as e:
+			self.logger.error(f"LLM cache count failed: {e}")
+		return stats
+
+
+_shared_caches: Dict[str, LLMResponseCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_response_cache(db_path: Optional[str] = None,
+							  ttl_seconds: int = DEFAULT_TTL_SECONDS,
+							  redis_url: Optional[str] = None) -> LLMResponseCache:
+	"""
+	Process-wide cache instance shared by the Gemini client and the scrapers.
+
+	Uses Redis when ``redis_url`` or the LLM_CACHE_REDIS_URL environment
+	variable is set, otherwise SQLite at ``db_path`` (or LLM_CACHE_PATH).
+	"""
+	redis_url = redis_url or os.getenv("LLM_CACHE_REDIS_URL")
+	db_path = db_path or os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+	location = redis_url or str(resolve_cache_path(db_path))
+	with _shared_lock:
+		if location not in _shared_caches:
+			_shared_caches[location] = LLMResponseCache(db_path=db_path, ttl_seconds=ttl_seconds, redis_url=redis_url)
+		return _shared_caches[location]
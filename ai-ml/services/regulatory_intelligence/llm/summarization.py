@@ -28,6 +28,19 @@ class SummarizationService:
 	def key_points(self, text: str, max_points: int = 8) -> List[str]:
 		return self.helpers.key_points(text, max_points=max_points)
 
+	def summarize_documents(self, texts: List[str], style: str = "executive", max_bullets: int = 6,
+							offline: bool = False) -> List[Dict[str, Any]]:
+		"""Summarize many documents or sections, packing several into each request.
+
+		With ``offline`` the requests go through the Gemini Batch API, which is
+		cheaper but may take hours; use it for scheduled jobs only.
+		"""
+		return self.helpers.summarize_many(texts, style=style, max_bullets=max_bullets, offline=offline)
+
+	def key_points_batch(self, texts: List[str], max_points: int = 8, offline: bool = False) -> List[List[str]]:
+		"""Key points of many documents or sections, packing several into each request."""
+		return self.helpers.key_points_many(texts, max_points=max_points, offline=offline)
+
 
 def main():  # simple manual test
 	print("🧪 Testing SummarizationService")
@@ -2,18 +2,27 @@
 REGIQ AI/ML - NLP Module
 
 Natural Language Processing for regulatory documents:
+- Shared document analysis (one spaCy parse per document)
 - Text preprocessing
 - Entity recognition
 - Text classification
+- Shared classifier model pool with dynamic batching
 - Model training scripts
 """
 
+from .document_analysis import DocumentAnalyzer, get_shared_analyzer
 from .text_preprocessing import TextPreprocessor
 from .entity_recognition import RegulatoryEntityRecognizer
+from .model_pool import ClassifierModelPool, DynamicBatcher, get_shared_model_pool
 from .text_classification import RegulatoryTextClassifier
 
 __all__ = [
+    'DocumentAnalyzer',
+    'get_shared_analyzer',
     'TextPreprocessor',
     'RegulatoryEntityRecognizer',
+    'ClassifierModelPool',
+    'DynamicBatcher',
+    'get_shared_model_pool',
     'RegulatoryTextClassifier',
 ]
\ No newline at end of file
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Document Analysis Module
+Shared spaCy parsing for regulatory documents.
+
+Each document is parsed once, running only the pipeline components its
+consumers need, and the resulting Doc is cached by content hash so the
+text preprocessor, the regulatory NER and the knowledge-graph entity
+extractor all reuse the same parse.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set
+
+try:
+    import spacy
+    SPACY_AVAILABLE = True
+except ImportError:
+    SPACY_AVAILABLE = False
+
+
+# Analysis features and the pipeline components that provide them.
+# Components missing from the loaded model are ignored.
+FEATURE_COMPONENTS: Dict[str, Set[str]] = {
+    'tokens': set(),
+    'sentences': {'transformer', 'tok2vec', 'parser', 'senter'},
+    'pos': {'transformer', 'tok2vec', 'tagger', 'attribute_ruler', 'morphologizer'},
+    'entities': {'transformer', 'tok2vec', 'ner', 'entity_ruler'},
+}
+
+
+class DocumentAnalyzer:
+    """
+    Parses documents once with the components its consumers require
+    and caches the spaCy Doc by content hash.
+    """
+
+    def __init__(self,
+                 model_name: str = "en_core_web_sm",
+                 nlp: Any = None,
+                 cache_size: int = 32,
+                 fallback_models: Iterable[str] = ("en_core_web_md",)):
+        """
+        Initialize document analyzer.
+
+        Args:
+            model_name: spaCy model to load
+            nlp: Already loaded spaCy pipeline (skips loading)
+            cache_size: Number of parsed documents to keep
+            fallback_models: Models to try if model_name is not installed
+        """
+        self.logger = self._setup_logging()
+        self.cache_size = cache_size
+        self.nlp = nlp if nlp is not None else self._load_model(model_name, fallback_models)
+        self.required_features: Set[str] = {'tokens'}
+
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._cache_features: Dict[str, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _setup_logging(self) -> logging.Logger:
+        """Setup logging for document analyzer."""
+        logger = logging.getLogger('document_analyzer')
+        logger.setLevel(logging.INFO)
+
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+
+        return logger
+
+    def _load_model(self, model_name: str, fallback_models: Iterable[str]):
+        """Load the spaCy model, trying fallbacks in order."""
+        if not SPACY_AVAILABLE:
+            self.logger.warning("⚠️  spaCy not available, document analysis disabled")
+            return None
+
+        for name in [model_name, *fallback_models]:
+            try:
+                nlp = spacy.load(name)
+                self.logger.info(f"✅ spaCy model {name} loaded successfully")
+                return nlp
+            except OSError:
+                continue
+
+        self.logger.error(f"❌ No spaCy model found. Please install: python -m spacy download {model_name}")
+        return None
+
+    def require(self, *features: str) -> None:
+        """
+        Register features a consumer needs from every parse.
+
+        Registering up front lets one parse serve all consumers sharing
+        this analyzer.
+        """
+        unknown = set(features) - set(FEATURE_COMPONENTS)
+        if unknown:
+            raise ValueError(f"Unknown analysis features: {sorted(unknown)}")
+        self.required_features.update(features)
+
+    def analyze(self, text: str, features: Optional[Iterable[str]] = None):
+        """
+        Get the spaCy Doc for a text, parsing it only if needed.
+
+        Args:
+            text: Text to analyze
+            features: Features needed by this call (defaults to all registered)
+
+        Returns:
+            spaCy Doc, or None if no model is available
+        """
+        if self.nlp is None or text is None:
+            return None
+
+        needed = frozenset(features or ()) | self.required_features
+        key = self._content_key(text)
+
+        with self._lock:
+            doc = self._cache.get(key)
+            if doc is not None and needed <= self._cache_features[key]:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return doc
+            self.misses += 1
+
+        doc = self.nlp(text, disable=self._disabled_components(needed))
+
+        with self._lock:
+            self._cache[key] = doc
+            self._cache_features[key] = needed
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                evicted, _ = self._cache.popitem(last=False)
+                self._cache_features.pop(evicted, None)
+
+        return doc
+
+    def analyze_stream(self,
+                       texts: Iterable[Any],
+                       features: Optional[Iterable[str]] = None,
+                       batch_size: int = 64,
+                       n_process: int = 1,
+                       as_tuples: bool = False) -> Iterator[Any]:
+        """
+        Parse a corpus lazily with ``nlp.pipe``.
+
+        Only the components for ``features`` run (not every registered
+        consumer's), and Docs are yielded without being cached so memory
+        stays flat over large backfills.
+
+        Args:
+            texts: Iterable of texts, or (text, context) pairs if as_tuples
+            features: Features needed by this task (defaults to all registered)
+            batch_size: Texts per batch
+            n_process: Worker processes (-1 for all CPUs)
+            as_tuples: Pass (text, context) pairs through to the output
+
+        Yields:
+            spaCy Docs, or (Doc, context) pairs if as_tuples
+        """
+        if self.nlp is None:
+            raise RuntimeError("spaCy model not available")
+
+        needed = frozenset(features) | {'tokens'} if features else frozenset(self.required_features)
+        yield from self.nlp.pipe(
+            texts,
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=self._disabled_components(needed),
+            as_tuples=as_tuples
+        )
+
+    def _disabled_components(self, features: FrozenSet[str]) -> List[str]:
+        """Pipeline components not needed for the requested features."""
+        needed: Set[str] = set()
+        for feature in features:
+            needed |= FEATURE_COMPONENTS[feature]
+        return [name for name in self.nlp.pipe_names if name not in needed]
+
+    @staticmethod
+    def _content_key(text: str) -> str:
+        """Content hash used as the cache key."""
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def clear_cache(self) -> None:
+        """Drop all cached documents."""
+        with self._lock:
+            self._cache.clear()
+            self._cache_features.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        total = self.hits + self.misses
+        return {
+            'cached_documents': len(self._cache),
+            'required_features': sorted(self.required_features),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+_shared_analyzers: Dict[str, DocumentAnalyzer] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_analyzer(model_name: str = "en_core_web_sm") -> DocumentAnalyzer:
+    """Process-wide analyzer so all NLP consumers share one model and Doc cache."""
+    with _shared_lock:
+        if model_name not in _shared_analyzers:
+            _shared_analyzers[model_name] = DocumentAnalyzer(model_name)
+        return _shared_analyzers[model_name]
@@ -10,13 +10,12 @@ import sys
 import re
 import logging
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any, Set
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Any, Set
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import json
 
 # NLP Libraries
-import spacy
 from spacy import displacy
 import dateutil.parser
 from dateutil.relativedelta import relativedelta
@@ -25,6 +24,8 @@ from dateutil.relativedelta import relativedelta
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 
 from config.env_config import get_env_config
+from services.regulatory_intelligence.nlp.document_analysis import DocumentAnalyzer, get_shared_analyzer
+from services.regulatory_intelligence.nlp.term_matcher import TermIndex, TermMatcher
 
 
 @dataclass
@@ -79,13 +80,13 @@ class RegulatoryEntityRecognizer:
     Extracts regulatory entities, dates, deadlines, and penalty amounts.
     """
     
-    def __init__(self):
+    def __init__(self, analyzer: Optional[DocumentAnalyzer] = None):
         """Initialize entity recognizer."""
         self.env_config = get_env_config()
         self.logger = self._setup_logging()
         
         # Initialize spaCy model
-        self._initialize_spacy_model()
+        self._initialize_spacy_model(analyzer)
         
         # Regulatory entity patterns
         self._setup_regulatory_patterns()
@@ -95,6 +96,9 @@ class RegulatoryEntityRecognizer:
         
         # Penalty patterns
         self._setup_penalty_patterns()
+        
+        # Single compiled matcher over all term dictionaries
+        self._setup_term_matcher()
     
     def _setup_logging(self) -> logging.Logger:
         """Setup logging for entity recognizer."""
@@ -109,18 +113,11 @@ class RegulatoryEntityRecognizer:
         
         return logger
     
-    def _initialize_spacy_model(self):
-        """Initialize spaCy model."""
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-            self.logger.info("✅ spaCy model loaded successfully")
-        except OSError:
-            try:
-                self.nlp = spacy.load("en_core_web_md")
-                self.logger.info("✅ spaCy medium model loaded successfully")
-            except OSError:
-                self.logger.error("❌ No spaCy model found. Please install: python -m spacy download en_core_web_sm")
-                self.nlp = None
+    def _initialize_spacy_model(self, analyzer: Optional[DocumentAnalyzer] = None):
+        """Initialize spaCy model via the shared document analyzer."""
+        self.analyzer = analyzer or get_shared_analyzer()
+        self.analyzer.require('entities')
+        self.nlp = self.analyzer.nlp
     
     def _setup_regulatory_patterns(self):
         """Setup regulatory entity patterns."""
@@ -192,12 +189,42 @@ class RegulatoryEntityRecognizer:
             'forfeiture', 'disgorgement', 'restitution'
         ]
     
-    def extract_regulatory_entities(self, text: str) -> List[RegulatoryEntity]:
+    def _setup_term_matcher(self):
+        """Compile agency, framework and indicator dictionaries into one matcher."""
+        self.term_matcher = TermMatcher()
+        for agency, variations in self.regulatory_agencies.items():
+            self.term_matcher.add('agency', agency, variations)
+        for framework, variations in self.regulatory_frameworks.items():
+            self.term_matcher.add('framework', framework, variations)
+        
+        # Indicators keep substring semantics ("fines" contains "fine")
+        for term in self.compliance_terms:
+            self.term_matcher.add('compliance', term, [term], whole_word=False)
+        for indicator in self.deadline_indicators:
+            self.term_matcher.add('deadline', indicator, [indicator], whole_word=False)
+        for indicator in self.penalty_indicators:
+            self.term_matcher.add('penalty', indicator, [indicator], whole_word=False)
+        
+        self.term_matcher.compile()
+    
+    def build_term_index(self, text: str) -> TermIndex:
+        """
+        Term matches for a text, computed in one pass.
+        
+        Callers pass the index to each extractor for the same text; it is
+        never stored on the recognizer, so concurrent calls stay independent.
+        """
+        return TermIndex(self.term_matcher.find_all(text))
+    
+    def extract_regulatory_entities(self, text: str, doc=None,
+                                    term_index: Optional[TermIndex] = None) -> List[RegulatoryEntity]:
         """
         Extract regulatory entities from text.
         
         Args:
             text: Text to analyze
+            doc: Already parsed spaCy Doc for text
+            term_index: Term matches for text (built if not given)
             
         Returns:
             List of regulatory entities
@@ -206,9 +233,9 @@ class RegulatoryEntityRecognizer:
         
         if not self.nlp:
             self.logger.warning("⚠️  spaCy model not available, using pattern matching")
-            return self._extract_entities_pattern_based(text)
+            return self._extract_entities_pattern_based(text, term_index)
         
-        doc = self.nlp(text)
+        doc = doc if doc is not None else self.analyzer.analyze(text)
         
         # Extract using spaCy NER
         for ent in doc.ents:
@@ -227,7 +254,7 @@ class RegulatoryEntityRecognizer:
                     entities.append(entity)
         
         # Extract using pattern matching
-        pattern_entities = self._extract_entities_pattern_based(text)
+        pattern_entities = self._extract_entities_pattern_based(text, term_index)
         entities.extend(pattern_entities)
         
         # Remove duplicates
@@ -235,70 +262,47 @@ class RegulatoryEntityRecognizer:
         
         return entities
     
-    def _extract_entities_pattern_based(self, text: str) -> List[RegulatoryEntity]:
+    def _extract_entities_pattern_based(self, text: str,
+                                        term_index: Optional[TermIndex] = None) -> List[RegulatoryEntity]:
         """Extract entities using pattern matching."""
         entities = []
-        
-        # Extract regulatory agencies
-        for agency, variations in self.regulatory_agencies.items():
-            for variation in variations:
-                pattern = re.compile(re.escape(variation), re.IGNORECASE)
-                for match in pattern.finditer(text):
-                    entity = RegulatoryEntity(
-                        text=match.group(),
-                        label='REGULATORY_AGENCY',
-                        start=match.start(),
-                        end=match.end(),
-                        confidence=0.9,
-                        context=self._get_context(text, match.start(), match.end()),
-                        metadata={'agency': agency, 'source': 'pattern_matching'}
-                    )
-                    entities.append(entity)
-        
-        # Extract regulatory frameworks
-        for framework, variations in self.regulatory_frameworks.items():
-            for variation in variations:
-                pattern = re.compile(re.escape(variation), re.IGNORECASE)
-                for match in pattern.finditer(text):
-                    entity = RegulatoryEntity(
-                        text=match.group(),
-                        label='REGULATORY_FRAMEWORK',
-                        start=match.start(),
-                        end=match.end(),
-                        confidence=0.9,
-                        context=self._get_context(text, match.start(), match.end()),
-                        metadata={'framework': framework, 'source': 'pattern_matching'}
-                    )
-                    entities.append(entity)
+        term_index = term_index if term_index is not None else self.build_term_index(text)
+        
+        # Extract regulatory agencies and frameworks
+        for category, label in (('agency', 'REGULATORY_AGENCY'), ('framework', 'REGULATORY_FRAMEWORK')):
+            for match in term_index.matches(category):
+                entity = RegulatoryEntity(
+                    text=match.text,
+                    label=label,
+                    start=match.start,
+                    end=match.end,
+                    confidence=0.9,
+                    context=self._get_context(text, match.start, match.end),
+                    metadata={category: match.key, 'source': 'pattern_matching'}
+                )
+                entities.append(entity)
         
         return entities
     
     def _is_regulatory_entity(self, text: str) -> bool:
         """Check if text is a regulatory entity."""
-        text_lower = text.lower()
-        
-        # Check against known regulatory terms
-        for agency_variations in self.regulatory_agencies.values():
-            if any(term.lower() in text_lower for term in agency_variations):
-                return True
-        
-        for framework_variations in self.regulatory_frameworks.values():
-            if any(term.lower() in text_lower for term in framework_variations):
-                return True
-        
-        return any(term.lower() in text_lower for term in self.compliance_terms)
+        return self.term_matcher.contains(text, ('agency', 'framework', 'compliance'))
     
-    def extract_dates(self, text: str) -> List[DateEntity]:
+    def extract_dates(self, text: str, doc=None,
+                      term_index: Optional[TermIndex] = None) -> List[DateEntity]:
         """
         Extract dates from text.
         
         Args:
             text: Text to analyze
+            doc: Already parsed spaCy Doc for text
+            term_index: Term matches for text (built if not given)
             
         Returns:
             List of date entities
         """
         dates = []
+        term_index = term_index if term_index is not None else self.build_term_index(text)
         
         # Extract using pattern matching
         for pattern in self.date_patterns:
@@ -307,7 +311,7 @@ class RegulatoryEntityRecognizer:
                     parsed_date = dateutil.parser.parse(match.group())
                     
                     # Check if it's a deadline
-                    is_deadline = self._is_deadline(text, match.start(), match.end())
+                    is_deadline = self._is_deadline(text, match.start(), match.end(), term_index)
                     
                     date_entity = DateEntity(
                         text=match.group(),
@@ -325,12 +329,12 @@ class RegulatoryEntityRecognizer:
         
         # Use spaCy if available
         if self.nlp:
-            doc = self.nlp(text)
+            doc = doc if doc is not None else self.analyzer.analyze(text)
             for ent in doc.ents:
                 if ent.label_ == 'DATE':
                     try:
                         parsed_date = dateutil.parser.parse(ent.text)
-                        is_deadline = self._is_deadline(text, ent.start_char, ent.end_char)
+                        is_deadline = self._is_deadline(text, ent.start_char, ent.end_char, term_index)
                         
                         date_entity = DateEntity(
                             text=ent.text,
@@ -352,33 +356,33 @@ class RegulatoryEntityRecognizer:
         
         return dates
     
-    def _is_deadline(self, text: str, start: int, end: int) -> bool:
+    def _is_deadline(self, text: str, start: int, end: int,
+                     term_index: Optional[TermIndex] = None) -> bool:
         """Check if a date is a deadline."""
-        # Get context around the date
-        context_start = max(0, start - 50)
-        context_end = min(len(text), end + 50)
-        context = text[context_start:context_end].lower()
-        
-        # Check for deadline indicators
-        return any(indicator in context for indicator in self.deadline_indicators)
+        # Check for deadline indicators in the context around the date
+        term_index = term_index if term_index is not None else self.build_term_index(text)
+        return term_index.any_within('deadline', max(0, start - 50), min(len(text), end + 50))
     
-    def extract_penalties(self, text: str) -> List[PenaltyEntity]:
+    def extract_penalties(self, text: str,
+                          term_index: Optional[TermIndex] = None) -> List[PenaltyEntity]:
         """
         Extract penalty amounts from text.
         
         Args:
             text: Text to analyze
+            term_index: Term matches for text (built if not given)
             
         Returns:
             List of penalty entities
         """
         penalties = []
+        term_index = term_index if term_index is not None else self.build_term_index(text)
         
         # Extract using pattern matching
         for pattern in self.currency_patterns:
             for match in re.finditer(pattern, text, re.IGNORECASE):
                 # Check if it's in a penalty context
-                if self._is_penalty_context(text, match.start(), match.end()):
+                if self._is_penalty_context(text, match.start(), match.end(), term_index):
                     try:
                         amount = float(match.group(1).replace(',', ''))
                         currency = self._extract_currency(match.group())
@@ -399,15 +403,12 @@ class RegulatoryEntityRecognizer:
         
         return penalties
     
-    def _is_penalty_context(self, text: str, start: int, end: int) -> bool:
+    def _is_penalty_context(self, text: str, start: int, end: int,
+                            term_index: Optional[TermIndex] = None) -> bool:
         """Check if amount is in a penalty context."""
-        # Get context around the amount
-        context_start = max(0, start - 100)
-        context_end = min(len(text), end + 100)
-        context = text[context_start:context_end].lower()
-        
-        # Check for penalty indicators
-        return any(indicator in context for indicator in self.penalty_indicators)
+        # Check for penalty indicators in the context around the amount
+        term_index = term_index if term_index is not None else self.build_term_index(text)
+        return term_index.any_within('penalty', max(0, start - 100), min(len(text), end + 100))
     
     def _extract_currency(self, text: str) -> str:
         """Extract currency from text."""
@@ -466,10 +467,80 @@ class RegulatoryEntityRecognizer:
         """
         self.logger.info("🔍 Starting entity recognition")
         
+        # Parse once and share the Doc across extractors
+        doc = self.analyzer.analyze(text) if self.nlp else None
+        
+        result = self._build_recognition_result(text, doc)
+        
+        self.logger.info(f"✅ Entity recognition completed: {result.metadata['total_entities']} entities found")
+        
+        return result
+    
+    def recognize_entities_stream(self,
+                                  texts: Iterable[str],
+                                  batch_size: int = 64,
+                                  n_process: int = 1) -> Iterator[EntityRecognitionResult]:
+        """
+        Recognize entities across a corpus lazily using spaCy's ``nlp.pipe``.
+        
+        Only the NER components run; the tagger, parser and lemmatizer are
+        disabled. Results are yielded in input order so memory stays flat
+        on large backfills.
+        
+        Args:
+            texts: Iterable of texts (may be a generator)
+            batch_size: Texts per spaCy batch
+            n_process: Worker processes for parsing (-1 for all CPUs)
+            
+        Yields:
+            EntityRecognitionResult objects
+        """
+        if not self.nlp:
+            for text in texts:
+                yield self._build_recognition_result(text, None)
+            return
+        
+        docs = self.analyzer.analyze_stream(
+            texts,
+            features=('entities',),
+            batch_size=batch_size,
+            n_process=n_process
+        )
+        
+        count = 0
+        for doc in docs:
+            yield self._build_recognition_result(doc.text, doc)
+            count += 1
+        
+        self.logger.info(f"✅ Stream entity recognition completed: {count} texts")
+    
+    def batch_recognize(self,
+                        texts: List[str],
+                        batch_size: int = 64,
+                        n_process: int = 1) -> List[EntityRecognitionResult]:
+        """
+        Recognize entities in multiple texts.
+        
+        Args:
+            texts: List of texts to analyze
+            batch_size: Texts per spaCy batch
+            n_process: Worker processes for parsing
+            
+        Returns:
+            List of entity recognition results
+        """
+        self.logger.info(f"🔄 Batch entity recognition for {len(texts)} texts")
+        return list(self.recognize_entities_stream(texts, batch_size=batch_size, n_process=n_process))
+    
+    def _build_recognition_result(self, text: str, doc=None) -> EntityRecognitionResult:
+        """Build the recognition result for a text and its parse."""
+        # Match terms once and share them across extractors
+        term_index = self.build_term_index(text)
+        
         # Extract all entity types
-        regulatory_entities = self.extract_regulatory_entities(text)
-        date_entities = self.extract_dates(text)
-        penalty_entities = self.extract_penalties(text)
+        regulatory_entities = self.extract_regulatory_entities(text, doc=doc, term_index=term_index)
+        date_entities = self.extract_dates(text, doc=doc, term_index=term_index)
+        penalty_entities = self.extract_penalties(text, term_index=term_index)
         
         # Combine all entities
         all_entities = []
@@ -520,17 +591,13 @@ class RegulatoryEntityRecognizer:
             'processing_timestamp': datetime.now().isoformat()
         }
         
-        result = EntityRecognitionResult(
+        return EntityRecognitionResult(
             regulatory_entities=regulatory_entities,
             date_entities=date_entities,
             penalty_entities=penalty_entities,
             all_entities=all_entities,
             metadata=metadata
         )
-        
-        self.logger.info(f"✅ Entity recognition completed: {len(all_entities)} entities found")
-        
-        return result
 
 
 def main():
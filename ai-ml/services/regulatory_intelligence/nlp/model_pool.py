@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Classifier Model Pool Module
+Process-wide pool of classification models.
+
+Transformer pipelines are loaded once per (model, backend) and served
+through a dynamic batcher that groups concurrent requests into a single
+forward pass. Persisted sklearn pipelines are loaded once through
+ModelPersistence and shared by every classifier instance.
+"""
+
+import sys
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent.parent))
+
+from services.regulatory_intelligence.utils.model_persistence import ModelMetadata, ModelPersistence
+
+try:
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+
+INFERENCE_BACKENDS = ("pytorch", "int8", "onnx")
+
+_STOP = object()
+
+
+class DynamicBatcher:
+    """
+    Groups single-item requests into batches for a batch inference function.
+
+    A background worker waits for the first request, then keeps collecting
+    until ``max_batch_size`` items are queued or ``max_wait_ms`` has passed,
+    and runs them through ``infer_fn`` in one call.
+    """
+
+    def __init__(self,
+                 infer_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 10.0,
+                 name: str = "batcher"):
+        """
+        Initialize dynamic batcher.
+
+        Args:
+            infer_fn: Function mapping a list of inputs to a list of outputs
+            max_batch_size: Maximum items per batch
+            max_wait_ms: Maximum time to wait for a batch to fill
+            name: Name of the worker thread
+        """
+        self.infer_fn = infer_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.name = name
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item: Any) -> Future:
+        """Queue one input and return a future for its output."""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        return future
+
+    def predict(self, items: Iterable[Any]) -> List[Any]:
+        """Run several inputs through the batcher and wait for all outputs."""
+        futures = [self.submit(item) for item in items]
+        return [future.result() for future in futures]
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread on first use."""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        """Worker loop collecting and running batches."""
+        while True:
+            request = self._queue.get()
+            if request is _STOP:
+                return
+
+            batch = [request]
+            stopping = False
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is _STOP:
+                    stopping = True
+                    break
+                batch.append(request)
+
+            self._run_batch(batch)
+            if stopping:
+                return
+
+    def _run_batch(self, batch: List[Tuple[Any, Future]]) -> None:
+        """Run one batch and resolve its futures."""
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            outputs = self.infer_fn([item for item, _ in batch])
+            if len(outputs) != len(batch):
+                raise RuntimeError(f"Expected {len(batch)} outputs, got {len(outputs)}")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        for (_, future), output in zip(batch, outputs):
+            future.set_result(output)
+
+    def close(self) -> None:
+        """Stop the worker after queued requests are processed."""
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+        if worker is not None and worker.is_alive():
+            self._queue.put(_STOP)
+            worker.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics."""
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+        }
+
+
+class ClassifierModelPool:
+    """
+    Loads classification models once per process and shares them.
+
+    Transformer pipelines are keyed by (model name, backend) and wrapped in
+    a DynamicBatcher; sklearn pipelines are keyed by persisted model name.
+    """
+
+    def __init__(self,
+                 model_dir: str = "models/nlp",
+                 persistence: Optional[ModelPersistence] = None,
+                 transformer_loader: Optional[Callable[[str, str], Callable]] = None):
+        """
+        Initialize model pool.
+
+        Args:
+            model_dir: ModelPersistence base directory for sklearn pipelines
+            persistence: Already configured ModelPersistence (overrides model_dir)
+            transformer_loader: Function (model_name, backend) -> batch pipeline
+        """
+        self.logger = self._setup_logging()
+        self.model_dir = model_dir
+        self._persistence = persistence
+        self._transformer_loader = transformer_loader or self._load_transformer
+
+        self._transformers: Dict[Tuple[str, str], Optional[DynamicBatcher]] = {}
+        self._sklearn_models: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self.load_times: Dict[str, float] = {}
+
+    def _setup_logging(self) -> logging.Logger:
+        """Setup logging for model pool."""
+        logger = logging.getLogger('classifier_model_pool')
+        logger.setLevel(logging.INFO)
+
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+
+        return logger
+
+    @property
+    def persistence(self) -> ModelPersistence:
+        """ModelPersistence for sklearn pipelines, created on first use."""
+        if self._persistence is None:
+            self._persistence = ModelPersistence(self.model_dir)
+        return self._persistence
+
+    # ------------------------------------------------------------------
+    # Transformer pipelines
+    # ------------------------------------------------------------------
+
+    def get_transformer(self,
+                        model_name: str,
+                        backend: str = "pytorch",
+                        max_batch_size: int = 32,
+                        max_wait_ms: float = 10.0) -> Optional[DynamicBatcher]:
+        """
+        Get the batched pipeline for a transformer model, loading it once.
+
+        Args:
+            model_name: HuggingFace model name
+            backend: Inference backend (pytorch, int8 or onnx)
+            max_batch_size: Maximum texts per forward pass
+            max_wait_ms: Maximum time to wait for a batch to fill
+
+        Returns:
+            DynamicBatcher, or None if the model could not be loaded
+        """
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend: {backend}")
+
+        key = (model_name, backend)
+        with self._lock:
+            if key not in self._transformers:
+                start = time.perf_counter()
+                try:
+                    batch_pipeline = self._transformer_loader(model_name, backend)
+                    self._transformers[key] = DynamicBatcher(
+                        batch_pipeline,
+                        max_batch_size=max_batch_size,
+                        max_wait_ms=max_wait_ms,
+                        name=f"batcher-{model_name}-{backend}"
+                    )
+                    self.load_times[f"{model_name}:{backend}"] = time.perf_counter() - start
+                    self.logger.info(f"✅ Transformer {model_name} loaded ({backend})")
+                except Exception as e:
+                    self.logger.warning(f"⚠️  Transformer {model_name} failed to load ({backend}): {e}")
+                    self._transformers[key] = None
+            return self._transformers[key]
+
+    def _load_transformer(self, model_name: str, backend: str) -> Callable[[List[str]], List[Any]]:
+        """Load a text-classification pipeline on the requested backend."""
+        if not TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("transformers not available")
+
+        if backend == "onnx" and not ONNX_AVAILABLE:
+            self.logger.warning("⚠️  optimum[onnxruntime] not available, falling back to int8")
+            backend = "int8"
+        if backend == "int8" and not TORCH_AVAILABLE:
+            self.logger.warning("⚠️  torch not available, falling back to pytorch")
+            backend = "pytorch"
+
+        if backend == "onnx":
+            model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+            classifier = pipeline("text-classification", model=model,
+                                  tokenizer=AutoTokenizer.from_pretrained(model_name))
+        elif backend == "int8":
+            model = AutoModelForSequenceClassification.from_pretrained(model_name)
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            classifier = pipeline("text-classification", model=model,
+                                  tokenizer=AutoTokenizer.from_pretrained(model_name), device=-1)
+        else:
+            classifier = pipeline("text-classification", model=model_name)
+
+        def run(texts: List[str]) -> List[Any]:
+            return classifier(texts, batch_size=len(texts), truncation=True)
+
+        return run
+
+    # ------------------------------------------------------------------
+    # sklearn pipelines
+    # ------------------------------------------------------------------
+
+    def get_sklearn_model(self, model_name: str) -> Optional[Any]:
+        """
+        Get a persisted sklearn pipeline, loading it once.
+
+        Args:
+            model_name: Persisted model name
+
+        Returns:
+            Fitted pipeline, or None if it has not been persisted
+        """
+        with self._lock:
+            if model_name in self._sklearn_models:
+                return self._sklearn_models[model_name]
+
+            if self.persistence.get_metadata(model_name) is None:
+                return None
+
+            start = time.perf_counter()
+            try:
+                model = self.persistence.load(model_name, model_type='sklearn')
+            except Exception as e:
+                self.logger.error(f"Error loading {model_name} model: {e}")
+                return None
+
+            self._sklearn_models[model_name] = model
+            self.load_times[model_name] = time.perf_counter() - start
+            return model
+
+    def put_sklearn_model(self,
+                          model_name: str,
+                          model: Any,
+                          training_samples: int = 0,
+                          config: Optional[Dict[str, Any]] = None,
+                          persist: bool = True) -> None:
+        """
+        Add a fitted sklearn pipeline to the pool.
+
+        Args:
+            model_name: Model name
+            model: Fitted pipeline
+            training_samples: Number of training examples
+            config: Training configuration stored with the metadata
+            persist: Save the model through ModelPersistence
+        """
+        with self._lock:
+            self._sklearn_models[model_name] = model
+
+        if not persist:
+            return
+
+        metadata = ModelMetadata(
+            model_name=model_name,
+            model_type='sklearn',
+            version='1.0.0',
+            created_at='',
+            training_samples=training_samples,
+            features=[],
+            metrics={},
+            config=config or {},
+            checksum='',
+            file_size=0,
+            description=f"Text classifier for {model_name}",
+            tags=["text_classification", "regulatory"]
+        )
+        try:
+            self.persistence.save(model, model_name, metadata)
+        except Exception as e:
+            self.logger.error(f"Error saving {model_name} model: {e}")
+
+    # ------------------------------------------------------------------
+    # Pool management
+    # ------------------------------------------------------------------
+
+    def warm_up(self,
+                sklearn_models: Iterable[str] = (),
+                transformers: Iterable[Tuple[str, str]] = ()) -> Dict[str, bool]:
+        """
+        Load models ahead of the first request.
+
+        Args:
+            sklearn_models: Persisted sklearn model names
+            transformers: (model name, backend) pairs
+
+        Returns:
+            Mapping of model to whether it is available
+        """
+        status = {}
+        for model_name in sklearn_models:
+            status[model_name] = self.get_sklearn_model(model_name) is not None
+        for model_name, backend in transformers:
+            status[f"{model_name}:{backend}"] = self.get_transformer(model_name, backend) is not None
+        return status
+
+    def close(self) -> None:
+        """Stop batcher workers and drop all models."""
+        with self._lock:
+            for batcher in self._transformers.values():
+                if batcher is not None:
+                    batcher.close()
+            self._transformers.clear()
+            self._sklearn_models.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        return {
+            'sklearn_models': sorted(self._sklearn_models),
+            'transformers': {
+                f"{name}:{backend}": batcher.get_stats() if batcher else None
+                for (name, backend), batcher in self._transformers.items()
+            },
+            'load_times': {name: round(seconds, 4) for name, seconds in self.load_times.items()},
+        }
+
+
+_shared_pools: Dict[str, ClassifierModelPool] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_model_pool(model_dir: str = "models/nlp") -> ClassifierModelPool:
+    """Process-wide model pool so classifier instances share loaded models."""
+    with _shared_lock:
+        if model_dir not in _shared_pools:
+            _shared_pools[model_dir] = ClassifierModelPool(model_dir)
+        return _shared_pools[model_dir]
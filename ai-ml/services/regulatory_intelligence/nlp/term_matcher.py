@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Term Matcher Module
+Single-pass dictionary matching for regulatory terms.
+
+All phrases (agency and framework aliases, deadline and penalty
+indicators, ...) are compiled once into one trie-shaped regular
+expression, so matching cost grows with the text rather than with the
+number of dictionary entries.
+"""
+
+import re
+import bisect
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class TermMatch:
+    """A dictionary phrase found in text."""
+    text: str
+    start: int
+    end: int
+    category: str
+    key: str
+
+
+def _trie_regex(phrases: Iterable[str]) -> str:
+    """Build a regex matching any phrase, longest alternative first."""
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def to_regex(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + to_regex(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        optional = '' in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')' + ('?' if optional else '')
+
+    return to_regex(trie)
+
+
+class TermMatcher:
+    """
+    Case-insensitive multi-phrase matcher.
+
+    Phrases are grouped into categories (e.g. 'agency', 'penalty') and
+    map to a canonical key. Whole-word phrases only match between
+    non-word characters; other phrases match as substrings.
+    """
+
+    def __init__(self):
+        """Initialize an empty matcher."""
+        # lowercase phrase -> [(category, key, whole_word)]
+        self._terms: Dict[str, List[Tuple[str, str, bool]]] = {}
+        self._pattern: Optional[re.Pattern] = None
+        self._lengths: List[int] = []
+
+    def add(self, category: str, key: str, phrases: Iterable[str], whole_word: bool = True) -> None:
+        """
+        Add phrases to the dictionary.
+
+        Args:
+            category: Category of the phrases
+            key: Canonical key the phrases map to
+            phrases: Phrase variations
+            whole_word: Require word boundaries around matches
+        """
+        for phrase in phrases:
+            entries = self._terms.setdefault(phrase.lower(), [])
+            if (category, key, whole_word) not in entries:
+                entries.append((category, key, whole_word))
+        self._pattern = None
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def compile(self) -> None:
+        """Compile the dictionary into a single pattern."""
+        # Zero-width lookahead so matches starting inside another match are found too
+        self._pattern = re.compile('(?=(' + _trie_regex(self._terms) + '))', re.IGNORECASE)
+        self._lengths = sorted({len(phrase) for phrase in self._terms})
+
+    def find_all(self, text: str, categories: Optional[Iterable[str]] = None) -> List[TermMatch]:
+        """
+        Find every dictionary phrase in text in one pass.
+
+        Args:
+            text: Text to search
+            categories: Only report these categories (all if None)
+
+        Returns:
+            Matches ordered by start position
+        """
+        if not text or not self._terms:
+            return []
+        if self._pattern is None:
+            self.compile()
+        wanted = set(categories) if categories is not None else None
+
+        matches = []
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            longest = match.group(1)
+            # Shorter phrases that are prefixes of the longest match also occur here
+            for length in self._lengths[:bisect.bisect_right(self._lengths, len(longest))]:
+                entries = self._terms.get(longest[:length].lower())
+                if not entries:
+                    continue
+                end = start + length
+                bounded = self._is_word_boundary(text, start, end)
+                for category, key, whole_word in entries:
+                    if wanted is not None and category not in wanted:
+                        continue
+                    if whole_word and not bounded:
+                        continue
+                    matches.append(TermMatch(text[start:end], start, end, category, key))
+        return matches
+
+    def contains(self, text: str, categories: Iterable[str]) -> bool:
+        """Check whether text contains any phrase from the given categories."""
+        return bool(self.find_all(text, categories))
+
+    @staticmethod
+    def _is_word_boundary(text: str, start: int, end: int) -> bool:
+        """True if the span is not part of a longer word."""
+        before = text[start - 1] if start > 0 else ' '
+        after = text[end] if end < len(text) else ' '
+        return not (before.isalnum() or before == '_') and not (after.isalnum() or after == '_')
+
+
+class TermIndex:
+    """Matches of one text grouped by category for fast window lookups."""
+
+    def __init__(self, matches: List[TermMatch]):
+        self._by_category: Dict[str, List[TermMatch]] = {}
+        for match in matches:
+            self._by_category.setdefault(match.category, []).append(match)
+        self._starts = {
+            category: [m.start for m in items] for category, items in self._by_category.items()
+        }
+
+    def matches(self, category: str) -> List[TermMatch]:
+        """All matches of a category."""
+        return self._by_category.get(category, [])
+
+    def any_within(self, category: str, window_start: int, window_end: int) -> bool:
+        """True if a match of the category lies entirely inside the window."""
+        starts = self._starts.get(category)
+        if not starts:
+            return False
+        items = self._by_category[category]
+        for i in range(bisect.bisect_left(starts, window_start), len(starts)):
+            if items[i].start >= window_end:
+                break
+            if items[i].end <= window_end:
+                return True
+        return False
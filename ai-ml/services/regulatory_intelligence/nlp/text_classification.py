@@ -26,14 +26,12 @@ from sklearn.metrics import classification_report, accuracy_score
 from sklearn.pipeline import Pipeline
 import joblib
 
-# NLP Libraries
-import spacy
-from transformers import pipeline
-
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 
 from config.env_config import get_env_config
+from services.regulatory_intelligence.nlp.document_analysis import get_shared_analyzer
+from services.regulatory_intelligence.nlp.model_pool import ClassifierModelPool, get_shared_model_pool
 
 
 @dataclass
@@ -55,6 +53,12 @@ class ClassificationConfig:
     confidence_threshold: float = 0.7
     max_features: int = 10000
     n_estimators: int = 100  # For Random Forest
+    transformer_model: str = "distilbert-base-uncased-finetuned-sst-2-english"
+    inference_backend: str = "pytorch"  # pytorch, int8, onnx
+    max_batch_size: int = 32  # Texts per transformer forward pass
+    max_wait_ms: float = 10.0  # Time to wait for a batch to fill
+    model_dir: str = "models/nlp"  # ModelPersistence directory
+    load_persisted_models: bool = True
 
 
 class RegulatoryTextClassifier:
@@ -63,11 +67,26 @@ class RegulatoryTextClassifier:
     Classifies regulation types, compliance categories, risk levels, and urgency.
     """
     
-    def __init__(self, config: ClassificationConfig = None):
-        """Initialize text classifier."""
+    # Persisted model name per classification task
+    MODEL_NAMES = {
+        'regulation_type': 'regulatory_regulation_type',
+        'compliance_category': 'regulatory_compliance_category',
+        'risk_level': 'regulatory_risk_level',
+        'urgency_level': 'regulatory_urgency_level',
+    }
+    
+    def __init__(self, config: ClassificationConfig = None, model_pool: ClassifierModelPool = None):
+        """
+        Initialize text classifier.
+        
+        Args:
+            config: Classification configuration
+            model_pool: Model pool to share models with (defaults to the process-wide pool)
+        """
         self.env_config = get_env_config()
         self.config = config or ClassificationConfig()
         self.logger = self._setup_logging()
+        self.model_pool = model_pool or get_shared_model_pool(self.config.model_dir)
         
         # Initialize models
         self._initialize_models()
@@ -75,6 +94,10 @@ class RegulatoryTextClassifier:
         # Setup classification categories
         self._setup_classification_categories()
         
+        # Load persisted sklearn pipelines instead of retraining
+        if self.config.load_persisted_models:
+            self.load_persisted_models()
+        
         # Initialize transformer pipeline if enabled
         if self.config.use_transformer:
             self._initialize_transformer_pipeline()
@@ -97,26 +120,40 @@ class RegulatoryTextClassifier:
         self.models = {}
         self.vectorizers = {}
         
-        # Initialize spaCy for text preprocessing
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-            self.logger.info("✅ spaCy model loaded for classification")
-        except OSError:
+        # Reuse the shared spaCy model instead of loading one per instance
+        self.nlp = get_shared_analyzer().nlp
+        if self.nlp is None:
             self.logger.warning("⚠️  spaCy model not found, using basic preprocessing")
-            self.nlp = None
     
     def _initialize_transformer_pipeline(self):
         """Initialize transformer pipeline for classification."""
-        try:
-            self.transformer_pipeline = pipeline(
-                "text-classification",
-                model="distilbert-base-uncased-finetuned-sst-2-english",
-                return_all_scores=True
-            )
+        # Loaded once per process; concurrent requests are batched together
+        self.transformer_pipeline = self.model_pool.get_transformer(
+            self.config.transformer_model,
+            backend=self.config.inference_backend,
+            max_batch_size=self.config.max_batch_size,
+            max_wait_ms=self.config.max_wait_ms
+        )
+        if self.transformer_pipeline:
             self.logger.info("✅ Transformer pipeline initialized")
-        except Exception as e:
-            self.logger.warning(f"⚠️  Transformer pipeline failed: {e}")
-            self.transformer_pipeline = None
+    
+    def load_persisted_models(self) -> List[str]:
+        """
+        Load persisted sklearn pipelines from the model pool.
+        
+        Returns:
+            Names of the tasks with a persisted model
+        """
+        loaded = []
+        for task_name, model_name in self.MODEL_NAMES.items():
+            model = self.model_pool.get_sklearn_model(model_name)
+            if model is not None:
+                self.models[task_name] = model
+                loaded.append(task_name)
+        
+        if loaded:
+            self.logger.info(f"📂 Loaded persisted models: {', '.join(loaded)}")
+        return loaded
     
     def _setup_classification_categories(self):
         """Setup classification categories and training data."""
@@ -285,16 +322,36 @@ class RegulatoryTextClassifier:
         self.logger.info(f"✅ {model_name} model trained successfully")
         return pipeline_model
     
-    def train_all_models(self):
-        """Train all classification models."""
+    def train_all_models(self, force: bool = False):
+        """
+        Train all classification models.
+        
+        Tasks with a persisted model are loaded instead of retrained unless
+        force is set. Newly trained models are saved to the model pool.
+        
+        Args:
+            force: Retrain every model even if a persisted one exists
+        """
         self.logger.info("🎓 Training all classification models")
         
+        if not force:
+            self.load_persisted_models()
+        
         # Create training data
         training_data = self._create_training_data()
         
         # Train each model
         for model_name, data in training_data.items():
-            self._train_model(data, model_name)
+            if model_name in self.models and not force:
+                continue
+            model = self._train_model(data, model_name)
+            if model is not None:
+                self.model_pool.put_sklearn_model(
+                    self.MODEL_NAMES[model_name],
+                    model,
+                    training_samples=len(data),
+                    config={'model_type': self.config.model_type, 'max_features': self.config.max_features}
+                )
         
         self.logger.info("✅ All models trained successfully")
     
@@ -347,79 +404,72 @@ class RegulatoryTextClassifier:
     
     def _classify_with_ml_models(self, text: str) -> Dict[str, Tuple[str, float]]:
         """Classify text using trained ML models."""
-        results = {}
+        return self._classify_with_ml_models_batch([text])[0]
+    
+    def _classify_with_ml_models_batch(self, texts: List[str]) -> List[Dict[str, Tuple[str, float]]]:
+        """Classify texts using trained ML models, one vectorized call per model."""
+        results = [{} for _ in texts]
         
         for model_name, model in self.models.items():
             try:
-                # Get prediction and probability
-                prediction = model.predict([text])[0]
-                probabilities = model.predict_proba([text])[0]
-                confidence = max(probabilities)
-                
-                results[model_name] = (prediction, confidence)
+                # The prediction is the most probable class, so one call gives both
+                probabilities = model.predict_proba(texts)
+                best = np.argmax(probabilities, axis=1)
+                for i, index in enumerate(best):
+                    results[i][model_name] = (model.classes_[index], float(probabilities[i][index]))
             except Exception as e:
                 self.logger.error(f"Error in {model_name} classification: {e}")
-                results[model_name] = ('UNKNOWN', 0.0)
+                for result in results:
+                    result[model_name] = ('UNKNOWN', 0.0)
         
         return results
     
+    def _map_transformer_output(self, output: Any) -> Dict[str, str]:
+        """Map a transformer prediction to urgency and risk levels."""
+        # Pipelines return the top label, or all labels when top_k is set
+        if isinstance(output, list):
+            output = max(output, key=lambda item: item['score'])
+        
+        # Use transformer for sentiment analysis as proxy for urgency/risk
+        sentiment = output['label']
+        
+        if sentiment == 'POSITIVE':
+            urgency = 'LOW'
+            risk = 'LOW'
+        elif sentiment == 'NEGATIVE':
+            urgency = 'HIGH'
+            risk = 'HIGH'
+        else:
+            urgency = 'MEDIUM'
+            risk = 'MEDIUM'
+        
+        return {
+            'urgency_level': urgency,
+            'risk_level': risk
+        }
+    
     def _classify_with_transformer(self, text: str) -> Dict[str, str]:
         """Classify text using transformer model."""
-        if not hasattr(self, 'transformer_pipeline') or not self.transformer_pipeline:
-            return {}
+        return self._classify_with_transformer_batch([text])[0]
+    
+    def _classify_with_transformer_batch(self, texts: List[str]) -> List[Dict[str, str]]:
+        """Classify texts using the batched transformer pipeline."""
+        if not getattr(self, 'transformer_pipeline', None):
+            return [{} for _ in texts]
         
         try:
-            # Use transformer for sentiment analysis as proxy for urgency/risk
-            results = self.transformer_pipeline(text)
-            
-            # Map sentiment to urgency/risk
-            sentiment = results[0]['label']
-            confidence = results[0]['score']
-            
-            if sentiment == 'POSITIVE':
-                urgency = 'LOW'
-                risk = 'LOW'
-            elif sentiment == 'NEGATIVE':
-                urgency = 'HIGH'
-                risk = 'HIGH'
-            else:
-                urgency = 'MEDIUM'
-                risk = 'MEDIUM'
-            
-            return {
-                'urgency_level': urgency,
-                'risk_level': risk
-            }
+            # Requests from concurrent callers are coalesced by the batcher
+            outputs = self.transformer_pipeline.predict(texts)
+            return [self._map_transformer_output(output) for output in outputs]
         except Exception as e:
             self.logger.error(f"Transformer classification error: {e}")
-            return {}
+            return [{} for _ in texts]
     
-    def classify_text(self, text: str) -> ClassificationResult:
-        """
-        Classify text for regulation type, compliance category, risk level, and urgency.
-        
-        Args:
-            text: Text to classify
-            
-        Returns:
-            Classification result
-        """
-        self.logger.info("🔍 Starting text classification")
-        
-        # Rule-based classification
-        rule_based_results = self._classify_with_rule_based(text)
-        
-        # ML model classification
-        ml_results = {}
-        if self.models:
-            ml_results = self._classify_with_ml_models(text)
-        
-        # Transformer classification
-        transformer_results = {}
-        if hasattr(self, 'transformer_pipeline') and self.transformer_pipeline:
-            transformer_results = self._classify_with_transformer(text)
-        
-        # Combine results
+    def _combine_results(self,
+                         rule_based_results: Dict[str, str],
+                         ml_results: Dict[str, Tuple[str, float]],
+                         transformer_results: Dict[str, str]) -> ClassificationResult:
+        """Combine rule-based, ML and transformer results."""
         final_results = rule_based_results.copy()
         confidence_scores = {}
         
@@ -444,7 +494,7 @@ class RegulatoryTextClassifier:
             'processing_timestamp': datetime.now().isoformat()
         }
         
-        result = ClassificationResult(
+        return ClassificationResult(
             regulation_type=final_results.get('regulation_type', 'UNKNOWN'),
             compliance_category=final_results.get('compliance_category', 'UNKNOWN'),
             risk_level=final_results.get('risk_level', 'LOW'),
@@ -452,11 +502,53 @@ class RegulatoryTextClassifier:
             confidence_scores=confidence_scores,
             metadata=metadata
         )
+    
+    def classify_text(self, text: str) -> ClassificationResult:
+        """
+        Classify text for regulation type, compliance category, risk level, and urgency.
+        
+        Args:
+            text: Text to classify
+            
+        Returns:
+            Classification result
+        """
+        self.logger.info("🔍 Starting text classification")
+        
+        result = self._combine_results(
+            self._classify_with_rule_based(text),
+            self._classify_with_ml_models(text) if self.models else {},
+            self._classify_with_transformer(text)
+        )
         
         self.logger.info(f"✅ Text classification completed: {result.regulation_type}, {result.risk_level}")
         
         return result
     
+    def classify_batch(self, texts: List[str]) -> List[ClassificationResult]:
+        """
+        Classify several texts, running each model once over the batch.
+        
+        Args:
+            texts: Texts to classify
+            
+        Returns:
+            Classification results in input order
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        
+        self.logger.info(f"🔍 Classifying batch of {len(texts)} texts")
+        
+        ml_results = self._classify_with_ml_models_batch(texts) if self.models else [{} for _ in texts]
+        transformer_results = self._classify_with_transformer_batch(texts)
+        
+        return [
+            self._combine_results(self._classify_with_rule_based(text), ml, transformer)
+            for text, ml, transformer in zip(texts, ml_results, transformer_results)
+        ]
+    
     def save_models(self, model_dir: str = "models/nlp_classification"):
         """Save trained models to disk."""
         model_path = Path(model_dir)
@@ -11,13 +11,12 @@ import re
 import logging
 import unicodedata
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Any
 from dataclasses import dataclass
 import string
 
 # NLP Libraries
 import nltk
-import spacy
 from nltk.corpus import stopwords
 from nltk.tokenize import sent_tokenize, word_tokenize
 from nltk.stem import WordNetLemmatizer
@@ -27,6 +26,7 @@ from nltk.tag import pos_tag
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 
 from config.env_config import get_env_config
+from services.regulatory_intelligence.nlp.document_analysis import DocumentAnalyzer, get_shared_analyzer
 
 # Download required NLTK data
 try:
@@ -70,14 +70,14 @@ class TextPreprocessor:
     Handles cleaning, normalization, tokenization, and segmentation.
     """
     
-    def __init__(self, config: PreprocessingConfig = None):
+    def __init__(self, config: PreprocessingConfig = None, analyzer: Optional[DocumentAnalyzer] = None):
         """Initialize text preprocessor."""
         self.env_config = get_env_config()
         self.config = config or PreprocessingConfig()
         self.logger = self._setup_logging()
         
         # Initialize NLP components
-        self._initialize_nlp_components()
+        self._initialize_nlp_components(analyzer)
         
         # Regulatory-specific terms to preserve
         self.regulatory_terms = {
@@ -101,15 +101,14 @@ class TextPreprocessor:
         
         return logger
     
-    def _initialize_nlp_components(self):
+    def _initialize_nlp_components(self, analyzer: Optional[DocumentAnalyzer] = None):
         """Initialize NLP components."""
-        try:
-            # Initialize spaCy model
-            self.nlp = spacy.load("en_core_web_sm")
-            self.logger.info("✅ spaCy model loaded successfully")
-        except OSError:
+        # Shared spaCy parsing: one parse per document across the NLP pipeline
+        self.analyzer = analyzer or get_shared_analyzer()
+        self.analyzer.require('tokens', 'sentences', 'pos')
+        self.nlp = self.analyzer.nlp
+        if self.nlp is None:
             self.logger.warning("⚠️  spaCy model not found, using basic tokenization")
-            self.nlp = None
         
         # Initialize NLTK components
         try:
@@ -205,12 +204,13 @@ class TextPreprocessor:
         
         return text
     
-    def tokenize_text(self, text: str) -> List[str]:
+    def tokenize_text(self, text: str, doc=None) -> List[str]:
         """
         Tokenize text into words.
         
         Args:
             text: Text to tokenize
+            doc: Already parsed spaCy Doc for text
             
         Returns:
             List of tokens
@@ -220,7 +220,7 @@ class TextPreprocessor:
         
         # Use spaCy if available, otherwise NLTK
         if self.nlp:
-            doc = self.nlp(text)
+            doc = doc if doc is not None else self.analyzer.analyze(text)
             tokens = [token.text for token in doc if not token.is_space]
         else:
             tokens = word_tokenize(text)
@@ -233,12 +233,13 @@ class TextPreprocessor:
         
         return tokens
     
-    def segment_sentences(self, text: str) -> List[str]:
+    def segment_sentences(self, text: str, doc=None) -> List[str]:
         """
         Segment text into sentences.
         
         Args:
             text: Text to segment
+            doc: Already parsed spaCy Doc for text
             
         Returns:
             List of sentences
@@ -248,7 +249,9 @@ class TextPreprocessor:
         
         # Use spaCy if available, otherwise NLTK
         if self.nlp:
-            doc = self.nlp(text)
+            doc = doc if doc is not None else self.analyzer.analyze(text)
+        
+        if doc is not None and doc.has_annotation("SENT_START"):
             sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
         else:
             sentences = sent_tokenize(text)
@@ -309,12 +312,14 @@ class TextPreprocessor:
         
         return lemmatized
     
-    def get_pos_tags(self, tokens: List[str]) -> List[Tuple[str, str]]:
+    def get_pos_tags(self, tokens: List[str], doc=None) -> List[Tuple[str, str]]:
         """
         Get part-of-speech tags for tokens.
         
         Args:
             tokens: List of tokens
+            doc: Parsed spaCy Doc the tokens were taken from; tags are read
+                from it in context instead of re-parsing the joined tokens
             
         Returns:
             List of (token, pos_tag) tuples
@@ -323,14 +328,26 @@ class TextPreprocessor:
             return []
         
         # Use spaCy if available, otherwise NLTK
-        if self.nlp:
-            doc = self.nlp(' '.join(tokens))
+        if doc is not None:
+            pos_tags = self._align_pos_tags(tokens, doc)
+        elif self.nlp:
+            doc = self.analyzer.analyze(' '.join(tokens))
             pos_tags = [(token.text, token.pos_) for token in doc]
         else:
             pos_tags = pos_tag(tokens)
         
         return pos_tags
     
+    def _align_pos_tags(self, tokens: List[str], doc) -> List[Tuple[str, str]]:
+        """Read POS tags for a token subsequence from the Doc it came from."""
+        pos_tags = []
+        index = 0
+        for token in doc:
+            if index < len(tokens) and token.text == tokens[index]:
+                pos_tags.append((token.text, token.pos_))
+                index += 1
+        return pos_tags
+    
     def process_text(self, text: str) -> ProcessedText:
         """
         Complete text preprocessing pipeline.
@@ -346,11 +363,22 @@ class TextPreprocessor:
         # Clean text
         cleaned_text = self.clean_text(text)
         
+        # Parse once; tokens, sentences and POS tags all read from this Doc
+        doc = self.analyzer.analyze(cleaned_text) if self.nlp and cleaned_text else None
+        
+        result = self._build_processed_text(text, cleaned_text, doc)
+        
+        self.logger.info(f"✅ Text preprocessing completed: {len(result.tokens)} tokens, {len(result.sentences)} sentences")
+        
+        return result
+    
+    def _build_processed_text(self, text: str, cleaned_text: str, doc=None) -> ProcessedText:
+        """Build the preprocessing result for a cleaned text and its parse."""
         # Tokenize
-        tokens = self.tokenize_text(cleaned_text)
+        tokens = self.tokenize_text(cleaned_text, doc=doc)
         
         # Segment sentences
-        sentences = self.segment_sentences(cleaned_text)
+        sentences = self.segment_sentences(cleaned_text, doc=doc)
         
         # Remove stopwords
         filtered_tokens = self.remove_stopwords(tokens)
@@ -359,7 +387,7 @@ class TextPreprocessor:
         lemmatized_tokens = self.lemmatize_tokens(filtered_tokens)
         
         # Get POS tags
-        pos_tags = self.get_pos_tags(filtered_tokens)
+        pos_tags = self.get_pos_tags(filtered_tokens, doc=doc)
         
         # Create metadata
         metadata = {
@@ -377,7 +405,7 @@ class TextPreprocessor:
             }
         }
         
-        result = ProcessedText(
+        return ProcessedText(
             original_text=text,
             cleaned_text=cleaned_text,
             tokens=filtered_tokens,
@@ -386,38 +414,95 @@ class TextPreprocessor:
             pos_tags=pos_tags,
             metadata=metadata
         )
+    
+    def process_stream(self,
+                       texts: Iterable[str],
+                       batch_size: int = 64,
+                       n_process: int = 1) -> Iterator[ProcessedText]:
+        """
+        Preprocess a corpus lazily using spaCy's ``nlp.pipe``.
         
-        self.logger.info(f"✅ Text preprocessing completed: {len(filtered_tokens)} tokens, {len(sentences)} sentences")
+        Only the tokenizer, tagger and parser run; NER and other components
+        are disabled. Results are yielded one at a time, in input order, so
+        memory stays flat on large backfills.
         
-        return result
+        Args:
+            texts: Iterable of raw texts (may be a generator)
+            batch_size: Texts per spaCy batch
+            n_process: Worker processes for parsing (-1 for all CPUs)
+            
+        Yields:
+            ProcessedText objects
+        """
+        if not self.nlp:
+            for i, text in enumerate(texts):
+                yield self._safe_process(i, text, lambda: self.process_text(text))
+            return
+        
+        docs = self.analyzer.analyze_stream(
+            self._clean_stream(texts),
+            features=('tokens', 'sentences', 'pos'),
+            batch_size=batch_size,
+            n_process=n_process,
+            as_tuples=True
+        )
+        
+        count = 0
+        for doc, (text, error) in docs:
+            if error is not None:
+                yield self._error_result(count, text, error)
+            else:
+                yield self._safe_process(count, text, lambda: self._build_processed_text(text, doc.text, doc))
+            count += 1
+        
+        self.logger.info(f"✅ Stream processing completed: {count} texts")
     
-    def batch_process(self, texts: List[str]) -> List[ProcessedText]:
+    def _clean_stream(self, texts: Iterable[str]) -> Iterator[Tuple[str, Tuple[str, Optional[Exception]]]]:
+        """
+        Clean texts for the parser as (cleaned, (text, error)) pairs.
+        
+        A text that fails to clean is passed on as an empty string with its
+        error, so it gets an error result in order instead of ending the stream.
+        """
+        for text in texts:
+            try:
+                yield self.clean_text(text), (text, None)
+            except Exception as e:
+                yield "", (text, e)
+    
+    def _safe_process(self, index: int, text: str, process) -> ProcessedText:
+        """Run one preprocessing step, returning an empty result on failure."""
+        try:
+            return process()
+        except Exception as e:
+            return self._error_result(index, text, e)
+    
+    def _error_result(self, index: int, text: str, error: Exception) -> ProcessedText:
+        """Log a failed text and return an empty result for it."""
+        self.logger.error(f"Error processing text {index}: {error}")
+        return ProcessedText(
+            original_text=text,
+            cleaned_text="",
+            tokens=[],
+            sentences=[],
+            metadata={'error': str(error)}
+        )
+    
+    def batch_process(self, texts: List[str], batch_size: int = 64, n_process: int = 1) -> List[ProcessedText]:
         """
         Process multiple texts in batch.
         
         Args:
             texts: List of texts to process
+            batch_size: Texts per spaCy batch
+            n_process: Worker processes for parsing
             
         Returns:
             List of ProcessedText objects
         """
         self.logger.info(f"🔄 Batch processing {len(texts)} texts")
         
-        results = []
-        for i, text in enumerate(texts):
-            try:
-                result = self.process_text(text)
-                results.append(result)
-            except Exception as e:
-                self.logger.error(f"Error processing text {i}: {e}")
-                # Create empty result for failed processing
-                results.append(ProcessedText(
-                    original_text=text,
-                    cleaned_text="",
-                    tokens=[],
-                    sentences=[],
-                    metadata={'error': str(e)}
-                ))
+        results = list(self.process_stream(texts, batch_size=batch_size, n_process=n_process))
         
         self.logger.info(f"✅ Batch processing completed: {len(results)} results")
         return results
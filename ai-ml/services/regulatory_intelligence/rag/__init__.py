@@ -6,12 +6,16 @@ Provides document embedding, storage, and retrieval:
 - Document embeddings
 - Retrieval system
 - Embedding cache for performance
+- BM25 lexical index for hybrid search
+- Token-budget context packing
 """
 
 from .vector_database import VectorDatabaseManager, VectorDBConfig, EmbeddingPipeline
 from .document_embeddings import DocumentEmbeddingService, DocumentMetadata
 from .retrieval_system import ContextRetriever, RAGSystem
 from .embedding_cache import EmbeddingPersistence
+from .lexical_index import BM25Index
+from .context_packing import ContextPacker
 
 __all__ = [
     'VectorDatabaseManager',
@@ -22,4 +26,6 @@ __all__ = [
     'ContextRetriever',
     'RAGSystem',
     'EmbeddingPersistence',
+    'BM25Index',
+    'ContextPacker',
 ]
\ No newline at end of file
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Context Packing
+Token-budget-aware selection of retrieved chunks for LLM prompts.
+
+LLM cost and latency scale with prompt size, so context is packed by tokens
+rather than characters:
+- Near-duplicate passages are removed with MinHash over word shingles
+- Chunks are selected greedily by score per token, or by 0/1 knapsack
+"""
+
+import math
+import zlib
+import logging
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+# Large Mersenne prime for universal hashing of shingles
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Fixed per-document prompt overhead ("Document N: ...\nSource: ...\nContent: ")
+_HEADER_OVERHEAD_TOKENS = 8
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate Gemini tokens for text (roughly four characters per token)."""
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+def document_text(doc: Dict[str, Any]) -> str:
+    """Full chunk text for a retrieved document, falling back to the preview."""
+    return doc.get("content") or doc.get("content_preview", "")
+
+
+def document_score(doc: Dict[str, Any]) -> float:
+    """Best available ranking score for a retrieved document."""
+    for key in ("fusion_score", "hybrid_score", "similarity_score", "relevance_score", "bm25_score"):
+        if doc.get(key) is not None:
+            return float(doc[key])
+    return 0.0
+
+
+class MinHasher:
+    """MinHash signatures over word shingles for near-duplicate detection."""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 42):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text."""
+        words = text.lower().split()
+        n = self.shingle_size
+        if len(words) <= n:
+            shingles = {" ".join(words)}
+        else:
+            shingles = {" ".join(words[i:i + n]) for i in range(len(words) - n + 1)}
+        hashes = np.array([zlib.crc32(s.encode("utf-8")) for s in shingles], dtype=np.uint64)
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float(np.mean(sig_a == sig_b))
+
+
+class ContextPacker:
+    """Packs retrieved documents into a token budget."""
+
+    def __init__(self, max_tokens: int = 3000,
+                 token_counter: Optional[Callable[[str], int]] = None,
+                 dedup_threshold: float = 0.8,
+                 strategy: str = "greedy"):
+        """
+        Initialize the packer.
+
+        Args:
+            max_tokens: Token budget for all context documents
+            token_counter: Function returning the token count of a text
+            dedup_threshold: Estimated Jaccard similarity above which passages are duplicates
+            strategy: "greedy" (score per token) or "knapsack" (exact 0/1 knapsack)
+        """
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter or estimate_tokens
+        self.dedup_threshold = dedup_threshold
+        self.strategy = strategy
+        self.min_hasher = MinHasher()
+        self.logger = self._setup_logger()
+
+    def _setup_logger(self) -> logging.Logger:
+        logger = logging.getLogger("context_packer")
+        logger.setLevel(logging.INFO)
+        if not logger.handlers:
+            h = logging.StreamHandler()
+            h.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+            logger.addHandler(h)
+        return logger
+
+    def pack(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Select and deduplicate documents to fit the token budget.
+
+        Returns:
+            Packed documents ordered by score, each with a ``token_count``
+        """
+        if not documents:
+            return []
+
+        # Copies, so the caller's documents are not annotated
+        unique_docs = [
+            {**doc, "token_count": self._count_document_tokens(doc)}
+            for doc in self._remove_near_duplicates(documents)
+        ]
+
+        if self.strategy == "knapsack":
+            selected = self._select_knapsack(unique_docs)
+        else:
+            selected = self._select_greedy(unique_docs)
+
+        packed = sorted(selected, key=document_score, reverse=True)
+
+        total = sum(doc["token_count"] for doc in packed)
+        self.logger.info(
+            f"Packed {len(packed)}/{len(documents)} documents into {total}/{self.max_tokens} tokens"
+        )
+        return packed
+
+    def _count_document_tokens(self, doc: Dict[str, Any]) -> int:
+        """Tokens a document will occupy in the prompt, including its header."""
+        header = f"{doc.get('title', '')} {doc.get('source', '')}"
+        return (self.token_counter(document_text(doc)) + self.token_counter(header)
+                + _HEADER_OVERHEAD_TOKENS)
+
+    def _remove_near_duplicates(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop passages nearly identical to a higher-scoring passage."""
+        kept = []
+        signatures = []
+        for doc in sorted(documents, key=document_score, reverse=True):
+            text = document_text(doc)
+            if not text:
+                continue
+            signature = self.min_hasher.signature(text)
+            if any(MinHasher.similarity(signature, other) >= self.dedup_threshold for other in signatures):
+                continue
+            kept.append(doc)
+            signatures.append(signature)
+        return kept
+
+    def _select_greedy(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Greedy selection by score per token; oversized items are skipped, not fatal."""
+        ranked = sorted(
+            documents,
+            key=lambda d: document_score(d) / max(d["token_count"], 1),
+            reverse=True
+        )
+        selected = []
+        used = 0
+        for doc in ranked:
+            if used + doc["token_count"] <= self.max_tokens:
+                selected.append(doc)
+                used += doc["token_count"]
+
+        # Guard against the classic greedy failure: one strong chunk beats many weak ones
+        best_single = max(
+            (d for d in documents if d["token_count"] <= self.max_tokens),
+            key=document_score, default=None
+        )
+        if best_single is not None and document_score(best_single) > sum(map(document_score, selected)):
+            return [best_single]
+        return selected
+
+    def _select_knapsack(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Exact 0/1 knapsack maximizing total score within the token budget."""
+        capacity = self.max_tokens
+        best = np.zeros(capacity + 1)
+        keep = np.zeros((len(documents), capacity + 1), dtype=bool)
+
+        for i, doc in enumerate(documents):
+            weight = doc["token_count"]
+            if weight > capacity:
+                continue
+            candidate = np.full(capacity + 1, -np.inf)
+            candidate[weight:] = best[:capacity + 1 - weight] + document_score(doc)
+            improved = candidate > best
+            keep[i] = improved
+            best = np.where(improved, candidate, best)
+
+        selected = []
+        remaining = capacity
+        for i in range(len(documents) - 1, -1, -1):
+            if keep[i, remaining]:
+                selected.append(documents[i])
+                remaining -= documents[i]["token_count"]
+        return selected
@@ -6,6 +6,8 @@ Handles document embedding generation, storage, and similarity search for RAG sy
 
 import os
 import sys
+import copy
+import asyncio
 import json
 import logging
 from pathlib import Path
@@ -19,6 +21,8 @@ sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 from services.regulatory_intelligence.rag.vector_database import (
     VectorDatabaseManager, VectorDBConfig, EmbeddingPipeline
 )
+from services.regulatory_intelligence.rag.embedding_cache import QueryCache, normalize_query
+from services.regulatory_intelligence.rag.lexical_index import reciprocal_rank_fusion
 
 
 @dataclass
@@ -44,6 +48,7 @@ class DocumentEmbeddingService:
         self.logger = self._setup_logger()
         self.vector_db = VectorDatabaseManager(config)
         self.embedding_pipeline = EmbeddingPipeline(config)
+        self.query_cache = QueryCache(max_size=self.config.query_cache_size)
         
     def _setup_logger(self) -> logging.Logger:
         logger = logging.getLogger("document_embedding_service")
@@ -100,7 +105,10 @@ class DocumentEmbeddingService:
             
             success = self.process_document(document_id, content, metadata)
             results[document_id] = success
-        
+
+        # Write the lexical index snapshot once per batch
+        self.vector_db.flush()
+
         successful = sum(results.values())
         total = len(results)
         self.logger.info(f"Batch processing complete: {successful}/{total} documents successful")
@@ -113,31 +121,18 @@ class DocumentEmbeddingService:
         n_results = n_results or self.config.default_top_k
         
         try:
+            cache_key = self._query_cache_key(query, n_results, filters)
+            cached = self.query_cache.get(cache_key)
+            if cached is not None:
+                self.logger.debug("Query cache hit")
+                return copy.deepcopy(cached)
+            
             # Perform search
             search_results = self.vector_db.search_documents(query, n_results)
             
             # Format results
-            similar_docs = []
-            if search_results.get("documents") and search_results["documents"][0]:
-                for i, (doc, metadata, distance) in enumerate(zip(
-                    search_results["documents"][0],
-                    search_results["metadatas"][0],
-                    search_results["distances"][0]
-                )):
-                    # Apply filters if provided
-                    if filters and not self._apply_filters(metadata, filters):
-                        continue
-                    
-                    similar_docs.append({
-                        "document_id": metadata.get("document_id", ""),
-                        "title": metadata.get("title", ""),
-                        "source": metadata.get("source", ""),
-                        "document_type": metadata.get("document_type", ""),
-                        "date": metadata.get("date", ""),
-                        "similarity_score": float(1 - distance),  # Convert distance to similarity
-                        "content_preview": doc[:200] + "..." if len(doc) > 200 else doc,
-                        "metadata": metadata
-                    })
+            similar_docs = self._format_search_results(search_results, filters)
+            self.query_cache.put(cache_key, copy.deepcopy(similar_docs))
             
             self.logger.info(f"Found {len(similar_docs)} similar documents for query")
             return similar_docs
@@ -146,6 +141,114 @@ class DocumentEmbeddingService:
             self.logger.error(f"Error searching similar documents: {e}")
             return []
     
+    def search_similar_documents_batch(self, queries: List[str], n_results: int = None,
+                                       filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for documents similar to many queries at once.
+        
+        Cached queries are answered from the query cache; the remaining
+        distinct queries are embedded and searched in a single batch.
+        """
+        n_results = n_results or self.config.default_top_k
+        
+        try:
+            keys = [self._query_cache_key(q, n_results, filters) for q in queries]
+            results = {}
+            pending = {}
+            for query, key in zip(queries, keys):
+                if key in results or key in pending:
+                    continue
+                cached = self.query_cache.get(key)
+                if cached is not None:
+                    results[key] = cached
+                else:
+                    pending[key] = query
+            
+            if pending:
+                batch_results = self.vector_db.search_documents_batch(list(pending.values()), n_results)
+                for key, search_results in zip(pending, batch_results):
+                    similar_docs = self._format_search_results(search_results, filters)
+                    self.query_cache.put(key, similar_docs)
+                    results[key] = similar_docs
+            
+            self.logger.info(f"Batch search: {len(queries)} queries, {len(pending)} searched")
+            return [copy.deepcopy(results[key]) for key in keys]
+            
+        except Exception as e:
+            self.logger.error(f"Error in batch similarity search: {e}")
+            return [[] for _ in queries]
+    
+    def _query_cache_key(self, query: str, n_results: int,
+                         filters: Optional[Dict[str, Any]]) -> str:
+        """Build a query cache key, dropping stale entries if the index changed."""
+        self.query_cache.sync_version(self.vector_db.index_version)
+        filters_key = json.dumps(filters, sort_keys=True, default=str) if filters else ""
+        return f"{normalize_query(query)}|{n_results}|{filters_key}"
+    
+    def _format_search_results(self, search_results: Dict[str, Any],
+                               filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Convert raw vector database results into document dictionaries."""
+        similar_docs = []
+        if search_results.get("documents") and search_results["documents"][0]:
+            for doc, metadata, distance in zip(
+                search_results["documents"][0],
+                search_results["metadatas"][0],
+                search_results["distances"][0]
+            ):
+                # Apply filters if provided
+                if filters and not self._apply_filters(metadata, filters):
+                    continue
+                
+                similar_docs.append({
+                    "document_id": metadata.get("document_id", ""),
+                    "title": metadata.get("title", ""),
+                    "source": metadata.get("source", ""),
+                    "document_type": metadata.get("document_type", ""),
+                    "date": metadata.get("date", ""),
+                    "similarity_score": float(1 - distance),  # Convert distance to similarity
+                    "content_preview": doc[:200] + "..." if len(doc) > 200 else doc,
+                    "content": doc,
+                    "metadata": metadata,
+                    "retrieval_sources": ["vector"]
+                })
+        return similar_docs
+    
+    def search_lexical(self, query: str, n_results: int = None,
+                       filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Search the BM25 index over full document text."""
+        n_results = n_results or self.config.default_top_k
+        
+        try:
+            lexical_index = self.vector_db.lexical_index
+            filter_fn = (lambda metadata: self._apply_filters(metadata, filters)) if filters else None
+            hits = lexical_index.search(query, n_results, filter_fn)
+            # The BM25 index keeps term statistics only; text comes from the vector store
+            texts = self.vector_db.get_documents([doc_id for doc_id, _ in hits]) if hits else {}
+            
+            lexical_docs = []
+            for doc_id, score in hits:
+                text = texts.get(doc_id) or ""
+                metadata = lexical_index.get_metadata(doc_id) or {}
+                lexical_docs.append({
+                    "document_id": metadata.get("document_id", doc_id),
+                    "title": metadata.get("title", ""),
+                    "source": metadata.get("source", ""),
+                    "document_type": metadata.get("document_type", ""),
+                    "date": metadata.get("date", ""),
+                    "bm25_score": float(score),
+                    "content_preview": text[:200] + "..." if len(text) > 200 else text,
+                    "content": text,
+                    "metadata": metadata,
+                    "retrieval_sources": ["bm25"]
+                })
+            
+            self.logger.info(f"Found {len(lexical_docs)} lexical matches for query")
+            return lexical_docs
+            
+        except Exception as e:
+            self.logger.error(f"Error in lexical search: {e}")
+            return []
+    
     def _apply_filters(self, metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
         """Apply filters to metadata."""
         for key, value in filters.items():
@@ -201,7 +304,8 @@ class DocumentEmbeddingService:
                     "embedding_dimension": self.config.embedding_dimension,
                     "default_top_k": self.config.default_top_k,
                     "similarity_threshold": self.config.similarity_threshold
-                }
+                },
+                "query_cache": self.query_cache.get_stats()
             })
             return stats
         except Exception as e:
@@ -258,6 +362,87 @@ class SimilaritySearchEngine:
             self.logger.error(f"Error in ranked search: {e}")
             return []
     
+    def search_with_ranking_batch(self, queries: List[str], n_results: int = 10,
+                                  min_similarity: float = 0.7,
+                                  filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Batch variant of ``search_with_ranking`` using a single embedding/search pass."""
+        try:
+            batch_results = self.embedding_service.search_similar_documents_batch(
+                queries, n_results * 2, filters
+            )
+            
+            ranked_batches = []
+            for results in batch_results:
+                filtered_results = [
+                    r for r in results
+                    if r.get("similarity_score", 0) >= min_similarity
+                ]
+                ranked_results = sorted(
+                    filtered_results,
+                    key=lambda x: x.get("similarity_score", 0),
+                    reverse=True
+                )
+                ranked_batches.append(ranked_results[:n_results])
+            
+            self.logger.info(f"Ranked batch search completed for {len(queries)} queries")
+            return ranked_batches
+            
+        except Exception as e:
+            self.logger.error(f"Error in ranked batch search: {e}")
+            return [[] for _ in queries]
+    
+    def search_hybrid(self, query: str, n_results: int = 10,
+                      min_similarity: float = 0.7,
+                      filters: Optional[Dict[str, Any]] = None,
+                      rrf_k: int = 60) -> List[Dict[str, Any]]:
+        """
+        Fuse vector and BM25 results with reciprocal rank fusion.
+        
+        Fusion happens before the final top-k so exact citation matches that
+        embed poorly still make the cut.
+        """
+        vector_results = self.search_with_ranking(query, n_results * 2, min_similarity, filters)
+        return self._fuse(query, vector_results, n_results, filters, rrf_k)
+    
+    async def asearch_hybrid(self, query: str, n_results: int = 10,
+                             min_similarity: float = 0.7,
+                             filters: Optional[Dict[str, Any]] = None,
+                             rrf_k: int = 60) -> List[Dict[str, Any]]:
+        """Async ``search_hybrid``; vector and lexical retrieval run concurrently."""
+        vector_results, lexical_results = await asyncio.gather(
+            asyncio.to_thread(self.search_with_ranking, query, n_results * 2, min_similarity, filters),
+            asyncio.to_thread(self.embedding_service.search_lexical, query, n_results * 2, filters)
+        )
+        return self._fuse(query, vector_results, n_results, filters, rrf_k, lexical_results)
+    
+    def search_hybrid_batch(self, queries: List[str], n_results: int = 10,
+                            min_similarity: float = 0.7,
+                            filters: Optional[Dict[str, Any]] = None,
+                            rrf_k: int = 60) -> List[List[Dict[str, Any]]]:
+        """Batch variant of ``search_hybrid``; vector search runs as one batch."""
+        vector_batches = self.search_with_ranking_batch(queries, n_results * 2, min_similarity, filters)
+        return [
+            self._fuse(query, vector_results, n_results, filters, rrf_k)
+            for query, vector_results in zip(queries, vector_batches)
+        ]
+    
+    def _fuse(self, query: str, vector_results: List[Dict[str, Any]], n_results: int,
+              filters: Optional[Dict[str, Any]], rrf_k: int,
+              lexical_results: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Fuse vector results with lexical results for the same query."""
+        try:
+            if lexical_results is None:
+                lexical_results = self.embedding_service.search_lexical(query, n_results * 2, filters)
+            fused = reciprocal_rank_fusion([vector_results, lexical_results], k=rrf_k)
+            
+            final_results = fused[:n_results]
+            self.logger.info(f"Hybrid search returned {len(final_results)} results")
+            return final_results
+            
+        except Exception as e:
+            self.logger.error(f"Error in hybrid search: {e}")
+            return vector_results[:n_results]
+    
     def search_by_document_type(self, query: str, document_type: str, 
                                n_results: int = 5) -> List[Dict[str, Any]]:
         """Search within a specific document type."""
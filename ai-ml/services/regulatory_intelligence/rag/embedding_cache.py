@@ -93,6 +93,65 @@ class EmbeddingCache:
         return len(self.cache)
 
 
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query string for use as a cache key.
+
+    Case, repeated whitespace and trailing punctuation do not change the
+    meaning of FAQ-style questions, so they are folded away.
+    """
+    return " ".join(query.casefold().split()).rstrip("?!. ")
+
+
+class QueryCache(EmbeddingCache):
+    """
+    LRU cache for query embeddings and search results.
+
+    Entries are scoped to an index version: when the vector index changes,
+    cached search results are stale and the whole cache is dropped.
+    """
+
+    def __init__(self, max_size: int = 256):
+        """
+        Initialize cache.
+
+        Args:
+            max_size: Maximum number of queries to cache
+        """
+        super().__init__(max_size=max_size)
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+    def sync_version(self, version: Any):
+        """Drop all entries if the index version has changed."""
+        with self.lock:
+            if version != self.version:
+                self.cache.clear()
+                self.version = version
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get cached value and record hit/miss statistics."""
+        value = super().get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        total = self.hits + self.misses
+        return {
+            "size": self.size(),
+            "max_size": self.max_size,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
 class EmbeddingPersistence:
     """
     Persistent storage for document embeddings using SQLite.
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Lexical Index
+BM25 inverted index over full chunk text and reciprocal rank fusion for hybrid retrieval.
+
+Embeddings blur exact legal citations such as "Article 10(2)" or "Reg B §1002.9";
+a lexical index over the full text recovers them. Only term statistics,
+document ids and metadata are kept; the text itself stays in the vector
+store. The index is updated incrementally as documents are ingested and
+persisted as JSON next to the vector stores: each batch is appended to a
+JSON-lines journal and the full snapshot is only rewritten once the journal
+outgrows it (or on flush), so bulk ingestion writes each document a bounded
+number of times. Processes sharing the files serialize journal appends and
+compaction with a lock file.
+"""
+
+import os
+import re
+import json
+import math
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import Counter, defaultdict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Numbers with dotted/dashed parts and parenthesised sub-clauses ("10(2)",
+# "1002.9", "240.10b-5") are kept whole; otherwise plain alphanumeric words.
+_TOKEN_PATTERN = re.compile(r"\d+(?:[.\-]\w+)*(?:\([0-9a-z]+\))*|[a-z][a-z0-9]*")
+
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "this", "to", "was", "what", "which",
+    "with",
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize text for BM25 scoring.
+
+    Citation tokens with sub-clauses also emit their parent number, so a
+    query for "Article 10" still matches "Article 10(2)".
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        tokens.append(token)
+        paren = token.find("(")
+        if paren > 0:
+            tokens.append(token[:paren])
+    return tokens
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]],
+                           k: int = 60,
+                           id_key: str = "document_id") -> List[Dict[str, Any]]:
+    """
+    Fuse several ranked result lists with reciprocal rank fusion.
+
+    Each document scores ``sum(1 / (k + rank))`` over the lists it appears in.
+    Fields from all lists are merged into one dictionary per document and the
+    fused score is stored under ``fusion_score``.
+
+    Args:
+        result_lists: Ranked lists of result dictionaries, best first
+        k: RRF damping constant
+        id_key: Key identifying the same document across lists
+
+    Returns:
+        Fused results sorted by ``fusion_score``
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    scores: Dict[str, float] = defaultdict(float)
+
+    for results in result_lists:
+        for rank, doc in enumerate(results, 1):
+            doc_id = doc.get(id_key)
+            if not doc_id:
+                continue
+            scores[doc_id] += 1.0 / (k + rank)
+            if doc_id in fused:
+                merged = fused[doc_id]
+                for key, value in doc.items():
+                    if key == "retrieval_sources":
+                        merged[key] = merged.get(key, []) + [s for s in value if s not in merged.get(key, [])]
+                    elif key not in merged or not merged[key]:
+                        merged[key] = value
+            else:
+                fused[doc_id] = dict(doc)
+
+    for doc_id, doc in fused.items():
+        doc["fusion_score"] = scores[doc_id]
+
+    return sorted(fused.values(), key=lambda d: d["fusion_score"], reverse=True)
+
+
+class BM25Index:
+    """
+    Incremental BM25 inverted index with JSON persistence.
+
+    Postings map each term to ``{document_id: term_frequency}``. Documents
+    keep only their metadata (for filtering) and distinct terms (for
+    removal); callers fetch the text of hits from the vector store.
+
+    Changes are appended to ``<index_path>.log`` as they happen and replayed
+    on load; ``save``/``flush`` fold the journal into the JSON snapshot.
+    Appends, loads and compaction hold ``<index_path>.lock``, and compaction
+    rebuilds the snapshot from the files, so entries journaled by other
+    processes sharing the index are neither lost nor truncated unread.
+    """
+
+    def __init__(self, index_path: Optional[str] = None, k1: float = 1.5, b: float = 0.75,
+                 compact_after: int = 1000):
+        """
+        Initialize the index, loading it from disk if present.
+
+        Args:
+            index_path: JSON file to persist the index to (in-memory if None)
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+            compact_after: Journal entries tolerated before the snapshot is
+                rewritten (at least the number of indexed documents)
+        """
+        self.index_path = Path(index_path) if index_path else None
+        self.journal_path = (
+            self.index_path.with_suffix(self.index_path.suffix + ".log") if self.index_path else None
+        )
+        self.lock_path = (
+            self.index_path.with_suffix(self.index_path.suffix + ".lock") if self.index_path else None
+        )
+        self.k1 = k1
+        self.b = b
+        self.compact_after = compact_after
+        self.logger = self._setup_logger()
+        self.lock = threading.Lock()
+        self.journal_entries = 0
+
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.doc_lengths: Dict[str, int] = {}
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.total_length = 0
+
+        self.load()
+
+    def _setup_logger(self) -> logging.Logger:
+        logger = logging.getLogger("bm25_index")
+        logger.setLevel(logging.INFO)
+        if not logger.handlers:
+            h = logging.StreamHandler()
+            h.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+            logger.addHandler(h)
+        return logger
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add_documents(self, ids: List[str], texts: List[str],
+                      metadatas: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Add or replace documents in the index."""
+        metadatas = metadatas or [{} for _ in ids]
+        with self.lock:
+            entries = []
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                term_counts = dict(Counter(tokenize(text)))
+                self._add(doc_id, term_counts, metadata or {})
+                entries.append({"op": "add", "id": doc_id, "terms": term_counts, "metadata": metadata or {}})
+            self._append_journal(entries)
+        self.logger.debug(f"Indexed {len(ids)} documents ({len(self)} total)")
+        self._maybe_compact()
+
+    def remove_document(self, doc_id: str) -> bool:
+        """Remove a document from the index."""
+        with self.lock:
+            if doc_id not in self.doc_lengths:
+                return False
+            self._remove(doc_id)
+            self._append_journal([{"op": "remove", "id": doc_id}])
+        self._maybe_compact()
+        return True
+
+    def _add(self, doc_id: str, term_counts: Dict[str, int], metadata: Dict[str, Any]) -> None:
+        """Index one document's term counts, replacing any previous version; caller holds the lock."""
+        if doc_id in self.doc_lengths:
+            self._remove(doc_id)
+        for term, tf in term_counts.items():
+            self.postings[term][doc_id] = tf
+        length = sum(term_counts.values())
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+        self.documents[doc_id] = {"metadata": metadata, "terms": list(term_counts)}
+
+    def _remove(self, doc_id: str) -> None:
+        """Remove a document's postings; caller holds the lock."""
+        for term in self.documents.get(doc_id, {}).get("terms", ()):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+        self.documents.pop(doc_id, None)
+
+    def search(self, query: str, top_k: int = 10,
+               filter_fn: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Tuple[str, float]]:
+        """
+        Score documents against a query.
+
+        Args:
+            query: Query text
+            top_k: Number of results to return
+            filter_fn: Optional predicate on document metadata
+
+        Returns:
+            List of (document_id, score) pairs, best first
+        """
+        with self.lock:
+            n_docs = len(self.doc_lengths)
+            if n_docs == 0:
+                return []
+            avg_length = self.total_length / n_docs
+            scores: Dict[str, float] = defaultdict(float)
+
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+            if filter_fn is not None:
+                scores = {
+                    doc_id: score for doc_id, score in scores.items()
+                    if filter_fn(self.documents[doc_id]["metadata"])
+                }
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def get_metadata(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Get stored metadata for a document."""
+        document = self.documents.get(doc_id)
+        return document["metadata"] if document is not None else None
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold the inter-process lock on the index files."""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a+") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _append_journal(self, entries: List[Dict[str, Any]]) -> None:
+        """Append change entries to the journal; caller holds the lock."""
+        if self.journal_path is None or not entries:
+            return
+        try:
+            with self._file_lock():
+                with open(self.journal_path, "a") as f:
+                    f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            self.journal_entries += len(entries)
+        except Exception as e:
+            self.logger.error(f"Failed to append to BM25 journal: {e}")
+
+    def _maybe_compact(self) -> None:
+        """
+        Rewrite the snapshot once the journal outgrows it.
+
+        The threshold grows with the index, so the snapshot is rewritten a
+        logarithmic number of times during bulk ingestion.
+        """
+        if self.journal_entries > max(self.compact_after, len(self)):
+            self.save()
+
+    def save(self) -> None:
+        """
+        Fold the journal into the snapshot and truncate it.
+
+        The index is first reloaded from the snapshot and journal on disk,
+        which include this process's changes and those of other processes
+        sharing the files, so the rewrite does not drop their entries.
+        """
+        if self.index_path is None:
+            return
+        try:
+            with self.lock, self._file_lock():
+                self._load_files()
+                data = {
+                    "k1": self.k1,
+                    "b": self.b,
+                    "postings": self.postings,
+                    "doc_lengths": self.doc_lengths,
+                    "documents": self.documents,
+                }
+                tmp_path = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.index_path)
+                if self.journal_path.exists():
+                    self.journal_path.unlink()
+                self.journal_entries = 0
+            self.logger.info(f"Saved BM25 index with {len(self)} documents")
+        except Exception as e:
+            self.logger.error(f"Failed to save BM25 index: {e}")
+
+    def flush(self) -> None:
+        """Fold pending journal entries into the snapshot."""
+        if self.journal_entries:
+            self.save()
+
+    def load(self) -> None:
+        """Load the index snapshot from disk if it exists and replay the journal."""
+        if self.index_path is None:
+            return
+        try:
+            with self.lock, self._file_lock():
+                self._load_files()
+        except Exception as e:
+            self.logger.error(f"Failed to load BM25 index: {e}")
+
+    def _load_files(self) -> None:
+        """Replace the in-memory index with the snapshot plus journal; caller holds both locks."""
+        self.postings = defaultdict(dict)
+        self.doc_lengths = {}
+        self.documents = {}
+        self.total_length = 0
+        if self.index_path.exists():
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            self.k1 = data.get("k1", self.k1)
+            self.b = data.get("b", self.b)
+            self.postings = defaultdict(dict, data.get("postings", {}))
+            self.doc_lengths = data.get("doc_lengths", {})
+            self.documents = data.get("documents", {})
+            self.total_length = sum(self.doc_lengths.values())
+            self.logger.info(f"Loaded BM25 index with {len(self)} documents")
+        self._replay_journal()
+
+    def _replay_journal(self) -> None:
+        """Apply journal entries written since the last snapshot; caller holds both locks."""
+        self.journal_entries = 0
+        if not self.journal_path.exists():
+            return
+        replayed = 0
+        with open(self.journal_path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted append
+                    self.logger.warning("Skipping unreadable BM25 journal entry")
+                    continue
+                if entry.get("op") == "add":
+                    self._add(entry["id"], entry["terms"], entry.get("metadata") or {})
+                elif entry.get("op") == "remove" and entry["id"] in self.doc_lengths:
+                    self._remove(entry["id"])
+                replayed += 1
+        self.journal_entries = replayed
+        if replayed:
+            self.logger.info(f"Replayed {replayed} BM25 journal entries")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        return {
+            "documents": len(self),
+            "terms": len(self.postings),
+            "average_document_length": round(self.total_length / len(self), 2) if len(self) else 0.0,
+            "index_path": str(self.index_path) if self.index_path else None,
+            "journal_entries": self.journal_entries,
+        }
@@ -661,34 +661,46 @@ class RegulatoryDataSeeder:
             config = KnowledgeGraphConfig()
             graph_manager = GraphDatabaseManager(config)
 
-            for entity_data in KG_SEED_ENTITIES:
-                try:
-                    entity = RegulatoryEntity(
-                        entity_id=entity_data["id"],
-                        entity_type=entity_data["type"],
-                        name=entity_data["name"],
-                        properties={k: v for k, v in entity_data.items()
-                                    if k not in ("id", "type", "name")},
-                    )
-                    graph_manager.add_entity(entity)
-                    results["entities_added"] += 1
-                except Exception as e:
-                    results["failed"] += 1
-                    self.logger.warning(f"  Entity failed: {entity_data['id']} — {e}")
-
-            for source_id, rel_type, target_id in KG_SEED_RELATIONSHIPS:
-                try:
-                    rel = EntityRelationship(
-                        source_id=source_id,
-                        target_id=target_id,
-                        relationship_type=rel_type,
-                        properties={"seeded": True},
-                    )
-                    graph_manager.add_relationship(rel)
-                    results["relationships_added"] += 1
-                except Exception as e:
-                    results["failed"] += 1
-                    self.logger.warning(f"  Relationship failed: {source_id}→{target_id} — {e}")
+            # Buffer Neo4j writes into batched UNWIND transactions
+            with graph_manager.bulk():
+                for entity_data in KG_SEED_ENTITIES:
+                    try:
+                        entity = RegulatoryEntity(
+                            entity_id=entity_data["id"],
+                            name=entity_data["name"],
+                            entity_type=entity_data["type"],
+                            jurisdiction=entity_data.get("jurisdiction", "GLOBAL"),
+                            description=entity_data.get("description", ""),
+                            confidence=1.0,
+                            metadata={k: v for k, v in entity_data.items()
+                                      if k not in ("id", "type", "name", "jurisdiction", "description")},
+                        )
+                        if graph_manager.add_entity(entity):
+                            results["entities_added"] += 1
+                        else:
+                            results["failed"] += 1
+                    except Exception as e:
+                        results["failed"] += 1
+                        self.logger.warning(f"  Entity failed: {entity_data['id']} — {e}")
+
+                for source_id, rel_type, target_id in KG_SEED_RELATIONSHIPS:
+                    try:
+                        rel = EntityRelationship(
+                            relationship_id=f"{source_id}_{rel_type}_{target_id}",
+                            source_entity_id=source_id,
+                            target_entity_id=target_id,
+                            relationship_type=rel_type,
+                            confidence=1.0,
+                            context="seed",
+                            metadata={"seeded": True},
+                        )
+                        if graph_manager.add_relationship(rel):
+                            results["relationships_added"] += 1
+                        else:
+                            results["failed"] += 1
+                    except Exception as e:
+                        results["failed"] += 1
+                        self.logger.warning(f"  Relationship failed: {source_id}→{target_id} — {e}")
 
         except ImportError as e:
             self.logger.warning(f"Knowledge Graph dependencies not available: {e}")
@@ -7,9 +7,10 @@ Implements context retrieval, ranking algorithms, relevance filtering, and respo
 import os
 import sys
 import json
+import asyncio
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 import numpy as np
 
@@ -19,18 +20,23 @@ sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 from services.regulatory_intelligence.rag.document_embeddings import (
     DocumentEmbeddingService, SimilaritySearchEngine, DocumentMetadata
 )
+from services.regulatory_intelligence.rag.context_packing import ContextPacker, document_text, estimate_tokens
 from services.regulatory_intelligence.llm.gemini_client import GeminiClient, GeminiClientConfig
 
 
 @dataclass
 class RetrievalConfig:
     """Configuration for the retrieval system."""
-    max_context_length: int = 4000
+    max_context_length: int = 4000  # Deprecated character budget; see max_context_tokens
+    max_context_tokens: int = 3000
+    context_dedup_threshold: float = 0.8
+    context_packing_strategy: str = "greedy"  # "greedy" or "knapsack"
     min_similarity_threshold: float = 0.7
     max_documents: int = 10
     rerank_top_k: int = 5
     use_hybrid_search: bool = True
     enable_query_expansion: bool = True
+    rrf_k: int = 60
 
 
 class ContextRetriever:
@@ -42,6 +48,12 @@ class ContextRetriever:
         self.config = config or RetrievalConfig()
         self.logger = self._setup_logger()
         self.search_engine = SimilaritySearchEngine(embedding_service)
+        # Estimated token counts here; ResponseGenerator re-packs with exact counts
+        self.context_packer = ContextPacker(
+            max_tokens=self.config.max_context_tokens,
+            dedup_threshold=self.config.context_dedup_threshold,
+            strategy=self.config.context_packing_strategy
+        )
         
     def _setup_logger(self) -> logging.Logger:
         logger = logging.getLogger("context_retriever")
@@ -56,18 +68,56 @@ class ContextRetriever:
         """Retrieve relevant context for a query."""
         try:
             # Get similar documents
-            similar_docs = self.search_engine.search_with_ranking(
-                query=query,
-                n_results=self.config.max_documents,
-                min_similarity=self.config.min_similarity_threshold,
-                filters=filters
-            )
+            if self.config.use_hybrid_search:
+                similar_docs = self.search_engine.search_hybrid(
+                    query=query,
+                    n_results=self.config.max_documents,
+                    min_similarity=self.config.min_similarity_threshold,
+                    filters=filters,
+                    rrf_k=self.config.rrf_k
+                )
+            else:
+                similar_docs = self.search_engine.search_with_ranking(
+                    query=query,
+                    n_results=self.config.max_documents,
+                    min_similarity=self.config.min_similarity_threshold,
+                    filters=filters
+                )
             
-            # Apply relevance filtering
-            relevant_docs = self._filter_relevant_documents(similar_docs, query)
+            context_docs = self._select_context(similar_docs, query)
             
-            # Limit context length
-            context_docs = self._limit_context_length(relevant_docs)
+            self.logger.info(f"Retrieved {len(context_docs)} relevant documents")
+            return context_docs
+            
+        except Exception as e:
+            self.logger.error(f"Error retrieving context: {e}")
+            return []
+    
+    async def aretrieve_context(self, query: str,
+                                filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Async ``retrieve_context``.
+        
+        Search runs off the event loop; with hybrid search the vector and
+        BM25 retrievals run concurrently.
+        """
+        try:
+            if self.config.use_hybrid_search:
+                similar_docs = await self.search_engine.asearch_hybrid(
+                    query=query,
+                    n_results=self.config.max_documents,
+                    min_similarity=self.config.min_similarity_threshold,
+                    filters=filters,
+                    rrf_k=self.config.rrf_k
+                )
+            else:
+                similar_docs = await asyncio.to_thread(
+                    self.search_engine.search_with_ranking,
+                    query, self.config.max_documents,
+                    self.config.min_similarity_threshold, filters
+                )
+            
+            context_docs = self._select_context(similar_docs, query)
             
             self.logger.info(f"Retrieved {len(context_docs)} relevant documents")
             return context_docs
@@ -76,9 +126,52 @@ class ContextRetriever:
             self.logger.error(f"Error retrieving context: {e}")
             return []
     
+    def retrieve_context_batch(self, queries: List[str],
+                               filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Retrieve relevant context for many queries with one embedding/search pass."""
+        try:
+            if self.config.use_hybrid_search:
+                similar_batches = self.search_engine.search_hybrid_batch(
+                    queries=queries,
+                    n_results=self.config.max_documents,
+                    min_similarity=self.config.min_similarity_threshold,
+                    filters=filters,
+                    rrf_k=self.config.rrf_k
+                )
+            else:
+                similar_batches = self.search_engine.search_with_ranking_batch(
+                    queries=queries,
+                    n_results=self.config.max_documents,
+                    min_similarity=self.config.min_similarity_threshold,
+                    filters=filters
+                )
+            
+            context_batches = [
+                self._select_context(similar_docs, query)
+                for query, similar_docs in zip(queries, similar_batches)
+            ]
+            
+            self.logger.info(f"Retrieved context for {len(queries)} queries")
+            return context_batches
+            
+        except Exception as e:
+            self.logger.error(f"Error retrieving batch context: {e}")
+            return [[] for _ in queries]
+    
+    def _select_context(self, similar_docs: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+        """Apply relevance filtering and context length limits to search hits."""
+        # Apply relevance filtering
+        relevant_docs = self._filter_relevant_documents(similar_docs, query)
+        
+        # Limit context length
+        return self._limit_context_length(relevant_docs)
+    
     def _filter_relevant_documents(self, documents: List[Dict[str, Any]], 
                                   query: str) -> List[Dict[str, Any]]:
         """Filter documents based on relevance to the query."""
+        if any("fusion_score" in doc for doc in documents):
+            return self._filter_fused_documents(documents)
+        
         relevant_docs = []
         
         for doc in documents:
@@ -87,7 +180,7 @@ class ContextRetriever:
                 continue
             
             # Check content relevance (simple keyword matching)
-            content = doc.get("content_preview", "").lower()
+            content = (doc.get("content") or doc.get("content_preview", "")).lower()
             query_terms = query.lower().split()
             
             # Calculate relevance score
@@ -105,6 +198,26 @@ class ContextRetriever:
         
         return relevant_docs
     
+    def _filter_fused_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Filter hybrid search results.
+        
+        Lexical relevance is already captured by BM25, so documents are kept if
+        they pass the similarity threshold or matched lexically.
+        """
+        relevant_docs = [
+            doc for doc in documents
+            if doc.get("similarity_score", 0) >= self.config.min_similarity_threshold
+            or doc.get("bm25_score", 0) > 0
+        ]
+        
+        max_fusion = max((doc["fusion_score"] for doc in relevant_docs), default=0.0)
+        for doc in relevant_docs:
+            doc["relevance_score"] = doc["fusion_score"] / max_fusion if max_fusion else 0.0
+        
+        relevant_docs.sort(key=lambda x: x["fusion_score"], reverse=True)
+        return relevant_docs
+    
     def _calculate_relevance_score(self, content: str, query_terms: List[str]) -> float:
         """Calculate relevance score based on keyword matching."""
         if not content or not query_terms:
@@ -114,20 +227,8 @@ class ContextRetriever:
         return matches / len(query_terms)
     
     def _limit_context_length(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Limit the total context length to avoid token limits."""
-        context_docs = []
-        total_length = 0
-        
-        for doc in documents:
-            content_length = len(doc.get("content_preview", ""))
-            
-            if total_length + content_length <= self.config.max_context_length:
-                context_docs.append(doc)
-                total_length += content_length
-            else:
-                break
-        
-        return context_docs
+        """Pack documents into the context token budget."""
+        return self.context_packer.pack(documents)
 
 
 class RankingAlgorithm:
@@ -180,6 +281,12 @@ class RankingAlgorithm:
     
     def _rank_hybrid(self, documents: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
         """Hybrid ranking combining similarity and relevance."""
+        if documents and all("fusion_score" in doc for doc in documents):
+            # Already fused with BM25 via reciprocal rank fusion
+            for doc in documents:
+                doc["hybrid_score"] = doc["fusion_score"]
+            return sorted(documents, key=lambda x: x["hybrid_score"], reverse=True)
+        
         query_terms = query.lower().split()
         
         for doc in documents:
@@ -212,8 +319,9 @@ class RelevanceFilter:
     
     def filter_by_similarity(self, documents: List[Dict[str, Any]], 
                            threshold: float = 0.7) -> List[Dict[str, Any]]:
-        """Filter documents by similarity threshold."""
-        return [doc for doc in documents if doc.get("similarity_score", 0) >= threshold]
+        """Filter documents by similarity threshold, keeping BM25 matches."""
+        return [doc for doc in documents
+                if doc.get("similarity_score", 0) >= threshold or doc.get("bm25_score", 0) > 0]
     
     def filter_by_document_type(self, documents: List[Dict[str, Any]], 
                                document_types: List[str]) -> List[Dict[str, Any]]:
@@ -243,10 +351,21 @@ class RelevanceFilter:
 class ResponseGenerator:
     """Generates responses using retrieved context and LLM."""
     
-    def __init__(self, gemini_client: Optional[GeminiClient] = None):
+    def __init__(self, gemini_client: Optional[GeminiClient] = None,
+                 config: Optional[RetrievalConfig] = None):
         self.gemini_client = gemini_client or GeminiClient(GeminiClientConfig())
+        self.config = config or RetrievalConfig()
         self.logger = self._setup_logger()
+        # Packing uses local estimates; the assembled prompt gets one exact count
+        self.context_packer = self._packer(self.config.max_context_tokens)
         
+    def _packer(self, max_tokens: int) -> ContextPacker:
+        return ContextPacker(
+            max_tokens=max_tokens,
+            dedup_threshold=self.config.context_dedup_threshold,
+            strategy=self.config.context_packing_strategy
+        )
+    
     def _setup_logger(self) -> logging.Logger:
         logger = logging.getLogger("response_generator")
         logger.setLevel(logging.INFO)
@@ -259,26 +378,13 @@ class ResponseGenerator:
     def generate_response(self, query: str, context_documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate a response using retrieved context."""
         try:
-            # Prepare context
-            context_text = self._prepare_context(context_documents)
+            # Pack context into the token budget
+            context_documents, prompt = self._build_prompt(query, context_documents)
             
             # Generate response using Gemini
-            prompt = self._create_prompt(query, context_text)
             response = self.gemini_client.generate_text(prompt)
             
-            # Calculate confidence based on context quality
-            confidence = self._calculate_confidence(context_documents)
-            
-            # Extract citations
-            citations = self._extract_citations(context_documents)
-            
-            return {
-                "response": response,
-                "confidence": confidence,
-                "citations": citations,
-                "context_used": len(context_documents),
-                "sources": [doc.get("title", "") for doc in context_documents]
-            }
+            return {"response": response, **self._response_metadata(context_documents)}
             
         except Exception as e:
             self.logger.error(f"Error generating response: {e}")
@@ -290,13 +396,68 @@ class ResponseGenerator:
                 "sources": []
             }
     
+    async def agenerate_response_stream(self, query: str,
+                                        context_documents: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a response as ``token`` events followed by a ``citations`` event.
+        
+        Prompt construction, including its exact token count, runs in a
+        worker thread so it does not block the event loop.
+        """
+        try:
+            context_documents, prompt = await asyncio.to_thread(self._build_prompt, query, context_documents)
+            
+            async for text in self.gemini_client.agenerate_text_stream(prompt):
+                yield {"event": "token", "data": {"text": text}}
+            
+            yield {"event": "citations", "data": self._response_metadata(context_documents)}
+            
+        except Exception as e:
+            self.logger.error(f"Error streaming response: {e}")
+            yield {"event": "error", "data": {
+                "message": "I apologize, but I encountered an error generating a response."
+            }}
+    
+    def _build_prompt(self, query: str,
+                      context_documents: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Pack context documents and build the prompt.
+        
+        Documents are packed with local token estimates, then the assembled
+        prompt is counted exactly once, through the client's rate limiter
+        (this may wait for a slot). If the estimates undercounted enough
+        to overflow the budget, the context is repacked once with the budget
+        scaled by the observed ratio.
+        """
+        packed = self.context_packer.pack(context_documents)
+        prompt = self._create_prompt(query, self._prepare_context(packed))
+        
+        ratio = self.gemini_client.count_tokens(prompt) / estimate_tokens(prompt)
+        used = sum(doc["token_count"] for doc in packed)
+        if used * ratio > self.config.max_context_tokens:
+            self.logger.info(f"Token estimate off by {ratio:.2f}x; repacking context")
+            packed = self._packer(int(self.config.max_context_tokens / ratio)).pack(context_documents)
+            prompt = self._create_prompt(query, self._prepare_context(packed))
+        
+        return packed, prompt
+    
+    def _response_metadata(self, context_documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Confidence, citations and sources for a generated response."""
+        return {
+            # Calculate confidence based on context quality
+            "confidence": self._calculate_confidence(context_documents),
+            "citations": self._extract_citations(context_documents),
+            "context_used": len(context_documents),
+            "sources": [doc.get("title", "") for doc in context_documents]
+        }
+    
     def _prepare_context(self, documents: List[Dict[str, Any]]) -> str:
         """Prepare context from retrieved documents."""
         context_parts = []
         
         for i, doc in enumerate(documents, 1):
             title = doc.get("title", "Unknown")
-            content = doc.get("content_preview", "")
+            content = document_text(doc)
             source = doc.get("source", "Unknown")
             
             context_parts.append(f"Document {i}: {title}\nSource: {source}\nContent: {content}\n")
@@ -362,7 +523,7 @@ class RAGSystem:
         self.context_retriever = ContextRetriever(embedding_service, config)
         self.ranking_algorithm = RankingAlgorithm()
         self.relevance_filter = RelevanceFilter()
-        self.response_generator = ResponseGenerator()
+        self.response_generator = ResponseGenerator(config=self.config)
         
     def _setup_logger(self) -> logging.Logger:
         logger = logging.getLogger("rag_system")
@@ -375,10 +536,55 @@ class RAGSystem:
     
     def query(self, question: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Process a query through the complete RAG pipeline."""
+        # Step 1: Retrieve context
+        context_docs = self.context_retriever.retrieve_context(question, filters)
+        return self._answer(question, context_docs)
+    
+    async def aquery_stream(self, question: str,
+                            filters: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a query and stream the answer.
+        
+        Yields ``token`` events as text arrives, then a ``citations`` event
+        (or an ``error`` event).
+        """
+        context_docs = await self.context_retriever.aretrieve_context(question, filters)
+        
+        if not context_docs:
+            yield {"event": "token", "data": {
+                "text": "I couldn't find relevant information to answer your question."
+            }}
+            yield {"event": "citations", "data": {
+                "confidence": 0.0, "citations": [], "context_used": 0, "sources": []
+            }}
+            return
+        
+        ranked_docs = self.ranking_algorithm.rank_documents(context_docs, question, "hybrid")
+        relevant_docs = self.relevance_filter.filter_by_similarity(
+            ranked_docs, self.config.min_similarity_threshold
+        )
+        
+        async for event in self.response_generator.agenerate_response_stream(question, relevant_docs):
+            yield event
+        
+        self.logger.info(f"RAG streaming query processed: {len(relevant_docs)} documents used")
+    
+    def query_batch(self, questions: List[str],
+                    filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Process many queries, retrieving all contexts in one batch.
+        
+        Repeated questions share a single embedding and search.
+        """
+        context_batches = self.context_retriever.retrieve_context_batch(questions, filters)
+        return [
+            self._answer(question, context_docs)
+            for question, context_docs in zip(questions, context_batches)
+        ]
+    
+    def _answer(self, question: str, context_docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Rank, filter and generate a response from retrieved context."""
         try:
-            # Step 1: Retrieve context
-            context_docs = self.context_retriever.retrieve_context(question, filters)
-            
             if not context_docs:
                 return {
                     "response": "I couldn't find relevant information to answer your question.",
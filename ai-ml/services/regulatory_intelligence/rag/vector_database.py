@@ -7,10 +7,12 @@ Provides ChromaDB and FAISS integration for RAG system with embedding pipeline.
 import os
 import sys
 import json
+import uuid
 import logging
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union, Tuple
 from dataclasses import dataclass
+import numpy as np
 
 # Add project root
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
@@ -24,7 +26,6 @@ except ImportError:
 
 try:
     import faiss
-    import numpy as np
     FAISS_AVAILABLE = True
 except ImportError:
     FAISS_AVAILABLE = False
@@ -36,6 +37,8 @@ except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
 
 from config.env_config import get_env_config
+from services.regulatory_intelligence.rag.embedding_cache import QueryCache, normalize_query
+from services.regulatory_intelligence.rag.lexical_index import BM25Index
 
 
 @dataclass
@@ -49,6 +52,12 @@ class VectorDBConfig:
     faiss_index_path: str = "data/vector_db/faiss_index.bin"
     faiss_metadata_path: str = "data/vector_db/faiss_metadata.json"
     
+    # BM25 lexical index settings
+    bm25_index_path: str = "data/vector_db/bm25_index.json"
+    
+    # Generation token rewritten on every ingest, shared by all processes
+    index_version_path: str = "data/vector_db/index_version"
+    
     # Embedding settings
     embedding_model: str = "all-MiniLM-L6-v2"  # Fast, good quality
     embedding_dimension: int = 384
@@ -57,6 +66,9 @@ class VectorDBConfig:
     # Search settings
     default_top_k: int = 5
     similarity_threshold: float = 0.7
+    
+    # Query cache settings
+    query_cache_size: int = 256
 
 
 class EmbeddingPipeline:
@@ -76,7 +88,7 @@ class EmbeddingPipeline:
             logger.addHandler(h)
         return logger
     
-    def _load_embedding_model(self) -> Optional[SentenceTransformer]:
+    def _load_embedding_model(self) -> Optional["SentenceTransformer"]:
         """Load the sentence transformer model."""
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             self.logger.warning("sentence-transformers not available")
@@ -165,16 +177,22 @@ class ChromaDBManager:
             self.logger.error(f"Failed to get collection: {e}")
             return None
     
-    def add_documents(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]) -> bool:
+    def add_documents(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str],
+                      embeddings: Optional[np.ndarray] = None) -> bool:
         """Add documents to the collection."""
         if self.collection is None:
             return False
         
         try:
+            kwargs = {}
+            if embeddings is not None:
+                # Store our own embeddings so query embeddings we compute match
+                kwargs["embeddings"] = np.asarray(embeddings, dtype=np.float32).tolist()
             self.collection.add(
                 documents=documents,
                 metadatas=metadatas,
-                ids=ids
+                ids=ids,
+                **kwargs
             )
             self.logger.info(f"Added {len(documents)} documents to ChromaDB")
             return True
@@ -182,7 +200,20 @@ class ChromaDBManager:
             self.logger.error(f"Failed to add documents: {e}")
             return False
     
-    def search_documents(self, query: str, n_results: int = None) -> Dict[str, Any]:
+    def get_documents(self, ids: List[str]) -> Dict[str, str]:
+        """Get stored document text by id."""
+        if self.collection is None or not ids:
+            return {}
+        
+        try:
+            results = self.collection.get(ids=list(ids), include=["documents"])
+            return dict(zip(results["ids"], results["documents"]))
+        except Exception as e:
+            self.logger.error(f"Failed to get documents: {e}")
+            return {}
+    
+    def search_documents(self, query: str, n_results: int = None,
+                         query_embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Search for similar documents."""
         if self.collection is None:
             return {"documents": [], "metadatas": [], "distances": []}
@@ -190,15 +221,46 @@ class ChromaDBManager:
         n_results = n_results or self.config.default_top_k
         
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results
-            )
+            if query_embedding is not None:
+                results = self.collection.query(
+                    query_embeddings=[np.asarray(query_embedding, dtype=np.float32).tolist()],
+                    n_results=n_results
+                )
+            else:
+                results = self.collection.query(
+                    query_texts=[query],
+                    n_results=n_results
+                )
             self.logger.info(f"Found {len(results['documents'][0])} similar documents")
             return results
         except Exception as e:
             self.logger.error(f"Failed to search documents: {e}")
             return {"documents": [], "metadatas": [], "distances": []}
+    
+    def search_documents_batch(self, queries: List[str], n_results: int = None,
+                               query_embeddings: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Search for similar documents for many queries in a single collection query."""
+        if self.collection is None or not queries:
+            return {"documents": [], "metadatas": [], "distances": []}
+        
+        n_results = n_results or self.config.default_top_k
+        
+        try:
+            if query_embeddings is not None:
+                results = self.collection.query(
+                    query_embeddings=np.asarray(query_embeddings, dtype=np.float32).tolist(),
+                    n_results=n_results
+                )
+            else:
+                results = self.collection.query(
+                    query_texts=list(queries),
+                    n_results=n_results
+                )
+            self.logger.info(f"Batch search returned results for {len(results['documents'])} queries")
+            return results
+        except Exception as e:
+            self.logger.error(f"Failed to batch search documents: {e}")
+            return {"documents": [], "metadatas": [], "distances": []}
 
 
 class FAISSManager:
@@ -302,8 +364,8 @@ class FAISSManager:
         k = k or self.config.default_top_k
         
         try:
-            # Normalize query vector
-            query_vector = query_vector.reshape(1, -1)
+            # Normalize a copy of the query vector; callers may hold cached arrays
+            query_vector = np.array(query_vector, dtype=np.float32).reshape(1, -1)
             faiss.normalize_L2(query_vector)
             
             # Search
@@ -314,6 +376,25 @@ class FAISSManager:
         except Exception as e:
             self.logger.error(f"Failed to search FAISS index: {e}")
             return np.array([]), np.array([])
+    
+    def search_vectors_batch(self, query_vectors: np.ndarray, k: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Search for similar vectors for a matrix of queries in one index call."""
+        if self.index is None:
+            return np.array([]), np.array([])
+        
+        k = k or self.config.default_top_k
+        
+        try:
+            query_vectors = np.array(query_vectors, dtype=np.float32).reshape(len(query_vectors), -1)
+            faiss.normalize_L2(query_vectors)
+            
+            distances, indices = self.index.search(query_vectors, k)
+            
+            self.logger.info(f"Batch searched {len(indices)} query vectors")
+            return distances, indices
+        except Exception as e:
+            self.logger.error(f"Failed to batch search FAISS index: {e}")
+            return np.array([]), np.array([])
 
 
 class VectorDatabaseManager:
@@ -325,6 +406,11 @@ class VectorDatabaseManager:
         self.embedding_pipeline = EmbeddingPipeline(config)
         self.chromadb_manager = ChromaDBManager(config)
         self.faiss_manager = FAISSManager(config)
+        self.lexical_index = BM25Index(self.config.bm25_index_path)
+        
+        # Bumped whenever this process changes the indexes
+        self._local_version = 0
+        self.query_embedding_cache = QueryCache(max_size=self.config.query_cache_size)
         
     def _setup_logger(self) -> logging.Logger:
         logger = logging.getLogger("vector_db_manager")
@@ -336,7 +422,7 @@ class VectorDatabaseManager:
         return logger
     
     def add_documents(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]) -> bool:
-        """Add documents to both ChromaDB and FAISS."""
+        """Add documents to ChromaDB, FAISS and the BM25 lexical index."""
         if not documents:
             return False
         
@@ -348,11 +434,17 @@ class VectorDatabaseManager:
             return False
         
         # Add to ChromaDB
-        chroma_success = self.chromadb_manager.add_documents(documents, metadatas, ids)
+        chroma_success = self.chromadb_manager.add_documents(documents, metadatas, ids, embeddings)
         
         # Add to FAISS
         faiss_success = self.faiss_manager.add_vectors(embeddings, metadatas)
         
+        # Index term statistics of the full text for BM25
+        self.lexical_index.add_documents(ids, documents, metadatas)
+        
+        self._local_version += 1
+        self._write_index_generation()
+        
         success = chroma_success and faiss_success
         if success:
             self.logger.info(f"Successfully added {len(documents)} documents to vector databases")
@@ -361,36 +453,146 @@ class VectorDatabaseManager:
         
         return success
     
+    @property
+    def index_version(self) -> Tuple[int, Optional[str]]:
+        """
+        Version of the indexes, for invalidating dependent caches.
+        
+        Combines this process's change counter with the generation token
+        persisted next to the indexes, so ingestion by other processes
+        sharing them also changes the version.
+        """
+        return self._local_version, self._read_index_generation()
+    
+    def _read_index_generation(self) -> Optional[str]:
+        try:
+            with open(self.config.index_version_path, 'r') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _write_index_generation(self):
+        """Replace the persisted generation token with a fresh one."""
+        path = Path(self.config.index_version_path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            tmp_path.write_text(uuid.uuid4().hex)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Failed to persist index version: {e}")
+    
+    def get_documents(self, ids: List[str]) -> Dict[str, str]:
+        """Get stored document text by id (e.g. for BM25 hits, whose index keeps no text)."""
+        return self.chromadb_manager.get_documents(ids)
+    
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed query strings, reusing cached embeddings for repeated queries.
+        
+        All cache misses are encoded together in a single model pass.
+        """
+        keys = [normalize_query(q) for q in queries]
+        embeddings = {}
+        missing = {}
+        for query, key in zip(queries, keys):
+            if key in embeddings or key in missing:
+                continue
+            cached = self.query_embedding_cache.get(key)
+            if cached is not None:
+                embeddings[key] = cached
+            else:
+                missing[key] = query
+        
+        if missing:
+            generated = self.embedding_pipeline.generate_embeddings(list(missing.values()))
+            for key, vector in zip(missing, generated):
+                vector = np.asarray(vector, dtype=np.float32)
+                self.query_embedding_cache.put(key, vector)
+                embeddings[key] = vector
+        
+        return np.vstack([embeddings[key] for key in keys])
+    
     def search_documents(self, query: str, n_results: int = None, use_chromadb: bool = True) -> Dict[str, Any]:
         """Search for similar documents using ChromaDB or FAISS."""
         n_results = n_results or self.config.default_top_k
         
         if use_chromadb:
-            return self.chromadb_manager.search_documents(query, n_results)
+            query_embedding = None
+            if self.embedding_pipeline.model is not None:
+                query_embedding = self.embed_queries([query])[0]
+            return self.chromadb_manager.search_documents(query, n_results, query_embedding)
         else:
             # Use FAISS for search
             try:
-                query_embedding = self.embedding_pipeline.generate_single_embedding(query)
+                query_embedding = self.embed_queries([query])[0]
                 distances, indices = self.faiss_manager.search_vectors(query_embedding, n_results)
                 
-                # Get documents and metadata
-                documents = []
-                metadatas = []
-                for idx in indices:
-                    if idx < len(self.faiss_manager.metadata):
-                        metadatas.append(self.faiss_manager.metadata[idx])
-                        # Note: FAISS doesn't store documents, only vectors
-                        documents.append("")  # Placeholder
-                
-                return {
-                    "documents": [documents],
-                    "metadatas": [metadatas],
-                    "distances": [distances.tolist()]
-                }
+                return self._format_faiss_results(distances, indices)
             except Exception as e:
                 self.logger.error(f"Failed to search with FAISS: {e}")
                 return {"documents": [], "metadatas": [], "distances": []}
     
+    def search_documents_batch(self, queries: List[str], n_results: int = None,
+                               use_chromadb: bool = True) -> List[Dict[str, Any]]:
+        """
+        Search for many queries with one encoder pass and one index search.
+        
+        Returns one result dictionary per query, in the same shape as
+        ``search_documents``.
+        """
+        if not queries:
+            return []
+        
+        n_results = n_results or self.config.default_top_k
+        empty = {"documents": [], "metadatas": [], "distances": []}
+        
+        try:
+            query_embeddings = None
+            if self.embedding_pipeline.model is not None:
+                query_embeddings = self.embed_queries(queries)
+            
+            if use_chromadb:
+                results = self.chromadb_manager.search_documents_batch(queries, n_results, query_embeddings)
+                if not results.get("documents"):
+                    return [dict(empty) for _ in queries]
+                return [
+                    {
+                        "documents": [results["documents"][i]],
+                        "metadatas": [results["metadatas"][i]],
+                        "distances": [results["distances"][i]]
+                    }
+                    for i in range(len(queries))
+                ]
+            
+            if query_embeddings is None:
+                raise RuntimeError("Embedding model not loaded")
+            distances, indices = self.faiss_manager.search_vectors_batch(query_embeddings, n_results)
+            if len(indices) == 0:
+                return [dict(empty) for _ in queries]
+            return [self._format_faiss_results(d, i) for d, i in zip(distances, indices)]
+        except Exception as e:
+            self.logger.error(f"Failed to batch search documents: {e}")
+            return [dict(empty) for _ in queries]
+    
+    def _format_faiss_results(self, distances: np.ndarray, indices: np.ndarray) -> Dict[str, Any]:
+        """Convert raw FAISS output for one query into the search result shape."""
+        documents = []
+        metadatas = []
+        kept_distances = []
+        for distance, idx in zip(distances, indices):
+            if 0 <= idx < len(self.faiss_manager.metadata):
+                metadatas.append(self.faiss_manager.metadata[idx])
+                # Note: FAISS doesn't store documents, only vectors
+                documents.append("")  # Placeholder
+                kept_distances.append(float(distance))
+        
+        return {
+            "documents": [documents],
+            "metadatas": [metadatas],
+            "distances": [kept_distances]
+        }
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector database."""
         stats = {
@@ -404,8 +606,20 @@ class VectorDatabaseManager:
         if self.faiss_manager.index is not None:
             stats["faiss_total_vectors"] = self.faiss_manager.index.ntotal
         
+        stats["index_version"] = self.index_version
+        stats["bm25_index"] = self.lexical_index.get_stats()
+        stats["query_embedding_cache"] = self.query_embedding_cache.get_stats()
+        
         return stats
 
+    def flush(self):
+        """Fold the BM25 journal into its snapshot, e.g. at the end of a bulk ingest."""
+        self.lexical_index.flush()
+
+    def close(self):
+        """Persist pending index state before shutdown."""
+        self.flush()
+
 
 def main():
     """Test the vector database setup."""
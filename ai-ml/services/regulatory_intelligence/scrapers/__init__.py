@@ -7,9 +7,12 @@ PDF documents, and regulatory APIs.
 Provides:
     - DocumentProcessingPipeline: Main orchestrator for all ingestion
     - PDFProcessor: PDF text extraction (PyPDF2, pdfplumber, PyMuPDF)
+    - PDFExtractionEngine: Single-backend, page-parallel PDF extraction
     - SECEdgarScraper: SEC EDGAR filings scraper
     - EURegulatoryScaper: EU regulatory documents scraper
     - RegulatoryAPIConnector: External regulatory API connector
+    - AsyncHttpClient: Concurrent, rate-limited HTTP layer for crawls
+    - CrawlLedger: Persistent document ledger for incremental crawls
 
 Author: REGIQ AI/ML Team
 Version: 1.0.0
@@ -17,9 +20,12 @@ Version: 1.0.0
 
 from .document_pipeline import DocumentProcessingPipeline
 from .pdf_processor import PDFProcessor, PDFMetadata, ExtractedContent
+from .pdf_extraction import PDFExtractionEngine, PageContent, PDFDocumentInfo
 from .sec_edgar_scraper import SECEdgarScraper, SECFiling, ScrapingConfig
 from .eu_regulatory_scraper import EURegulatoryScaper, EURegulatoryDocument
 from .regulatory_api_connector import RegulatoryAPIConnector, APIConfig, RegulatoryAPIData
+from .async_http import AsyncHttpClient, AsyncTokenBucket, ConditionalCache, FetchResult
+from .crawl_ledger import CrawlLedger, LedgerEntry
 
 __version__ = "1.0.0"
 __author__ = "REGIQ AI/ML Team"
@@ -31,6 +37,9 @@ __all__ = [
     "PDFProcessor",
     "PDFMetadata",
     "ExtractedContent",
+    "PDFExtractionEngine",
+    "PageContent",
+    "PDFDocumentInfo",
     # SEC EDGAR
     "SECEdgarScraper",
     "SECFiling",
@@ -42,4 +51,12 @@ __all__ = [
     "RegulatoryAPIConnector",
     "APIConfig",
     "RegulatoryAPIData",
+    # Async HTTP
+    "AsyncHttpClient",
+    "AsyncTokenBucket",
+    "ConditionalCache",
+    "FetchResult",
+    # Crawl ledger
+    "CrawlLedger",
+    "LedgerEntry",
 ]
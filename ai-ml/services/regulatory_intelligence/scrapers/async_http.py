@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Async HTTP Layer
+Concurrent, rate-limited HTTP fetching for regulatory scrapers.
+
+Requests are spread over a pool of keep-alive connections, throttled by a
+token bucket per host (or host suffix, e.g. all of sec.gov), capped by a
+global concurrency limit, and revalidated with conditional GETs
+(ETag / Last-Modified) so unchanged pages are not downloaded again.
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+
+@dataclass
+class FetchResult:
+    """Body and metadata of a successful GET."""
+    url: str
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    encoding: str = "utf-8"
+    not_modified: bool = False  # Served from the conditional cache after a 304
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self._header('etag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self._header('last-modified')
+
+    def _header(self, name: str) -> Optional[str]:
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return None
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket allowing ``rate`` requests per second with bursts up to ``capacity``.
+
+    The default capacity of one token spaces requests 1/rate apart, so no
+    one-second window exceeds the rate (hosts such as SEC EDGAR enforce a
+    hard per-second limit). A larger capacity allows a burst of that many
+    requests on top of the steady rate; the bucket starts with one token
+    either way.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ConditionalCache:
+    """
+    Bounded store of validators and bodies for conditional GETs.
+
+    Entries are keyed by full URL and hold the ETag / Last-Modified
+    headers of the last 200 response together with its body, which is
+    returned when the server answers 304 Not Modified. Both the number of
+    entries and the total size of the stored bodies are bounded; least
+    recently used entries are evicted first, and a body larger than the
+    whole budget is not cached (the next request is a plain GET). Any
+    object with the same get/put interface can be used instead (e.g.
+    CrawlLedger, whose entries carry no body).
+    """
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(entry: Dict[str, Any]) -> int:
+        return len(entry.get('content') or b"")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def put(self, url: str, entry: Dict[str, Any]) -> None:
+        size = self._size(entry)
+        with self._lock:
+            previous = self._entries.pop(url, None)
+            if previous is not None:
+                self._bytes -= self._size(previous)
+            if size > self.max_bytes:
+                return
+            self._entries[url] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= self._size(evicted)
+
+    @property
+    def total_bytes(self) -> int:
+        """Size of the cached bodies."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AsyncHttpClient:
+    """
+    Async HTTP client with per-host rate limits and connection pooling.
+
+    Use as an async context manager; one instance serves one crawl.
+
+    Example:
+        >>> async with AsyncHttpClient("REGIQ", host_rates={"sec.gov": 10}) as client:
+        ...     pages = await client.get_many(urls)
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self,
+                 user_agent: str,
+                 default_rate: float = 1.0,
+                 host_rates: Optional[Dict[str, float]] = None,
+                 max_concurrency: int = 8,
+                 timeout: float = 30.0,
+                 max_retries: int = 3,
+                 backoff_seconds: float = 2.0,
+                 headers: Optional[Dict[str, str]] = None,
+                 conditional_cache: Optional[ConditionalCache] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize async HTTP client.
+
+        Args:
+            user_agent: User-Agent header sent with every request
+            default_rate: Requests per second for hosts not in host_rates
+            host_rates: Requests per second by host or host suffix (e.g. "sec.gov")
+            max_concurrency: Maximum requests in flight across all hosts
+            timeout: Request timeout in seconds
+            max_retries: Attempts per request
+            backoff_seconds: Base delay between retries
+            headers: Extra default headers
+            conditional_cache: Validator store for conditional GETs
+            logger: Logger to report to
+        """
+        if not HTTPX_AVAILABLE:
+            raise RuntimeError("httpx not available. Install with: pip install httpx")
+
+        self.user_agent = user_agent
+        self.default_rate = default_rate
+        self.host_rates = dict(host_rates or {})
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max(1, max_retries)
+        self.backoff_seconds = backoff_seconds
+        self.headers = {'User-Agent': user_agent, **(headers or {})}
+        self.conditional_cache = conditional_cache if conditional_cache is not None else ConditionalCache()
+        self.logger = logger or logging.getLogger('async_http')
+
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._buckets: Dict[str, AsyncTokenBucket] = {}
+        self.stats = {'requests': 0, 'not_modified': 0, 'retries': 0, 'errors': 0}
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            )
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._client.aclose()
+        self._client = None
+        self._buckets.clear()
+
+    def _bucket_for(self, host: str) -> AsyncTokenBucket:
+        """Token bucket for a host, shared by hosts under the same configured suffix."""
+        key, rate, matched = host, self.default_rate, ''
+        for suffix, suffix_rate in self.host_rates.items():
+            # The most specific configured suffix wins
+            if (host == suffix or host.endswith('.' + suffix)) and len(suffix) > len(matched):
+                key, rate, matched = suffix, suffix_rate, suffix
+        if key not in self._buckets:
+            self._buckets[key] = AsyncTokenBucket(rate)
+        return self._buckets[key]
+
+    async def get(self,
+                  url: str,
+                  params: Optional[Dict[str, Any]] = None,
+                  conditional_cache: Optional[Any] = None) -> Optional[FetchResult]:
+        """
+        GET a URL, respecting rate limits and revalidating cached copies.
+
+        Args:
+            url: URL to fetch
+            params: Query parameters
+            conditional_cache: Validator store for this request (defaults to the client's)
+
+        Returns:
+            FetchResult, or None if the request failed. After a 304 the
+            result has ``not_modified`` set and carries the cached body,
+            if the store keeps one.
+        """
+        if self._client is None:
+            raise RuntimeError("AsyncHttpClient must be used as an async context manager")
+
+        cache = conditional_cache if conditional_cache is not None else self.conditional_cache
+        cache_key = str(httpx.URL(url, params=params))
+        cached = cache.get(cache_key)
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        bucket = self._bucket_for(urlparse(cache_key).hostname or '')
+
+        for attempt in range(self.max_retries):
+            await bucket.acquire()
+            try:
+                async with self._semaphore:
+                    self.stats['requests'] += 1
+                    response = await self._client.get(url, params=params, headers=headers)
+            except httpx.HTTPError as e:
+                self.stats['errors'] += 1
+                self.logger.warning(f"Request failed (attempt {attempt + 1}): {e}")
+                if attempt < self.max_retries - 1:
+                    self.stats['retries'] += 1
+                    await asyncio.sleep(self.backoff_seconds * (attempt + 1))
+                continue
+
+            if response.status_code == 304 and cached:
+                self.stats['not_modified'] += 1
+                return FetchResult(cache_key, 200, cached.get('content') or b"", cached.get('headers') or {},
+                                   cached.get('encoding') or 'utf-8', not_modified=True)
+
+            if response.status_code == 200:
+                result = FetchResult(cache_key, 200, response.content, dict(response.headers),
+                                     response.encoding or 'utf-8')
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if etag or last_modified:
+                    cache.put(cache_key, {
+                        'etag': etag,
+                        'last_modified': last_modified,
+                        'content': result.content,
+                        'headers': result.headers,
+                        'encoding': result.encoding,
+                    })
+                return result
+
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries - 1:
+                wait_time = self._retry_after(response) or self.backoff_seconds * (attempt + 1)
+                self.logger.warning(f"HTTP {response.status_code}: {url}. Waiting {wait_time:.1f} seconds...")
+                self.stats['retries'] += 1
+                await asyncio.sleep(wait_time)
+                continue
+
+            self.logger.warning(f"HTTP {response.status_code}: {url}")
+            return None
+
+        return None
+
+    async def get_many(self,
+                       urls: Iterable[str],
+                       conditional_cache: Optional[Any] = None) -> List[Optional[FetchResult]]:
+        """GET several URLs concurrently, preserving order."""
+        return await asyncio.gather(*(self.get(url, conditional_cache=conditional_cache) for url in urls))
+
+    @staticmethod
+    def _retry_after(response: "httpx.Response") -> Optional[float]:
+        """Seconds requested by a Retry-After header, if numeric."""
+        try:
+            return float(response.headers.get('Retry-After', ''))
+        except ValueError:
+            return None
+
+
+def run_sync(coroutine: Awaitable) -> Any:
+    """
+    Run a coroutine from synchronous code.
+
+    Uses a private event loop, on a helper thread if the caller is
+    already inside a running loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
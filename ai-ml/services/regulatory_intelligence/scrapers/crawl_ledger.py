@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Crawl Ledger
+Persistent record of every document the pipeline has ingested.
+
+Each document (keyed by source and accession number or URL) stores its
+content hash, HTTP validators and the last pipeline stage it completed,
+along with that stage's output. Unchanged documents are skipped end to
+end on the next run, changed ones restart from download, and documents
+interrupted mid-pipeline resume from the stage after the last one recorded.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+DEFAULT_LEDGER_PATH = "data/crawl_ledger.db"
+
+# Pipeline stages in order
+STAGE_DOWNLOADED = "downloaded"
+STAGE_ANALYZED = "analyzed"
+STAGE_SAVED = "saved"
+STAGES = (STAGE_DOWNLOADED, STAGE_ANALYZED, STAGE_SAVED)
+
+
+def content_hash(content: Union[str, bytes]) -> str:
+    """SHA-256 of document content."""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+@dataclass
+class LedgerEntry:
+    """Ledger state of one document."""
+    key: str
+    source: str
+    url: Optional[str]
+    accession_number: Optional[str]
+    content_hash: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stage: str
+    result: Optional[Dict[str, Any]]
+    updated_at: float
+    changed: bool = False  # Content differed from the previous run
+
+    def reached(self, stage: str) -> bool:
+        """True if the document completed the given stage."""
+        return STAGES.index(self.stage) >= STAGES.index(stage)
+
+    @property
+    def analyzed(self) -> bool:
+        """True if the document was saved with its AI analysis."""
+        return self.reached(STAGE_SAVED) and bool((self.result or {}).get("analyzed"))
+
+    def completed(self, analyze_with_ai: bool) -> bool:
+        """True if a run with these options has nothing left to do for the document."""
+        return self.reached(STAGE_SAVED) and (self.analyzed or not analyze_with_ai)
+
+
+class CrawlLedger:
+    """
+    SQLite-backed ledger of crawled documents and their pipeline stage.
+
+    Also acts as the conditional-GET cache for document downloads: it
+    hands out ETag / Last-Modified validators only for documents saved
+    with their AI analysis, so a 304 means there is nothing left to do,
+    while unfinished or unanalyzed documents are downloaded in full to
+    resume processing.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_LEDGER_PATH):
+        """
+        Initialize crawl ledger.
+
+        Args:
+            db_path: SQLite database path
+        """
+        self.logger = self._setup_logging()
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_ledger (
+                doc_key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                url TEXT,
+                accession_number TEXT,
+                content_hash TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                stage TEXT NOT NULL,
+                result TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_crawl_ledger_url ON crawl_ledger(url)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_crawl_ledger_accession ON crawl_ledger(accession_number)")
+        self.conn.commit()
+
+    def _setup_logging(self) -> logging.Logger:
+        """Setup logging for crawl ledger."""
+        logger = logging.getLogger('crawl_ledger')
+        logger.setLevel(logging.INFO)
+
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+
+        return logger
+
+    @staticmethod
+    def key_for(source: str, identifier: str) -> str:
+        """Ledger key of a document (identifier is an accession number, URL or path)."""
+        return f"{source}:{identifier}"
+
+    def get_entry(self, key: str) -> Optional[LedgerEntry]:
+        """Get the ledger entry of a document."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT doc_key, source, url, accession_number, content_hash, etag, last_modified, "
+                "stage, result, updated_at FROM crawl_ledger WHERE doc_key = ?",
+                (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return LedgerEntry(*row[:8], json.loads(row[8]) if row[8] else None, row[9])
+
+    def record_content(self,
+                       key: str,
+                       source: str,
+                       content: Union[str, bytes],
+                       url: Optional[str] = None,
+                       accession_number: Optional[str] = None,
+                       etag: Optional[str] = None,
+                       last_modified: Optional[str] = None) -> LedgerEntry:
+        """
+        Record downloaded content and detect changes.
+
+        New or changed content resets the document to the download stage
+        and drops earlier stage results; unchanged content keeps its stage
+        and only refreshes the validators.
+
+        Returns:
+            Updated entry, with ``changed`` set for new or changed content
+        """
+        digest = content_hash(content)
+        previous = self.get_entry(key)
+        changed = previous is None or previous.content_hash != digest
+        now = time.time()
+
+        with self.lock:
+            if changed:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO crawl_ledger VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, ?)",
+                    (key, source, url, accession_number, digest, etag, last_modified, STAGE_DOWNLOADED, now)
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE crawl_ledger SET etag = ?, last_modified = ?, updated_at = ? WHERE doc_key = ?",
+                    (etag, last_modified, now, key)
+                )
+            self.conn.commit()
+
+        entry = self.get_entry(key)
+        entry.changed = changed
+        return entry
+
+    def mark_stage(self, key: str, stage: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record that a document completed a stage.
+
+        Args:
+            key: Ledger key
+            stage: Completed stage
+            result: Stage output to keep for resumed runs (kept if None)
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+
+        with self.lock:
+            if result is None:
+                self.conn.execute(
+                    "UPDATE crawl_ledger SET stage = ?, updated_at = ? WHERE doc_key = ?",
+                    (stage, time.time(), key)
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE crawl_ledger SET stage = ?, result = ?, updated_at = ? WHERE doc_key = ?",
+                    (stage, json.dumps(result, default=str), time.time(), key)
+                )
+            self.conn.commit()
+
+    # Conditional-GET cache interface (see AsyncHttpClient)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Validators for a URL, only if its document was saved with its analysis."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, result FROM crawl_ledger WHERE url = ? AND stage = ? "
+                "AND (etag IS NOT NULL OR last_modified IS NOT NULL)",
+                (url, STAGE_SAVED)
+            ).fetchone()
+        if not row or not (json.loads(row[2]) if row[2] else {}).get("analyzed"):
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'content': None}
+
+    def put(self, url: str, entry: Dict[str, Any]) -> None:
+        """No-op: validators are stored with the content by record_content."""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Count documents per stage."""
+        with self.lock:
+            rows = self.conn.execute("SELECT stage, COUNT(*) FROM crawl_ledger GROUP BY stage").fetchall()
+        counts = {stage: 0 for stage in STAGES}
+        counts.update(dict(rows))
+        return {'documents': sum(counts.values()), 'stages': counts}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
@@ -26,9 +26,11 @@ try:
     from .sec_edgar_scraper import SECEdgarScraper
     from .eu_regulatory_scraper import EURegulatoryScaper
     from .regulatory_api_connector import RegulatoryAPIConnector
+    from .crawl_ledger import CrawlLedger, DEFAULT_LEDGER_PATH, STAGE_SAVED
     PROCESSORS_AVAILABLE = True
 except ImportError as e:
     PROCESSORS_AVAILABLE = False
+    DEFAULT_LEDGER_PATH = "data/crawl_ledger.db"
     print(f"⚠️  Some processors not available: {e}")
 
 
@@ -36,15 +38,29 @@ class DocumentProcessingPipeline:
     """
     Main document processing pipeline orchestrator.
     Coordinates all document processing activities and provides unified interface.
+    
+    In incremental mode every PDF and scraped document is tracked in a
+    crawl ledger, so repeated runs skip unchanged documents and resume
+    documents interrupted mid-pipeline.
     """
     
-    def __init__(self):
-        """Initialize document processing pipeline."""
+    def __init__(self, incremental: bool = True, ledger_path: str = DEFAULT_LEDGER_PATH):
+        """
+        Initialize document processing pipeline.
+        
+        Args:
+            incremental: Skip documents unchanged since the last run
+            ledger_path: Crawl ledger database path
+        """
         self.env_config = get_env_config()
         self.gemini_manager = GeminiAPIManager()
         self.logger = self._setup_logging()
+        self.incremental = incremental
+        self.ledger_path = ledger_path
+        self.pdf_skipped_unchanged = 0
         
         # Initialize processors
+        self.ledger = None
         self.pdf_processor = None
         self.sec_scraper = None
         self.eu_scraper = None
@@ -69,9 +85,11 @@ class DocumentProcessingPipeline:
         """Initialize all document processors."""
         try:
             if PROCESSORS_AVAILABLE:
+                if self.incremental:
+                    self.ledger = CrawlLedger(self.ledger_path)
                 self.pdf_processor = PDFProcessor()
-                self.sec_scraper = SECEdgarScraper()
-                self.eu_scraper = EURegulatoryScaper()
+                self.sec_scraper = SECEdgarScraper(ledger=self.ledger)
+                self.eu_scraper = EURegulatoryScaper(ledger=self.ledger)
                 self.api_connector = RegulatoryAPIConnector()
                 self.logger.info("✅ All processors initialized successfully")
             else:
@@ -79,12 +97,20 @@ class DocumentProcessingPipeline:
         except Exception as e:
             self.logger.error(f"Error initializing processors: {e}")
     
+    def close(self):
+        """Release processor resources (the PDF extraction worker pool)."""
+        if self.pdf_processor:
+            self.pdf_processor.close()
+    
     def process_pdf_documents(self, 
                             pdf_paths: List[str], 
                             analyze_with_ai: bool = True) -> List[Dict[str, Any]]:
         """
         Process multiple PDF documents.
         
+        With a crawl ledger, PDFs whose file content is unchanged since
+        they were last processed (with AI analysis, if requested) are skipped.
+        
         Args:
             pdf_paths: List of PDF file paths
             analyze_with_ai: Whether to analyze with Gemini
@@ -99,13 +125,30 @@ class DocumentProcessingPipeline:
             return []
         
         results = []
+        self.pdf_skipped_unchanged = 0
         
         for pdf_path in pdf_paths:
             try:
+                entry = None
+                if self.ledger is not None:
+                    entry = self.ledger.record_content(
+                        CrawlLedger.key_for("PDF", str(Path(pdf_path).resolve())),
+                        "PDF",
+                        Path(pdf_path).read_bytes(),
+                        url=str(Path(pdf_path).resolve())
+                    )
+                    if entry.completed(analyze_with_ai):
+                        self.pdf_skipped_unchanged += 1
+                        continue
+                
                 self.logger.info(f"Processing: {pdf_path}")
                 result = self.pdf_processor.process_regulatory_pdf(pdf_path, analyze_with_ai)
                 results.append(result)
                 
+                # Only fully successful runs are recorded, so failures are retried next time
+                if entry and "error" not in result and "error" not in result.get("ai_analysis", {}):
+                    self.ledger.mark_stage(entry.key, STAGE_SAVED, {"analyzed": analyze_with_ai})
+                
             except Exception as e:
                 self.logger.error(f"Error processing {pdf_path}: {e}")
                 results.append({
@@ -114,7 +157,8 @@ class DocumentProcessingPipeline:
                     "processing_timestamp": datetime.now().isoformat()
                 })
         
-        self.logger.info(f"✅ PDF processing completed: {len(results)} documents")
+        self.logger.info(f"✅ PDF processing completed: {len(results)} documents, "
+                         f"{self.pdf_skipped_unchanged} unchanged skipped")
         return results
     
     def scrape_regulatory_websites(self, 
@@ -268,7 +312,8 @@ class DocumentProcessingPipeline:
                 "scraping_sources": scraping_sources or [],
                 "api_requests": len(api_requests) if api_requests else 0
             },
-            "results": {}
+            "results": {},
+            "skipped_unchanged": {}
         }
         
         # 1. Process PDF documents
@@ -276,6 +321,7 @@ class DocumentProcessingPipeline:
             self.logger.info("📄 Phase 1: PDF Processing")
             pdf_results = self.process_pdf_documents(pdf_paths, analyze_with_ai)
             results["results"]["pdf_processing"] = pdf_results
+            results["skipped_unchanged"]["PDF"] = self.pdf_skipped_unchanged
         
         # 2. Web scraping
         if scraping_sources:
@@ -284,6 +330,10 @@ class DocumentProcessingPipeline:
                 scraping_sources, days_back, analyze_with_ai
             )
             results["results"]["web_scraping"] = scraping_results
+            if 'SEC' in scraping_results:
+                results["skipped_unchanged"]["SEC"] = self.sec_scraper.skipped_unchanged
+            if 'EU' in scraping_results:
+                results["skipped_unchanged"]["EU"] = self.eu_scraper.skipped_unchanged
         
         # 3. API data collection
         if api_requests or not pdf_paths and not scraping_sources:  # Default if nothing specified
@@ -309,6 +359,7 @@ class DocumentProcessingPipeline:
             "successful_operations": 0,
             "failed_operations": 0,
             "ai_analyses_completed": 0,
+            "unchanged_documents_skipped": sum(results.get("skipped_unchanged", {}).values()),
             "data_sources_used": [],
             "processing_phases": []
         }
@@ -448,6 +499,7 @@ def main():
         print(f"   Successful operations: {summary.get('successful_operations', 0)}")
         print(f"   Failed operations: {summary.get('failed_operations', 0)}")
         print(f"   AI analyses: {summary.get('ai_analyses_completed', 0)}")
+        print(f"   Unchanged skipped: {summary.get('unchanged_documents_skipped', 0)}")
         print(f"   Data sources: {', '.join(summary.get('data_sources_used', []))}")
         print(f"   Duration: {results.get('pipeline_duration', 'Unknown')}")
         
@@ -456,6 +508,8 @@ def main():
         
     except Exception as e:
         print(f"❌ Pipeline test failed: {e}")
+    finally:
+        pipeline.close()
 
 
 if __name__ == "__main__":
@@ -18,6 +18,7 @@ from urllib.parse import urljoin, urlparse
 import json
 import sqlite3
 import re
+import asyncio
 
 # Web scraping libraries
 try:
@@ -37,6 +38,11 @@ sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 
 from config.env_config import get_env_config
 from config.gemini_config import GeminiAPIManager
+from services.regulatory_intelligence.llm.response_cache import get_shared_response_cache
+from services.regulatory_intelligence.scrapers.async_http import AsyncHttpClient, ConditionalCache, run_sync
+from services.regulatory_intelligence.scrapers.crawl_ledger import (
+    CrawlLedger, LedgerEntry, STAGE_ANALYZED, STAGE_SAVED
+)
 
 
 @dataclass
@@ -96,17 +102,44 @@ class EURegulatoryScaper:
         }
     }
     
-    def __init__(self, rate_limit_delay: float = 2.0):
-        """Initialize EU regulatory scraper."""
+    # Listing page (REGULATORY_SITES key) and parser per agency
+    LISTING_PAGES = {
+        "ESMA": ("news_url", "_parse_esma_listing"),
+        "EBA": ("publications_url", "_parse_eba_listing"),
+        "ECB": ("news_url", "_parse_ecb_listing"),
+    }
+    
+    def __init__(self,
+                 rate_limit_delay: float = 2.0,
+                 requests_per_second: Optional[float] = None,
+                 max_concurrency: int = 8,
+                 ledger: Optional[CrawlLedger] = None):
+        """
+        Initialize EU regulatory scraper.
+        
+        Args:
+            rate_limit_delay: Seconds between sequential requests
+            requests_per_second: Per-agency rate for concurrent crawls (defaults to 1 / rate_limit_delay)
+            max_concurrency: Requests in flight during concurrent crawls
+            ledger: Crawl ledger for incremental crawls (every document is processed if None)
+        """
         self.rate_limit_delay = rate_limit_delay
+        self.requests_per_second = requests_per_second or 1.0 / rate_limit_delay
+        self.max_concurrency = max_concurrency
+        self.ledger = ledger
+        self.skipped_unchanged = 0
         self.env_config = get_env_config()
         self.gemini_manager = GeminiAPIManager()
+        self.llm_cache = get_shared_response_cache()
         self.logger = self._setup_logging()
         self.session = self._setup_session()
         
         # Rate limiting
         self.last_request_time = 0
         
+        # Validators for conditional GETs across crawls
+        self.conditional_cache = ConditionalCache()
+        
         if not WEB_SCRAPING_AVAILABLE:
             self.logger.warning("Web scraping libraries not available. Limited functionality.")
     
@@ -165,18 +198,40 @@ class EURegulatoryScaper:
             self.logger.error(f"Request failed: {e}")
             return None
     
+    def _http_client(self) -> AsyncHttpClient:
+        """Create an async HTTP client for one concurrent crawl."""
+        # Each agency host gets its own bucket, so agencies are crawled in parallel
+        return AsyncHttpClient(
+            user_agent=self.session.headers['User-Agent'],
+            default_rate=self.requests_per_second,
+            max_concurrency=self.max_concurrency,
+            headers={
+                'Accept': self.session.headers['Accept'],
+                'Accept-Language': self.session.headers['Accept-Language'],
+            },
+            conditional_cache=self.conditional_cache,
+            logger=self.logger
+        )
+    
     def scrape_esma_publications(self, days_back: int = 30, max_results: int = 50) -> List[EURegulatoryDocument]:
         """Scrape ESMA publications and news."""
         self.logger.info("🇪🇺 Scraping ESMA publications")
         
-        documents = []
-        
         # Scrape ESMA news
         news_url = self.REGULATORY_SITES["ESMA"]["news_url"]
         response = self._make_request(news_url)
         
-        if response:
-            soup = BeautifulSoup(response.content, 'html.parser')
+        documents = self._parse_esma_listing(response.content, days_back, max_results) if response else []
+        
+        self.logger.info(f"✅ Found {len(documents)} ESMA documents")
+        return documents
+    
+    def _parse_esma_listing(self, html: bytes, days_back: int, max_results: int) -> List[EURegulatoryDocument]:
+        """Parse the ESMA news listing page."""
+        documents = []
+        
+        if html:
+            soup = BeautifulSoup(html, 'html.parser')
             
             # Find news articles (ESMA-specific selectors)
             news_items = soup.find_all(['article', 'div'], class_=re.compile(r'news|article|item'))
@@ -216,21 +271,27 @@ class EURegulatoryScaper:
                 except Exception as e:
                     self.logger.warning(f"Error parsing ESMA item: {e}")
         
-        self.logger.info(f"✅ Found {len(documents)} ESMA documents")
         return documents
     
     def scrape_eba_publications(self, days_back: int = 30, max_results: int = 50) -> List[EURegulatoryDocument]:
         """Scrape EBA publications and consultations."""
         self.logger.info("🏦 Scraping EBA publications")
         
-        documents = []
-        
         # Scrape EBA publications
         pub_url = self.REGULATORY_SITES["EBA"]["publications_url"]
         response = self._make_request(pub_url)
         
-        if response:
-            soup = BeautifulSoup(response.content, 'html.parser')
+        documents = self._parse_eba_listing(response.content, days_back, max_results) if response else []
+        
+        self.logger.info(f"✅ Found {len(documents)} EBA documents")
+        return documents
+    
+    def _parse_eba_listing(self, html: bytes, days_back: int, max_results: int) -> List[EURegulatoryDocument]:
+        """Parse the EBA publications listing page."""
+        documents = []
+        
+        if html:
+            soup = BeautifulSoup(html, 'html.parser')
             
             # Find publication items
             pub_items = soup.find_all(['div', 'article'], class_=re.compile(r'publication|document|item'))
@@ -268,21 +329,27 @@ class EURegulatoryScaper:
                 except Exception as e:
                     self.logger.warning(f"Error parsing EBA item: {e}")
         
-        self.logger.info(f"✅ Found {len(documents)} EBA documents")
         return documents
     
     def scrape_ecb_publications(self, days_back: int = 30, max_results: int = 50) -> List[EURegulatoryDocument]:
         """Scrape ECB press releases and publications."""
         self.logger.info("🏛️ Scraping ECB publications")
         
-        documents = []
-        
         # Scrape ECB press releases
         press_url = self.REGULATORY_SITES["ECB"]["news_url"]
         response = self._make_request(press_url)
         
-        if response:
-            soup = BeautifulSoup(response.content, 'html.parser')
+        documents = self._parse_ecb_listing(response.content, days_back, max_results) if response else []
+        
+        self.logger.info(f"✅ Found {len(documents)} ECB documents")
+        return documents
+    
+    def _parse_ecb_listing(self, html: bytes, days_back: int, max_results: int) -> List[EURegulatoryDocument]:
+        """Parse the ECB press release listing page."""
+        documents = []
+        
+        if html:
+            soup = BeautifulSoup(html, 'html.parser')
             
             # Find press release items
             press_items = soup.find_all(['div', 'article'], class_=re.compile(r'press|news|item'))
@@ -316,7 +383,6 @@ class EURegulatoryScaper:
                 except Exception as e:
                     self.logger.warning(f"Error parsing ECB item: {e}")
         
-        self.logger.info(f"✅ Found {len(documents)} ECB documents")
         return documents
     
     def _parse_date(self, date_text: str) -> str:
@@ -365,8 +431,15 @@ class EURegulatoryScaper:
         response = self._make_request(document.url)
         
         if response:
+            return self._extract_main_content(response.content)
+        
+        return None
+    
+    def _extract_main_content(self, html: bytes) -> str:
+        """Extract the main text of a document page."""
+        if html:
             # Parse HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(html, 'html.parser')
             
             # Remove script and style elements
             for script in soup(["script", "style", "nav", "header", "footer"]):
@@ -393,7 +466,7 @@ class EURegulatoryScaper:
             
             return content
         
-        return None
+        return ""
     
     def analyze_document_with_gemini(self, document: EURegulatoryDocument, content: str) -> Dict[str, Any]:
         """
@@ -438,16 +511,21 @@ Format your response as JSON with these keys: regulatory_focus, key_requirements
 """
         
         try:
-            response = self.gemini_manager.generate_content(
+            # Unchanged documents reuse the cached analysis instead of a new API call
+            response, model_used = self.llm_cache.get_or_generate_with_model(
                 analysis_prompt,
-                model="gemini-2.5-flash"
+                "gemini-2.5-flash",
+                lambda: self.gemini_manager.generate_content_with_model(
+                    analysis_prompt,
+                    model="gemini-2.5-flash"
+                )
             )
             
             if response:
                 return {
                     "gemini_analysis": response,
                     "analysis_timestamp": datetime.now().isoformat(),
-                    "model_used": "gemini-2.5-flash",
+                    "model_used": model_used,
                     "document_metadata": document.__dict__
                 }
             else:
@@ -457,6 +535,37 @@ Format your response as JSON with these keys: regulatory_focus, key_requirements
             self.logger.error(f"Gemini analysis error: {e}")
             return {"error": f"Analysis failed: {str(e)}"}
     
+    def _build_document_result(self,
+                               agency: str,
+                               document: EURegulatoryDocument,
+                               content: str,
+                               analyze_with_ai: bool,
+                               entry: Optional[LedgerEntry] = None) -> Dict[str, Any]:
+        """Build the result record for a downloaded document, reusing ledger results."""
+        result = {
+            "agency": agency,
+            "document": document.__dict__,
+            "content_length": len(content),
+            "download_timestamp": datetime.now().isoformat(),
+            "content": content[:10000]  # Store first 10k chars
+        }
+        
+        # AI Analysis
+        if analyze_with_ai and content:
+            if entry and entry.reached(STAGE_ANALYZED) and "ai_analysis" in (entry.result or {}):
+                # Analysis finished in an interrupted run
+                ai_analysis = entry.result["ai_analysis"]
+            else:
+                ai_analysis = self.analyze_document_with_gemini(document, content)
+                if entry and "error" not in ai_analysis:
+                    self.ledger.mark_stage(entry.key, STAGE_ANALYZED, {"ai_analysis": ai_analysis})
+            result["ai_analysis"] = ai_analysis
+        
+        if entry:
+            result["ledger_key"] = entry.key
+        
+        return result
+    
     def scrape_all_agencies(self, 
                           agencies: List[str] = None,
                           days_back: int = 30,
@@ -465,6 +574,11 @@ Format your response as JSON with these keys: regulatory_focus, key_requirements
         """
         Scrape documents from multiple EU regulatory agencies.
         
+        Agencies and documents are fetched concurrently within each
+        agency's rate limit; see scrape_all_agencies_async. With a crawl
+        ledger, documents already processed and unchanged since the last
+        run are skipped.
+        
         Args:
             agencies: List of agency codes (ESMA, EBA, ECB, etc.)
             days_back: Number of days to look back
@@ -474,60 +588,110 @@ Format your response as JSON with these keys: regulatory_focus, key_requirements
         Returns:
             List of document results with analysis
         """
+        return run_sync(self.scrape_all_agencies_async(agencies, days_back, max_results_per_agency, analyze_with_ai))
+    
+    async def scrape_all_agencies_async(self,
+                                        agencies: List[str] = None,
+                                        days_back: int = 30,
+                                        max_results_per_agency: int = 20,
+                                        analyze_with_ai: bool = True) -> List[Dict[str, Any]]:
+        """
+        Scrape documents from multiple EU regulatory agencies concurrently.
+        
+        Args:
+            agencies: List of agency codes (ESMA, EBA, ECB, etc.)
+            days_back: Number of days to look back
+            max_results_per_agency: Max results per agency
+            analyze_with_ai: Whether to analyze with Gemini
+            
+        Returns:
+            List of document results with analysis, in agency order
+        """
         if agencies is None:
             agencies = ["ESMA", "EBA", "ECB"]
         
         self.logger.info(f"🇪🇺 Scraping {len(agencies)} EU regulatory agencies")
+        self.skipped_unchanged = 0
         
-        all_results = []
+        async with self._http_client() as client:
+            agency_results = await asyncio.gather(*(
+                self._scrape_agency_async(client, agency, days_back, max_results_per_agency, analyze_with_ai)
+                for agency in agencies
+            ))
         
-        # Agency-specific scraping methods
-        scraping_methods = {
-            "ESMA": self.scrape_esma_publications,
-            "EBA": self.scrape_eba_publications,
-            "ECB": self.scrape_ecb_publications,
-        }
+        all_results = [result for results in agency_results for result in results]
+        self.logger.info(f"✅ EU scraping completed: {len(all_results)} documents processed, "
+                         f"{self.skipped_unchanged} unchanged skipped")
+        return all_results
+    
+    async def _scrape_agency_async(self,
+                                   client: AsyncHttpClient,
+                                   agency: str,
+                                   days_back: int,
+                                   max_results: int,
+                                   analyze_with_ai: bool) -> List[Dict[str, Any]]:
+        """Fetch, download and analyze the recent documents of one agency."""
+        if agency not in self.LISTING_PAGES or agency not in self.REGULATORY_SITES:
+            self.logger.warning(f"No scraping method for agency: {agency}")
+            return []
         
-        for agency in agencies:
-            if agency in scraping_methods:
-                try:
-                    self.logger.info(f"📊 Processing agency: {agency}")
-                    
-                    # Get documents
-                    documents = scraping_methods[agency](days_back, max_results_per_agency)
-                    
-                    # Process each document
-                    for document in documents:
-                        try:
-                            # Download content
-                            content = self.download_document_content(document)
-                            
-                            if content:
-                                result = {
-                                    "agency": agency,
-                                    "document": document.__dict__,
-                                    "content_length": len(content),
-                                    "download_timestamp": datetime.now().isoformat(),
-                                    "content": content[:10000]  # Store first 10k chars
-                                }
-                                
-                                # AI Analysis
-                                if analyze_with_ai and content:
-                                    ai_analysis = self.analyze_document_with_gemini(document, content)
-                                    result["ai_analysis"] = ai_analysis
-                                
-                                all_results.append(result)
-                            
-                        except Exception as e:
-                            self.logger.error(f"Error processing document {document.title}: {e}")
-                
-                except Exception as e:
-                    self.logger.error(f"Error processing agency {agency}: {e}")
-            else:
-                self.logger.warning(f"No scraping method for agency: {agency}")
+        try:
+            self.logger.info(f"📊 Processing agency: {agency}")
+            
+            url_key, parser_name = self.LISTING_PAGES[agency]
+            listing_url = self.REGULATORY_SITES[agency][url_key]
+            parse_listing = getattr(self, parser_name)
+            response = await client.get(listing_url)
+            documents = await asyncio.to_thread(
+                parse_listing, response.content, days_back, max_results
+            ) if response else []
+            
+            # Download all documents of the agency concurrently; fully processed
+            # documents are revalidated against the ledger
+            downloads = await client.get_many((document.url for document in documents),
+                                              conditional_cache=self.ledger)
         
-        self.logger.info(f"✅ EU scraping completed: {len(all_results)} documents processed")
-        return all_results
+        except Exception as e:
+            self.logger.error(f"Error processing agency {agency}: {e}")
+            return []
+        
+        async def process(document: EURegulatoryDocument, download) -> Optional[Dict[str, Any]]:
+            # Parsing and Gemini calls are blocking; keep them off the event loop
+            content = await asyncio.to_thread(self._extract_main_content, download.content)
+            if not content:
+                return None
+            
+            entry = None
+            if self.ledger is not None:
+                # Hash the extracted text so page chrome changes do not count as edits
+                entry = self.ledger.record_content(
+                    CrawlLedger.key_for("EU", download.url), "EU", content, url=download.url,
+                    etag=download.etag, last_modified=download.last_modified
+                )
+                if entry.completed(analyze_with_ai):
+                    self.skipped_unchanged += 1
+                    return None
+            
+            return await asyncio.to_thread(self._build_document_result, agency, document, content,
+                                           analyze_with_ai, entry)
+        
+        pending = []
+        for document, download in zip(documents, downloads):
+            if download and download.not_modified and self.ledger is not None:
+                self.skipped_unchanged += 1
+            elif download:
+                pending.append((document, download))
+        outcomes = await asyncio.gather(*(process(document, download) for document, download in pending),
+                                        return_exceptions=True)
+        
+        results = []
+        for (document, _), outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error(f"Error processing document {document.title}: {outcome}")
+            elif outcome:
+                results.append(outcome)
+        
+        return results
     
     def save_results_to_database(self, results: List[Dict[str, Any]], db_path: str = "data/eu_regulatory.db"):
         """Save scraping results to SQLite database."""
@@ -556,6 +720,7 @@ Format your response as JSON with these keys: regulatory_focus, key_requirements
         """)
         
         # Insert results
+        saved_keys = []
         for result in results:
             try:
                 document = result.get('document', {})
@@ -576,6 +741,9 @@ Format your response as JSON with these keys: regulatory_focus, key_requirements
                     json.dumps(ai_analysis, default=str),
                     result.get('download_timestamp')
                 ))
+                # Failed analyses are not recorded, so the next crawl retries them
+                if result.get('ledger_key') and "error" not in ai_analysis:
+                    saved_keys.append((result['ledger_key'], "ai_analysis" in result))
                 
             except sqlite3.IntegrityError:
                 # Document already exists
@@ -586,6 +754,12 @@ Format your response as JSON with these keys: regulatory_focus, key_requirements
         conn.commit()
         conn.close()
         
+        # Saved documents are skipped by later crawls until they change; documents
+        # saved without analysis are picked up again by runs that analyze
+        if self.ledger is not None:
+            for key, analyzed in saved_keys:
+                self.ledger.mark_stage(key, STAGE_SAVED, {"analyzed": analyzed})
+        
         self.logger.info("✅ EU regulatory results saved to database")
 
 
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - PDF Extraction Engine
+Single-pass, page-parallel text extraction for regulatory PDFs.
+
+Each document is read with one backend only: the first of PyMuPDF,
+pdfplumber and PyPDF2 that yields text for a sample of pages. Metadata
+comes from the same open handle. Pages are extracted in contiguous
+ranges on a process pool and streamed back in page order, and table
+extraction only runs on pages whose text looks tabular.
+"""
+
+import os
+import re
+import logging
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    PDFPLUMBER_AVAILABLE = False
+
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+
+@dataclass
+class PageContent:
+    """Content extracted from one page."""
+    page_number: int  # 1-based
+    text: str
+    tables: List[Dict] = field(default_factory=list)
+    images: List[Dict] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass
+class PDFDocumentInfo:
+    """Backend selection and metadata of a PDF, read from a single open."""
+    path: str
+    backend: str
+    page_count: int
+    file_size: int
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class PageTextView(Sequence):
+    """
+    Per-page view over a document's full text.
+
+    Pages are sliced out of the full text on access, so page texts are
+    not stored a second time.
+    """
+
+    def __init__(self, text: str, spans: List[Tuple[int, int]]):
+        self._text = text
+        self._spans = spans
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._text[start:end] for start, end in self._spans[index]]
+        start, end = self._spans[index]
+        return self._text[start:end]
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    @property
+    def spans(self) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each page in the full text."""
+        return list(self._spans)
+
+    def __repr__(self) -> str:
+        return f"PageTextView(pages={len(self)})"
+
+
+@dataclass
+class PDFExtraction:
+    """Result of extracting a whole PDF."""
+    info: PDFDocumentInfo
+    text: str
+    page_texts: PageTextView
+    tables: List[Dict]
+    images: List[Dict]
+
+
+# Backends
+
+def _clean_metadata(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in values.items() if value not in (None, "")}
+
+
+class PyMuPDFBackend:
+    """Fastest backend; also reports images and (PyMuPDF >= 1.23) tables."""
+
+    def __init__(self, path: str):
+        self.doc = fitz.open(path)
+        self.page_count = self.doc.page_count
+
+    def metadata(self) -> Dict[str, Any]:
+        meta = self.doc.metadata or {}
+        return _clean_metadata({
+            'title': meta.get('title'),
+            'author': meta.get('author'),
+            'subject': meta.get('subject'),
+            'creator': meta.get('creator'),
+            'producer': meta.get('producer'),
+            'creation_date': meta.get('creationDate'),
+            'modification_date': meta.get('modDate'),
+        })
+
+    def page_text(self, index: int) -> str:
+        return self.doc[index].get_text()
+
+    def page_tables(self, index: int) -> List[Tuple[Any, Optional[Tuple]]]:
+        page = self.doc[index]
+        if not hasattr(page, 'find_tables'):
+            return []
+        return [(table.extract(), tuple(table.bbox)) for table in page.find_tables().tables]
+
+    def page_images(self, index: int) -> List[Dict]:
+        page = self.doc[index]
+        images = []
+        for img_index, img in enumerate(page.get_images()):
+            try:
+                bbox = tuple(page.get_image_bbox(img))
+            except Exception:
+                bbox = None
+            images.append({'image_num': img_index + 1, 'xref': img[0], 'bbox': bbox})
+        return images
+
+    def close(self) -> None:
+        self.doc.close()
+
+
+class PdfPlumberBackend:
+    """Layout-aware backend with table support."""
+
+    def __init__(self, path: str):
+        self.pdf = pdfplumber.open(path)
+        self.page_count = len(self.pdf.pages)
+
+    def metadata(self) -> Dict[str, Any]:
+        meta = self.pdf.metadata or {}
+        return _clean_metadata({
+            'title': meta.get('Title'),
+            'author': meta.get('Author'),
+            'subject': meta.get('Subject'),
+            'creator': meta.get('Creator'),
+            'producer': meta.get('Producer'),
+            'creation_date': meta.get('CreationDate'),
+            'modification_date': meta.get('ModDate'),
+        })
+
+    def page_text(self, index: int) -> str:
+        return self.pdf.pages[index].extract_text() or ""
+
+    def page_tables(self, index: int) -> List[Tuple[Any, Optional[Tuple]]]:
+        return [(table.extract(), tuple(table.bbox)) for table in self.pdf.pages[index].find_tables()]
+
+    def page_images(self, index: int) -> List[Dict]:
+        return [
+            {'image_num': img_index + 1, 'bbox': (img.get('x0'), img.get('top'), img.get('x1'), img.get('bottom'))}
+            for img_index, img in enumerate(self.pdf.pages[index].images)
+        ]
+
+    def close(self) -> None:
+        self.pdf.close()
+
+
+class PyPDF2Backend:
+    """Pure-Python fallback; text only."""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        self.reader = PyPDF2.PdfReader(self.file)
+        self.page_count = len(self.reader.pages)
+
+    def metadata(self) -> Dict[str, Any]:
+        meta = self.reader.metadata or {}
+        return _clean_metadata({
+            'title': meta.get('/Title'),
+            'author': meta.get('/Author'),
+            'subject': meta.get('/Subject'),
+            'creator': meta.get('/Creator'),
+            'producer': meta.get('/Producer'),
+            'creation_date': meta.get('/CreationDate'),
+            'modification_date': meta.get('/ModDate'),
+        })
+
+    def page_text(self, index: int) -> str:
+        return self.reader.pages[index].extract_text() or ""
+
+    def page_tables(self, index: int) -> List[Tuple[Any, Optional[Tuple]]]:
+        return []
+
+    def page_images(self, index: int) -> List[Dict]:
+        return []
+
+    def close(self) -> None:
+        self.file.close()
+
+
+# Backends in order of preference (cheapest first); only installed ones are registered
+BACKEND_ORDER = ("pymupdf", "pdfplumber", "pypdf2")
+PDF_BACKENDS: Dict[str, type] = {}
+if PYMUPDF_AVAILABLE:
+    PDF_BACKENDS["pymupdf"] = PyMuPDFBackend
+if PDFPLUMBER_AVAILABLE:
+    PDF_BACKENDS["pdfplumber"] = PdfPlumberBackend
+if PYPDF2_AVAILABLE:
+    PDF_BACKENDS["pypdf2"] = PyPDF2Backend
+
+
+def available_backends() -> List[str]:
+    """Installed backends in order of preference."""
+    return [name for name in BACKEND_ORDER if name in PDF_BACKENDS] + \
+           [name for name in PDF_BACKENDS if name not in BACKEND_ORDER]
+
+
+_COLUMN_ROW = re.compile(r'\S+(?:\s{2,}|\t)\S+(?:\s{2,}|\t)\S+')
+_NUMERIC_CELL = re.compile(r'^[\s$€£(+-]*\d[\d,.]*\s*[%)]?\s*$')
+
+
+def looks_tabular(text: str, min_rows: int = 3) -> bool:
+    """
+    Cheap test for pages likely to contain tables.
+
+    Matches runs of lines with three or more whitespace-separated columns,
+    or (for backends that emit one cell per line) a high share of purely
+    numeric lines.
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) < min_rows:
+        return False
+    if sum(1 for line in lines if _COLUMN_ROW.search(line)) >= min_rows:
+        return True
+    numeric = sum(1 for line in lines if _NUMERIC_CELL.match(line))
+    return numeric >= 2 * min_rows and numeric >= 0.25 * len(lines)
+
+
+def iter_page_range(path: str,
+                    backend: str,
+                    start: int,
+                    end: int,
+                    detect_tables: bool = True) -> Iterator[PageContent]:
+    """Extract pages [start, end) of a PDF with one backend, opening it once."""
+    return _iter_pages(PDF_BACKENDS[backend], path, start, end, detect_tables)
+
+
+def _iter_pages(reader_cls: type, path: str, start: int, end: int, detect_tables: bool) -> Iterator[PageContent]:
+    reader = reader_cls(path)
+    try:
+        for index in range(start, min(end, reader.page_count)):
+            try:
+                text = reader.page_text(index)
+                page = PageContent(index + 1, text, images=reader.page_images(index))
+                if detect_tables and looks_tabular(text):
+                    page.tables = [
+                        {'page': index + 1, 'table_num': table_num + 1, 'data': data, 'bbox': bbox}
+                        for table_num, (data, bbox) in enumerate(reader.page_tables(index))
+                    ]
+                for image in page.images:
+                    image['page'] = index + 1
+                yield page
+            except Exception as e:
+                yield PageContent(index + 1, "", error=str(e))
+    finally:
+        reader.close()
+
+
+def _extract_page_range(reader_cls: type, path: str, start: int, end: int, detect_tables: bool) -> List[PageContent]:
+    """Process-pool task: extract a contiguous page range (the backend class is pickled by reference)."""
+    return list(_iter_pages(reader_cls, path, start, end, detect_tables))
+
+
+class PDFExtractionEngine:
+    """
+    Page-parallel PDF extraction with single-backend selection.
+
+    Example:
+        >>> engine = PDFExtractionEngine(max_workers=4)
+        >>> for page in engine.iter_pages("filing.pdf"):
+        ...     print(page.page_number, len(page.text))
+    """
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 pages_per_task: int = 16,
+                 parallel_threshold: int = 32,
+                 sample_pages: int = 3,
+                 detect_tables: bool = True,
+                 backend_order: Optional[Tuple[str, ...]] = None):
+        """
+        Initialize PDF extraction engine.
+
+        Args:
+            max_workers: Worker processes for page extraction (CPU count if None)
+            pages_per_task: Pages extracted per worker task
+            parallel_threshold: Documents with fewer pages are extracted in-process
+            sample_pages: Pages probed when choosing a backend
+            detect_tables: Extract tables from pages that look tabular
+            backend_order: Backend preference (installed backends by default)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = max(1, pages_per_task)
+        self.parallel_threshold = parallel_threshold
+        self.sample_pages = sample_pages
+        self.detect_tables = detect_tables
+        self.backend_order = tuple(backend_order) if backend_order else tuple(available_backends())
+        self.logger = self._setup_logging()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _setup_logging(self) -> logging.Logger:
+        """Setup logging for PDF extraction engine."""
+        logger = logging.getLogger('pdf_extraction')
+        logger.setLevel(logging.INFO)
+
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+
+        return logger
+
+    def inspect(self, path: str, backend: Optional[str] = None) -> PDFDocumentInfo:
+        """
+        Choose a backend for a PDF and read its metadata.
+
+        Backends are probed in order of preference until one yields text
+        for the first pages; scanned documents without a text layer keep
+        the first backend that could open them.
+
+        Args:
+            path: PDF file path
+            backend: Force a backend instead of probing
+
+        Returns:
+            Document info with the chosen backend
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"PDF file not found: {path}")
+
+        candidates = (backend,) if backend else self.backend_order
+        if not candidates:
+            raise RuntimeError("No PDF backend available. Install with: pip install pymupdf")
+
+        fallback = None
+        for name in candidates:
+            if name not in PDF_BACKENDS:
+                raise ValueError(f"Unknown or unavailable PDF backend: {name}")
+            try:
+                reader = PDF_BACKENDS[name](path)
+            except Exception as e:
+                self.logger.warning(f"{name} could not open {path}: {e}")
+                continue
+            try:
+                info = PDFDocumentInfo(path, name, reader.page_count, os.path.getsize(path), reader.metadata())
+                has_text = any(
+                    reader.page_text(index).strip()
+                    for index in range(min(self.sample_pages, reader.page_count))
+                )
+            except Exception as e:
+                self.logger.warning(f"{name} failed on {path}: {e}")
+                continue
+            finally:
+                reader.close()
+
+            if has_text or backend:
+                return info
+            fallback = fallback or info
+
+        if fallback is None:
+            raise RuntimeError(f"No PDF backend could read {path}")
+        self.logger.warning(f"No text layer found in {path}")
+        return fallback
+
+    def _page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        return [(start, min(start + self.pages_per_task, page_count))
+                for start in range(0, page_count, self.pages_per_task)]
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def iter_pages(self, path: str, info: Optional[PDFDocumentInfo] = None) -> Iterator[PageContent]:
+        """
+        Stream the pages of a PDF in page order.
+
+        Large documents are split into page ranges extracted on the process
+        pool; at most two ranges per worker are in flight, so memory stays
+        bounded however many pages the document has.
+        """
+        info = info or self.inspect(path)
+
+        if info.page_count < self.parallel_threshold or self.max_workers == 1:
+            yield from iter_page_range(path, info.backend, 0, info.page_count, self.detect_tables)
+            return
+
+        executor = self._get_executor()
+        reader_cls = PDF_BACKENDS[info.backend]
+        ranges = iter(self._page_ranges(info.page_count))
+        pending = deque()
+        for start, end in ranges:
+            pending.append(executor.submit(_extract_page_range, reader_cls, path, start, end, self.detect_tables))
+            if len(pending) >= 2 * self.max_workers:
+                break
+
+        while pending:
+            pages = pending.popleft().result()
+            next_range = next(ranges, None)
+            if next_range:
+                pending.append(executor.submit(_extract_page_range, reader_cls, path, *next_range,
+                                               self.detect_tables))
+            yield from pages
+
+    def extract(self, path: str, backend: Optional[str] = None) -> PDFExtraction:
+        """
+        Extract a whole PDF.
+
+        The full text (with page markers) is assembled once from the page
+        stream; per-page texts are views into it.
+        """
+        info = self.inspect(path, backend)
+        parts, spans, tables, images = [], [], [], []
+        offset = 0
+
+        for page in self.iter_pages(path, info):
+            if page.error:
+                self.logger.warning(f"Error extracting page {page.page_number}: {page.error}")
+            header = f"\n--- Page {page.page_number} ---\n"
+            parts.append(header)
+            parts.append(page.text)
+            parts.append("\n")
+            start = offset + len(header)
+            spans.append((start, start + len(page.text)))
+            offset = start + len(page.text) + 1
+            tables.extend(page.tables)
+            images.extend(page.images)
+
+        text = "".join(parts)
+        del parts
+        return PDFExtraction(info, text, PageTextView(text, spans), tables, images)
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "PDFExtractionEngine":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
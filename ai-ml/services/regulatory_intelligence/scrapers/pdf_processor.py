@@ -7,29 +7,45 @@ Integrates with Gemini 2.5-flash for intelligent document analysis.
 
 import os
 import sys
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Sequence, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime
 
-# PDF Processing Libraries
+# Table extraction (optional)
 try:
-    import PyPDF2
-    import pdfplumber
-    import fitz  # PyMuPDF
     import tabula
-    PDF_LIBRARIES_AVAILABLE = True
-except ImportError as e:
-    PDF_LIBRARIES_AVAILABLE = False
-    print(f"⚠️  PDF libraries not installed: {e}")
-    print("   Install with: pip install PyPDF2 pdfplumber pymupdf tabula-py")
+    TABULA_AVAILABLE = True
+except ImportError:
+    TABULA_AVAILABLE = False
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 
 from config.env_config import get_env_config
 from config.gemini_config import GeminiAPIManager
+from services.regulatory_intelligence.llm.response_cache import get_shared_response_cache
+from services.regulatory_intelligence.llm.prompt_coalescer import PromptCoalescer, PromptTask
+from services.regulatory_intelligence.scrapers.pdf_extraction import PDFExtractionEngine, available_backends
+
+PDF_LIBRARIES_AVAILABLE = bool(available_backends())
+if not PDF_LIBRARIES_AVAILABLE:
+    print("⚠️  PDF libraries not installed")
+    print("   Install with: pip install pymupdf pdfplumber PyPDF2")
+
+
+ANALYSIS_SCHEMA = {
+    "document_type": "string",
+    "key_topics": ["string"],
+    "important_dates": ["string"],
+    "requirements": ["string"],
+    "penalties": ["string"],
+    "entities": ["string"],
+    "summary": "string",
+}
 
 
 @dataclass
@@ -54,24 +70,40 @@ class ExtractedContent:
     tables: List[Dict] = None
     images: List[Dict] = None
     metadata: PDFMetadata = None
-    page_texts: List[str] = None
+    page_texts: Sequence[str] = None
     structured_data: Dict = None
 
 
 class PDFProcessor:
     """
     Advanced PDF processing for regulatory documents.
-    Uses multiple libraries for robust extraction and Gemini for analysis.
+    Extracts each document with a single backend, page-parallel, and uses Gemini for analysis.
     """
     
-    def __init__(self):
-        """Initialize PDF processor."""
+    def __init__(self, max_workers: Optional[int] = None, max_parallel_files: int = 2):
+        """
+        Initialize PDF processor.
+        
+        Args:
+            max_workers: Worker processes for page extraction (CPU count if None)
+            max_parallel_files: Files processed concurrently by batch_process_pdfs
+        """
         self.env_config = get_env_config()
         self.gemini_manager = GeminiAPIManager()
+        self.llm_cache = get_shared_response_cache()
         self.logger = self._setup_logging()
+        self.max_parallel_files = max(1, max_parallel_files)
         
         if not PDF_LIBRARIES_AVAILABLE:
             raise ImportError("PDF processing libraries not available. Please install required packages.")
+        
+        self.engine = PDFExtractionEngine(max_workers=max_workers)
+        # Batch analyses share requests; results are cached per document
+        self.coalescer = PromptCoalescer(
+            lambda prompt: self.gemini_manager.generate_content_with_model(prompt, model="gemini-2.5-flash"),
+            model="gemini-2.5-flash",
+            cache=self.llm_cache
+        )
     
     def _setup_logging(self) -> logging.Logger:
         """Setup logging for PDF processor."""
@@ -85,107 +117,54 @@ class PDFProcessor:
             logger.addHandler(handler)
         
         return logger
+
+    def close(self) -> None:
+        """Shut down the extraction engine's worker pool."""
+        self.engine.close()
+
+    def __enter__(self) -> "PDFProcessor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _extract_with(self, pdf_path: str, backend: str):
+        """Extract a PDF with a specific backend."""
+        return self.engine.extract(pdf_path, backend=backend)
     
-    def extract_text_pypdf2(self, pdf_path: str) -> Tuple[str, List[str]]:
+    def extract_text_pypdf2(self, pdf_path: str) -> Tuple[str, Sequence[str]]:
         """Extract text using PyPDF2 (good for simple PDFs)."""
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                
-                full_text = ""
-                page_texts = []
-                
-                for page_num, page in enumerate(reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        page_texts.append(page_text)
-                        full_text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
-                    except Exception as e:
-                        self.logger.warning(f"Error extracting page {page_num + 1}: {e}")
-                        page_texts.append("")
-                
-                return full_text, page_texts
-                
+            extraction = self._extract_with(pdf_path, "pypdf2")
+            return extraction.text, extraction.page_texts
         except Exception as e:
             self.logger.error(f"PyPDF2 extraction failed: {e}")
             return "", []
     
-    def extract_text_pdfplumber(self, pdf_path: str) -> Tuple[str, List[str], List[Dict]]:
+    def extract_text_pdfplumber(self, pdf_path: str) -> Tuple[str, Sequence[str], List[Dict]]:
         """Extract text and tables using pdfplumber (good for complex layouts)."""
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                full_text = ""
-                page_texts = []
-                tables = []
-                
-                for page_num, page in enumerate(pdf.pages):
-                    try:
-                        # Extract text
-                        page_text = page.extract_text() or ""
-                        page_texts.append(page_text)
-                        full_text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
-                        
-                        # Extract tables
-                        page_tables = page.extract_tables()
-                        if page_tables:
-                            for table_num, table in enumerate(page_tables):
-                                tables.append({
-                                    'page': page_num + 1,
-                                    'table_num': table_num + 1,
-                                    'data': table,
-                                    'bbox': page.within_bbox(page.bbox).extract_tables()[table_num] if hasattr(page, 'bbox') else None
-                                })
-                    
-                    except Exception as e:
-                        self.logger.warning(f"Error processing page {page_num + 1}: {e}")
-                        page_texts.append("")
-                
-                return full_text, page_texts, tables
-                
+            extraction = self._extract_with(pdf_path, "pdfplumber")
+            return extraction.text, extraction.page_texts, extraction.tables
         except Exception as e:
             self.logger.error(f"pdfplumber extraction failed: {e}")
             return "", [], []
     
-    def extract_text_pymupdf(self, pdf_path: str) -> Tuple[str, List[str], List[Dict]]:
+    def extract_text_pymupdf(self, pdf_path: str) -> Tuple[str, Sequence[str], List[Dict]]:
         """Extract text and images using PyMuPDF (good for complex documents)."""
         try:
-            doc = fitz.open(pdf_path)
-            full_text = ""
-            page_texts = []
-            images = []
-            
-            for page_num in range(doc.page_count):
-                try:
-                    page = doc[page_num]
-                    
-                    # Extract text
-                    page_text = page.get_text()
-                    page_texts.append(page_text)
-                    full_text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
-                    
-                    # Extract images
-                    image_list = page.get_images()
-                    for img_index, img in enumerate(image_list):
-                        images.append({
-                            'page': page_num + 1,
-                            'image_num': img_index + 1,
-                            'xref': img[0],
-                            'bbox': page.get_image_bbox(img)
-                        })
-                
-                except Exception as e:
-                    self.logger.warning(f"Error processing page {page_num + 1}: {e}")
-                    page_texts.append("")
-            
-            doc.close()
-            return full_text, page_texts, images
-            
+            extraction = self._extract_with(pdf_path, "pymupdf")
+            return extraction.text, extraction.page_texts, extraction.images
         except Exception as e:
             self.logger.error(f"PyMuPDF extraction failed: {e}")
             return "", [], []
     
     def extract_tables_tabula(self, pdf_path: str) -> List[Dict]:
         """Extract tables using tabula-py (specialized for tables)."""
+        if not TABULA_AVAILABLE:
+            self.logger.warning("tabula-py not installed. Install with: pip install tabula-py")
+            return []
+        
         try:
             # Extract all tables from all pages
             tables = tabula.read_pdf(pdf_path, pages='all', multiple_tables=True)
@@ -205,28 +184,20 @@ class PDFProcessor:
             self.logger.error(f"Tabula table extraction failed: {e}")
             return []
     
+    @staticmethod
+    def _to_pdf_metadata(info) -> PDFMetadata:
+        """Convert engine document info to PDFMetadata."""
+        return PDFMetadata(
+            filename=os.path.basename(info.path),
+            file_size=info.file_size,
+            page_count=info.page_count,
+            **info.metadata
+        )
+    
     def get_pdf_metadata(self, pdf_path: str) -> PDFMetadata:
         """Extract PDF metadata."""
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                metadata = reader.metadata or {}
-                
-                file_stats = os.stat(pdf_path)
-                
-                return PDFMetadata(
-                    filename=os.path.basename(pdf_path),
-                    file_size=file_stats.st_size,
-                    page_count=len(reader.pages),
-                    title=metadata.get('/Title'),
-                    author=metadata.get('/Author'),
-                    subject=metadata.get('/Subject'),
-                    creator=metadata.get('/Creator'),
-                    producer=metadata.get('/Producer'),
-                    creation_date=metadata.get('/CreationDate'),
-                    modification_date=metadata.get('/ModDate')
-                )
-                
+            return self._to_pdf_metadata(self.engine.inspect(pdf_path))
         except Exception as e:
             self.logger.error(f"Metadata extraction failed: {e}")
             return PDFMetadata(
@@ -237,71 +208,29 @@ class PDFProcessor:
     
     def process_pdf_comprehensive(self, pdf_path: str) -> ExtractedContent:
         """
-        Comprehensive PDF processing using multiple methods.
-        Combines results from different libraries for best extraction.
+        Comprehensive PDF processing in a single pass.
+        
+        The cheapest backend that yields text (PyMuPDF first) reads the
+        file once for metadata, text, images and tables; pages are
+        extracted in parallel and tables only on pages that look tabular.
         """
         self.logger.info(f"🔍 Processing PDF: {pdf_path}")
         
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
-        # Get metadata
-        metadata = self.get_pdf_metadata(pdf_path)
-        self.logger.info(f"📄 PDF Info: {metadata.page_count} pages, {metadata.file_size} bytes")
-        
-        # Try multiple extraction methods
-        best_text = ""
-        best_page_texts = []
-        tables = []
-        images = []
-        
-        # Method 1: pdfplumber (best for complex layouts)
-        try:
-            text1, page_texts1, tables1 = self.extract_text_pdfplumber(pdf_path)
-            if len(text1) > len(best_text):
-                best_text = text1
-                best_page_texts = page_texts1
-            tables.extend(tables1)
-            self.logger.info("✅ pdfplumber extraction successful")
-        except Exception as e:
-            self.logger.warning(f"pdfplumber failed: {e}")
-        
-        # Method 2: PyMuPDF (good for images and complex docs)
-        try:
-            text2, page_texts2, images2 = self.extract_text_pymupdf(pdf_path)
-            if len(text2) > len(best_text):
-                best_text = text2
-                best_page_texts = page_texts2
-            images.extend(images2)
-            self.logger.info("✅ PyMuPDF extraction successful")
-        except Exception as e:
-            self.logger.warning(f"PyMuPDF failed: {e}")
-        
-        # Method 3: PyPDF2 (fallback)
-        if not best_text:
-            try:
-                text3, page_texts3 = self.extract_text_pypdf2(pdf_path)
-                best_text = text3
-                best_page_texts = page_texts3
-                self.logger.info("✅ PyPDF2 extraction successful (fallback)")
-            except Exception as e:
-                self.logger.error(f"All extraction methods failed: {e}")
-        
-        # Method 4: Specialized table extraction
-        try:
-            tabula_tables = self.extract_tables_tabula(pdf_path)
-            tables.extend(tabula_tables)
-            self.logger.info(f"✅ Extracted {len(tabula_tables)} tables with tabula")
-        except Exception as e:
-            self.logger.warning(f"Tabula table extraction failed: {e}")
+        extraction = self.engine.extract(pdf_path)
+        metadata = self._to_pdf_metadata(extraction.info)
+        self.logger.info(f"📄 PDF Info: {metadata.page_count} pages, {metadata.file_size} bytes, "
+                         f"extracted with {extraction.info.backend}")
         
         return ExtractedContent(
-            text=best_text,
-            tables=tables,
-            images=images,
+            text=extraction.text,
+            tables=extraction.tables,
+            images=extraction.images,
             metadata=metadata,
-            page_texts=best_page_texts,
-            structured_data={}
+            page_texts=extraction.page_texts,
+            structured_data={"extraction_backend": extraction.info.backend}
         )
     
     def analyze_with_gemini(self, content: ExtractedContent) -> Dict[str, Any]:
@@ -314,17 +243,51 @@ class PDFProcessor:
         if not content.text.strip():
             return {"error": "No text content to analyze"}
         
-        # Prepare analysis prompt
-        analysis_prompt = f"""
+        analysis_prompt = self._analysis_prompt(
+            content.metadata.filename if content.metadata else 'Unknown',
+            content.metadata.page_count if content.metadata else 'Unknown',
+            len(content.tables) if content.tables else 0,
+            content.text
+        )
+        
+        try:
+            # Unchanged documents reuse the cached analysis instead of a new API call
+            response, model_used = self.llm_cache.get_or_generate_with_model(
+                analysis_prompt,
+                "gemini-2.5-flash",
+                lambda: self.gemini_manager.generate_content_with_model(
+                    analysis_prompt,
+                    model="gemini-2.5-flash"
+                )
+            )
+            
+            if response:
+                self.logger.info("✅ Gemini analysis completed")
+                return {
+                    "gemini_analysis": response,
+                    "analysis_timestamp": datetime.now().isoformat(),
+                    "model_used": model_used
+                }
+            else:
+                return {"error": "Gemini analysis failed"}
+                
+        except Exception as e:
+            self.logger.error(f"Gemini analysis error: {e}")
+            return {"error": f"Analysis failed: {str(e)}"}
+    
+    @staticmethod
+    def _analysis_prompt(filename: str, page_count: Any, table_count: int, text: str) -> str:
+        """Analysis prompt for one document."""
+        return f"""
 Analyze this regulatory document and provide a structured analysis:
 
 DOCUMENT METADATA:
-- Filename: {content.metadata.filename if content.metadata else 'Unknown'}
-- Pages: {content.metadata.page_count if content.metadata else 'Unknown'}
-- Tables found: {len(content.tables) if content.tables else 0}
+- Filename: {filename}
+- Pages: {page_count}
+- Tables found: {table_count}
 
 DOCUMENT TEXT (first 3000 characters):
-{content.text[:3000]}...
+{text[:3000]}...
 
 Please provide:
 1. DOCUMENT TYPE: What type of regulatory document is this?
@@ -337,27 +300,44 @@ Please provide:
 
 Format your response as JSON with these keys: document_type, key_topics, important_dates, requirements, penalties, entities, summary
 """
+    
+    def analyze_many_with_gemini(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several extracted documents, packing them into shared Gemini requests.
         
-        try:
-            # Use Gemini 2.5-flash for analysis
-            response = self.gemini_manager.generate_content(
-                analysis_prompt,
-                model="gemini-2.5-flash"
-            )
+        Args:
+            documents: process_regulatory_pdf results (without AI analysis)
             
-            if response:
-                self.logger.info("✅ Gemini analysis completed")
-                return {
-                    "gemini_analysis": response,
+        Returns:
+            One analysis per document, shaped like analyze_with_gemini's; a
+            failed document gets an error entry without affecting the others
+        """
+        self.logger.info(f"🤖 Analyzing {len(documents)} documents with Gemini 2.5-flash")
+        
+        tasks, positions = [], []
+        for position, document in enumerate(documents):
+            text = document.get("extracted_text", "")
+            if text.strip():
+                metadata = document.get("metadata") or {}
+                tasks.append(PromptTask(self._analysis_prompt(
+                    metadata.get("filename", "Unknown"),
+                    metadata.get("page_count", "Unknown"),
+                    document.get("tables_found", 0),
+                    text
+                ), ANALYSIS_SCHEMA, output_tokens=500))
+                positions.append(position)
+        
+        analyses = [{"error": "No text content to analyze"} for _ in documents]
+        for position, (value, model_used) in zip(positions, self.coalescer.run_with_models(tasks)):
+            if isinstance(value, dict) and "error" in value:
+                analyses[position] = {"error": f"Analysis failed: {value['error']}"}
+            else:
+                analyses[position] = {
+                    "gemini_analysis": json.dumps(value),
                     "analysis_timestamp": datetime.now().isoformat(),
-                    "model_used": "gemini-2.5-flash"
+                    "model_used": model_used
                 }
-            else:
-                return {"error": "Gemini analysis failed"}
-                
-        except Exception as e:
-            self.logger.error(f"Gemini analysis error: {e}")
-            return {"error": f"Analysis failed: {str(e)}"}
+        return analyses
     
     def process_regulatory_pdf(self, pdf_path: str, analyze_with_ai: bool = True) -> Dict[str, Any]:
         """
@@ -384,7 +364,8 @@ Format your response as JSON with these keys: document_type, key_topics, importa
                 "tables_found": len(content.tables) if content.tables else 0,
                 "images_found": len(content.images) if content.images else 0,
                 "extracted_text": content.text,
-                "page_texts": content.page_texts,
+                # Offsets into extracted_text; pages are not stored twice
+                "page_spans": content.page_texts.spans if content.page_texts else [],
                 "tables": content.tables,
                 "images": content.images
             }
@@ -405,13 +386,18 @@ Format your response as JSON with these keys: document_type, key_topics, importa
                 "processing_timestamp": datetime.now().isoformat()
             }
     
-    def batch_process_pdfs(self, pdf_directory: str, output_directory: str = None) -> List[Dict]:
+    def batch_process_pdfs(self, pdf_directory: str, output_directory: str = None,
+                           analyze_with_ai: bool = True) -> List[Dict]:
         """
         Batch process multiple PDFs in a directory.
         
+        Files are extracted concurrently, then analyzed together with
+        coalesced Gemini requests.
+        
         Args:
             pdf_directory: Directory containing PDF files
             output_directory: Directory to save results (optional)
+            analyze_with_ai: Whether to analyze with Gemini
             
         Returns:
             List of processing results
@@ -427,29 +413,29 @@ Format your response as JSON with these keys: document_type, key_topics, importa
         
         self.logger.info(f"📚 Processing {len(pdf_files)} PDF files")
         
-        results = []
-        for pdf_file in pdf_files:
-            try:
-                result = self.process_regulatory_pdf(str(pdf_file))
-                results.append(result)
-                
-                # Save individual result if output directory specified
-                if output_directory:
-                    output_dir = Path(output_directory)
-                    output_dir.mkdir(parents=True, exist_ok=True)
-                    
+        # Pages of each file share the engine's pool
+        with ThreadPoolExecutor(max_workers=self.max_parallel_files) as executor:
+            results = list(executor.map(
+                lambda pdf_file: self.process_regulatory_pdf(str(pdf_file), analyze_with_ai=False),
+                pdf_files
+            ))
+        
+        if analyze_with_ai:
+            extracted = [result for result in results if "error" not in result]
+            for result, analysis in zip(extracted, self.analyze_many_with_gemini(extracted)):
+                result["ai_analysis"] = analysis
+        
+        # Save individual results if output directory specified
+        if output_directory:
+            output_dir = Path(output_directory)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            for pdf_file, result in zip(pdf_files, results):
+                try:
                     output_file = output_dir / f"{pdf_file.stem}_analysis.json"
-                    import json
                     with open(output_file, 'w', encoding='utf-8') as f:
                         json.dump(result, f, indent=2, default=str)
-                
-            except Exception as e:
-                self.logger.error(f"Failed to process {pdf_file}: {e}")
-                results.append({
-                    "error": str(e),
-                    "pdf_path": str(pdf_file),
-                    "processing_timestamp": datetime.now().isoformat()
-                })
+                except Exception as e:
+                    self.logger.error(f"Failed to save result for {pdf_file}: {e}")
         
         self.logger.info(f"✅ Batch processing completed: {len(results)} files processed")
         return results
@@ -460,26 +446,26 @@ def main():
     print("🧪 Testing PDF Processor")
     print("="*50)
     
-    processor = PDFProcessor()
+    with PDFProcessor() as processor:
     
-    # Test with a sample PDF (you would need to provide a real PDF file)
-    test_pdf = "data/sample_regulatory_document.pdf"
+        # Test with a sample PDF (you would need to provide a real PDF file)
+        test_pdf = "data/sample_regulatory_document.pdf"
     
-    if os.path.exists(test_pdf):
-        print(f"📄 Processing: {test_pdf}")
-        result = processor.process_regulatory_pdf(test_pdf)
+        if os.path.exists(test_pdf):
+            print(f"📄 Processing: {test_pdf}")
+            result = processor.process_regulatory_pdf(test_pdf)
         
-        print(f"✅ Processing completed!")
-        print(f"📊 Text length: {result.get('text_length', 0)} characters")
-        print(f"📄 Pages: {result.get('page_count', 0)}")
-        print(f"📋 Tables: {result.get('tables_found', 0)}")
-        print(f"🖼️  Images: {result.get('images_found', 0)}")
+            print(f"✅ Processing completed!")
+            print(f"📊 Text length: {result.get('text_length', 0)} characters")
+            print(f"📄 Pages: {result.get('page_count', 0)}")
+            print(f"📋 Tables: {result.get('tables_found', 0)}")
+            print(f"🖼️  Images: {result.get('images_found', 0)}")
         
-        if 'ai_analysis' in result:
-            print(f"🤖 AI Analysis: Available")
-    else:
-        print(f"⚠️  Test PDF not found: {test_pdf}")
-        print("   Place a sample regulatory PDF in data/ directory to test")
+            if 'ai_analysis' in result:
+                print(f"🤖 AI Analysis: Available")
+        else:
+            print(f"⚠️  Test PDF not found: {test_pdf}")
+            print("   Place a sample regulatory PDF in data/ directory to test")
 
 
 if __name__ == "__main__":
@@ -23,6 +23,7 @@ sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 
 from config.env_config import get_env_config
 from config.gemini_config import GeminiAPIManager
+from services.regulatory_intelligence.llm.response_cache import get_shared_response_cache
 
 
 @dataclass
@@ -95,6 +96,7 @@ class RegulatoryAPIConnector:
         """Initialize regulatory API connector."""
         self.env_config = get_env_config()
         self.gemini_manager = GeminiAPIManager()
+        self.llm_cache = get_shared_response_cache()
         self.logger = self._setup_logging()
         
         # Rate limiting tracking
@@ -350,16 +352,21 @@ class RegulatoryAPIConnector:
             analysis_prompt = self._create_generic_prompt(api_data)
         
         try:
-            response = self.gemini_manager.generate_content(
+            # Unchanged documents reuse the cached analysis instead of a new API call
+            response, model_used = self.llm_cache.get_or_generate_with_model(
                 analysis_prompt,
-                model="gemini-2.5-flash"
+                "gemini-2.5-flash",
+                lambda: self.gemini_manager.generate_content_with_model(
+                    analysis_prompt,
+                    model="gemini-2.5-flash"
+                )
             )
             
             if response:
                 return {
                     "gemini_analysis": response,
                     "analysis_timestamp": datetime.now().isoformat(),
-                    "model_used": "gemini-2.5-flash",
+                    "model_used": model_used,
                     "data_source": api_data.source_api,
                     "data_type": api_data.data_type
                 }
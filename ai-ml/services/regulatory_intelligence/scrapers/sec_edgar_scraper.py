@@ -17,6 +17,7 @@ from datetime import datetime, timedelta
 from urllib.parse import urljoin, urlparse
 import json
 import sqlite3
+import asyncio
 
 # Web scraping libraries
 try:
@@ -37,6 +38,11 @@ sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 
 from config.env_config import get_env_config
 from config.gemini_config import GeminiAPIManager
+from services.regulatory_intelligence.llm.response_cache import get_shared_response_cache
+from services.regulatory_intelligence.scrapers.async_http import AsyncHttpClient, ConditionalCache, run_sync
+from services.regulatory_intelligence.scrapers.crawl_ledger import (
+    CrawlLedger, LedgerEntry, STAGE_ANALYZED, STAGE_SAVED
+)
 
 
 @dataclass
@@ -58,6 +64,8 @@ class SECFiling:
 class ScrapingConfig:
     """Configuration for web scraping."""
     rate_limit_delay: float = 1.0  # Seconds between requests
+    requests_per_second: float = 10.0  # SEC fair access limit for concurrent crawls
+    max_concurrency: int = 8  # Requests in flight during concurrent crawls
     max_retries: int = 3
     timeout: int = 30
     user_agent: str = "REGIQ AI/ML Research Tool (compliance@regiq.com)"
@@ -74,17 +82,29 @@ class SECEdgarScraper:
     EDGAR_SEARCH_URL = "https://www.sec.gov/edgar/search/"
     EDGAR_API_URL = "https://data.sec.gov"
     
-    def __init__(self, config: ScrapingConfig = None):
-        """Initialize SEC EDGAR scraper."""
+    def __init__(self, config: ScrapingConfig = None, ledger: Optional[CrawlLedger] = None):
+        """
+        Initialize SEC EDGAR scraper.
+        
+        Args:
+            config: Scraping configuration
+            ledger: Crawl ledger for incremental crawls (every filing is processed if None)
+        """
         self.config = config or ScrapingConfig()
+        self.ledger = ledger
+        self.skipped_unchanged = 0
         self.env_config = get_env_config()
         self.gemini_manager = GeminiAPIManager()
+        self.llm_cache = get_shared_response_cache()
         self.logger = self._setup_logging()
         self.session = self._setup_session()
         
         # Rate limiting
         self.last_request_time = 0
         
+        # Validators for conditional GETs across crawls
+        self.conditional_cache = ConditionalCache()
+        
         if not WEB_SCRAPING_AVAILABLE:
             self.logger.warning("Web scraping libraries not available. Limited functionality.")
     
@@ -154,6 +174,21 @@ class SECEdgarScraper:
         
         return None
     
+    def _http_client(self) -> AsyncHttpClient:
+        """Create an async HTTP client for one concurrent crawl."""
+        # SEC counts requests per client across all of its hosts
+        return AsyncHttpClient(
+            user_agent=self.config.user_agent,
+            default_rate=self.config.requests_per_second,
+            host_rates={'sec.gov': self.config.requests_per_second},
+            max_concurrency=self.config.max_concurrency,
+            timeout=self.config.timeout,
+            max_retries=self.config.max_retries,
+            headers={'Accept-Encoding': 'gzip, deflate'},
+            conditional_cache=self.conditional_cache,
+            logger=self.logger
+        )
+    
     def search_company_filings(self, 
                              company_name: str = None, 
                              cik: str = None, 
@@ -211,14 +246,7 @@ class SECEdgarScraper:
             return []
         
         try:
-            tickers_data = response.json()
-            
-            # Find matching company
-            matching_cik = None
-            for entry in tickers_data.values():
-                if company_name.lower() in entry.get('title', '').lower():
-                    matching_cik = entry.get('cik_str')
-                    break
+            matching_cik = self._match_company_cik(response.json(), company_name)
             
             if matching_cik:
                 return self.search_company_filings(
@@ -236,6 +264,14 @@ class SECEdgarScraper:
             self.logger.error(f"Failed to parse company tickers: {e}")
             return []
     
+    @staticmethod
+    def _match_company_cik(tickers_data: Dict, company_name: str) -> Optional[str]:
+        """Find the CIK of the first company whose title contains the name."""
+        for entry in tickers_data.values():
+            if company_name.lower() in entry.get('title', '').lower():
+                return entry.get('cik_str')
+        return None
+    
     def _parse_sec_api_response(self, data: Dict, form_types: List[str], 
                                date_from: str, date_to: str, max_results: int) -> List[SECFiling]:
         """Parse SEC API response into SECFiling objects."""
@@ -349,16 +385,21 @@ Format your response as JSON with these keys: document_type, key_business_info,
 """
         
         try:
-            response = self.gemini_manager.generate_content(
+            # Unchanged documents reuse the cached analysis instead of a new API call
+            response, model_used = self.llm_cache.get_or_generate_with_model(
                 analysis_prompt,
-                model="gemini-2.5-flash"
+                "gemini-2.5-flash",
+                lambda: self.gemini_manager.generate_content_with_model(
+                    analysis_prompt,
+                    model="gemini-2.5-flash"
+                )
             )
             
             if response:
                 return {
                     "gemini_analysis": response,
                     "analysis_timestamp": datetime.now().isoformat(),
-                    "model_used": "gemini-2.5-flash",
+                    "model_used": model_used,
                     "filing_metadata": filing.__dict__
                 }
             else:
@@ -368,6 +409,37 @@ Format your response as JSON with these keys: document_type, key_business_info,
             self.logger.error(f"Gemini analysis error: {e}")
             return {"error": f"Analysis failed: {str(e)}"}
     
+    def _build_filing_result(self,
+                             company: str,
+                             filing: SECFiling,
+                             content: str,
+                             analyze_with_ai: bool,
+                             entry: Optional[LedgerEntry] = None) -> Dict[str, Any]:
+        """Build the result record for a downloaded filing, reusing ledger results."""
+        result = {
+            "company": company,
+            "filing": filing.__dict__,
+            "content_length": len(content),
+            "download_timestamp": datetime.now().isoformat(),
+            "content": content[:10000]  # Store first 10k chars
+        }
+        
+        # AI Analysis
+        if analyze_with_ai and content:
+            if entry and entry.reached(STAGE_ANALYZED) and "ai_analysis" in (entry.result or {}):
+                # Analysis finished in an interrupted run
+                ai_analysis = entry.result["ai_analysis"]
+            else:
+                ai_analysis = self.analyze_filing_with_gemini(filing, content)
+                if entry and "error" not in ai_analysis:
+                    self.ledger.mark_stage(entry.key, STAGE_ANALYZED, {"ai_analysis": ai_analysis})
+            result["ai_analysis"] = ai_analysis
+        
+        if entry:
+            result["ledger_key"] = entry.key
+        
+        return result
+    
     def scrape_recent_filings(self, 
                             companies: List[str], 
                             form_types: List[str] = None,
@@ -376,6 +448,10 @@ Format your response as JSON with these keys: document_type, key_business_info,
         """
         Scrape recent filings for multiple companies.
         
+        Companies and filings are fetched concurrently within the SEC rate
+        limit; see scrape_recent_filings_async. With a crawl ledger, filings
+        already processed and unchanged since the last run are skipped.
+        
         Args:
             companies: List of company names or CIKs
             form_types: List of form types to search for
@@ -385,7 +461,27 @@ Format your response as JSON with these keys: document_type, key_business_info,
         Returns:
             List of filing results with analysis
         """
+        return run_sync(self.scrape_recent_filings_async(companies, form_types, days_back, analyze_with_ai))
+    
+    async def scrape_recent_filings_async(self,
+                                          companies: List[str],
+                                          form_types: List[str] = None,
+                                          days_back: int = 30,
+                                          analyze_with_ai: bool = True) -> List[Dict[str, Any]]:
+        """
+        Scrape recent filings for multiple companies concurrently.
+        
+        Args:
+            companies: List of company names or CIKs
+            form_types: List of form types to search for
+            days_back: Number of days to look back
+            analyze_with_ai: Whether to analyze with Gemini
+            
+        Returns:
+            List of filing results with analysis, in company order
+        """
         self.logger.info(f"🔍 Scraping recent filings for {len(companies)} companies")
+        self.skipped_unchanged = 0
         
         # Calculate date range
         end_date = datetime.now()
@@ -394,56 +490,104 @@ Format your response as JSON with these keys: document_type, key_business_info,
         date_from = start_date.strftime('%Y-%m-%d')
         date_to = end_date.strftime('%Y-%m-%d')
         
-        all_results = []
-        
-        for company in companies:
-            try:
-                self.logger.info(f"📊 Processing company: {company}")
-                
-                # Search for filings
-                filings = self.search_company_filings(
-                    company_name=company if not company.isdigit() else None,
-                    cik=company if company.isdigit() else None,
-                    form_types=form_types,
-                    date_from=date_from,
-                    date_to=date_to,
-                    max_results=50
-                )
-                
-                # Process each filing
-                for filing in filings:
-                    try:
-                        # Download content
-                        content = self.download_filing_content(filing)
-                        
-                        if content:
-                            result = {
-                                "company": company,
-                                "filing": filing.__dict__,
-                                "content_length": len(content),
-                                "download_timestamp": datetime.now().isoformat(),
-                                "content": content[:10000]  # Store first 10k chars
-                            }
-                            
-                            # AI Analysis
-                            if analyze_with_ai and content:
-                                ai_analysis = self.analyze_filing_with_gemini(filing, content)
-                                result["ai_analysis"] = ai_analysis
-                            
-                            all_results.append(result)
-                            
-                        else:
-                            self.logger.warning(f"Failed to download: {filing.accession_number}")
-                    
-                    except Exception as e:
-                        self.logger.error(f"Error processing filing {filing.accession_number}: {e}")
+        async with self._http_client() as client:
+            # Company names are resolved against one copy of the tickers file
+            tickers_data = {}
+            if any(not company.isdigit() for company in companies):
+                response = await client.get(f"{self.EDGAR_API_URL}/company_tickers.json")
+                try:
+                    tickers_data = response.json() if response else {}
+                except json.JSONDecodeError as e:
+                    self.logger.error(f"Failed to parse company tickers: {e}")
             
-            except Exception as e:
-                self.logger.error(f"Error processing company {company}: {e}")
-        
-        self.logger.info(f"✅ Scraping completed: {len(all_results)} filings processed")
+            company_results = await asyncio.gather(*(
+                self._scrape_company_async(client, company, tickers_data, form_types,
+                                           date_from, date_to, analyze_with_ai)
+                for company in companies
+            ))
+        
+        all_results = [result for results in company_results for result in results]
+        self.logger.info(f"✅ Scraping completed: {len(all_results)} filings processed, "
+                         f"{self.skipped_unchanged} unchanged skipped")
         return all_results
     
+    async def _scrape_company_async(self,
+                                    client: AsyncHttpClient,
+                                    company: str,
+                                    tickers_data: Dict,
+                                    form_types: List[str],
+                                    date_from: str,
+                                    date_to: str,
+                                    analyze_with_ai: bool) -> List[Dict[str, Any]]:
+        """Fetch, download and analyze the recent filings of one company."""
+        try:
+            self.logger.info(f"📊 Processing company: {company}")
+            
+            cik = company if company.isdigit() else self._match_company_cik(tickers_data, company)
+            if not cik:
+                self.logger.warning(f"Company not found: {company}")
+                return []
+            
+            response = await client.get(f"{self.EDGAR_API_URL}/submissions/CIK{str(cik).zfill(10)}.json")
+            if not response:
+                self.logger.error(f"Failed to fetch data for CIK: {cik}")
+                return []
+            
+            filings = self._parse_sec_api_response(response.json(), form_types, date_from, date_to, 50)
+            
+            # Download all filings of the company concurrently; fully processed
+            # filings are revalidated against the ledger
+            downloads = await client.get_many(
+                (filing.txt_url or filing.document_url for filing in filings),
+                conditional_cache=self.ledger
+            )
+        
+        except Exception as e:
+            self.logger.error(f"Error processing company {company}: {e}")
+            return []
+        
+        downloaded = []
+        for filing, download in zip(filings, downloads):
+            if download and download.not_modified and self.ledger is not None:
+                self.skipped_unchanged += 1
+            elif download and download.content:
+                entry = self._record_download(filing, download)
+                if entry and entry.completed(analyze_with_ai):
+                    self.skipped_unchanged += 1
+                else:
+                    downloaded.append((filing, download.text, entry))
+            else:
+                self.logger.warning(f"Failed to download: {filing.accession_number}")
+        
+        # Gemini calls are blocking; run them on worker threads off the event loop
+        outcomes = await asyncio.gather(*(
+            asyncio.to_thread(self._build_filing_result, company, filing, content, analyze_with_ai, entry)
+            for filing, content, entry in downloaded
+        ), return_exceptions=True)
+        
+        results = []
+        for (filing, _, _), outcome in zip(downloaded, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error(f"Error processing filing {filing.accession_number}: {outcome}")
+            else:
+                results.append(outcome)
+        
+        return results
+    
+    def _record_download(self, filing: SECFiling, download) -> Optional[LedgerEntry]:
+        """Record a downloaded filing in the crawl ledger."""
+        if self.ledger is None:
+            return None
+        return self.ledger.record_content(
+            CrawlLedger.key_for("SEC", filing.accession_number),
+            "SEC",
+            download.content,
+            url=download.url,
+            accession_number=filing.accession_number,
+            etag=download.etag,
+            last_modified=download.last_modified
+        )
+    
     def save_results_to_database(self, results: List[Dict[str, Any]], db_path: str = "data/sec_filings.db"):
         """Save scraping results to SQLite database."""
         self.logger.info(f"💾 Saving {len(results)} results to database")
@@ -471,6 +615,7 @@ Format your response as JSON with these keys: document_type, key_business_info,
         """)
         
         # Insert results
+        saved_keys = []
         for result in results:
             try:
                 filing = result.get('filing', {})
@@ -491,6 +636,9 @@ Format your response as JSON with these keys: document_type, key_business_info,
                     json.dumps(ai_analysis, default=str),
                     result.get('download_timestamp')
                 ))
+                # Failed analyses are not recorded, so the next crawl retries them
+                if result.get('ledger_key') and "error" not in ai_analysis:
+                    saved_keys.append((result['ledger_key'], "ai_analysis" in result))
                 
             except sqlite3.IntegrityError:
                 # Filing already exists
@@ -501,6 +649,12 @@ Format your response as JSON with these keys: document_type, key_business_info,
         conn.commit()
         conn.close()
         
+        # Saved documents are skipped by later crawls until they change; documents
+        # saved without analysis are picked up again by runs that analyze
+        if self.ledger is not None:
+            for key, analyzed in saved_keys:
+                self.ledger.mark_stage(key, STAGE_SAVED, {"analyzed": analyzed})
+        
         self.logger.info("✅ Results saved to database")
 
 
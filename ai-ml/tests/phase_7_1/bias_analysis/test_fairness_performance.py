@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Fairness Metrics Performance Tests
+Test suite for the scalable fairness metric implementations.
+
+Tests:
+    - Individual fairness: batched neighbor search, exact linear-time
+      pairwise similarity, neighbor-based fairness maps and reports
+    - Group statistics kernel shared by the group metric analyzers
+    - Intersectional subgroup cube: roll-ups, pruning and ranking
+    - Streaming audits: chunked and memory-mapped inputs, mergeable statistics
+    - Online monitoring: sliding, tumbling and decaying windows, sequential alerts
+
+All tests run offline on synthetic data.
+
+Author: REGIQ AI/ML Team
+Version: 1.0.0
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from sklearn.metrics import brier_score_loss, confusion_matrix, log_loss
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import StandardScaler
+
+from services.bias_analysis.metrics import individual_fairness
+from services.bias_analysis.metrics.individual_fairness import (
+    IndividualFairnessAnalyzer,
+    IndividualFairnessThreshold,
+)
+from services.bias_analysis.metrics import group_statistics, intersectional_analysis
+from services.bias_analysis.metrics.group_statistics import compute_group_statistics, merge_group_statistics
+from services.bias_analysis.metrics.intersectional_analysis import (
+    IntersectionalAnalyzer,
+    IntersectionalThreshold,
+)
+from services.bias_analysis.metrics.demographic_parity import DemographicParityAnalyzer
+from services.bias_analysis.metrics.equalized_odds import EqualizedOddsAnalyzer
+from services.bias_analysis.metrics.calibration_analysis import CalibrationAnalyzer
+from services.bias_analysis.metrics.streaming_audit import StreamingAuditConfig, StreamingFairnessAuditor
+from services.bias_analysis.scoring.online_monitor import MonitorConfig, OnlineFairnessMonitor
+from services.bias_analysis.mitigation.validation.mitigation_validator import MitigationValidator
+
+
+class TestIndividualFairnessScaling(unittest.TestCase):
+    """Test individual fairness without dense pairwise matrices."""
+
+    def setUp(self):
+        self.analyzer = IndividualFairnessAnalyzer(IndividualFairnessThreshold(min_group_size=10))
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(300, 4))
+        self.y_pred = rng.binomial(1, 0.6, 300)
+        self.protected = rng.choice(["a", "b"], 300)
+
+    def test_similarity_score_matches_dense_formula(self):
+        """The O(n * d) similarity equals the mean of the n x n combined matrix."""
+        rng = np.random.default_rng(1)
+        X_scaled = rng.normal(size=(80, 3))
+        X_scaled[5] = 0.0  # Zero rows have cosine 0 with everything
+        for y_pred in (rng.binomial(1, 0.4, 80), rng.random(80)):
+            combined = (cosine_similarity(X_scaled) + 1 - np.abs(np.subtract.outer(y_pred, y_pred))) / 2
+            mask = ~np.eye(80, dtype=bool)
+            self.assertAlmostEqual(self.analyzer._calculate_similarity_score(X_scaled, y_pred),
+                                   float(np.mean(combined[mask])), places=10)
+
+    def test_batched_neighbors_match_per_row_queries(self):
+        """One kneighbors call gives the per-row consistency of the old loop, duplicates included."""
+        X = np.vstack([self.X, self.X[:20]])  # Exact duplicates
+        y_pred = np.concatenate([self.y_pred, self.y_pred[:20]])
+        X_scaled = self.analyzer._standardize(X)
+        distances, indices, method = self.analyzer._find_neighbors(X_scaled)
+        self.assertEqual(method, "exact")
+        self.assertEqual(indices.shape, (len(X), 5))
+        self.assertFalse(np.any(indices == np.arange(len(X))[:, None]))
+
+        nbrs = NearestNeighbors(n_neighbors=6).fit(X_scaled)
+        reference_distances = np.array([np.sort(nbrs.kneighbors([row])[0][0])[1:] for row in X_scaled])
+        np.testing.assert_allclose(np.sort(distances, axis=1), reference_distances, atol=1e-12)
+
+        consistency = self.analyzer._neighbor_consistency(y_pred, indices)
+        expected = [np.mean(y_pred[indices[i]] == y_pred[i]) for i in range(len(X))]
+        np.testing.assert_allclose(consistency, expected)
+
+    def test_analysis_uses_no_pairwise_matrices(self):
+        """Full analysis runs with pairwise matrix helpers disabled and reports capped lists."""
+        self.analyzer.threshold.max_reported_pairs = 7
+        with mock.patch.object(individual_fairness, "cosine_similarity", side_effect=AssertionError), \
+                mock.patch.object(individual_fairness, "euclidean_distances", side_effect=AssertionError):
+            result = self.analyzer.calculate_individual_fairness(self.X, self.y_pred, self.protected)
+
+        self.assertEqual(sorted(result.groups), ["a", "b"])
+        self.assertEqual(result.metadata["neighbor_search"], {"a": "exact", "b": "exact"})
+        for group in result.groups:
+            fairness_map = result.fairness_maps[group]
+            self.assertLessEqual(len(fairness_map["fairness_violations"]), 7)
+            self.assertGreater(fairness_map["n_violations"], 7)
+            self.assertAlmostEqual(fairness_map["violation_rate"],
+                                   fairness_map["n_violations"] / fairness_map["pairs_evaluated"])
+            distances = [v["distance"] for v in fairness_map["fairness_violations"]]
+            self.assertEqual(distances, sorted(distances))
+
+            report = result.individual_reports[group]
+            self.assertEqual(len(report["individual_metrics"]), 7)
+            self.assertGreaterEqual(report["n_outliers"], len(report["outliers"]))
+
+            group_X = StandardScaler().fit_transform(self.X[self.protected == group])
+            self.assertAlmostEqual(
+                result.similarity_scores[group],
+                self.analyzer._calculate_similarity_score(group_X, self.y_pred[self.protected == group])
+            )
+
+    @unittest.skipUnless(individual_fairness.HNSWLIB_AVAILABLE, "hnswlib not installed")
+    def test_large_groups_use_hnsw(self):
+        """Groups above ann_min_group_size use the approximate index with high recall."""
+        self.analyzer.threshold.ann_min_group_size = 100
+        X_scaled = self.analyzer._standardize(self.X)
+        _, indices, method = self.analyzer._find_neighbors(X_scaled)
+        self.assertEqual(method, "hnsw")
+        exact = NearestNeighbors(n_neighbors=6).fit(X_scaled).kneighbors(X_scaled)[1][:, 1:]
+        recall = np.mean([len(set(a) & set(b)) / 5 for a, b in zip(indices, exact)])
+        self.assertGreater(recall, 0.95)
+
+
+class TestGroupStatistics(unittest.TestCase):
+    """Test the single-pass group statistics kernel."""
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        n = 3000
+        self.groups = rng.choice(["x", "y", "z"], n, p=[0.5, 0.3, 0.2])
+        self.y_true = rng.binomial(1, 0.5, n)
+        self.y_pred = rng.binomial(1, 0.6, n)
+        self.y_prob = rng.random(n)
+        self.y_prob[:20] = 0.0  # Falls in no (lower, upper] bin
+        self.y_prob[20:40] = 0.5  # On a bin boundary
+
+    def test_matches_per_group_masks(self):
+        """Rates, confusion matrices, losses and bins equal the per-mask computations."""
+        stats = compute_group_statistics(self.groups, self.y_true, self.y_pred, self.y_prob,
+                                         protected_groups=["z", "x", "absent"], n_bins=10)
+        self.assertEqual(stats.groups, ["z", "x", "absent"])
+        self.assertEqual(stats.sizes[2], 0)
+        boundaries = np.linspace(0, 1, 11)
+
+        for i, group in enumerate(["z", "x"]):
+            mask = self.groups == group
+            y_true, y_pred, y_prob = self.y_true[mask], self.y_pred[mask], self.y_prob[mask]
+            self.assertEqual(stats.sizes[i], mask.sum())
+            np.testing.assert_array_equal(stats.group_indices()[i], np.flatnonzero(mask))
+            self.assertAlmostEqual(stats.positive_rates[i], y_pred.mean())
+
+            tn, fp, fn, tp = confusion_matrix(y_true, y_pred, labels=[0, 1]).ravel()
+            self.assertEqual(stats.confusion_matrix(i), {"tn": tn, "fp": fp, "fn": fn, "tp": tp})
+            self.assertAlmostEqual(stats.tpr[i], tp / (tp + fn))
+            self.assertAlmostEqual(stats.fpr[i], fp / (fp + tn))
+
+            self.assertAlmostEqual(stats.brier_scores[i], brier_score_loss(y_true, y_prob))
+            self.assertAlmostEqual(stats.log_losses[i], log_loss(y_true, y_prob), places=6)
+
+            ece, mce = 0.0, 0.0
+            for lower, upper in zip(boundaries[:-1], boundaries[1:]):
+                in_bin = (y_prob > lower) & (y_prob <= upper)
+                if in_bin.any():
+                    gap = abs(y_prob[in_bin].mean() - y_true[in_bin].mean())
+                    ece += in_bin.mean() * gap
+                    mce = max(mce, gap)
+            self.assertAlmostEqual(stats.ece[i], ece)
+            self.assertAlmostEqual(stats.mce[i], mce)
+
+    def test_analyzers_share_one_pass(self):
+        """Analyzers give the same results from a shared precomputed kernel."""
+        stats = compute_group_statistics(self.groups, self.y_true, self.y_pred, self.y_prob)
+        dp, eo, cal = DemographicParityAnalyzer(), EqualizedOddsAnalyzer(), CalibrationAnalyzer()
+
+        with mock.patch("services.bias_analysis.metrics.demographic_parity.compute_group_statistics",
+                        side_effect=AssertionError), \
+                mock.patch("services.bias_analysis.metrics.equalized_odds.compute_group_statistics",
+                           side_effect=AssertionError), \
+                mock.patch("services.bias_analysis.metrics.calibration_analysis.compute_group_statistics",
+                           side_effect=AssertionError):
+            shared = (
+                dp.calculate_demographic_parity(self.y_true, self.y_pred, self.groups, group_stats=stats),
+                eo.calculate_equalized_odds(self.y_true, self.y_pred, self.groups, group_stats=stats),
+                cal.calculate_calibration_metrics(self.y_true, self.y_prob, self.groups, group_stats=stats),
+            )
+
+        alone = (
+            dp.calculate_demographic_parity(self.y_true, self.y_pred, self.groups),
+            eo.calculate_equalized_odds(self.y_true, self.y_pred, self.groups),
+            cal.calculate_calibration_metrics(self.y_true, self.y_prob, self.groups),
+        )
+        self.assertEqual(shared[0].positive_rates, alone[0].positive_rates)
+        self.assertEqual(shared[1].metadata["confusion_matrices"], alone[1].metadata["confusion_matrices"])
+        self.assertEqual(shared[2].ece_scores, alone[2].ece_scores)
+        self.assertEqual(shared[2].reliability_diagrams, alone[2].reliability_diagrams)
+
+    def test_validator_metrics_from_kernel(self):
+        """MitigationValidator differences match the analyzers' group results."""
+        validator = MitigationValidator()
+        y_proba = np.column_stack([1 - self.y_prob, self.y_prob])
+        stats = validator._group_statistics(self.y_true, self.y_pred, y_proba, self.groups)
+
+        dp = DemographicParityAnalyzer().calculate_demographic_parity(self.y_true, self.y_pred, self.groups)
+        eo = EqualizedOddsAnalyzer().calculate_equalized_odds(self.y_true, self.y_pred, self.groups)
+        cal = CalibrationAnalyzer().calculate_calibration_metrics(self.y_true, self.y_prob, self.groups)
+
+        self.assertAlmostEqual(validator._calculate_demographic_parity(stats), dp.max_difference)
+        self.assertAlmostEqual(validator._calculate_equalized_odds(stats),
+                               (eo.tpr_difference + eo.fpr_difference) / 2)
+        ece = list(cal.ece_scores.values())
+        self.assertAlmostEqual(validator._calculate_calibration(stats), max(ece) - min(ece))
+        self.assertIsNone(validator._calculate_calibration(
+            validator._group_statistics(self.y_true, self.y_pred, None, self.groups)
+        ))
+
+    def test_invalid_inputs_raise(self):
+        """Mismatched lengths and out-of-range probabilities are rejected."""
+        with self.assertRaises(ValueError):
+            compute_group_statistics(["a", "b"], y_true=[1, 0], y_pred=[1])
+        with self.assertRaises(ValueError):
+            compute_group_statistics(["a", "b"], y_true=[1, 0], y_prob=[2.0, -1.0])
+
+
+class TestIntersectionalAnalysis(unittest.TestCase):
+    """Test the intersectional subgroup cube."""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        n = 3000
+        self.attributes = {
+            "sex": rng.choice(["F", "M"], n),
+            "race": rng.choice(["A", "B", "C"], n),
+            "age": rng.choice(["young", "old"], n, p=[0.9, 0.1]),
+        }
+        self.y_true = rng.binomial(1, 0.5, n)
+        self.y_prob = rng.random(n)
+        self.y_pred = (self.y_prob > 0.5).astype(int)
+        # One subgroup is strongly disadvantaged
+        worst = (self.attributes["sex"] == "F") & (self.attributes["race"] == "C")
+        self.y_pred[worst & (rng.random(n) < 0.7)] = 0
+
+    def test_rollups_match_direct_computation(self):
+        """Every cell and marginal equals the statistics computed from its rows."""
+        result = IntersectionalAnalyzer(IntersectionalThreshold(min_group_size=1)).calculate_intersectional_fairness(
+            self.y_true, self.y_pred, self.attributes, y_prob=self.y_prob
+        )
+        combined = np.char.add(np.char.add(self.attributes["sex"], "|"), self.attributes["race"])
+        for attribute, values in (("sex", self.attributes["sex"]), ("sex x race", combined)):
+            direct = compute_group_statistics(values, y_true=self.y_true, y_pred=self.y_pred, y_prob=self.y_prob)
+            for i, group in enumerate(direct.groups):
+                label = ", ".join(f"{name}={value}" for name, value in
+                                  zip(attribute.split(" x "), group.split("|")))
+                subgroup = result.subgroups[label]
+                self.assertEqual(subgroup["size"], direct.sizes[i])
+                self.assertAlmostEqual(subgroup["positive_rate"], direct.positive_rates[i])
+                self.assertAlmostEqual(subgroup["tpr"], direct.tpr[i])
+                self.assertAlmostEqual(subgroup["fpr"], direct.fpr[i])
+                self.assertAlmostEqual(subgroup["ece"], direct.ece[i])
+        self.assertEqual(len(result.subgroups), 2 + 3 + 2 + 6 + 4 + 6 + 12)
+        self.assertAlmostEqual(result.metadata["overall"]["positive_rate"], self.y_pred.mean())
+
+    def test_rows_are_scanned_once(self):
+        """Marginals are rolled up from the cube instead of rescanning rows."""
+        with mock.patch.object(intersectional_analysis, "accumulate_group_statistics",
+                               wraps=group_statistics.accumulate_group_statistics) as accumulate:
+            IntersectionalAnalyzer().calculate_intersectional_fairness(
+                self.y_true, self.y_pred, self.attributes
+            )
+        self.assertEqual(accumulate.call_count, 1)
+
+    def test_small_subgroups_are_pruned(self):
+        """Subgroups below min_group_size are not reported but still count in marginals."""
+        analyzer = IntersectionalAnalyzer(IntersectionalThreshold(min_group_size=100, max_order=2))
+        result = analyzer.calculate_intersectional_fairness(self.y_true, self.y_pred, self.attributes)
+        self.assertTrue(all(group["size"] >= 100 for group in result.subgroups.values()))
+        self.assertTrue(all(group["order"] <= 2 for group in result.subgroups.values()))
+        self.assertGreater(result.metadata["pruned_subgroups"], 0)
+        self.assertGreater(result.disparities["race x age"]["pruned"], 0)
+        self.assertEqual(result.subgroups["sex=F"]["size"], np.sum(self.attributes["sex"] == "F"))
+
+    def test_worst_subgroups_ranked(self):
+        """The disadvantaged intersection is ranked first and flagged."""
+        result = IntersectionalAnalyzer(IntersectionalThreshold(rank_by="positive_rate", top_k=3)) \
+            .calculate_intersectional_fairness(self.y_true, self.y_pred, self.attributes)
+        rates = [group["positive_rate"] for group in result.worst_subgroups]
+        self.assertEqual(len(rates), 3)
+        self.assertEqual(rates, sorted(rates))
+        self.assertEqual(result.worst_subgroups[0]["attributes"]["race"], "C")
+        self.assertEqual(result.worst_subgroups[0]["attributes"]["sex"], "F")
+        self.assertTrue(result.threshold_violation)
+
+
+class TestStreamingAudit(unittest.TestCase):
+    """Test out-of-core audits from mergeable statistics."""
+
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        n = 2500
+        self.columns = {
+            "gender": rng.choice([1, 2, 3], n),
+            "label": rng.binomial(1, 0.5, n),
+            "score": rng.random(n),
+        }
+        self.columns["decision"] = (self.columns["score"] > 0.4 + 0.1 * self.columns["gender"]).astype(int)
+        self.auditor = StreamingFairnessAuditor(StreamingAuditConfig(chunk_size=300, max_workers=2))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def assertSameStatistics(self, streamed, direct):
+        self.assertEqual(streamed.groups, direct.groups)
+        self.assertTrue(np.array_equal(streamed.sizes, direct.sizes))
+        self.assertTrue(np.array_equal(streamed.confusion, direct.confusion))
+        self.assertTrue(np.array_equal(streamed.bin_counts, direct.bin_counts))
+        self.assertTrue(np.allclose(streamed.bin_prob_sums, direct.bin_prob_sums))
+        self.assertTrue(np.allclose(streamed.brier_sums, direct.brier_sums))
+
+    def direct_statistics(self, rows=slice(None)):
+        return compute_group_statistics(self.columns["gender"][rows].astype(str), self.columns["label"][rows],
+                                        self.columns["decision"][rows], self.columns["score"][rows])
+
+    def test_memory_mapped_chunks_match_in_memory(self):
+        """Chunked statistics of memory-mapped arrays equal the in-memory ones."""
+        arrays = {}
+        for name, values in self.columns.items():
+            np.save(f"{self.tmp.name}/{name}.npy", values)
+            arrays[name] = np.load(f"{self.tmp.name}/{name}.npy", mmap_mode="r")
+
+        state = self.auditor.accumulate(self.auditor.iter_array_chunks(arrays), ["gender"],
+                                        "decision", "label", "score")
+        self.assertEqual(state.chunks, 9)
+        self.assertEqual(state.rows, 2500)
+        self.assertIsNone(state.group_stats["gender"].codes)
+        self.assertSameStatistics(state.group_stats["gender"], self.direct_statistics())
+
+    def test_files_merge_in_parallel(self):
+        """Files audited in separate processes merge to the statistics of all rows."""
+        paths = []
+        for i, rows in enumerate((slice(0, 1000), slice(1000, None))):
+            path = f"{self.tmp.name}/decisions_{i}.csv"
+            pd.DataFrame({name: values[rows] for name, values in self.columns.items()}).to_csv(path, index=False)
+            paths.append(path)
+
+        state = self.auditor.audit_files(paths, ["gender"], "decision", "label", "score")
+        self.assertEqual(state.rows, 2500)
+        self.assertEqual(state.sources, paths)
+        self.assertSameStatistics(state.group_stats["gender"], self.direct_statistics())
+
+        # Merging is order independent
+        parts = [self.direct_statistics(slice(1000, None)), self.direct_statistics(slice(0, 1000))]
+        self.assertSameStatistics(merge_group_statistics(parts), self.direct_statistics())
+
+    def test_evaluate_matches_in_memory_analyzers(self):
+        """Final metrics from streamed statistics equal the in-memory analyzers."""
+        state = self.auditor.accumulate(self.auditor.iter_array_chunks(self.columns), ["gender"],
+                                        "decision", "label", "score")
+        result = self.auditor.evaluate(state)
+        groups = self.columns["gender"].astype(str)
+
+        dp = DemographicParityAnalyzer().calculate_demographic_parity(
+            self.columns["label"], self.columns["decision"], groups)
+        cal = CalibrationAnalyzer().calculate_calibration_metrics(
+            self.columns["label"], self.columns["score"], groups)
+        self.assertEqual(result.demographic_parity["gender"].positive_rates, dp.positive_rates)
+        self.assertEqual(result.demographic_parity["gender"].protected_attribute, "gender")
+        self.assertEqual(result.equalized_odds["gender"].metadata["total_samples"], 2500)
+        self.assertIn("chi_square_p_value", result.equalized_odds["gender"].statistical_tests)
+        for group, ece in cal.ece_scores.items():
+            self.assertAlmostEqual(result.calibration["gender"].ece_scores[group], ece)
+
+    def test_merge_rejects_incompatible_statistics(self):
+        """Statistics with different inputs or bins cannot be merged."""
+        with_labels = self.direct_statistics()
+        without_labels = compute_group_statistics(self.columns["gender"], y_pred=self.columns["decision"])
+        with self.assertRaises(ValueError):
+            merge_group_statistics([with_labels, without_labels])
+        with self.assertRaises(ValueError):
+            merge_group_statistics([with_labels, compute_group_statistics(
+                self.columns["gender"], self.columns["label"], self.columns["decision"],
+                self.columns["score"], n_bins=5)])
+
+
+class TestOnlineFairnessMonitor(unittest.TestCase):
+    """Test incremental fairness monitoring over event streams."""
+
+    def events(self, n, bias, seed=5):
+        rng = np.random.default_rng(seed)
+        groups = rng.choice(["a", "b"], n)
+        y_true = rng.binomial(1, 0.5, n)
+        y_prob = np.clip(rng.random(n) - bias * (groups == "b"), 0, 1)
+        return groups, (y_prob > 0.5).astype(int), y_true, y_prob
+
+    def assertMatchesWindow(self, snapshot, groups, y_pred, y_true, y_prob, rows, weights=None):
+        stats = compute_group_statistics(groups[rows], y_true[rows], y_pred[rows], y_prob[rows])
+        weights = np.ones(len(stats.groups)) if weights is None else weights
+        self.assertEqual(snapshot.group_sizes, dict(zip(stats.groups, stats.sizes.tolist())))
+        rates = stats.positive_rates
+        self.assertAlmostEqual(snapshot.raw_metrics["demographic_parity"], abs(rates[0] - rates[1]))
+        self.assertAlmostEqual(snapshot.raw_metrics["calibration"], stats.ece.mean())
+
+    def test_sliding_window_matches_recomputation(self):
+        """Incremental totals equal the statistics of the events still in the window."""
+        groups, y_pred, y_true, y_prob = self.events(600, 0.2)
+        times = np.arange(600) * 10.0
+        monitor = OnlineFairnessMonitor("model", MonitorConfig(window_seconds=1200, bucket_seconds=100,
+                                                               min_group_size=5, alert_threshold=1.0))
+        for i in range(0, 600, 20):
+            batch = slice(i, i + 20)
+            snapshot = monitor.update_batch(groups[batch], y_pred[batch], y_true[batch], y_prob[batch],
+                                            timestamp=times[i + 19])
+        # Buckets ending by 5990 - 1200 have expired; the first batch kept is stamped 4790
+        self.assertMatchesWindow(snapshot, groups, y_pred, y_true, y_prob, slice(460, 600))
+
+    def test_tumbling_window_closes(self):
+        """A tumbling window reports the closed window and restarts from zero."""
+        groups, y_pred, y_true, y_prob = self.events(200, 0.2)
+        monitor = OnlineFairnessMonitor("model", MonitorConfig(window_type="tumbling", window_seconds=100,
+                                                               min_group_size=5, alert_threshold=1.0))
+        for i in range(200):
+            snapshot = monitor.update(groups[i], y_pred[i], y_true[i], y_prob[i], timestamp=float(i))
+        self.assertMatchesWindow(monitor.last_window, groups, y_pred, y_true, y_prob, slice(0, 100))
+        self.assertMatchesWindow(snapshot, groups, y_pred, y_true, y_prob, slice(100, 200))
+
+    def test_decay_weights_events(self):
+        """Exponential decay halves the weight of events every half-life."""
+        monitor = OnlineFairnessMonitor("model", MonitorConfig(window_type="decay", half_life_seconds=60))
+        monitor.update_batch(["a"] * 8, [1] * 8, timestamp=0.0)
+        snapshot = monitor.update_batch(["a", "b"], [0, 0], timestamp=120.0)
+        self.assertAlmostEqual(snapshot.group_sizes["a"], 3.0)
+        self.assertAlmostEqual(snapshot.group_sizes["b"], 1.0)
+
+    def test_alerts_on_significant_crossing_only(self):
+        """Biased streams raise one alert per crossing; fair streams none."""
+        config = MonitorConfig(window_seconds=1e9, min_group_size=50)
+        for bias, expected in ((0.0, 0), (0.5, 1)):
+            groups, y_pred, y_true, y_prob = self.events(4000, bias)
+            monitor = OnlineFairnessMonitor("credit_model", config)
+            for i in range(0, 4000, 40):
+                batch = slice(i, i + 40)
+                monitor.update_batch(groups[batch], y_pred[batch], y_true[batch], y_prob[batch], timestamp=float(i))
+            self.assertEqual(len(monitor.alerts), expected)
+
+        alert = monitor.alerts[0]
+        self.assertEqual(alert.model_id, "credit_model")
+        self.assertGreater(alert.bias_score, config.alert_threshold)
+        self.assertLess(alert.detailed_findings["online_monitoring"]["p_value"], config.significance_level)
+
+    def test_alpha_rearmed_per_excursion(self):
+        """Looks from earlier excursions above the threshold do not shrink alpha."""
+        config = MonitorConfig(window_seconds=10, bucket_seconds=10, min_group_size=5)
+        monitor = OnlineFairnessMonitor("model", config)
+        groups = ["a"] * 10 + ["b"] * 10
+        biased, fair = [1] * 10 + [0] * 10, [1] * 20
+        # First looks get alpha * 6 / pi^2 ~ 0.030
+        p_values = iter([0.04] * 50 + [0.01])
+        with mock.patch.object(monitor, "_disparity_p_value", side_effect=lambda *args: next(p_values)):
+            for i in range(50):
+                self.assertFalse(monitor.update_batch(groups, biased, timestamp=200.0 * i).significant)
+                monitor.update_batch(groups, fair, timestamp=200.0 * i + 100)
+            snapshot = monitor.update_batch(groups, biased, timestamp=10000.0)
+        self.assertTrue(snapshot.significant)
+        self.assertEqual(snapshot.alert.detailed_findings["online_monitoring"]["sequential_look"], 1)
+
+
+def run_tests():
+    """Run all fairness performance tests."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    # Add all test classes
+    suite.addTests(loader.loadTestsFromTestCase(TestIndividualFairnessScaling))
+    suite.addTests(loader.loadTestsFromTestCase(TestGroupStatistics))
+    suite.addTests(loader.loadTestsFromTestCase(TestIntersectionalAnalysis))
+    suite.addTests(loader.loadTestsFromTestCase(TestStreamingAudit))
+    suite.addTests(loader.loadTestsFromTestCase(TestOnlineFairnessMonitor))
+
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
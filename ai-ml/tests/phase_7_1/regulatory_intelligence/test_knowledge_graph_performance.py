@@ -0,0 +1,749 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Knowledge Graph Performance Tests
+Test suite for knowledge graph indexing and query features.
+
+Tests:
+    - Secondary indexes (entity type, jurisdiction, relationship type)
+    - MinHash/LSH regulation similarity index and regulation linking
+    - Bounded, ranked compliance path queries
+    - Batched Neo4j synchronization
+    - Binary graph snapshots (memory-mapped, lazily materialized)
+    - Incremental and approximate graph analytics
+    - Cached regulation neighborhoods and related-regulation queries
+
+All tests run offline against an in-memory NetworkX graph and a recording Neo4j driver.
+
+Author: REGIQ AI/ML Team
+Version: 1.0.0
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+import networkx as nx
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from services.regulatory_intelligence.knowledge_graph.entity_extraction import (
+    RegulatoryEntity, EntityRelationship, KnowledgeGraphConfig
+)
+from services.regulatory_intelligence.knowledge_graph.graph_database import (
+    GraphDatabaseManager, GraphQueryEngine
+)
+from services.regulatory_intelligence.knowledge_graph.similarity_index import RegulationSimilarityIndex
+from services.regulatory_intelligence.knowledge_graph.path_query import PathQueryEngine
+from services.regulatory_intelligence.knowledge_graph.neo4j_sync import Neo4jBulkWriter
+from services.regulatory_intelligence.knowledge_graph.graph_snapshot import GraphSnapshot
+from services.regulatory_intelligence.knowledge_graph.graph_analytics import (
+    ComponentTracker, approximate_betweenness, hyperball_closeness
+)
+from services.regulatory_intelligence.knowledge_graph.compliance_mapping import ComplianceMapper
+import random
+
+
+def make_entity(entity_id: str, entity_type: str = "REGULATION", jurisdiction: str = "US",
+                name: str = None) -> RegulatoryEntity:
+    return RegulatoryEntity(
+        entity_id=entity_id,
+        name=name or entity_id,
+        entity_type=entity_type,
+        jurisdiction=jurisdiction,
+        description="",
+        confidence=0.9,
+        metadata={}
+    )
+
+
+def make_relationship(source: str, target: str, relationship_type: str = "REQUIRES",
+                      confidence: float = 0.8) -> EntityRelationship:
+    return EntityRelationship(
+        relationship_id=f"rel_{source}_{target}",
+        source_entity_id=source,
+        target_entity_id=target,
+        relationship_type=relationship_type,
+        confidence=confidence,
+        context="",
+        metadata={}
+    )
+
+
+class RecordingTransaction:
+    """Stand-in for a py2neo Transaction that records statements."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.statements = []
+
+    def run(self, cypher, parameters=None):
+        if self.graph.fail_on and self.graph.fail_on in cypher:
+            raise RuntimeError("write failed")
+        self.statements.append((cypher, parameters or {}))
+
+
+class RecordingGraph:
+    """Stand-in for a py2neo Graph that records committed transactions."""
+
+    def __init__(self, fail_on: str = None):
+        self.fail_on = fail_on
+        self.committed = []
+        self.rolled_back = 0
+
+    def begin(self):
+        return RecordingTransaction(self)
+
+    def commit(self, tx):
+        self.committed.append(tx.statements)
+
+    def rollback(self, tx):
+        self.rolled_back += 1
+
+    def statements(self, keyword: str):
+        return [(c, p) for tx in self.committed for c, p in tx if keyword in c]
+
+
+class TestGraphIndexes(unittest.TestCase):
+    """Test secondary indexes of GraphDatabaseManager."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = GraphDatabaseManager(KnowledgeGraphConfig(
+            graph_db_path=os.path.join(self.temp_dir, "kg.json"),
+            graph_snapshot_path=os.path.join(self.temp_dir, "kg.snapshot")
+        ))
+        self.manager.add_entity(make_entity("reg_1", "REGULATION", "US"))
+        self.manager.add_entity(make_entity("reg_2", "REGULATION", "EU"))
+        self.manager.add_entity(make_entity("req_1", "REQUIREMENT", "US"))
+        self.manager.add_relationship(make_relationship("reg_1", "req_1", "REQUIRES"))
+        self.manager.add_relationship(make_relationship("reg_2", "reg_1", "RELATED_TO"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_lookups_use_indexes(self):
+        """Type and jurisdiction lookups are served from the indexes, not a node scan."""
+        # Bypasses the indexes, so a scan would find it
+        self.manager.graph.add_node("reg_raw", entity_type="REGULATION", jurisdiction="US")
+
+        regulations = self.manager.get_entities_by_type("REGULATION")
+        self.assertEqual([e["entity_id"] for e in regulations], ["reg_1", "reg_2"])
+        self.assertEqual(regulations[0]["jurisdiction"], "US")
+        self.assertEqual(self.manager.get_entity_ids_by_jurisdiction("US"), ["reg_1", "req_1"])
+        self.assertEqual(self.manager.get_edges_by_relationship_type("REQUIRES"), [("reg_1", "req_1")])
+
+        network = GraphQueryEngine(self.manager).get_compliance_network("US")
+        self.assertEqual(set(network.nodes), {"reg_1", "req_1"})
+
+        self.manager.rebuild_indexes()
+        self.assertEqual(self.manager.get_entity_ids_by_type("REGULATION"), ["reg_1", "reg_2", "reg_raw"])
+
+    def test_re_adding_moves_index_entries(self):
+        """Re-adding an entity or edge with new attributes updates every index."""
+        self.manager.add_entity(make_entity("reg_2", "GUIDANCE", "UK"))
+        self.manager.add_relationship(make_relationship("reg_1", "req_1", "MANDATES"))
+
+        self.assertEqual(self.manager.get_entity_ids_by_type("REGULATION"), ["reg_1"])
+        self.assertEqual(self.manager.get_entity_ids_by_type("GUIDANCE"), ["reg_2"])
+        self.assertEqual(self.manager.get_entity_ids_by_jurisdiction("EU"), [])
+        self.assertEqual(self.manager.get_edges_by_relationship_type("REQUIRES"), [])
+        self.assertEqual(self.manager.get_edges_by_relationship_type("MANDATES"), [("reg_1", "req_1")])
+        self.assertNotIn("reg_2", self.manager.regulation_index)
+
+    def test_stats_match_graph_after_reload(self):
+        """Stats come from the indexes, which load_graph rebuilds."""
+        self.manager.graph.add_node("orphan")
+        self.manager.rebuild_indexes()
+        expected = {
+            "entity_types": {"REGULATION": 2, "REQUIREMENT": 1, "UNKNOWN": 1},
+            "relationship_types": {"REQUIRES": 1, "RELATED_TO": 1},
+        }
+        stats = self.manager.get_graph_stats()
+        self.assertEqual(stats["entity_types"], expected["entity_types"])
+        self.assertEqual(stats["relationship_types"], expected["relationship_types"])
+
+        self.assertTrue(self.manager.save_graph())
+        reloaded = GraphDatabaseManager(self.manager.config)
+        self.assertTrue(reloaded.load_graph())
+        stats = reloaded.get_graph_stats()
+        self.assertEqual(stats["entity_types"], expected["entity_types"])
+        self.assertEqual(stats["relationship_types"], expected["relationship_types"])
+        self.assertEqual(len(reloaded.regulation_index), 2)
+
+
+class TestRegulationSimilarityIndex(unittest.TestCase):
+    """Test MinHash/LSH regulation similarity."""
+
+    def test_query_returns_exact_jaccard_of_candidates(self):
+        """Near duplicates are found with exact scores; unrelated names are not candidates."""
+        index = RegulationSimilarityIndex()
+        index.add("a", "General Data Protection Regulation")
+        index.add("b", "General Data Protection Regulation Guidance")
+        index.add("c", "Markets in Crypto Assets")
+
+        results = index.query("a")
+        self.assertEqual(results, [("b", 0.8)])
+        self.assertNotIn("c", index.candidates("a"))
+
+        index.remove("b")
+        self.assertEqual(index.query("a"), [])
+        self.assertEqual(index.get_stats()["regulations"], 2)
+
+    def test_recall_on_similar_pairs(self):
+        """Pairs above the linking threshold are almost always candidates."""
+        index = RegulationSimilarityIndex()
+        for i in range(200):
+            # Jaccard 0.5 with the partner: two shared words out of four
+            index.add(f"x{i}", f"alpha{i} beta{i} gamma{i}")
+            index.add(f"y{i}", f"alpha{i} beta{i} delta{i}")
+
+        found = sum(1 for i in range(200) if f"y{i}" in index.candidates(f"x{i}"))
+        self.assertGreaterEqual(found, 190)
+        # Unrelated pairs rarely collide
+        self.assertLess(len(index.candidates("x0")), 10)
+
+
+    def test_recall_at_linking_threshold(self):
+        """Weak matches the linker accepts (Jaccard ~0.1 with the jurisdiction boost) are still candidates."""
+        index = RegulationSimilarityIndex()
+        for i in range(500):
+            # One shared word out of seven, and one out of nine
+            index.add(f"x{i}", f"shared{i} a{i} b{i} c{i}")
+            index.add(f"y{i}", f"shared{i} d{i} e{i} f{i}")
+            index.add(f"z{i}", f"shared{i} g{i} h{i} k{i} m{i}")
+            index.add(f"w{i}", f"shared{i} n{i} p{i} q{i} r{i}")
+
+        self.assertGreaterEqual(sum(f"y{i}" in index.candidates(f"x{i}") for i in range(500)), 495)
+        self.assertGreaterEqual(sum(f"w{i}" in index.candidates(f"z{i}") for i in range(500)), 490)
+
+class TestRegulationLinking(unittest.TestCase):
+    """Test ComplianceMapper regulation linking over the similarity index."""
+
+    def setUp(self):
+        self.manager = GraphDatabaseManager()
+        names = [
+            ("gdpr", "EU", "General Data Protection Regulation"),
+            ("gdpr_uk", "UK", "UK General Data Protection Regulation"),
+            ("ai_act", "EU", "Artificial Intelligence Act"),
+            ("mica", "EU", "Markets in Crypto Assets"),
+        ]
+        for entity_id, jurisdiction, name in names:
+            self.manager.add_entity(make_entity(entity_id, "REGULATION", jurisdiction, name))
+        self.mapper = ComplianceMapper(self.manager)
+
+    def test_link_related_regulations_uses_index(self):
+        """Linking scores LSH candidates only and records RELATED_TO edges."""
+        with mock.patch.object(self.mapper, "_calculate_similarity") as brute_force:
+            relationships = self.mapper.link_related_regulations("gdpr")
+            brute_force.assert_not_called()
+
+        self.assertEqual([r.target_entity_id for r in relationships], ["gdpr_uk"])
+        self.assertAlmostEqual(relationships[0].confidence, 0.8)
+        self.assertEqual(self.manager.get_edges_by_relationship_type("RELATED_TO"), [("gdpr", "gdpr_uk")])
+
+    def test_link_all_related_regulations(self):
+        """A whole-graph pass links each similar pair in both directions."""
+        relationships = self.mapper.link_all_related_regulations()
+        pairs = {(r.source_entity_id, r.target_entity_id) for r in relationships}
+        self.assertEqual(pairs, {("gdpr", "gdpr_uk"), ("gdpr_uk", "gdpr")})
+
+
+    def test_weak_same_jurisdiction_matches_linked(self):
+        """Index-based linking keeps the brute-force links down to the threshold."""
+        manager = GraphDatabaseManager()
+        for i in range(100):
+            # One shared word out of seven
+            manager.add_entity(make_entity(f"x{i}", "REGULATION", "EU", f"Directive{i} a{i} b{i} c{i}"))
+            manager.add_entity(make_entity(f"y{i}", "REGULATION", "EU", f"Directive{i} d{i} e{i} f{i}"))
+        mapper = ComplianceMapper(manager)
+
+        linked = sum(
+            f"y{i}" in [reg["entity_id"] for reg in mapper._find_similar_regulations(
+                {"entity_id": f"x{i}", **manager.get_entity(f"x{i}")})]
+            for i in range(100)
+        )
+        # Jaccard 1/7 + 0.2 jurisdiction boost clears the 0.3 threshold
+        self.assertGreaterEqual(linked, 99)
+
+class TestPathQueries(unittest.TestCase):
+    """Test bounded, ranked path queries."""
+
+    def setUp(self):
+        self.manager = GraphDatabaseManager()
+        for entity_id in ["reg", "a", "b", "c", "req"]:
+            self.manager.add_entity(make_entity(entity_id))
+        # Two 2-hop routes (b more confident than a) and one 3-hop route
+        self.manager.add_relationship(make_relationship("reg", "a", "REQUIRES", 0.5))
+        self.manager.add_relationship(make_relationship("a", "req", "REQUIRES", 0.5))
+        self.manager.add_relationship(make_relationship("reg", "b", "GOVERNS", 0.9))
+        self.manager.add_relationship(make_relationship("b", "req", "REQUIRES", 0.9))
+        self.manager.add_relationship(make_relationship("reg", "c", "REQUIRES", 1.0))
+        self.manager.add_relationship(make_relationship("c", "a", "REQUIRES", 1.0))
+
+    def test_paths_in_cost_order_with_limits(self):
+        """Paths come cheapest first and respect limit, hop and type bounds."""
+        paths = self.manager.find_ranked_paths("reg", "req")
+        self.assertEqual([p.nodes for p in paths],
+                         [["reg", "b", "req"], ["reg", "a", "req"], ["reg", "c", "a", "req"]])
+        self.assertEqual(paths, sorted(paths, key=lambda p: p.cost))
+        self.assertAlmostEqual(paths[0].cost, 2.2)
+        self.assertEqual(paths[0].relationship_types, ["GOVERNS", "REQUIRES"])
+
+        self.assertEqual(self.manager.find_path("reg", "req", limit=1), [["reg", "b", "req"]])
+        self.assertEqual(len(self.manager.find_path("reg", "req", max_length=2)), 2)
+        self.assertEqual(self.manager.find_path("reg", "req", relationship_types=["REQUIRES"]),
+                         [["reg", "a", "req"], ["reg", "c", "a", "req"]])
+        self.assertEqual(self.manager.find_path("req", "reg"), [])
+        self.assertEqual(self.manager.find_path("reg", "missing"), [])
+
+    def test_dense_graph_query_is_time_bounded(self):
+        """A complete graph with astronomically many paths returns within budget."""
+        manager = GraphDatabaseManager()
+        nodes = [f"n{i}" for i in range(40)]
+        for node in nodes:
+            manager.graph.add_node(node)
+        for u in nodes:
+            for v in nodes:
+                if u != v:
+                    manager.graph.add_edge(u, v, relationship_type="RELATED_TO", confidence=0.9)
+
+        start = time.monotonic()
+        paths = list(PathQueryEngine(manager).iter_paths("n0", "n1", max_length=6, limit=None, time_budget=0.3))
+        self.assertLess(time.monotonic() - start, 2.0)
+        self.assertGreater(len(paths), 1)
+        self.assertEqual(paths[0].nodes, ["n0", "n1"])
+
+    def test_hop_limit_enforced_inside_search(self):
+        """Many cheap long paths do not hide a costlier short one."""
+        manager = GraphDatabaseManager()
+        manager.graph.add_edge("s", "a", relationship_type="RELATED_TO", confidence=0.0)
+        manager.graph.add_edge("a", "t", relationship_type="RELATED_TO", confidence=0.0)
+        for i in range(40):
+            manager.graph.add_edge("s", f"x{i}", relationship_type="RELATED_TO", confidence=1.0)
+            for j in range(40):
+                manager.graph.add_edge(f"x{i}", f"y{j}", relationship_type="RELATED_TO", confidence=1.0)
+        for j in range(40):
+            manager.graph.add_edge(f"y{j}", "t", relationship_type="RELATED_TO", confidence=1.0)
+
+        start = time.monotonic()
+        paths = PathQueryEngine(manager).find_paths("s", "t", max_length=2, limit=None, time_budget=0.5)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual([p.nodes for p in paths], [["s", "a", "t"]])
+        self.assertAlmostEqual(paths[0].cost, 4.0)
+
+    def test_pathways_use_top_k(self):
+        """Pathway creation consumes only the top-ranked paths."""
+        mapper = ComplianceMapper(self.manager)
+        pathways = mapper.create_compliance_pathways("reg", "req", max_pathways=2)
+
+        self.assertEqual([p.metadata["path"] for p in pathways], [["reg", "b", "req"], ["reg", "a", "req"]])
+        self.assertAlmostEqual(pathways[1].metadata["path_cost"], 3.0)
+
+
+class TestNeo4jBulkSync(unittest.TestCase):
+    """Test batched UNWIND writes to Neo4j."""
+
+    def setUp(self):
+        self.driver = RecordingGraph()
+        self.manager = GraphDatabaseManager(KnowledgeGraphConfig(neo4j_batch_size=50))
+        self.manager.neo4j_graph = self.driver
+        self.manager.neo4j_writer = Neo4jBulkWriter(self.driver, batch_size=50)
+
+    def test_bulk_load_batches_writes(self):
+        """Hundreds of adds become a handful of UNWIND transactions."""
+        entities = [make_entity(f"e{i}", entity_type)
+                    for i, entity_type in enumerate(["REGULATION", "REQUIREMENT"] * 60)]
+        relationships = [make_relationship(f"e{i}", f"e{i + 1}", "REQUIRES" if i % 2 else "GOVERNS")
+                         for i in range(119)]
+
+        self.assertEqual(self.manager.add_entities(entities), 120)
+        self.assertEqual(self.manager.add_relationships(relationships), 119)
+
+        constraint = self.driver.statements("CREATE CONSTRAINT")
+        self.assertEqual(len(constraint), 1)
+        self.assertIn("REQUIRE e.entity_id IS UNIQUE", constraint[0][0])
+
+        entity_rows = [row for _, params in self.driver.statements("MERGE (e:Entity") for row in params["rows"]]
+        self.assertEqual(len(entity_rows), 120)
+        self.assertEqual(entity_rows[0]["properties"]["entity_type"], "REGULATION")
+
+        requires = self.driver.statements("[r:`REQUIRES`]")
+        governs = self.driver.statements("[r:`GOVERNS`]")
+        self.assertEqual(sum(len(p["rows"]) for _, p in requires), 59)
+        self.assertEqual(sum(len(p["rows"]) for _, p in governs), 60)
+        self.assertTrue(all(len(p["rows"]) <= 50 for _, p in requires + governs))
+        self.assertLess(len(self.driver.committed), 15)
+        self.assertEqual(self.manager.neo4j_writer.pending, 0)
+
+    def test_single_add_flushes_and_sync_is_idempotent(self):
+        """Adds outside bulk() are written at once; re-syncing MERGEs the same rows."""
+        entity = make_entity("reg_1")
+        entity.metadata = {"tags": ["ai", "credit"], "source": {"url": "x"}, "empty": None}
+        self.manager.add_entity(entity)
+
+        (cypher, params), = self.driver.statements("MERGE (e:Entity")
+        properties = params["rows"][0]["properties"]
+        self.assertEqual(properties["tags"], ["ai", "credit"])
+        self.assertEqual(properties["source"], '{"url": "x"}')
+        self.assertNotIn("empty", properties)
+
+        self.manager.add_entity(make_entity("reg_2"))
+        self.manager.add_relationship(make_relationship("reg_1", "reg_2", "RELATED_TO"))
+        self.assertTrue(self.manager.sync_to_neo4j())
+        last = self.driver.statements("MERGE (e:Entity")[-1][1]["rows"]
+        self.assertEqual([row["entity_id"] for row in last], ["reg_1", "reg_2"])
+
+    def test_failed_batch_rolls_back(self):
+        """A failing batch is retried, rolled back and requeued; other batches still commit."""
+        driver = RecordingGraph(fail_on="[r:`CONFLICTS_WITH`]")
+        writer = Neo4jBulkWriter(driver, batch_size=10, max_retries=2, retry_backoff_seconds=0)
+        writer.add_entity(make_entity("a"))
+        writer.add_entity(make_entity("b"))
+        writer.add_relationship(make_relationship("a", "b", "CONFLICTS_WITH"))
+        writer.add_relationship(make_relationship("b", "a", "REQUIRES"))
+
+        self.assertFalse(writer.flush())
+        self.assertEqual(driver.rolled_back, 3)
+        self.assertEqual(writer.stats["retries"], 2)
+        self.assertEqual(writer.stats["relationships_written"], 1)
+        self.assertEqual(writer.stats["failed_batches"], 1)
+        self.assertEqual(writer.pending, 1)
+
+        # The requeued row is written once Neo4j accepts it again
+        driver.fail_on = None
+        self.assertTrue(writer.flush())
+        self.assertEqual(writer.stats["relationships_written"], 2)
+        self.assertEqual(writer.pending, 0)
+        with self.assertRaises(ValueError):
+            writer.add_relationship(make_relationship("a", "b", "BAD`) DETACH DELETE (n"))
+
+    def test_relationships_wait_for_failed_entities(self):
+        """Relationships are not written while their entity batch is failing."""
+        driver = RecordingGraph(fail_on="MERGE (e:Entity")
+        writer = Neo4jBulkWriter(driver, batch_size=10, max_retries=0)
+        writer.add_entity(make_entity("a"))
+        writer.add_entity(make_entity("b"))
+        writer.add_relationship(make_relationship("a", "b", "REQUIRES"))
+
+        self.assertFalse(writer.flush())
+        self.assertEqual(driver.statements("[r:`REQUIRES`]"), [])
+        self.assertEqual(writer.pending, 3)
+
+    def test_sync_reports_only_its_own_failures(self):
+        """An earlier failed flush does not make later syncs report failure."""
+        self.manager.neo4j_writer.max_retries = 0
+        self.driver.fail_on = "MERGE (e:Entity"
+        self.manager.add_entity(make_entity("a"))
+        self.assertEqual(self.manager.neo4j_writer.pending, 1)
+
+        self.driver.fail_on = None
+        self.assertTrue(self.manager.sync_to_neo4j())
+        self.assertEqual(self.manager.neo4j_writer.stats["failed_batches"], 1)
+
+    def test_single_add_reports_failure_without_retrying_backlog(self):
+        """A failed single add returns False; later adds write only their own rows."""
+        self.manager.neo4j_writer.max_retries = 0
+        self.driver.fail_on = "MERGE (e:Entity"
+        self.assertFalse(self.manager.add_entity(make_entity("a")))
+        self.assertTrue(self.manager.graph.has_node("a"))
+
+        self.driver.fail_on = None
+        self.assertTrue(self.manager.add_entity(make_entity("b")))
+        self.assertTrue(self.manager.add_entity(make_entity("c")))
+        written = [[row["entity_id"] for row in params["rows"]]
+                   for _, params in self.driver.statements("MERGE (e:Entity")]
+        self.assertEqual(written[-2:], [["b"], ["c"]])
+
+        # A relationship to the still-buffered entity waits for it
+        self.assertFalse(self.manager.add_relationship(make_relationship("a", "b", "REQUIRES")))
+        self.assertEqual(self.driver.statements("[r:`REQUIRES`]"), [])
+        self.assertTrue(self.manager.flush_neo4j())
+        self.assertEqual(self.manager.neo4j_writer.pending, 0)
+        self.assertEqual(len(self.driver.statements("[r:`REQUIRES`]")), 1)
+
+    def test_invalid_relationship_type_leaves_graph_unchanged(self):
+        """A type Neo4j would reject is refused before the NetworkX edge is added."""
+        self.manager.add_entity(make_entity("a"))
+        self.manager.add_entity(make_entity("b"))
+        version = self.manager.version
+
+        self.assertFalse(self.manager.add_relationship(make_relationship("a", "b", "BAD TYPE")))
+        self.assertFalse(self.manager.graph.has_edge("a", "b"))
+        self.assertEqual(self.manager.version, version)
+
+
+class TestGraphSnapshots(unittest.TestCase):
+    """Test binary graph snapshots."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = KnowledgeGraphConfig(
+            graph_db_path=os.path.join(self.temp_dir, "kg.json"),
+            graph_snapshot_path=os.path.join(self.temp_dir, "kg.snapshot")
+        )
+        self.manager = GraphDatabaseManager(self.config)
+        for i in range(30):
+            entity = make_entity(f"reg_{i}", "REGULATION" if i % 3 else "REQUIREMENT",
+                                 ["US", "EU"][i % 2], f"Regulation number {i}")
+            entity.metadata = {"year": 2000 + i, "tags": ["ai"]} if i % 5 == 0 else {}
+            self.manager.add_entity(entity)
+        for i in range(29):
+            self.manager.add_relationship(make_relationship(f"reg_{i}", f"reg_{i + 1}", "REQUIRES", 0.5 + i / 100))
+        self.manager.graph.add_node("bare")
+        self.manager.graph.add_edge("reg_0", "bare", weight=3)
+        self.manager.rebuild_indexes()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_round_trip_is_lossless(self):
+        """Materializing a snapshot reproduces every node and edge attribute."""
+        self.assertTrue(self.manager.save_snapshot())
+        loaded = GraphDatabaseManager(self.config)
+        self.assertTrue(loaded.load_snapshot(lazy=False))
+
+        self.assertEqual(dict(loaded.graph.nodes(data=True)), dict(self.manager.graph.nodes(data=True)))
+        self.assertEqual(sorted(loaded.graph.edges(data=True)), sorted(self.manager.graph.edges(data=True)))
+        self.assertEqual(loaded.get_graph_stats()["entity_types"], self.manager.get_graph_stats()["entity_types"])
+        self.assertEqual(len(loaded.regulation_index), 20)
+
+    def test_lazy_load_answers_lookups_from_columns(self):
+        """Entity lookups use the memory-mapped columns; graph algorithms materialize NetworkX."""
+        self.manager.save_snapshot()
+        loaded = GraphDatabaseManager(self.config)
+        loaded.load_snapshot()
+
+        snapshot = loaded._snapshot
+        self.assertIsInstance(snapshot.arrays["indices"], np.memmap)
+        self.assertEqual(loaded.get_entity("reg_5"), self.manager.get_entity("reg_5"))
+        self.assertEqual(loaded.get_entity_ids_by_type("REQUIREMENT"),
+                         self.manager.get_entity_ids_by_type("REQUIREMENT"))
+        self.assertEqual(len(loaded.get_entities_by_type("REGULATION")), 20)
+        self.assertEqual(snapshot.successors("reg_0"), ["reg_1", "bare"])
+        self.assertIsNotNone(loaded._snapshot)
+
+        self.assertEqual(loaded.find_path("reg_0", "reg_3"), [["reg_0", "reg_1", "reg_2", "reg_3"]])
+        self.assertIsNone(loaded._snapshot)
+        self.assertEqual(loaded.get_edges_by_relationship_type("REQUIRES")[0], ("reg_0", "reg_1"))
+
+    def test_lazy_load_answers_edge_lookups(self):
+        """Relationship-type lookups right after a lazy load see the snapshot's edges."""
+        self.manager.add_relationship(make_relationship("reg_7", "reg_2", "SUPERSEDES"))
+        self.manager.save_snapshot()
+        loaded = GraphDatabaseManager(self.config)
+        loaded.load_snapshot()
+
+        self.assertEqual(loaded.get_edges_by_relationship_type("SUPERSEDES"), [("reg_7", "reg_2")])
+        self.assertEqual(sorted(loaded.get_edges_by_relationship_type("REQUIRES")),
+                         sorted(self.manager.get_edges_by_relationship_type("REQUIRES")))
+        self.assertEqual(loaded.get_edges_by_relationship_type("UNKNOWN"), [])
+        self.assertIsNotNone(loaded._snapshot)
+
+    def test_default_load_prefers_current_snapshot(self):
+        """load_graph() uses the snapshot saved with the JSON, and re-saving is safe while mapped."""
+        self.assertTrue(self.manager.save_graph())
+        manifest = GraphSnapshot.open(self.config.graph_snapshot_path).manifest
+        # Types, jurisdictions and repeated metadata are interned once
+        self.assertLess(manifest["strings"], 31 + 30 * 3)
+
+        loaded = GraphDatabaseManager(self.config)
+        self.assertTrue(loaded.load_graph())
+        self.assertIsNotNone(loaded._snapshot)
+
+        loaded.add_entity(make_entity("reg_new"))
+        self.assertTrue(loaded.save_graph())
+        reloaded = GraphDatabaseManager(self.config)
+        reloaded.load_graph()
+        self.assertEqual(reloaded.graph.number_of_nodes(), 32)
+
+        self.assertTrue(reloaded.load_graph(self.config.graph_db_path))
+        self.assertIsNone(reloaded._snapshot)
+        self.assertEqual(reloaded.graph.number_of_nodes(), 32)
+
+
+class TestGraphAnalytics(unittest.TestCase):
+    """Test incremental and approximate graph metrics."""
+
+    def test_component_tracker_matches_networkx(self):
+        """Union-find component counts follow every add."""
+        random_graph = nx.gnm_random_graph(200, 150, seed=3, directed=True)
+        tracker = ComponentTracker()
+        graph = nx.DiGraph()
+        for node in random_graph.nodes:
+            tracker.add_node(node)
+            graph.add_node(node)
+        for i, (u, v) in enumerate(random_graph.edges):
+            tracker.add_edge(u, v)
+            graph.add_edge(u, v)
+            if i % 25 == 0:
+                self.assertEqual(tracker.components, nx.number_weakly_connected_components(graph))
+        self.assertEqual(tracker.largest_component_size(),
+                         max(len(c) for c in nx.weakly_connected_components(graph)))
+
+    def test_degree_tracker_matches_networkx(self):
+        """Degree centrality follows every add and is reused while the graph is unchanged."""
+        manager = GraphDatabaseManager()
+        for i in range(30):
+            manager.add_entity(make_entity(f"e{i}", "REQUIREMENT"))
+        engine = GraphQueryEngine(manager)
+        for i in range(29):
+            manager.add_relationship(make_relationship(f"e{i}", f"e{(i * 7 + 3) % 30}"))
+            if i % 5 == 0:
+                self.assertEqual(engine.analyze_graph_metrics()["centrality"]["degree"],
+                                 nx.degree_centrality(manager.graph))
+        # Re-adding an edge does not change degrees
+        manager.add_relationship(make_relationship("e0", "e3"))
+        first = engine.analyze_graph_metrics()["centrality"]["degree"]
+        self.assertEqual(first, nx.degree_centrality(manager.graph))
+        self.assertIs(engine.analyze_graph_metrics()["centrality"]["degree"], first)
+
+        manager.add_relationship(make_relationship("e1", "new"))
+        self.assertEqual(engine.analyze_graph_metrics()["centrality"]["degree"],
+                         nx.degree_centrality(manager.graph))
+        manager.rebuild_indexes()
+        self.assertEqual(manager.degrees.centrality(), nx.degree_centrality(manager.graph))
+
+    def test_approximations_within_error_bounds(self):
+        """HyperBall closeness and pivot betweenness stay close to the exact values."""
+        graph = nx.gnm_random_graph(400, 1200, seed=1, directed=True)
+        exact = nx.closeness_centrality(graph)
+        closeness, relative_error = hyperball_closeness(list(graph.nodes), list(graph.edges), precision=7)
+        errors = [abs(closeness[n] - exact[n]) / exact[n] for n in graph if exact[n] > 0]
+        self.assertLess(float(np.mean(errors)), relative_error)
+
+        exact = nx.betweenness_centrality(graph)
+        betweenness, bound = approximate_betweenness(graph, pivots=100)
+        self.assertLess(max(abs(betweenness[n] - exact[n]) for n in graph), bound)
+
+    def test_metrics_are_cached_per_graph_version(self):
+        """Large graphs get approximate centrality in the background, recomputed only after changes."""
+        manager = GraphDatabaseManager(KnowledgeGraphConfig(exact_centrality_max_nodes=50, betweenness_pivots=20))
+        for i in range(120):
+            manager.add_entity(make_entity(f"e{i}", "REQUIREMENT"))
+        for i in range(119):
+            manager.add_relationship(make_relationship(f"e{i}", f"e{i + 1}"))
+        engine = GraphQueryEngine(manager)
+
+        metrics = engine.analyze_graph_metrics(wait=True)
+        info = metrics["centrality_info"]
+        self.assertEqual(info["status"], "fresh")
+        self.assertEqual(info["method"], "approximate")
+        self.assertIn("betweenness_error_bound", info)
+        self.assertEqual(set(metrics["centrality"]), {"degree", "betweenness", "closeness"})
+        self.assertTrue(metrics["connectivity"]["is_weakly_connected"])
+        self.assertEqual(engine.analyze_graph_metrics()["centrality_info"]["status"], "fresh")
+
+        manager.add_entity(make_entity("island", "REQUIREMENT"))
+        metrics = engine.analyze_graph_metrics()
+        self.assertEqual(metrics["connectivity"]["number_weakly_connected_components"], 2)
+        self.assertEqual(metrics["basic_stats"]["nodes"], 121)
+        self.assertIn("island", metrics["centrality"]["degree"])
+        self.assertIn(metrics["centrality_info"]["status"], ("stale", "fresh"))
+        self.assertEqual(engine.analyze_graph_metrics(wait=True)["centrality_info"]["graph_version"],
+                         manager.version)
+
+        small = GraphDatabaseManager()
+        small.add_relationship(make_relationship("a", "b"))
+        metrics = GraphQueryEngine(small).analyze_graph_metrics()
+        self.assertEqual(metrics["centrality_info"]["method"], "exact")
+        self.assertEqual(metrics["centrality"]["closeness"], nx.closeness_centrality(small.graph))
+
+
+def reference_related(graph: nx.DiGraph, source: str, max_depth: int):
+    """Regulations within max_depth hops, by plain BFS."""
+    if source not in graph:
+        return []
+    distances = nx.single_source_shortest_path_length(graph, source, cutoff=max_depth)
+    return sorted((node, depth) for node, depth in distances.items()
+                  if graph.nodes[node].get("entity_type") == "REGULATION")
+
+
+class TestNeighborhoodIndex(unittest.TestCase):
+    """Test the cached regulation neighborhood index."""
+
+    def setUp(self):
+        self.manager = GraphDatabaseManager(KnowledgeGraphConfig(neighborhood_max_depth=3))
+        self.engine = GraphQueryEngine(self.manager)
+
+    def related(self, entity_id: str, max_depth: int):
+        return sorted((r["entity_id"], r["depth"])
+                      for r in self.engine.find_related_regulations(entity_id, max_depth=max_depth))
+
+    def test_matches_bfs_across_mutations(self):
+        """Cached answers stay equal to a fresh BFS while edges and types change."""
+        rng = random.Random(7)
+        for i in range(60):
+            self.manager.add_entity(make_entity(f"n{i}", rng.choice(["REGULATION", "REQUIREMENT"])))
+        for _ in range(80):
+            self.manager.add_relationship(make_relationship(f"n{rng.randrange(60)}", f"n{rng.randrange(60)}"))
+
+        for step in range(60):
+            if step % 3 == 0:
+                self.manager.add_entity(make_entity(f"n{rng.randrange(60)}",
+                                                    rng.choice(["REGULATION", "REQUIREMENT"])))
+            else:
+                self.manager.add_relationship(make_relationship(f"n{rng.randrange(60)}",
+                                                                f"n{rng.randrange(60)}"))
+            for source in (f"n{rng.randrange(60)}" for _ in range(10)):
+                for depth in (1, 2, 3, 4):
+                    self.assertEqual(self.related(source, depth),
+                                     reference_related(self.manager.graph, source, depth))
+        self.assertGreater(self.manager.neighborhoods.stats["hits"], 0)
+        self.assertGreater(self.manager.neighborhoods.stats["invalidated"], 0)
+
+    def test_pagination_and_targeted_invalidation(self):
+        """Results are paged nearest first and an edge only invalidates upstream entries."""
+        self.manager.add_entity(make_entity("hub", "REGULATION"))
+        for i in range(10):
+            self.manager.add_entity(make_entity(f"reg_{i}", "REGULATION"))
+            self.manager.add_relationship(make_relationship("hub", f"reg_{i}", "RELATED_TO"))
+        self.manager.add_entity(make_entity("other", "REGULATION"))
+
+        results = self.engine.find_related_regulations("hub", max_depth=2)
+        self.assertEqual(results[0]["entity_id"], "hub")
+        self.assertEqual(results[0]["depth"], 0)
+        self.assertEqual(results[0]["entity_type"], "REGULATION")
+        pages = [self.engine.find_related_regulations("hub", max_depth=2, offset=offset, limit=4)
+                 for offset in (0, 4, 8)]
+        self.assertEqual([len(page) for page in pages], [4, 4, 3])
+        self.assertEqual([r["entity_id"] for page in pages for r in page],
+                         [r["entity_id"] for r in results])
+
+        self.engine.find_related_regulations("other")
+        self.manager.add_relationship(make_relationship("reg_0", "other", "RELATED_TO"))
+        self.assertIn("other", self.manager.neighborhoods._entries)
+        self.assertNotIn("hub", self.manager.neighborhoods._entries)
+        self.assertIn(("other", 2), self.related("hub", 2))
+
+
+def run_tests():
+    """Run all knowledge graph performance tests."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    # Add all test classes
+    suite.addTests(loader.loadTestsFromTestCase(TestGraphIndexes))
+    suite.addTests(loader.loadTestsFromTestCase(TestRegulationSimilarityIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestRegulationLinking))
+    suite.addTests(loader.loadTestsFromTestCase(TestPathQueries))
+    suite.addTests(loader.loadTestsFromTestCase(TestNeo4jBulkSync))
+    suite.addTests(loader.loadTestsFromTestCase(TestGraphSnapshots))
+    suite.addTests(loader.loadTestsFromTestCase(TestGraphAnalytics))
+    suite.addTests(loader.loadTestsFromTestCase(TestNeighborhoodIndex))
+
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - LLM Response Cache Tests
+Test suite for the persistent Gemini response cache.
+
+Tests:
+    - Exact prompt-hash cache with TTL and per-model namespaces
+    - Semantic near-duplicate lookups
+    - GeminiClient integration (generate_text, structured JSON, streaming)
+
+All tests run offline against a stub SDK client and a temporary SQLite file.
+
+Author: REGIQ AI/ML Team
+Version: 1.0.0
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from services.regulatory_intelligence.llm.gemini_client import GeminiClient, GeminiClientConfig
+from services.regulatory_intelligence.llm.response_cache import LLMResponseCache, get_shared_response_cache
+
+
+class CountingModels:
+    """Stub SDK ``models`` namespace that counts API calls."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+
+    def generate_content(self, model, contents):
+        self.calls += 1
+        return SimpleNamespace(text=self.text)
+
+    def generate_content_stream(self, model, contents):
+        self.calls += 1
+        return iter([SimpleNamespace(text=self.text)])
+
+
+def bag_of_words(text: str) -> np.ndarray:
+    """Deterministic toy embedding for semantic cache tests."""
+    vector = np.zeros(64, dtype=np.float32)
+    for word in text.lower().split():
+        vector[hash(word) % 64] += 1.0
+    return vector
+
+
+class CacheTestCase(unittest.TestCase):
+    """Base class providing a temporary cache directory."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = str(Path(self.temp_dir) / "llm_responses.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class TestExactCache(CacheTestCase):
+    """Test the exact prompt-hash cache."""
+
+    def test_put_and_get(self):
+        """Stored responses are returned for the same prompt and model."""
+        cache = LLMResponseCache(db_path=self.db_path)
+        cache.put("Summarize X", "gemini-2.5-flash", "summary")
+        self.assertEqual(cache.get("Summarize X", "gemini-2.5-flash"), "summary")
+        self.assertIsNone(cache.get("Summarize Y", "gemini-2.5-flash"))
+
+    def test_models_are_namespaced(self):
+        """A response cached for one model is not served for another."""
+        cache = LLMResponseCache(db_path=self.db_path)
+        cache.put("prompt", "gemini-2.5-flash", "flash answer")
+        self.assertIsNone(cache.get("prompt", "gemini-2.5-pro"))
+
+    def test_params_change_key(self):
+        """Different generation parameters are cached separately."""
+        cache = LLMResponseCache(db_path=self.db_path)
+        cache.put("prompt", "m", "cold", params={"temperature": 0.0})
+        self.assertIsNone(cache.get("prompt", "m", params={"temperature": 0.9}))
+        self.assertEqual(cache.get("prompt", "m", params={"temperature": 0.0}), "cold")
+
+    def test_ttl_expiry(self):
+        """Expired entries are not returned and can be purged."""
+        cache = LLMResponseCache(db_path=self.db_path, ttl_seconds=0)
+        cache.put("prompt", "m", "stale")
+        time.sleep(0.01)
+        self.assertIsNone(cache.get("prompt", "m"))
+        self.assertEqual(cache.purge_expired(), 1)
+
+    def test_persists_across_instances(self):
+        """Entries survive a restart (e.g. the next nightly ingestion run)."""
+        LLMResponseCache(db_path=self.db_path).put("prompt", "m", "kept")
+        self.assertEqual(LLMResponseCache(db_path=self.db_path).get("prompt", "m"), "kept")
+
+    def test_relative_path_uses_service_data_dir(self):
+        """Relative cache paths resolve under the data directory, not the CWD."""
+        data_dir = Path(self.temp_dir) / "data"
+        cwd = Path(self.temp_dir) / "elsewhere"
+        cwd.mkdir()
+        with patch.dict(os.environ, {"REGIQ_DATA_DIR": str(data_dir)}):
+            with patch("os.getcwd", return_value=str(cwd)):
+                cache = LLMResponseCache(db_path="cache/llm.db")
+        self.assertEqual(cache.store.db_path, data_dir / "cache" / "llm.db")
+        self.assertTrue((data_dir / "cache" / "llm.db").exists())
+        self.assertFalse(any(cwd.iterdir()))
+        cache.store.close()
+
+    def test_get_or_generate(self):
+        """The generator is only called on a miss, and empty results are not cached."""
+        cache = LLMResponseCache(db_path=self.db_path)
+        calls = []
+        generate = lambda: calls.append(1) or "answer"
+        self.assertEqual(cache.get_or_generate("p", "m", generate), "answer")
+        self.assertEqual(cache.get_or_generate("p", "m", generate), "answer")
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(cache.get_or_generate("q", "m", lambda: None))
+        self.assertIsNone(cache.get("q", "m"))
+        stats = cache.get_stats()
+        self.assertEqual(stats["exact_hits"], 1)
+        self.assertEqual(stats["entries"], 1)
+
+    def test_fallback_answers_cached_under_fallback_model(self):
+        """A fallback model's answer is not served later as the requested model's."""
+        cache = LLMResponseCache(db_path=self.db_path)
+        response, model_used = cache.get_or_generate_with_model(
+            "p", "gemini-2.5-flash", lambda: ("fallback answer", "gemini-1.5-flash")
+        )
+        self.assertEqual((response, model_used), ("fallback answer", "gemini-1.5-flash"))
+        self.assertIsNone(cache.get("p", "gemini-2.5-flash"))
+        self.assertEqual(cache.get("p", "gemini-1.5-flash"), "fallback answer")
+
+        response, model_used = cache.get_or_generate_with_model(
+            "p", "gemini-2.5-flash", lambda: ("flash answer", "gemini-2.5-flash")
+        )
+        self.assertEqual(model_used, "gemini-2.5-flash")
+        self.assertEqual(cache.get_or_generate_with_model("p", "gemini-2.5-flash", lambda: (None, "x")),
+                         ("flash answer", "gemini-2.5-flash"))
+
+
+class TestSemanticCache(CacheTestCase):
+    """Test near-duplicate prompt lookups."""
+
+    def test_near_duplicate_hit(self):
+        """A reworded prompt above the threshold reuses the cached response."""
+        cache = LLMResponseCache(db_path=self.db_path, semantic_threshold=0.9, embed_fn=bag_of_words)
+        cache.put("what are the reporting deadlines under the rule", "m", "30 days")
+        self.assertEqual(cache.get("What are the reporting deadlines under the rule ", "m"), "30 days")
+        self.assertIsNone(cache.get("who enforces the penalties", "m"))
+        self.assertEqual(cache.get_stats()["semantic_hits"], 1)
+
+    def test_semantic_index_reloaded(self):
+        """Embeddings persisted by one instance are searched by the next."""
+        LLMResponseCache(db_path=self.db_path, semantic_threshold=0.9,
+                         embed_fn=bag_of_words).put("list key obligations", "m", "obligations")
+        cache = LLMResponseCache(db_path=self.db_path, semantic_threshold=0.9, embed_fn=bag_of_words)
+        self.assertEqual(cache.get("List key  obligations", "m"), "obligations")
+
+    def test_disabled_without_embedder(self):
+        """Without an embedding function only exact hits are served."""
+        cache = LLMResponseCache(db_path=self.db_path, semantic_threshold=0.5)
+        cache.put("list key obligations", "m", "obligations")
+        self.assertIsNone(cache.get("List key obligations", "m"))
+
+
+class TestGeminiClientCache(CacheTestCase):
+    """Test cache integration in GeminiClient."""
+
+    def make_client(self, text: str = '{"overview": "ok"}') -> GeminiClient:
+        client = GeminiClient(
+            GeminiClientConfig(initial_backoff_seconds=0.0),
+            cache=LLMResponseCache(db_path=self.db_path),
+        )
+        client._client = SimpleNamespace(models=CountingModels(text))
+        return client
+
+    def test_generate_text_cached(self):
+        """Repeated prompts are served without an API call."""
+        client = self.make_client("answer")
+        self.assertEqual(client.generate_text("question"), "answer")
+        self.assertEqual(client.generate_text("question"), "answer")
+        self.assertEqual(client._client.models.calls, 1)
+
+    def test_structured_json_cached(self):
+        """Structured JSON calls go through the same cache."""
+        client = self.make_client()
+        self.assertEqual(client.generate_structured_json("summarize"), {"overview": "ok"})
+        self.assertEqual(client.generate_structured_json("summarize"), {"overview": "ok"})
+        self.assertEqual(client._client.models.calls, 1)
+
+    def test_cache_served_offline(self):
+        """Cached responses are available without an SDK client."""
+        client = self.make_client("answer")
+        client.generate_text("question")
+        client._client = None
+        self.assertEqual(client.generate_text("question"), "answer")
+
+    def test_stream_replays_cached_response(self):
+        """A completed stream is cached and replayed as one chunk."""
+        client = self.make_client("streamed")
+        self.assertEqual(list(client.generate_text_stream("q")), ["streamed"])
+        self.assertEqual(list(client.generate_text_stream("q")), ["streamed"])
+        self.assertEqual(client._client.models.calls, 1)
+
+    def test_default_cache_shared_with_scrapers(self):
+        """Without an explicit path the client uses LLM_CACHE_PATH, like get_shared_response_cache()."""
+        with patch.dict(os.environ, {"LLM_CACHE_PATH": self.db_path}):
+            client = GeminiClient(GeminiClientConfig())
+            self.assertIs(client.cache, get_shared_response_cache())
+        self.assertEqual(client.cache.store.db_path, Path(self.db_path))
+
+    def test_cache_disabled(self):
+        """Disabling the cache calls the API every time."""
+        client = GeminiClient(GeminiClientConfig(cache_enabled=False))
+        client._client = SimpleNamespace(models=CountingModels("answer"))
+        client.generate_text("question")
+        client.generate_text("question")
+        self.assertIsNone(client.cache)
+        self.assertEqual(client._client.models.calls, 2)
+
+
+def run_tests():
+    """Run all LLM cache tests."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    # Add all test classes
+    suite.addTests(loader.loadTestsFromTestCase(TestExactCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestSemanticCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestGeminiClientCache))
+
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
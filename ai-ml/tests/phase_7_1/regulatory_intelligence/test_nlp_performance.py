@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - NLP Performance Tests
+Test suite for NLP pipeline throughput features.
+
+Tests:
+    - Shared document analysis (single parse, Doc cache, component selection)
+    - Doc sharing across preprocessing, NER and knowledge-graph extraction
+    - Corpus streaming with nlp.pipe
+    - Compiled single-pass term matching
+    - Classifier model pool (dynamic batching, shared and persisted models)
+
+All tests run offline against stub spaCy and transformer pipelines.
+
+Author: REGIQ AI/ML Team
+Version: 1.0.0
+"""
+
+import re
+import shutil
+import tempfile
+import threading
+import itertools
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from services.regulatory_intelligence.nlp.document_analysis import DocumentAnalyzer
+from services.regulatory_intelligence.nlp.term_matcher import TermMatcher
+from services.regulatory_intelligence.nlp.model_pool import ClassifierModelPool, DynamicBatcher
+from services.regulatory_intelligence.nlp.text_classification import ClassificationConfig, RegulatoryTextClassifier
+from services.regulatory_intelligence.nlp.text_preprocessing import TextPreprocessor
+from services.regulatory_intelligence.nlp.entity_recognition import RegulatoryEntityRecognizer
+from services.regulatory_intelligence.knowledge_graph.entity_extraction import EntityExtractor
+
+
+class StubDoc:
+    """Minimal stand-in for a spaCy Doc."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = [
+            SimpleNamespace(text=m.group(), pos_="PROPN" if m.group().isupper() else "NOUN", is_space=False)
+            for m in re.finditer(r"\S+", text)
+        ]
+        self.ents = [
+            SimpleNamespace(text=m.group(), label_="ORG", start_char=m.start(), end_char=m.end())
+            for m in re.finditer(r"\bSEC\b", text)
+        ]
+        self.sents = [SimpleNamespace(text=s) for s in re.split(r"(?<=\.)\s+", text) if s]
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def has_annotation(self, attr: str) -> bool:
+        return True
+
+
+class StubNLP:
+    """Minimal stand-in for a spaCy Language pipeline that records calls."""
+
+    pipe_names = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
+
+    def __init__(self):
+        self.calls = []
+        self.pipe_calls = []
+
+    def __call__(self, text, disable=()):
+        self.calls.append((text, list(disable)))
+        return StubDoc(text)
+
+    def pipe(self, texts, batch_size=1000, n_process=1, disable=(), as_tuples=False):
+        self.pipe_calls.append({"batch_size": batch_size, "n_process": n_process, "disable": list(disable)})
+        for item in texts:
+            if as_tuples:
+                text, context = item
+                yield StubDoc(text), context
+            else:
+                yield StubDoc(item)
+
+
+SAMPLE_TEXT = "The SEC requires disclosures. Penalties apply after December 31, 2025."
+
+
+class TestDocumentAnalyzer(unittest.TestCase):
+    """Test shared document parsing."""
+
+    def setUp(self):
+        self.nlp = StubNLP()
+        self.analyzer = DocumentAnalyzer(nlp=self.nlp)
+
+    def test_doc_cached_by_content(self):
+        """The same text is parsed once."""
+        first = self.analyzer.analyze(SAMPLE_TEXT)
+        second = self.analyzer.analyze(SAMPLE_TEXT)
+        self.assertIs(first, second)
+        self.assertEqual(len(self.nlp.calls), 1)
+        self.assertEqual(self.analyzer.get_stats()["hits"], 1)
+
+    def test_only_needed_components_run(self):
+        """Components not needed by any consumer are disabled."""
+        self.analyzer.require("entities")
+        self.analyzer.analyze(SAMPLE_TEXT)
+        disabled = self.nlp.calls[0][1]
+        self.assertIn("parser", disabled)
+        self.assertIn("lemmatizer", disabled)
+        self.assertNotIn("ner", disabled)
+
+    def test_reparse_when_more_features_needed(self):
+        """A cached Doc lacking a requested feature is re-parsed once."""
+        self.analyzer.require("entities")
+        self.analyzer.analyze(SAMPLE_TEXT)
+        self.analyzer.analyze(SAMPLE_TEXT, features=["sentences"])
+        self.analyzer.analyze(SAMPLE_TEXT, features=["entities", "sentences"])
+        self.assertEqual(len(self.nlp.calls), 2)
+        self.assertNotIn("parser", self.nlp.calls[1][1])
+
+    def test_cache_eviction(self):
+        """The cache is bounded."""
+        analyzer = DocumentAnalyzer(nlp=self.nlp, cache_size=2)
+        for text in ("a", "b", "c"):
+            analyzer.analyze(text)
+        analyzer.analyze("a")
+        self.assertEqual(len(self.nlp.calls), 4)
+        self.assertEqual(analyzer.get_stats()["cached_documents"], 2)
+
+    def test_unknown_feature_rejected(self):
+        """Unknown feature names raise."""
+        with self.assertRaises(ValueError):
+            self.analyzer.require("coreference")
+
+
+class TestSharedDocPipeline(unittest.TestCase):
+    """Test that NLP consumers share one parse per document."""
+
+    def setUp(self):
+        self.nlp = StubNLP()
+        self.analyzer = DocumentAnalyzer(nlp=self.nlp)
+
+    def test_preprocessor_parses_once(self):
+        """Tokens, sentences and POS tags come from a single parse."""
+        preprocessor = TextPreprocessor(analyzer=self.analyzer)
+        result = preprocessor.process_text(SAMPLE_TEXT)
+        self.assertEqual(len(self.nlp.calls), 1)
+        self.assertEqual(len(result.sentences), 2)
+        self.assertEqual([tag[0] for tag in result.pos_tags], result.tokens)
+
+    def test_recognizer_parses_once(self):
+        """Regulatory entities and dates share one parse."""
+        recognizer = RegulatoryEntityRecognizer(analyzer=self.analyzer)
+        recognizer.recognize_entities(SAMPLE_TEXT)
+        self.assertEqual(len(self.nlp.calls), 1)
+
+    def test_pipeline_shares_doc(self):
+        """Preprocessing, NER and knowledge-graph extraction share the Doc."""
+        preprocessor = TextPreprocessor(analyzer=self.analyzer)
+        recognizer = RegulatoryEntityRecognizer(analyzer=self.analyzer)
+        extractor = EntityExtractor(analyzer=self.analyzer)
+
+        preprocessor.segment_sentences(SAMPLE_TEXT)
+        recognizer.recognize_entities(SAMPLE_TEXT)
+        entities = extractor.extract_entities(SAMPLE_TEXT, "doc_1")
+
+        self.assertEqual(len(self.nlp.calls), 1)
+        self.assertIn("SEC", [entity.name for entity in entities])
+
+
+class TestCorpusStreaming(unittest.TestCase):
+    """Test nlp.pipe-based corpus processing."""
+
+    def setUp(self):
+        self.nlp = StubNLP()
+        self.analyzer = DocumentAnalyzer(nlp=self.nlp)
+
+    def test_preprocessor_stream_is_lazy(self):
+        """Results stream from an unbounded generator."""
+        preprocessor = TextPreprocessor(analyzer=self.analyzer)
+        corpus = (f"Filing {i} under SEC rules." for i in itertools.count())
+        results = list(itertools.islice(preprocessor.process_stream(corpus, batch_size=8), 3))
+        self.assertEqual([r.original_text for r in results],
+                         [f"Filing {i} under SEC rules." for i in range(3)])
+        self.assertEqual(self.nlp.calls, [])
+
+    def test_preprocessor_stream_survives_bad_text(self):
+        """A text that fails to clean gets an error result; the rest of the stream continues."""
+        class UnreadableText:
+            def __str__(self):
+                raise ValueError("undecodable")
+
+        preprocessor = TextPreprocessor(analyzer=self.analyzer)
+        bad = UnreadableText()
+        results = list(preprocessor.process_stream(["SEC rule one.", bad, "SEC rule two."]))
+        self.assertEqual(len(results), 3)
+        self.assertIs(results[1].original_text, bad)
+        self.assertEqual(results[1].metadata, {'error': 'undecodable'})
+        self.assertEqual([r.cleaned_text for r in (results[0], results[2])], ["SEC rule one.", "SEC rule two."])
+        self.assertTrue(results[2].tokens)
+
+    def test_preprocessor_disables_ner(self):
+        """Preprocessing runs without the NER component."""
+        RegulatoryEntityRecognizer(analyzer=self.analyzer)
+        preprocessor = TextPreprocessor(analyzer=self.analyzer)
+        preprocessor.batch_process([SAMPLE_TEXT], batch_size=16, n_process=2)
+        call = self.nlp.pipe_calls[0]
+        self.assertIn("ner", call["disable"])
+        self.assertNotIn("parser", call["disable"])
+        self.assertEqual((call["batch_size"], call["n_process"]), (16, 2))
+
+    def test_recognizer_batch(self):
+        """Batch recognition runs only NER and matches single-text results."""
+        TextPreprocessor(analyzer=self.analyzer)
+        recognizer = RegulatoryEntityRecognizer(analyzer=self.analyzer)
+        batch = recognizer.batch_recognize([SAMPLE_TEXT, "No entities here."])
+        single = recognizer.recognize_entities(SAMPLE_TEXT)
+
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch[0].all_entities, single.all_entities)
+        disabled = self.nlp.pipe_calls[0]["disable"]
+        self.assertIn("parser", disabled)
+        self.assertIn("tagger", disabled)
+        self.assertNotIn("ner", disabled)
+
+
+class TestTermMatcher(unittest.TestCase):
+    """Test the compiled multi-pattern matcher."""
+
+    def setUp(self):
+        self.matcher = TermMatcher()
+        self.matcher.add('framework', 'Basel', ['Basel III', 'Basel'])
+        self.matcher.add('agency', 'SEC', ['Securities and Exchange Commission', 'SEC'])
+        self.matcher.add('penalty', 'fine', ['fine'], whole_word=False)
+
+    def test_overlapping_and_prefix_matches(self):
+        """Every alias is found, including prefixes of longer aliases."""
+        matches = self.matcher.find_all("Basel III applies; the sec agrees.")
+        found = [(m.text, m.category, m.key) for m in matches]
+        self.assertIn(('Basel III', 'framework', 'Basel'), found)
+        self.assertIn(('Basel', 'framework', 'Basel'), found)
+        self.assertIn(('sec', 'agency', 'SEC'), found)
+
+    def test_whole_word_matching(self):
+        """Whole-word aliases do not match inside other words; substrings do."""
+        matches = self.matcher.find_all("Section 5 defines fines.")
+        self.assertNotIn('agency', [m.category for m in matches])
+        self.assertEqual([m.start for m in matches if m.category == 'penalty'], [12, 18])
+
+    def test_category_filter(self):
+        """Only requested categories are reported."""
+        self.assertTrue(self.matcher.contains("a fine of $5", ['penalty']))
+        self.assertFalse(self.matcher.contains("a fine of $5", ['agency']))
+
+    def test_recognizer_pattern_entities(self):
+        """The recognizer extracts agencies and frameworks in one pass."""
+        recognizer = RegulatoryEntityRecognizer(analyzer=DocumentAnalyzer(nlp=StubNLP()))
+        text = "The European Central Bank (ECB) enforces Basel III. See Section 2."
+        entities = recognizer._extract_entities_pattern_based(text)
+        found = {(e.text, e.label) for e in entities}
+        self.assertIn(('European Central Bank', 'REGULATORY_AGENCY'), found)
+        self.assertIn(('ECB', 'REGULATORY_AGENCY'), found)
+        self.assertIn(('Basel III', 'REGULATORY_FRAMEWORK'), found)
+        self.assertNotIn('Sec', {e.text for e in entities})
+        self.assertTrue(recognizer._is_penalty_context("a civil penalty of $5", 18, 20))
+        self.assertTrue(recognizer._is_deadline("the deadline is 1/1/2026", 16, 24))
+
+
+    def test_term_index_shared_per_call_not_per_instance(self):
+        """Each recognition matches terms once, with no index stored on the recognizer."""
+        recognizer = RegulatoryEntityRecognizer(analyzer=DocumentAnalyzer(nlp=StubNLP()))
+        texts = [f"The SEC imposed a civil penalty of ${i},000 with a deadline of 1/{i}/2026." for i in range(1, 9)]
+        expected = [recognizer.recognize_entities(text).metadata['penalty_entities'] for text in texts]
+
+        calls = []
+        find_all = recognizer.term_matcher.find_all
+
+        def counting_find_all(text, categories=None):
+            if categories is None:
+                calls.append(text)
+            return find_all(text, categories)
+
+        recognizer.term_matcher.find_all = counting_find_all
+        recognizer.recognize_entities(texts[0])
+        self.assertEqual(calls, [texts[0]])
+        self.assertFalse(hasattr(recognizer, '_term_index'))
+
+        results = [None] * len(texts)
+
+        def recognize(i):
+            for _ in range(20):
+                results[i] = recognizer.recognize_entities(texts[i]).penalty_entities
+
+        threads = [threading.Thread(target=recognize, args=(i,)) for i in range(len(texts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([len(r) for r in results], expected)
+        self.assertEqual([r[0].amount for r in results], [i * 1000.0 for i in range(1, 9)])
+
+
+class StubTransformerLoader:
+    """Stand-in transformer loader that records loads and batch sizes."""
+
+    def __init__(self):
+        self.loads = []
+        self.batch_sizes = []
+
+    def __call__(self, model_name, backend):
+        self.loads.append((model_name, backend))
+
+        def run(texts):
+            self.batch_sizes.append(len(texts))
+            return [{'label': 'NEGATIVE' if 'penalty' in text else 'POSITIVE', 'score': 0.9} for text in texts]
+
+        return run
+
+
+class TestClassifierModelPool(unittest.TestCase):
+    """Test the shared classifier model pool."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.loader = StubTransformerLoader()
+        self.pool = ClassifierModelPool(self.temp_dir, transformer_loader=self.loader)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_classifier(self, pool=None, **config):
+        return RegulatoryTextClassifier(ClassificationConfig(**config), model_pool=pool or self.pool)
+
+    def test_batcher_coalesces_concurrent_requests(self):
+        """Concurrent single requests are grouped up to the batch size."""
+        batches = []
+        batcher = DynamicBatcher(lambda items: batches.append(len(items)) or [i * 2 for i in items],
+                                 max_batch_size=8, max_wait_ms=50)
+        results = {}
+        threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, batcher.submit(i).result()))
+                   for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.close()
+
+        self.assertEqual(results, {i: i * 2 for i in range(20)})
+        self.assertLess(len(batches), 20)
+        self.assertLessEqual(max(batches), 8)
+
+    def test_batcher_propagates_errors(self):
+        """Inference errors are raised to every caller in the batch."""
+        def fail(items):
+            raise RuntimeError("model crashed")
+        batcher = DynamicBatcher(fail, max_wait_ms=1)
+        with self.assertRaises(RuntimeError):
+            batcher.predict(["a", "b"])
+        batcher.close()
+
+    def test_transformer_loaded_once(self):
+        """Classifier instances share one transformer per model and backend."""
+        first = self.make_classifier(use_transformer=True, inference_backend="int8")
+        second = self.make_classifier(use_transformer=True, inference_backend="int8")
+        self.assertIs(first.transformer_pipeline, second.transformer_pipeline)
+        self.assertEqual(len(self.loader.loads), 1)
+        self.assertEqual(self.loader.loads[0][1], "int8")
+        with self.assertRaises(ValueError):
+            self.pool.get_transformer("model", backend="tensorrt")
+
+    def test_classify_batch_single_forward_pass(self):
+        """A batch of texts runs through the transformer together."""
+        classifier = self.make_classifier(use_transformer=True, max_batch_size=16)
+        texts = ["routine update", "civil penalty imposed", "quarterly report"]
+        results = classifier.classify_batch(texts)
+        self.assertEqual(self.loader.batch_sizes, [3])
+        self.assertEqual([r.risk_level for r in results], ["LOW", "HIGH", "LOW"])
+
+    def test_persisted_models_loaded_instead_of_retrained(self):
+        """Trained pipelines are saved once and loaded by later processes."""
+        self.make_classifier().train_all_models()
+
+        fresh_pool = ClassifierModelPool(self.temp_dir, transformer_loader=self.loader)
+        classifier = self.make_classifier(pool=fresh_pool)
+        self.assertEqual(set(classifier.models), set(RegulatoryTextClassifier.MODEL_NAMES))
+
+        classifier._train_model = lambda data, name: self.fail("retrained a persisted model")
+        classifier.train_all_models()
+
+    def test_batch_matches_single_classification(self):
+        """Batched ML predictions equal per-text predictions."""
+        classifier = self.make_classifier(load_persisted_models=False)
+        classifier.train_all_models(force=True)
+        texts = ["GDPR data protection consent", "Basel III capital requirements"]
+        batch = classifier.classify_batch(texts)
+        for text, result in zip(texts, batch):
+            single = classifier.classify_text(text)
+            self.assertEqual(result.metadata['ml_results'], single.metadata['ml_results'])
+
+
+def run_tests():
+    """Run all NLP performance tests."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    # Add all test classes
+    suite.addTests(loader.loadTestsFromTestCase(TestDocumentAnalyzer))
+    suite.addTests(loader.loadTestsFromTestCase(TestSharedDocPipeline))
+    suite.addTests(loader.loadTestsFromTestCase(TestCorpusStreaming))
+    suite.addTests(loader.loadTestsFromTestCase(TestTermMatcher))
+    suite.addTests(loader.loadTestsFromTestCase(TestClassifierModelPool))
+
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
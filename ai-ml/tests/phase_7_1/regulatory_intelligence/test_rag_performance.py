@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - RAG Performance Tests
+Test suite for the RAG query-path optimizations.
+
+Tests:
+    - Query normalization and versioned query cache
+    - Query embedding reuse and batching
+    - Batched similarity search with result caching
+    - BM25 lexical index and reciprocal rank fusion
+    - Token-budget context packing
+    - Streaming answer generation
+
+Author: REGIQ AI/ML Team
+Version: 1.0.0
+"""
+
+import asyncio
+import unittest
+import tempfile
+import numpy as np
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from services.regulatory_intelligence.rag import vector_database, document_embeddings
+from services.regulatory_intelligence.rag.context_packing import ContextPacker
+from services.regulatory_intelligence.rag.embedding_cache import QueryCache, normalize_query
+from services.regulatory_intelligence.rag.lexical_index import (
+    BM25Index, reciprocal_rank_fusion, tokenize
+)
+from services.regulatory_intelligence.rag.retrieval_system import (
+    ContextRetriever, ResponseGenerator, RetrievalConfig
+)
+from services.regulatory_intelligence.rag.vector_database import VectorDBConfig
+
+
+def _search_result(doc_id: str, distance: float = 0.1):
+    """Build a single-query vector DB result."""
+    return {
+        "documents": [[f"content of {doc_id}"]],
+        "metadatas": [[{"document_id": doc_id, "title": doc_id, "source": "test"}]],
+        "distances": [[distance]],
+    }
+
+
+class TestQueryCache(unittest.TestCase):
+    """Test query normalization and the versioned query cache."""
+
+    def test_normalize_query(self):
+        """Equivalent FAQ phrasings share a cache key."""
+        self.assertEqual(
+            normalize_query("  What is  GDPR? "),
+            normalize_query("what is gdpr")
+        )
+
+    def test_version_change_clears_cache(self):
+        """Changing the index version drops cached entries."""
+        cache = QueryCache(max_size=4)
+        cache.sync_version(1)
+        cache.put("q", [1])
+        self.assertEqual(cache.get("q"), [1])
+
+        cache.sync_version(1)
+        self.assertEqual(cache.get("q"), [1])
+
+        cache.sync_version(2)
+        self.assertIsNone(cache.get("q"))
+
+    def test_statistics(self):
+        """Hits and misses are tracked."""
+        cache = QueryCache(max_size=4)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+
+class TestQueryEmbeddingBatching(unittest.TestCase):
+    """Test query embedding reuse in VectorDatabaseManager."""
+
+    def setUp(self):
+        """Set up a manager with mocked backends."""
+        patches = [
+            patch.object(vector_database, "EmbeddingPipeline"),
+            patch.object(vector_database, "ChromaDBManager"),
+            patch.object(vector_database, "FAISSManager"),
+            patch.object(vector_database, "BM25Index"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.vdb = vector_database.VectorDatabaseManager(VectorDBConfig())
+        self.encode = self.vdb.embedding_pipeline.generate_embeddings
+        self.encode.side_effect = lambda texts: np.random.rand(len(texts), 384).astype(np.float32)
+
+    def test_duplicate_queries_encoded_once(self):
+        """Duplicate queries in a batch are encoded in one pass."""
+        embeddings = self.vdb.embed_queries(["What is GDPR?", "what is gdpr", "Basel III"])
+
+        self.assertEqual(embeddings.shape, (3, 384))
+        self.encode.assert_called_once()
+        self.assertEqual(len(self.encode.call_args[0][0]), 2)
+        np.testing.assert_array_equal(embeddings[0], embeddings[1])
+
+    def test_cached_queries_not_reencoded(self):
+        """Repeated queries reuse cached embeddings."""
+        self.vdb.embed_queries(["What is GDPR?"])
+        self.vdb.embed_queries(["What is GDPR?"])
+
+        self.assertEqual(self.encode.call_count, 1)
+
+    def test_index_version_shared_across_processes(self):
+        """Ingestion by another manager on the same indexes changes the version."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = VectorDBConfig(index_version_path=str(Path(temp_dir) / "index_version"))
+            reader = vector_database.VectorDatabaseManager(config)
+            writer = vector_database.VectorDatabaseManager(config)
+            writer.embedding_pipeline.generate_embeddings.side_effect = self.encode.side_effect
+
+            before = reader.index_version
+            self.assertEqual(reader.index_version, before)
+            writer.add_documents(["GDPR text"], [{"source": "eu"}], ["doc_1"])
+            self.assertNotEqual(reader.index_version, before)
+
+
+class TestBatchedSimilaritySearch(unittest.TestCase):
+    """Test batched search and result caching in DocumentEmbeddingService."""
+
+    def setUp(self):
+        """Set up a service with a mocked vector database."""
+        patches = [
+            patch.object(document_embeddings, "VectorDatabaseManager"),
+            patch.object(document_embeddings, "EmbeddingPipeline"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.service = document_embeddings.DocumentEmbeddingService(VectorDBConfig())
+        self.vector_db = self.service.vector_db
+        self.vector_db.index_version = 0
+        self.vector_db.search_documents.side_effect = lambda q, n: _search_result(q)
+        self.vector_db.search_documents_batch.side_effect = (
+            lambda qs, n: [_search_result(q) for q in qs]
+        )
+
+    def test_repeated_query_served_from_cache(self):
+        """The second identical query does not hit the vector DB."""
+        first = self.service.search_similar_documents("What is GDPR?")
+        second = self.service.search_similar_documents("what is GDPR")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.vector_db.search_documents.call_count, 1)
+
+    def test_cached_results_are_copies(self):
+        """Callers mutating results do not corrupt the cache."""
+        first = self.service.search_similar_documents("GDPR")
+        first[0]["relevance_score"] = 1.0
+
+        second = self.service.search_similar_documents("GDPR")
+        self.assertNotIn("relevance_score", second[0])
+
+    def test_index_version_invalidates_results(self):
+        """Adding documents invalidates cached results."""
+        self.service.search_similar_documents("GDPR")
+        self.vector_db.index_version += 1
+        self.service.search_similar_documents("GDPR")
+
+        self.assertEqual(self.vector_db.search_documents.call_count, 2)
+
+    def test_batch_search_single_backend_call(self):
+        """A batch of queries is searched with one backend call."""
+        self.service.search_similar_documents("cached question")
+        questions = ["cached question", "Basel III", "EU AI Act", "basel iii"]
+
+        results = self.service.search_similar_documents_batch(questions)
+
+        self.assertEqual(len(results), len(questions))
+        self.vector_db.search_documents_batch.assert_called_once()
+        self.assertEqual(
+            self.vector_db.search_documents_batch.call_args[0][0],
+            ["Basel III", "EU AI Act"]
+        )
+        self.assertEqual(results[1], results[3])
+
+
+class TestBM25Index(unittest.TestCase):
+    """Test the BM25 lexical index."""
+
+    def setUp(self):
+        """Set up an index with regulatory chunks."""
+        self.index = BM25Index()
+        self.index.add_documents(
+            ["ai_act", "reg_b", "gdpr"],
+            [
+                "Article 10(2) requires training data governance for high-risk AI systems.",
+                "Under Reg B §1002.9 creditors must notify applicants of action taken.",
+                "Article 6 lists the lawful bases for processing personal data.",
+            ],
+            [{"regulation_type": "ai"}, {"regulation_type": "credit"}, {"regulation_type": "privacy"}]
+        )
+
+    def test_tokenize_keeps_citations(self):
+        """Citation tokens survive tokenization with their parent number."""
+        self.assertIn("10(2)", tokenize("Article 10(2)"))
+        self.assertIn("10", tokenize("Article 10(2)"))
+        self.assertIn("1002.9", tokenize("Reg B §1002.9"))
+
+    def test_exact_citation_ranks_first(self):
+        """Exact citations retrieve the right chunk."""
+        self.assertEqual(self.index.search("Article 10(2)")[0][0], "ai_act")
+        self.assertEqual(self.index.search("§ 1002.9 notice")[0][0], "reg_b")
+
+    def test_incremental_replace_and_remove(self):
+        """Re-adding a document replaces its postings."""
+        self.index.add_documents(["gdpr"], ["Data portability rights."])
+        self.assertEqual(self.index.search("lawful bases"), [])
+        self.assertEqual(self.index.search("portability")[0][0], "gdpr")
+
+        self.assertTrue(self.index.remove_document("gdpr"))
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.search("portability"), [])
+
+    def test_metadata_filter(self):
+        """Filters restrict lexical hits by metadata."""
+        hits = self.index.search("Article", filter_fn=lambda m: m["regulation_type"] == "privacy")
+        self.assertEqual([doc_id for doc_id, _ in hits], ["gdpr"])
+
+    def test_persistence_roundtrip(self):
+        """The index reloads from disk with identical scores."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = str(Path(temp_dir) / "bm25.json")
+            index = BM25Index(path)
+            index.add_documents(["a", "b"], ["Article 10(2) data governance", "Basel III capital"])
+            index.save()
+
+            reloaded = BM25Index(path)
+            self.assertEqual(len(reloaded), 2)
+            self.assertEqual(reloaded.search("Article 10(2)"), index.search("Article 10(2)"))
+
+    def test_bulk_ingest_appends_instead_of_rewriting(self):
+        """One-at-a-time ingestion journals adds and rewrites the snapshot rarely."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = str(Path(temp_dir) / "bm25.json")
+            index = BM25Index(path, compact_after=16)
+            with patch.object(index, "save", wraps=index.save) as save:
+                for i in range(512):
+                    index.add_documents([f"doc{i}"], [f"Article {i} capital requirements"])
+                index.remove_document("doc0")
+
+            # Snapshot size doubles between rewrites
+            self.assertLessEqual(save.call_count, 7)
+
+            # Journal entries since the last snapshot are replayed on load
+            reloaded = BM25Index(path)
+            self.assertEqual(len(reloaded), 511)
+            self.assertEqual(reloaded.search("Article 300")[0][0], "doc300")
+
+            index.flush()
+            self.assertFalse(index.journal_path.exists())
+            self.assertEqual(len(BM25Index(path)), 511)
+
+    def test_snapshot_keeps_term_statistics_only(self):
+        """Neither memory nor the snapshot holds document text."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "bm25.json"
+            index = BM25Index(str(path))
+            index.add_documents(["a"], ["Article 10(2) requires governance"], [{"title": "AI Act"}])
+            index.save()
+
+            self.assertNotIn("requires governance", path.read_text())
+            self.assertNotIn("text", index.documents["a"])
+            self.assertEqual(index.get_metadata("a"), {"title": "AI Act"})
+            index.remove_document("a")
+            self.assertEqual(index.search("governance"), [])
+
+    def test_compaction_keeps_other_processes_entries(self):
+        """Compacting one handle folds in entries journaled through another."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = str(Path(temp_dir) / "bm25.json")
+            first, second = BM25Index(path), BM25Index(path)
+            first.add_documents(["a"], ["Basel III capital"])
+            second.add_documents(["b"], ["Article 10(2) data governance"])
+
+            first.save()
+
+            self.assertFalse(first.journal_path.exists())
+            self.assertEqual(first.search("Article 10(2)")[0][0], "b")
+            self.assertEqual(sorted(BM25Index(path).doc_lengths), ["a", "b"])
+
+
+class TestHybridRetrieval(unittest.TestCase):
+    """Test reciprocal rank fusion and fused-result filtering."""
+
+    def test_reciprocal_rank_fusion(self):
+        """Documents found by both retrievers rank first."""
+        vector = [
+            {"document_id": "a", "similarity_score": 0.9, "retrieval_sources": ["vector"]},
+            {"document_id": "b", "similarity_score": 0.8, "retrieval_sources": ["vector"]},
+        ]
+        lexical = [
+            {"document_id": "c", "bm25_score": 7.0, "retrieval_sources": ["bm25"]},
+            {"document_id": "b", "bm25_score": 3.0, "retrieval_sources": ["bm25"]},
+        ]
+
+        fused = reciprocal_rank_fusion([vector, lexical], k=60)
+
+        self.assertEqual(fused[0]["document_id"], "b")
+        self.assertEqual(fused[0]["retrieval_sources"], ["vector", "bm25"])
+        self.assertEqual(fused[0]["similarity_score"], 0.8)
+        self.assertEqual(fused[0]["bm25_score"], 3.0)
+        self.assertEqual({d["document_id"] for d in fused}, {"a", "b", "c"})
+
+    def test_lexical_only_hits_survive_filtering(self):
+        """BM25-only hits are not dropped by the similarity threshold."""
+        retriever = ContextRetriever.__new__(ContextRetriever)
+        retriever.config = RetrievalConfig(min_similarity_threshold=0.7)
+
+        documents = reciprocal_rank_fusion([
+            [{"document_id": "weak", "similarity_score": 0.4}],
+            [{"document_id": "citation", "bm25_score": 5.0}],
+        ])
+
+        relevant = retriever._filter_relevant_documents(documents, "Article 10(2)")
+        self.assertEqual([d["document_id"] for d in relevant], ["citation"])
+        self.assertEqual(relevant[0]["relevance_score"], 1.0)
+
+
+class TestContextPacker(unittest.TestCase):
+    """Test token-budget context packing."""
+
+    @staticmethod
+    def _word_counter(text: str) -> int:
+        """Deterministic token counter: one token per word."""
+        return len(text.split())
+
+    @staticmethod
+    def _doc(doc_id: str, words: int, score: float, **metadata):
+        """Build a retrieved document with distinct content."""
+        return {
+            "document_id": doc_id,
+            "title": doc_id,
+            "similarity_score": score,
+            "content": " ".join(f"{doc_id}_{i}" for i in range(words)),
+            "metadata": metadata,
+        }
+
+    def _packer(self, max_tokens: int, strategy: str = "greedy") -> ContextPacker:
+        return ContextPacker(max_tokens=max_tokens, token_counter=self._word_counter, strategy=strategy)
+
+    def test_respects_budget_and_skips_oversized(self):
+        """An oversized chunk is skipped instead of ending selection."""
+        docs = [self._doc("big", 200, 0.95), self._doc("a", 20, 0.9), self._doc("b", 20, 0.85)]
+
+        packed = self._packer(max_tokens=80).pack(docs)
+
+        self.assertEqual([d["document_id"] for d in packed], ["a", "b"])
+        self.assertLessEqual(sum(d["token_count"] for d in packed), 80)
+
+    def test_near_duplicates_removed(self):
+        """Near-identical passages are sent only once."""
+        original = self._doc("orig", 60, 0.9)
+        duplicate = dict(original, document_id="dup", similarity_score=0.8)
+        duplicate["content"] = original["content"] + " extra"
+
+        packed = self._packer(max_tokens=1000).pack([original, duplicate])
+
+        self.assertEqual([d["document_id"] for d in packed], ["orig"])
+
+    def test_knapsack_maximizes_score(self):
+        """Knapsack finds the best-scoring combination within budget."""
+        docs = [self._doc("x", 50, 0.9), self._doc("y", 50, 0.85), self._doc("z", 90, 0.99)]
+
+        packed = self._packer(max_tokens=120, strategy="knapsack").pack(docs)
+
+        self.assertEqual({d["document_id"] for d in packed}, {"x", "y"})
+
+    def test_input_documents_not_mutated(self):
+        """Token counts are set on copies, not on the caller's documents."""
+        docs = [self._doc("a", 20, 0.9), self._doc("b", 20, 0.85)]
+
+        packed = self._packer(max_tokens=80).pack(docs)
+
+        self.assertEqual([d["document_id"] for d in packed], ["a", "b"])
+        self.assertTrue(all(d["token_count"] > 20 for d in packed))
+        self.assertTrue(all("token_count" not in d for d in docs))
+
+
+class TestStreamingResponse(unittest.TestCase):
+    """Test streaming answer generation."""
+
+    class FakeGeminiClient:
+        """Offline Gemini client that streams a fixed answer."""
+
+        def __init__(self, tokens_per_char=0.25):
+            self.prompts = []
+            self.counted = []
+            self.tokens_per_char = tokens_per_char
+
+        def count_tokens(self, text):
+            self.counted.append(text)
+            return int(len(text) * self.tokens_per_char)
+
+        async def agenerate_text_stream(self, prompt):
+            self.prompts.append(prompt)
+            for chunk in ["Consent ", "is ", "required."]:
+                yield chunk
+
+    def _collect(self, generator, docs):
+        async def run():
+            return [event async for event in generator.agenerate_response_stream("Need consent?", docs)]
+        return asyncio.run(run())
+
+    def test_tokens_then_citations(self):
+        """Tokens stream first and citations arrive at the end."""
+        client = self.FakeGeminiClient()
+        generator = ResponseGenerator(gemini_client=client)
+        docs = [{"document_id": "gdpr", "title": "GDPR", "source": "EUR-Lex",
+                 "similarity_score": 0.9, "content": "Article 7 requires consent."}]
+
+        events = self._collect(generator, docs)
+
+        self.assertEqual([e["event"] for e in events], ["token", "token", "token", "citations"])
+        self.assertEqual("".join(e["data"]["text"] for e in events[:-1]), "Consent is required.")
+        self.assertEqual(events[-1]["data"]["citations"], ["GDPR (EUR-Lex)"])
+        self.assertIn("Article 7 requires consent.", client.prompts[0])
+
+    def test_one_exact_count_per_prompt(self):
+        """Packing counts locally; only the assembled prompt is counted by the model."""
+        client = self.FakeGeminiClient()
+        generator = ResponseGenerator(gemini_client=client)
+        docs = [{"document_id": f"d{i}", "title": f"T{i}", "source": "S",
+                 "similarity_score": 0.9, "content": f"Article {i} text " * 20} for i in range(10)]
+
+        self._collect(generator, docs)
+
+        self.assertEqual(client.counted, client.prompts)
+
+    def test_repacks_when_estimate_undercounts(self):
+        """A prompt whose exact count overflows the budget is repacked smaller."""
+        client = self.FakeGeminiClient(tokens_per_char=1.0)
+        generator = ResponseGenerator(gemini_client=client, config=RetrievalConfig(max_context_tokens=400))
+        docs = [{"document_id": f"d{i}", "title": f"T{i}", "source": "S",
+                 "similarity_score": 0.9 - i / 100, "content": f"doc{i} " + "words " * 40}
+                for i in range(6)]
+
+        events = self._collect(generator, docs)
+
+        context = client.prompts[0].split("Context:\n", 1)[1].split("\n\nQuestion:", 1)[0]
+        self.assertGreater(events[-1]["data"]["context_used"], 0)
+        self.assertLess(events[-1]["data"]["context_used"], 6)
+        self.assertLessEqual(client.count_tokens(context), 400)
+
+    def test_error_event_on_failure(self):
+        """Generation failures surface as an error event."""
+        client = self.FakeGeminiClient()
+
+        async def failing_stream(prompt):
+            raise RuntimeError("boom")
+            yield  # pragma: no cover
+
+        client.agenerate_text_stream = failing_stream
+        generator = ResponseGenerator(gemini_client=client)
+
+        events = self._collect(generator, [{"title": "t", "content": "c"}])
+        self.assertEqual(events[-1]["event"], "error")
+
+
+def run_tests():
+    """Run all RAG performance tests."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    # Add all test classes
+    suite.addTests(loader.loadTestsFromTestCase(TestQueryCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestQueryEmbeddingBatching))
+    suite.addTests(loader.loadTestsFromTestCase(TestBatchedSimilaritySearch))
+    suite.addTests(loader.loadTestsFromTestCase(TestBM25Index))
+    suite.addTests(loader.loadTestsFromTestCase(TestHybridRetrieval))
+    suite.addTests(loader.loadTestsFromTestCase(TestContextPacker))
+    suite.addTests(loader.loadTestsFromTestCase(TestStreamingResponse))
+
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
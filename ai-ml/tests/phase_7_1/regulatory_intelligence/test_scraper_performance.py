@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+REGIQ AI/ML - Scraper Performance Tests
+Test suite for concurrent regulatory crawling.
+
+Tests:
+    - Async HTTP layer (per-host rate limits, concurrency cap, conditional GETs, retries)
+    - Concurrent SEC EDGAR crawl
+    - Concurrent EU agency crawl
+    - Incremental crawls with the crawl ledger (skip unchanged, resume after a crash)
+    - PDF extraction engine (backend selection, parallel page stream, table detection)
+
+All tests run offline against a local stub HTTP server and a text-file PDF backend.
+
+Author: REGIQ AI/ML Team
+Version: 1.0.0
+"""
+
+import os
+import json
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+import unittest
+import sys
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from services.regulatory_intelligence.scrapers.async_http import AsyncHttpClient, AsyncTokenBucket, ConditionalCache
+from services.regulatory_intelligence.scrapers import pdf_extraction
+from services.regulatory_intelligence.scrapers.pdf_extraction import PDFExtractionEngine, looks_tabular
+
+
+TODAY = datetime.now().strftime('%Y-%m-%d')
+ACCESSIONS = [f"0000320193-24-00000{i}" for i in range(6)]
+
+
+class StubRegulatoryServer:
+    """Local HTTP server imitating SEC EDGAR and EU agency pages."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failures = {}
+        self.revisions = {}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def route(self, path: str):
+        """Body for a path, or None for 404."""
+        if path == '/company_tickers.json':
+            return json.dumps({"0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."}})
+        if path == '/submissions/CIK0000320193.json':
+            return json.dumps({
+                "cik": "320193",
+                "name": "Apple Inc.",
+                "filings": {"recent": {
+                    "accessionNumber": ACCESSIONS,
+                    "filingDate": [TODAY] * len(ACCESSIONS),
+                    "form": ["10-K"] * len(ACCESSIONS),
+                }}
+            })
+        if path.startswith('/Archives/'):
+            return f"FILING TEXT {path}{self.revisions.get(path, '')}"
+        if path == '/esma/news':
+            items = ''.join(
+                f'<article class="news-item"><h3 class="title">Guideline {i}</h3>'
+                f'<a href="/esma/doc/{i}">read</a><time class="date">{TODAY}</time></article>'
+                for i in range(4)
+            )
+            return f"<html><body>{items}</body></html>"
+        if path.startswith('/esma/doc/'):
+            return f"<html><body><main>ESMA document {path}{self.revisions.get(path, '')}</main></body></html>"
+        if path == '/static':
+            return "unchanged"
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append((time.monotonic(), self.path, dict(self.headers)))
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    time.sleep(server.delay)
+                    self._respond()
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def _respond(self):
+                with server._lock:
+                    failures = server.failures.get(self.path, 0)
+                    if failures:
+                        server.failures[self.path] = failures - 1
+                if failures:
+                    self._send(429, b"", {'Retry-After': '0'})
+                    return
+
+                body = server.route(self.path)
+                if body is None:
+                    self._send(404, b"")
+                    return
+
+                etag = f'"{hash(body) & 0xffffffff:x}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self._send(304, b"", {'ETag': etag})
+                    return
+                self._send(200, body.encode('utf-8'), {'ETag': etag})
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class TextPageBackend:
+    """PDF backend stand-in reading form-feed separated pages from a text file."""
+    
+    def __init__(self, path):
+        with open(path, encoding='utf-8') as f:
+            self.pages = f.read().split('\f')
+        self.page_count = len(self.pages)
+    
+    def metadata(self):
+        return {'title': self.pages[0].splitlines()[0]}
+    
+    def page_text(self, index):
+        return self.pages[index]
+    
+    def page_tables(self, index):
+        return [([line.split() for line in self.pages[index].splitlines()], None)]
+    
+    def page_images(self, index):
+        return []
+    
+    def close(self):
+        pass
+
+
+class BlankPageBackend(TextPageBackend):
+    """Backend that opens every file but finds no text layer."""
+    
+    def page_text(self, index):
+        return ""
+
+
+class TestAsyncHttpClient(unittest.TestCase):
+    """Test the async HTTP layer."""
+
+    def fetch(self, server, paths, **client_options):
+        async def run():
+            async with AsyncHttpClient("REGIQ test", **client_options) as client:
+                return await client.get_many(f"{server.url}{path}" for path in paths), client.stats
+        return asyncio.run(run())
+
+    def test_requests_run_concurrently(self):
+        """Independent requests overlap up to the concurrency cap."""
+        with StubRegulatoryServer(delay=0.1) as server:
+            start = time.monotonic()
+            results, _ = self.fetch(server, ['/static'] * 8, default_rate=1000, max_concurrency=4)
+            elapsed = time.monotonic() - start
+
+        self.assertTrue(all(result.text == "unchanged" for result in results))
+        self.assertEqual(server.max_in_flight, 4)
+        self.assertLess(elapsed, 0.8 * 0.1 * 8)
+
+    def test_per_host_rate_limit(self):
+        """Requests to a host never exceed its token-bucket rate."""
+        with StubRegulatoryServer(delay=0.0) as server:
+            start = time.monotonic()
+            self.fetch(server, ['/static'] * 6, host_rates={'127.0.0.1': 2}, max_concurrency=8)
+            elapsed = time.monotonic() - start
+        # Requests are spaced 0.5s apart from the start: no initial burst
+        self.assertGreaterEqual(elapsed, 2.4)
+
+    def test_conditional_get(self):
+        """A revalidated page is served from cache after a 304."""
+        async def run(server):
+            async with AsyncHttpClient("REGIQ test", default_rate=1000) as client:
+                first = await client.get(f"{server.url}/static")
+                second = await client.get(f"{server.url}/static")
+                return first, second, client.stats
+
+        with StubRegulatoryServer(delay=0.0) as server:
+            first, second, stats = asyncio.run(run(server))
+
+        self.assertFalse(first.not_modified)
+        self.assertTrue(second.not_modified)
+        self.assertEqual(second.text, "unchanged")
+        self.assertEqual(stats['not_modified'], 1)
+        self.assertIn('If-None-Match', server.requests[1][2])
+
+    def test_conditional_cache_bounded_by_bytes(self):
+        """Cached bodies are evicted by total size, and oversized bodies are not kept."""
+        cache = ConditionalCache(max_entries=100, max_bytes=1000)
+        for i in range(5):
+            cache.put(f"u{i}", {'etag': f'"{i}"', 'content': b"x" * 300})
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get("u0"))
+        self.assertEqual(cache.total_bytes, 900)
+
+        cache.put("u4", {'etag': '"big"', 'content': b"x" * 2000})
+        self.assertIsNone(cache.get("u4"))
+        self.assertEqual(cache.total_bytes, 600)
+
+    def test_retry_on_rate_limit(self):
+        """429 responses are retried after the Retry-After delay."""
+        with StubRegulatoryServer(delay=0.0) as server:
+            server.failures['/static'] = 2
+            results, stats = self.fetch(server, ['/static'], default_rate=1000, backoff_seconds=0.0)
+        self.assertEqual(results[0].text, "unchanged")
+        self.assertEqual(stats['retries'], 2)
+
+    def test_missing_page(self):
+        """Non-retryable errors return None."""
+        with StubRegulatoryServer(delay=0.0) as server:
+            results, _ = self.fetch(server, ['/missing'], default_rate=1000)
+        self.assertIsNone(results[0])
+
+    def test_token_bucket_shares_suffix(self):
+        """Hosts under one configured suffix share a bucket."""
+        client = AsyncHttpClient("REGIQ test", host_rates={'sec.gov': 10})
+        self.assertIs(client._bucket_for('www.sec.gov'), client._bucket_for('data.sec.gov'))
+        self.assertIsNot(client._bucket_for('www.sec.gov'), client._bucket_for('www.esma.europa.eu'))
+        self.assertIsInstance(client._bucket_for('notsec.gov'), AsyncTokenBucket)
+        self.assertIsNot(client._bucket_for('notsec.gov'), client._bucket_for('www.sec.gov'))
+
+
+class ScraperTestCase(unittest.TestCase):
+    """Base class isolating scraper side effects."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self._env = {key: os.environ.get(key) for key in ('GEMINI_API_KEY', 'LLM_CACHE_PATH')}
+        os.environ.setdefault('GEMINI_API_KEY', 'test-key')
+        os.environ['LLM_CACHE_PATH'] = str(Path(self.temp_dir) / 'llm.db')
+
+    def tearDown(self):
+        for key, value in self._env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class TestConcurrentSECCrawl(ScraperTestCase):
+    """Test the concurrent SEC EDGAR crawl."""
+
+    def make_scraper(self, server):
+        from services.regulatory_intelligence.scrapers.sec_edgar_scraper import ScrapingConfig, SECEdgarScraper
+        scraper = SECEdgarScraper(ScrapingConfig(requests_per_second=100, max_concurrency=6))
+        scraper.BASE_URL = server.url
+        scraper.EDGAR_API_URL = server.url
+        return scraper
+
+    def test_filings_downloaded_concurrently(self):
+        """Filings of a company are downloaded in parallel and returned in order."""
+        with StubRegulatoryServer(delay=0.1) as server:
+            scraper = self.make_scraper(server)
+            start = time.monotonic()
+            results = scraper.scrape_recent_filings(["Apple", "320193"], form_types=["10-K"],
+                                                    analyze_with_ai=False)
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(len(results), 2 * len(ACCESSIONS))
+        self.assertEqual([r["filing"]["accession_number"] for r in results[:len(ACCESSIONS)]], ACCESSIONS)
+        self.assertTrue(results[0]["content"].startswith("FILING TEXT /Archives/"))
+        # Sequential fetching would take at least 15 * 0.1s
+        self.assertLess(elapsed, 1.0)
+        self.assertGreater(server.max_in_flight, 1)
+        tickers_requests = [path for _, path, _ in server.requests if path == '/company_tickers.json']
+        self.assertEqual(len(tickers_requests), 1)
+
+    def test_recrawl_revalidates(self):
+        """A second crawl revalidates unchanged filings with conditional GETs."""
+        with StubRegulatoryServer(delay=0.0) as server:
+            scraper = self.make_scraper(server)
+            scraper.scrape_recent_filings(["320193"], analyze_with_ai=False)
+            results = scraper.scrape_recent_filings(["320193"], analyze_with_ai=False)
+
+        conditional = [path for _, path, headers in server.requests if 'If-None-Match' in headers]
+        self.assertEqual(len(conditional), 1 + len(ACCESSIONS))
+        self.assertEqual(len(results), len(ACCESSIONS))
+
+    def test_called_from_running_loop(self):
+        """The synchronous entry point works inside an event loop."""
+        with StubRegulatoryServer(delay=0.0) as server:
+            scraper = self.make_scraper(server)
+
+            async def call():
+                return scraper.scrape_recent_filings(["320193"], analyze_with_ai=False)
+
+            results = asyncio.run(call())
+        self.assertEqual(len(results), len(ACCESSIONS))
+
+
+class TestConcurrentEUCrawl(ScraperTestCase):
+    """Test the concurrent EU agency crawl."""
+
+    def test_agency_documents_fetched(self):
+        """Listings are parsed and documents downloaded concurrently."""
+        from services.regulatory_intelligence.scrapers.eu_regulatory_scraper import EURegulatoryScaper
+
+        with StubRegulatoryServer(delay=0.1) as server:
+            scraper = EURegulatoryScaper(requests_per_second=100)
+            scraper.REGULATORY_SITES = {
+                "ESMA": {"name": "ESMA", "base_url": server.url, "news_url": f"{server.url}/esma/news"}
+            }
+            start = time.monotonic()
+            results = scraper.scrape_all_agencies(["ESMA", "XYZ"], analyze_with_ai=False)
+            elapsed = time.monotonic() - start
+
+        self.assertEqual([r["document"]["title"] for r in results], [f"Guideline {i}" for i in range(4)])
+        self.assertIn("ESMA document /esma/doc/0", results[0]["content"])
+        self.assertLess(elapsed, 0.45)
+
+
+class TestIncrementalCrawl(ScraperTestCase):
+    """Test incremental crawls backed by the crawl ledger."""
+    
+    def setUp(self):
+        super().setUp()
+        from services.regulatory_intelligence.scrapers.crawl_ledger import CrawlLedger
+        self.ledger = CrawlLedger(str(Path(self.temp_dir) / 'ledger.db'))
+        self.analyses = []
+    
+    def tearDown(self):
+        self.ledger.close()
+        super().tearDown()
+    
+    def make_scraper(self, server):
+        from services.regulatory_intelligence.scrapers.sec_edgar_scraper import ScrapingConfig, SECEdgarScraper
+        scraper = SECEdgarScraper(ScrapingConfig(requests_per_second=100), ledger=self.ledger)
+        scraper.BASE_URL = server.url
+        scraper.EDGAR_API_URL = server.url
+        
+        def analyze(filing, content):
+            self.analyses.append(filing.accession_number)
+            return {"summary": f"analysis of {filing.accession_number}"}
+        
+        scraper.analyze_filing_with_gemini = analyze
+        return scraper
+    
+    def crawl_and_save(self, scraper):
+        results = scraper.scrape_recent_filings(["320193"], form_types=["10-K"])
+        scraper.save_results_to_database(results, db_path=str(Path(self.temp_dir) / 'sec.db'))
+        return results
+    
+    def test_unchanged_documents_skipped(self):
+        """A crawl after a completed run skips every filing."""
+        with StubRegulatoryServer(delay=0.0) as server:
+            scraper = self.make_scraper(server)
+            first = self.crawl_and_save(scraper)
+            second = self.crawl_and_save(scraper)
+        
+        self.assertEqual(len(first), len(ACCESSIONS))
+        self.assertEqual(second, [])
+        self.assertEqual(scraper.skipped_unchanged, len(ACCESSIONS))
+        self.assertEqual(len(self.analyses), len(ACCESSIONS))
+        self.assertEqual(self.ledger.get_stats()['stages']['saved'], len(ACCESSIONS))
+    
+    def test_changed_document_reprocessed(self):
+        """Only filings whose content changed are analyzed again."""
+        with StubRegulatoryServer(delay=0.0) as server:
+            scraper = self.make_scraper(server)
+            self.crawl_and_save(scraper)
+            changed = [path for _, path, _ in server.requests if ACCESSIONS[2] in path][0]
+            server.revisions[changed] = " (amended)"
+            results = self.crawl_and_save(scraper)
+        
+        self.assertEqual([r["filing"]["accession_number"] for r in results], [ACCESSIONS[2]])
+        self.assertTrue(results[0]["content"].endswith("(amended)"))
+        self.assertEqual(self.analyses.count(ACCESSIONS[2]), 2)
+    
+    def test_resume_after_crash(self):
+        """Filings analyzed before a crash reuse their analysis and are saved on the next run."""
+        with StubRegulatoryServer(delay=0.0) as server:
+            scraper = self.make_scraper(server)
+            # Crash between analysis and save
+            scraper.scrape_recent_filings(["320193"], form_types=["10-K"])
+            self.assertEqual(self.ledger.get_stats()['stages']['analyzed'], len(ACCESSIONS))
+            results = self.crawl_and_save(scraper)
+        
+        self.assertEqual(len(results), len(ACCESSIONS))
+        self.assertEqual(len(self.analyses), len(ACCESSIONS))
+        self.assertEqual(results[0]["ai_analysis"], {"summary": f"analysis of {ACCESSIONS[0]}"})
+        self.assertEqual(self.ledger.get_stats()['stages']['saved'], len(ACCESSIONS))
+    
+    def test_failed_analysis_retried(self):
+        """Filings whose analysis failed are not marked saved and are analyzed again."""
+        with StubRegulatoryServer(delay=0.0) as server:
+            scraper = self.make_scraper(server)
+            analyze = scraper.analyze_filing_with_gemini
+            scraper.analyze_filing_with_gemini = lambda filing, content: (
+                {"error": "quota exhausted"} if filing.accession_number == ACCESSIONS[1] else analyze(filing, content)
+            )
+            self.crawl_and_save(scraper)
+            scraper.analyze_filing_with_gemini = analyze
+            results = self.crawl_and_save(scraper)
+        
+        self.assertEqual([r["filing"]["accession_number"] for r in results], [ACCESSIONS[1]])
+        self.assertEqual(results[0]["ai_analysis"], {"summary": f"analysis of {ACCESSIONS[1]}"})
+        self.assertEqual(self.ledger.get_stats()['stages']['saved'], len(ACCESSIONS))
+    
+    def test_unanalyzed_documents_analyzed_later(self):
+        """Filings saved by a run without AI analysis are analyzed by the next run that asks for it."""
+        with StubRegulatoryServer(delay=0.0) as server:
+            scraper = self.make_scraper(server)
+            db_path = str(Path(self.temp_dir) / 'sec.db')
+            first = scraper.scrape_recent_filings(["320193"], form_types=["10-K"], analyze_with_ai=False)
+            scraper.save_results_to_database(first, db_path=db_path)
+            again = scraper.scrape_recent_filings(["320193"], form_types=["10-K"], analyze_with_ai=False)
+            analyzed = self.crawl_and_save(scraper)
+            final = self.crawl_and_save(scraper)
+        
+        self.assertEqual(again, [])
+        self.assertEqual(len(analyzed), len(ACCESSIONS))
+        self.assertTrue(all("summary" in r["ai_analysis"] for r in analyzed))
+        self.assertEqual(final, [])
+        self.assertEqual(len(self.analyses), len(ACCESSIONS))
+    
+    def test_eu_documents_skipped(self):
+        """Saved EU documents are revalidated and skipped."""
+        from services.regulatory_intelligence.scrapers.eu_regulatory_scraper import EURegulatoryScaper
+        
+        with StubRegulatoryServer(delay=0.0) as server:
+            scraper = EURegulatoryScaper(requests_per_second=100, ledger=self.ledger)
+            scraper.REGULATORY_SITES = {
+                "ESMA": {"name": "ESMA", "base_url": server.url, "news_url": f"{server.url}/esma/news"}
+            }
+            db_path = str(Path(self.temp_dir) / 'eu.db')
+            first = scraper.scrape_all_agencies(["ESMA"], analyze_with_ai=False)
+            scraper.save_results_to_database(first, db_path=db_path)
+            server.revisions['/esma/doc/1'] = " revised"
+            second = scraper.scrape_all_agencies(["ESMA"], analyze_with_ai=False)
+        
+        self.assertEqual(len(first), 4)
+        self.assertEqual([r["document"]["title"] for r in second], ["Guideline 1"])
+        self.assertEqual(scraper.skipped_unchanged, 3)
+
+
+class TestPDFExtractionEngine(unittest.TestCase):
+    """Test single-backend, page-parallel PDF extraction."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        pdf_extraction.PDF_BACKENDS['blank'] = BlankPageBackend
+        pdf_extraction.PDF_BACKENDS['text'] = TextPageBackend
+    
+    def tearDown(self):
+        pdf_extraction.PDF_BACKENDS.pop('blank', None)
+        pdf_extraction.PDF_BACKENDS.pop('text', None)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def write_document(self, pages):
+        path = Path(self.temp_dir) / 'document.pdf'
+        path.write_text('\f'.join(pages), encoding='utf-8')
+        return str(path)
+    
+    def test_backend_selection(self):
+        """The first backend yielding text is chosen and supplies metadata."""
+        path = self.write_document(["Capital Requirements\nArticle 1", "Article 2"])
+        engine = PDFExtractionEngine(backend_order=('blank', 'text'))
+        info = engine.inspect(path)
+        self.assertEqual(info.backend, 'text')
+        self.assertEqual(info.page_count, 2)
+        self.assertEqual(info.metadata, {'title': 'Capital Requirements'})
+        self.assertEqual(engine.inspect(path, backend='blank').backend, 'blank')
+        with self.assertRaises(FileNotFoundError):
+            engine.inspect(str(Path(self.temp_dir) / 'missing.pdf'))
+    
+    def test_parallel_page_stream(self):
+        """Large documents are extracted on the process pool and streamed in page order."""
+        pages = [f"Article {i} text" for i in range(100)]
+        path = self.write_document(pages)
+        with PDFExtractionEngine(max_workers=2, pages_per_task=7, parallel_threshold=10,
+                                 backend_order=('text',)) as engine:
+            streamed = [page.page_number for page in engine.iter_pages(path)]
+            extraction = engine.extract(path)
+            self.assertIsNotNone(engine._executor)
+        self.assertIsNone(engine._executor)
+        
+        self.assertEqual(streamed, list(range(1, 101)))
+        self.assertEqual(list(extraction.page_texts), pages)
+        self.assertEqual(extraction.page_texts[1:3], pages[1:3])
+        self.assertEqual([extraction.text[start:end] for start, end in extraction.page_texts.spans], pages)
+        self.assertIn("\n--- Page 100 ---\nArticle 99 text\n", extraction.text)
+        self.assertTrue(extraction.text.startswith("\n--- Page 1 ---\nArticle 0 text\n"))
+    
+    def test_tables_only_on_tabular_pages(self):
+        """Table extraction runs only on pages that look tabular."""
+        table = "Bank    Tier 1    Ratio\nA    12.1    4%\nB    10.3    5%\nC    9.8    6%"
+        path = self.write_document(["Narrative text about capital.", table])
+        extraction = PDFExtractionEngine(backend_order=('text',)).extract(path)
+        self.assertEqual([t['page'] for t in extraction.tables], [2])
+        self.assertEqual(extraction.tables[0]['data'][0], ["Bank", "Tier", "1", "Ratio"])
+    
+    def test_looks_tabular(self):
+        """Column layouts and numeric cell runs count as tabular."""
+        self.assertTrue(looks_tabular("a  b  c\nd  e  f\ng  h  i"))
+        self.assertTrue(looks_tabular("Ratio\n12.5%\n$1,200\n3.4\n(5)\n7\n8"))
+        self.assertFalse(looks_tabular("The institution shall hold capital.\nArticle 92 applies."))
+
+
+def run_tests():
+    """Run all scraper performance tests."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    # Add all test classes
+    suite.addTests(loader.loadTestsFromTestCase(TestAsyncHttpClient))
+    suite.addTests(loader.loadTestsFromTestCase(TestConcurrentSECCrawl))
+    suite.addTests(loader.loadTestsFromTestCase(TestConcurrentEUCrawl))
+    suite.addTests(loader.loadTestsFromTestCase(TestIncrementalCrawl))
+    suite.addTests(loader.loadTestsFromTestCase(TestPDFExtractionEngine))
+
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
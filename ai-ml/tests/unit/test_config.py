@@ -6,6 +6,7 @@ Tests environment configuration and Gemini API configuration.
 
 import pytest
 import os
+import threading
 from unittest.mock import patch, Mock
 
 from config.env_config import EnvironmentConfig, get_env_config
@@ -115,6 +116,27 @@ class TestGeminiAPIManager:
         assert hasattr(manager, 'request_times')
         assert isinstance(manager.request_times, list)
     
+    def test_rate_limit_shared_across_threads(self, gemini_config_test):
+        """Concurrent callers share one request window and never exceed the RPM limit."""
+        gemini_config_test.rate_limit_requests_per_minute = 5
+        manager = GeminiAPIManager(gemini_config_test)
+        clock = [1000.0]
+        
+        def fake_sleep(seconds):
+            clock[0] += seconds
+        
+        with patch('config.gemini_config.time.time', side_effect=lambda: clock[0]), \
+                patch('config.gemini_config.time.sleep', side_effect=fake_sleep):
+            threads = [threading.Thread(target=manager._check_rate_limit) for _ in range(12)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        # Five per minute: requests 6 and 11 each wait one full window
+        assert clock[0] == 1120.0
+        assert manager.request_times == [1120.0, 1120.0]
+    
     @patch('config.gemini_config.SDK_AVAILABLE', True)
     def test_generate_content_success(self, mock_gemini_api_manager):
         """Test successful content generation."""